@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Query
 
+from app.api.routing import ProfiledRoute
 from app.schemas.bids import (
     ApplyBidRequest,
     ApplyBidResponse,
@@ -13,7 +14,7 @@ from app.services.bid_commands import add_campaign_comment_command, apply_bid_co
 from app.services.bid_audit import get_campaign_comments, get_recent_bid_changes, get_test_entries
 from app.services.campaign_report_cache import invalidate_campaign_report_cache
 
-router = APIRouter(prefix="/bids", tags=["bids"])
+router = APIRouter(prefix="/bids", tags=["bids"], route_class=ProfiledRoute)
 
 
 @router.get("/recent", response_model=list[BidChangeRecordResponse])
@@ -1,8 +1,12 @@
 import logging
-import requests
-from fastapi import APIRouter, Depends, Query
+from time import perf_counter
+from typing import Any, Callable
+
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 
+from app.api.routing import ProfiledRoute
+from app.core.responses import cache_headers, etag_matches, not_modified, request_etag
 from app.schemas.campaigns import (
     CampaignReportResponse,
     CampaignHourlyResponse,
@@ -16,7 +20,7 @@ from app.services.campaign_reporting import (
     build_bid_change_map,
     build_campaign_comment_maps,
     build_report_rows,
-    fetch_ads_stats_by_campaign_from_credentials,
+    fetch_ads_stats_by_campaign,
     load_products_parallel,
 )
 from app.services.bid_log import load_bid_changes_df, load_campaign_comments_df
@@ -27,10 +31,11 @@ from app.services.campaign_report_cache import get_campaign_report_cache, set_ca
 from app.services.integrations.ozon_ads import get_running_campaigns
 from app.services.integrations.ozon_ads import perf_token
 from app.services.integrations.ozon_seller import seller_analytics_sku_day, seller_analytics_stocks
-from app.services.main_overview import get_main_overview_cached
+from app.services.main_overview import get_main_overview_cached, get_main_overview_version
+from app.services.task_graph import GraphTask, run_task_graph
 from app.db.session import get_db
 
-router = APIRouter(prefix="/campaigns", tags=["campaigns"])
+router = APIRouter(prefix="/campaigns", tags=["campaigns"], route_class=ProfiledRoute)
 logger = logging.getLogger(__name__)
 
 
@@ -44,6 +49,8 @@ def list_companies() -> list[CompanyConfigResponse]:
 
 @router.get("/running", response_model=list[CampaignSummaryResponse])
 def list_running_campaigns(company: str | None = Query(default=None)) -> list[CampaignSummaryResponse]:
+    import requests
+
     _company_name, config = resolve_company_config(company)
     try:
         campaigns = get_running_campaigns(
@@ -65,59 +72,12 @@ def list_running_campaigns(company: str | None = Query(default=None)) -> list[Ca
     ]
 
 
-@router.get("/report", response_model=CampaignReportResponse)
-def get_campaign_report(
-    company: str | None = Query(default=None),
-    date_from: str = Query(...),
-    date_to: str = Query(...),
-    target_drr_pct: float = Query(default=20.0),
-) -> CampaignReportResponse:
-    company_name, config = resolve_company_config(company)
-    cache_key = (company_name, str(date_from), str(date_to), float(target_drr_pct))
-    cached = get_campaign_report_cache(cache_key)
-    if cached is not None:
-        return CampaignReportResponse(**cached)
-
-    perf_client_id = (config.get("perf_client_id") or "").strip() or None
-    perf_client_secret = (config.get("perf_client_secret") or "").strip() or None
-    seller_client_id = (config.get("seller_client_id") or "").strip() or None
-    seller_api_key = (config.get("seller_api_key") or "").strip() or None
-
-    running_campaigns = get_running_campaigns(
-        client_id=perf_client_id,
-        client_secret=perf_client_secret,
-    )
-    running_ids = [str(campaign.get("id")) for campaign in running_campaigns if campaign.get("id") is not None]
-
-    if not running_ids:
-        payload = {
-            "company": company_name,
-            "date_from": date_from,
-            "date_to": date_to,
-            "target_drr_pct": float(target_drr_pct),
-            "running_campaigns_count": 0,
-            "rows": [],
-        }
-        set_campaign_report_cache(cache_key, payload)
-        return CampaignReportResponse(**payload)
-
-    by_sku, _by_day, _by_day_sku = seller_analytics_sku_day(
-        date_from,
-        date_to,
-        limit=1000,
-        client_id=seller_client_id,
-        api_key=seller_api_key,
-    )
-    stats_by_campaign_id = fetch_ads_stats_by_campaign_from_credentials(
-        perf_client_id=perf_client_id,
-        perf_client_secret=perf_client_secret,
-        date_from=date_from,
-        date_to=date_to,
-        running_ids=running_ids,
-        batch_size=15,
-    )
-    token = perf_token(client_id=perf_client_id, client_secret=perf_client_secret)
-    products_by_campaign_id = load_products_parallel(token, running_ids, page_size=100)
+def _load_sku_offer_map(
+    products_by_campaign_id: dict[str, list[dict]],
+    *,
+    seller_client_id: str | None,
+    seller_api_key: str | None,
+) -> dict[str, str]:
     campaign_skus = sorted(
         {
             str(item.get("sku")).strip()
@@ -139,26 +99,134 @@ def get_campaign_report(
             if sku is None:
                 continue
             sku_offer_map[str(sku)] = str(item.get("offer_id") or "").strip()
-    bid_log_df = load_bid_changes_df()
-    comments_df = load_campaign_comments_df()
-    comment_map, comment_all = build_campaign_comment_maps(
-        comments_df,
-        company_name=company_name,
-        date_from=date_from,
-        date_to=date_to,
-    )
-    rows, _grand_total = build_report_rows(
-        running_campaigns=running_campaigns,
-        stats_by_campaign_id=stats_by_campaign_id,
-        sales_map=by_sku,
-        products_by_campaign_id=products_by_campaign_id,
-        sku_offer_map=sku_offer_map,
-        target_drr=float(target_drr_pct) / 100.0,
-        bid_change_map=build_bid_change_map(bid_log_df, date_from=date_from, date_to=date_to),
-        active_test_map=build_active_test_map(bid_log_df),
-        comment_map=comment_map,
-        comment_all=comment_all,
+    return sku_offer_map
+
+
+def _running_ids(running_campaigns: list[dict]) -> list[str]:
+    return [str(campaign.get("id")) for campaign in running_campaigns if campaign.get("id") is not None]
+
+
+def _when_running(load: Callable[[], Any]) -> Callable[..., Any]:
+    """Graph task that runs ``load`` only when a campaign is running; the report is empty otherwise."""
+
+    def run(running_campaigns: list[dict]) -> Any:
+        return load() if _running_ids(running_campaigns) else None
+
+    return run
+
+
+@router.get("/report", response_model=CampaignReportResponse)
+def get_campaign_report(
+    company: str | None = Query(default=None),
+    date_from: str = Query(...),
+    date_to: str = Query(...),
+    target_drr_pct: float = Query(default=20.0),
+) -> CampaignReportResponse:
+    started_at = perf_counter()
+    company_name, config = resolve_company_config(company)
+    cache_key = (company_name, str(date_from), str(date_to), float(target_drr_pct))
+    cached = get_campaign_report_cache(cache_key)
+    if cached is not None:
+        cached["timings"] = {"total_ms": round((perf_counter() - started_at) * 1000, 2)}
+        return CampaignReportResponse(**cached)
+
+    perf_client_id = (config.get("perf_client_id") or "").strip() or None
+    perf_client_secret = (config.get("perf_client_secret") or "").strip() or None
+    seller_client_id = (config.get("seller_client_id") or "").strip() or None
+    seller_api_key = (config.get("seller_api_key") or "").strip() or None
+
+    results, timings = run_task_graph(
+        [
+            GraphTask(
+                "running_campaigns",
+                lambda: get_running_campaigns(client_id=perf_client_id, client_secret=perf_client_secret),
+            ),
+            GraphTask(
+                "token",
+                _when_running(lambda: perf_token(client_id=perf_client_id, client_secret=perf_client_secret)),
+                deps=("running_campaigns",),
+            ),
+            GraphTask(
+                "seller_sales",
+                _when_running(
+                    lambda: seller_analytics_sku_day(
+                        date_from,
+                        date_to,
+                        limit=1000,
+                        client_id=seller_client_id,
+                        api_key=seller_api_key,
+                    )
+                ),
+                deps=("running_campaigns",),
+            ),
+            GraphTask(
+                "ads_stats",
+                lambda running_campaigns, token: fetch_ads_stats_by_campaign(
+                    token,
+                    date_from,
+                    date_to,
+                    _running_ids(running_campaigns),
+                    15,
+                )
+                if token is not None
+                else {},
+                deps=("running_campaigns", "token"),
+            ),
+            GraphTask(
+                "products",
+                lambda running_campaigns, token: load_products_parallel(
+                    token,
+                    _running_ids(running_campaigns),
+                    page_size=100,
+                    company=company_name,
+                )
+                if token is not None
+                else {},
+                deps=("running_campaigns", "token"),
+            ),
+            GraphTask(
+                "sku_offer_map",
+                lambda products: _load_sku_offer_map(
+                    products,
+                    seller_client_id=seller_client_id,
+                    seller_api_key=seller_api_key,
+                ),
+                deps=("products",),
+            ),
+            GraphTask("bid_log", _when_running(load_bid_changes_df), deps=("running_campaigns",)),
+            GraphTask("comments", _when_running(load_campaign_comments_df), deps=("running_campaigns",)),
+        ],
+        max_workers=6,
     )
+    running_campaigns = results["running_campaigns"]
+    running_ids = _running_ids(running_campaigns)
+
+    rows_checkpoint = perf_counter()
+    rows: list[dict] = []
+    if running_ids:
+        by_sku, _by_day, _by_day_sku = results["seller_sales"]
+        bid_log_df = results["bid_log"]
+        comment_map, comment_all = build_campaign_comment_maps(
+            results["comments"],
+            company_name=company_name,
+            date_from=date_from,
+            date_to=date_to,
+        )
+        rows, _grand_total = build_report_rows(
+            running_campaigns=running_campaigns,
+            stats_by_campaign_id=results["ads_stats"],
+            sales_map=by_sku,
+            products_by_campaign_id=results["products"],
+            sku_offer_map=results["sku_offer_map"],
+            target_drr=float(target_drr_pct) / 100.0,
+            bid_change_map=build_bid_change_map(bid_log_df, date_from=date_from, date_to=date_to),
+            active_test_map=build_active_test_map(bid_log_df),
+            comment_map=comment_map,
+            comment_all=comment_all,
+        )
+    timings["rows_ms"] = round((perf_counter() - rows_checkpoint) * 1000, 2)
+    timings["total_ms"] = round((perf_counter() - started_at) * 1000, 2)
+    logger.info("campaign report built company=%s campaigns=%s timings=%s", company_name, len(running_ids), timings)
 
     payload = {
         "company": company_name,
@@ -167,6 +235,7 @@ def get_campaign_report(
         "target_drr_pct": float(target_drr_pct),
         "running_campaigns_count": len(running_ids),
         "rows": rows,
+        "timings": timings,
     }
     set_campaign_report_cache(cache_key, payload)
     return CampaignReportResponse(**payload)
@@ -210,14 +279,24 @@ def campaign_hourly(
 
 @router.get("/main-overview", response_model=MainOverviewResponse)
 def main_overview(
+    request: Request,
+    response: Response,
     company: str | None = Query(default=None),
     date_from: str = Query(...),
     date_to: str = Query(...),
     target_drr_pct: float = Query(default=20.0),
     force_refresh: bool = Query(default=False),
     db: Session = Depends(get_db),
-) -> MainOverviewResponse:
+) -> MainOverviewResponse | Response:
+    import requests
+
     company_name, _config = resolve_company_config(company)
+    params = {"company": company, "date_from": date_from, "date_to": date_to, "target_drr_pct": float(target_drr_pct)}
+    version = None if force_refresh else get_main_overview_version(**params, db=db)
+    if version is not None:
+        etag = request_etag(request, version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
     try:
         payload = get_main_overview_cached(
             company=company,
@@ -255,4 +334,8 @@ def main_overview(
             "daily_rows": [],
             "weekly_rows": [],
         }
+    if version is None and payload.get("cached_at"):
+        version = get_main_overview_version(**params, db=db)
+    if version is not None:
+        response.headers.update(cache_headers(request_etag(request, version)))
     return MainOverviewResponse(**payload)
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Query
 
+from app.api.routing import ProfiledRoute
 from app.schemas.finance import FinanceSummaryResponse
 from app.services.finance_summary import get_finance_summary
 
-router = APIRouter(prefix="/finance", tags=["finance"])
+router = APIRouter(prefix="/finance", tags=["finance"], route_class=ProfiledRoute)
 
 
 @router.get("/summary", response_model=FinanceSummaryResponse)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from app.api.deps import get_admin_user
+from app.api.routing import ProfiledRoute
 from app.core.config import get_settings
-from app.schemas.health import HealthResponse
+from app.models.user import User
+from app.schemas.health import CacheStatsItem, CacheStatsResponse, HealthResponse
+from app.services.cache import cache_stats
 
-router = APIRouter(tags=["health"])
+router = APIRouter(tags=["health"], route_class=ProfiledRoute)
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -14,3 +18,8 @@ def healthcheck() -> HealthResponse:
         service=settings.app_name,
         environment=settings.app_env,
     )
+
+
+@router.get("/health/caches", response_model=CacheStatsResponse)
+def get_cache_stats(_current_user: User = Depends(get_admin_user)) -> CacheStatsResponse:
+    return CacheStatsResponse(items=[CacheStatsItem(**item) for item in cache_stats()])
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_admin_user
+from app.api.routing import ProfiledRoute
+from app.db.session import get_db
+from app.models.user import User
+from app.schemas.jobs import JobEnqueueRequest, JobEnqueueResponse, JobListResponse, JobResponse
+from app.services.job_queue import enqueue_job, get_job, job_to_dict, list_jobs
+from app.tasks.registry import get_task
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], route_class=ProfiledRoute)
+
+
+@router.get("", response_model=JobListResponse)
+def jobs_list(
+    status: str | None = Query(default=None),
+    kind: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+    _current_user: User = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+):
+    return JobListResponse(items=[JobResponse(**job_to_dict(job)) for job in list_jobs(db, status=status, kind=kind, limit=limit)])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def jobs_get(
+    job_id: int,
+    _current_user: User = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+):
+    job = get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job_to_dict(job))
+
+
+@router.post("", response_model=JobEnqueueResponse)
+def jobs_enqueue(
+    payload: JobEnqueueRequest,
+    _current_user: User = Depends(get_admin_user),
+    db: Session = Depends(get_db),
+):
+    try:
+        spec = get_task(payload.kind)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    payload_digest = hashlib.sha1(json.dumps(payload.payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    job, created = enqueue_job(
+        db,
+        spec.name,
+        payload.payload,
+        dedup_key=payload.dedup_key or f"{spec.name}:manual:{payload_digest}",
+        timeout_seconds=spec.timeout_seconds,
+        max_attempts=spec.max_attempts,
+    )
+    return JobEnqueueResponse(created=created, job=JobResponse(**job_to_dict(job)))
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import os
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.api.routing import ProfiledRoute
+from app.core.metrics import render_prometheus
+
+router = APIRouter(tags=["metrics"], route_class=ProfiledRoute)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics(authorization: str | None = Header(default=None)) -> PlainTextResponse:
+    expected = os.getenv("METRICS_TOKEN", "").strip()
+    if expected and authorization != f"Bearer {expected}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
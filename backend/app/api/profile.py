@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
+from app.api.routing import ProfiledRoute
 from app.db.session import get_db
 from app.models.organization import Organization
 from app.models.user import User
@@ -21,7 +22,7 @@ from app.schemas.profile import (
     CompanyProfileUpdateRequest,
 )
 
-router = APIRouter(prefix="/profile", tags=["profile"])
+router = APIRouter(prefix="/profile", tags=["profile"], route_class=ProfiledRoute)
 
 
 def serialize_company(organization: Organization, role: str = "member") -> CompanyProfileResponse:
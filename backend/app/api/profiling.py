@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_admin_user
+from app.api.routing import ProfiledRoute
+from app.db.session import get_db
+from app.models.user import User
+from app.schemas.profiling import ProfileItem, ProfileListResponse, ProfilingArmRequest, ProfilingStateResponse
+from app.services.profiling import (
+    SPEEDSCOPE_SUFFIX,
+    arm_profiling,
+    disarm_profiling,
+    list_profiles,
+    profile_file,
+    profiling_state,
+)
+
+router = APIRouter(prefix="/profiling", tags=["profiling"], route_class=ProfiledRoute)
+
+
+def _state_response(db: Session) -> ProfilingStateResponse:
+    state = profiling_state(db)
+    if state is None:
+        return ProfilingStateResponse(armed=False)
+    return ProfilingStateResponse(armed=True, **state)
+
+
+@router.get("/arm", response_model=ProfilingStateResponse)
+def profiling_arm_state(db: Session = Depends(get_db), _current_user: User = Depends(get_admin_user)):
+    return _state_response(db)
+
+
+@router.post("/arm", response_model=ProfilingStateResponse)
+def profiling_arm(
+    payload: ProfilingArmRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user),
+):
+    arm_profiling(
+        db,
+        payload.path,
+        count=payload.count,
+        method=payload.method,
+        interval_ms=payload.interval_ms,
+        armed_by=current_user.email,
+    )
+    return _state_response(db)
+
+
+@router.delete("/arm", response_model=ProfilingStateResponse)
+def profiling_disarm(db: Session = Depends(get_db), _current_user: User = Depends(get_admin_user)):
+    disarm_profiling(db)
+    return _state_response(db)
+
+
+@router.get("/profiles", response_model=ProfileListResponse)
+def profiling_list(_current_user: User = Depends(get_admin_user)):
+    return ProfileListResponse(items=[ProfileItem(**item) for item in list_profiles()])
+
+
+@router.get("/profiles/{filename}")
+def profiling_download(filename: str, _current_user: User = Depends(get_admin_user)):
+    path = profile_file(filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "application/json" if filename.endswith(SPEEDSCOPE_SUFFIX) else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=filename)
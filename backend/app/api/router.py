@@ -5,7 +5,9 @@ from app.api.bids import router as bids_router
 from app.api.campaigns import router as campaigns_router
 from app.api.finance import router as finance_router
 from app.api.health import router as health_router
+from app.api.jobs import router as jobs_router
 from app.api.profile import router as profile_router
+from app.api.profiling import router as profiling_router
 from app.api.running import router as running_router
 from app.api.running_goals import router as running_goals_router
 from app.api.stocks import router as stocks_router
@@ -19,7 +21,9 @@ def build_api_router() -> APIRouter:
     router.include_router(auth_router)
     router.include_router(bids_router)
     router.include_router(health_router)
+    router.include_router(jobs_router)
     router.include_router(profile_router)
+    router.include_router(profiling_router)
     router.include_router(running_router)
     router.include_router(running_goals_router)
     router.include_router(campaigns_router)
@@ -6,13 +6,14 @@ from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
+from app.api.routing import ProfiledRoute
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.running import RunningWorkoutResponse, RunningWorkoutUpsertRequest
 from app.services.running_workouts import delete_workout, list_workouts, upsert_workout
 
 
-router = APIRouter(prefix="/running/workouts", tags=["running"])
+router = APIRouter(prefix="/running/workouts", tags=["running"], route_class=ProfiledRoute)
 
 
 @router.get("", response_model=list[RunningWorkoutResponse])
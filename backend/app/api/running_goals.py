@@ -4,13 +4,14 @@ from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
+from app.api.routing import ProfiledRoute
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.running_goal import RunningGoalPayload, RunningGoalResponse
 from app.services.running_goals import create_goal, delete_goal, list_goals, update_goal
 
 
-router = APIRouter(prefix="/running/goals", tags=["running"])
+router = APIRouter(prefix="/running/goals", tags=["running"], route_class=ProfiledRoute)
 
 
 @router.get("", response_model=list[RunningGoalResponse])
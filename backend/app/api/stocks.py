@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
+from app.api.routing import ProfiledRoute
+from app.core.responses import cache_headers, etag_matches, model_response, not_modified, request_etag
 from app.db.session import get_db
 from app.schemas.stocks import (
     StocksSnapshotResponse,
@@ -10,9 +12,10 @@ from app.schemas.stocks import (
 )
 from app.services.company_config import resolve_company_config
 from app.services.stock_warehouse_preferences import save_stock_warehouse_preferences
-from app.services.stocks_snapshot import get_stocks_snapshot, get_stocks_workspace
+from app.services.snapshot_views import get_stocks_workspace_view, invalidate_stocks_workspace_views
+from app.services.stocks_snapshot import get_stocks_snapshot
 
-router = APIRouter(prefix="/stocks", tags=["stocks"])
+router = APIRouter(prefix="/stocks", tags=["stocks"], route_class=ProfiledRoute)
 
 
 @router.get("/snapshot", response_model=StocksSnapshotResponse)
@@ -22,6 +25,7 @@ def stocks_snapshot(company: str | None = Query(default=None)):
 
 @router.get("/workspace", response_model=StocksWorkspaceResponse)
 def stocks_workspace(
+    request: Request,
     company: str | None = Query(default=None),
     date_from: str | None = Query(default=None),
     date_to: str | None = Query(default=None),
@@ -30,21 +34,44 @@ def stocks_workspace(
     position_filter: str = Query(default="ALL"),
     assortment_filter: str = Query(default="ALL"),
     force_refresh: bool = Query(default=False),
+    q: str = Query(default=""),
+    city: list[str] = Query(default_factory=list),
+    candidates_only: bool = Query(default=False),
+    paid_storage: str = Query(default="ALL"),
+    sort: str = Query(default=""),
+    offset: int = Query(default=0, ge=0),
+    limit: int | None = Query(default=None, ge=1, le=2000),
+    cursor: str | None = Query(default=None),
     db: Session = Depends(get_db),
 ):
-    return StocksWorkspaceResponse(
-        **get_stocks_workspace(
-            company=company,
-            date_from=date_from,
-            date_to=date_to,
-            regional_order_min=regional_order_min,
-            minimum_supply=minimum_supply,
-            position_filter=position_filter,
-            assortment_filter=assortment_filter,
-            force_refresh=force_refresh,
-            db=db,
-        )
+    view = get_stocks_workspace_view(
+        company=company,
+        date_from=date_from,
+        date_to=date_to,
+        regional_order_min=regional_order_min,
+        minimum_supply=minimum_supply,
+        position_filter=position_filter,
+        assortment_filter=assortment_filter,
+        force_refresh=force_refresh,
+        db=db,
     )
+    etag = request_etag(request, view.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    try:
+        payload = view.page(
+            search=q,
+            cities=city,
+            candidates_only=candidates_only,
+            paid_storage=paid_storage,
+            sort=sort,
+            offset=offset,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return model_response(StocksWorkspaceResponse, payload, headers=cache_headers(etag))
 
 
 @router.put("/warehouse-preferences", response_model=StocksWarehousePreferencesUpdateResponse)
@@ -60,6 +87,7 @@ def update_warehouse_preferences(
         seller_client_id=seller_client_id,
         city_keys=payload.city_keys,
     )
+    invalidate_stocks_workspace_views()
     return StocksWarehousePreferencesUpdateResponse(
         company=company_name,
         seller_client_id=seller_client_id,
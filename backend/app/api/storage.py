@@ -1,17 +1,52 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
+from app.api.routing import ProfiledRoute
+from app.core.responses import cache_headers, etag_matches, model_response, not_modified, request_etag
 from app.db.session import get_db
 from app.schemas.storage import StorageSnapshotResponse
-from app.services.storage_snapshot import get_storage_snapshot
+from app.services.snapshot_views import get_storage_snapshot_view
 
-router = APIRouter(prefix="/storage", tags=["storage"])
+router = APIRouter(prefix="/storage", tags=["storage"], route_class=ProfiledRoute)
 
 
 @router.get("/snapshot", response_model=StorageSnapshotResponse)
 def storage_snapshot(
+    request: Request,
     company: str | None = Query(default=None),
     force_refresh: bool = Query(default=False),
+    q: str = Query(default=""),
+    city: list[str] = Query(default_factory=list),
+    fee_within_days: int | None = Query(default=None, ge=0),
+    risk_only: bool = Query(default=False),
+    sort: str = Query(default=""),
+    risk_sort: str = Query(default=""),
+    offset: int = Query(default=0, ge=0),
+    limit: int | None = Query(default=None, ge=1, le=5000),
+    cursor: str | None = Query(default=None),
+    risk_offset: int = Query(default=0, ge=0),
+    risk_cursor: str | None = Query(default=None),
     db: Session = Depends(get_db),
 ):
-    return StorageSnapshotResponse(**get_storage_snapshot(company=company, force_refresh=force_refresh, db=db))
+    view, flags = get_storage_snapshot_view(company=company, force_refresh=force_refresh, db=db)
+    etag = request_etag(request, [view.version, flags])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    try:
+        payload = view.page(
+            search=q,
+            cities=city,
+            fee_within_days=fee_within_days,
+            risk_only=risk_only,
+            sort=sort,
+            risk_sort=risk_sort,
+            offset=offset,
+            limit=limit,
+            cursor=cursor,
+            risk_offset=risk_offset,
+            risk_cursor=risk_cursor,
+            **flags,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return model_response(StorageSnapshotResponse, payload, headers=cache_headers(etag))
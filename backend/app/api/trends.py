@@ -1,18 +1,21 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 
+from app.api.routing import ProfiledRoute
+from app.core.responses import cache_headers, etag_matches, model_response, not_modified, request_etag
 from app.db.session import get_db
 from app.schemas.trends import TrendsSnapshotResponse
-from app.services.trends_snapshot import get_trends_snapshot
+from app.services.trends_snapshot import get_trends_snapshot, get_trends_snapshot_version
 
 
-router = APIRouter(prefix="/trends", tags=["trends"])
+router = APIRouter(prefix="/trends", tags=["trends"], route_class=ProfiledRoute)
 
 
 @router.get("/snapshot", response_model=TrendsSnapshotResponse)
 def trends_snapshot(
+    request: Request,
     company: str | None = Query(default=None),
     date_from: str = Query(...),
     date_to: str = Query(...),
@@ -21,14 +24,20 @@ def trends_snapshot(
     refresh: bool = Query(default=False),
     db: Session = Depends(get_db),
 ):
-    return TrendsSnapshotResponse(
-        **get_trends_snapshot(
-            company=company,
-            date_from=date_from,
-            date_to=date_to,
-            horizon=horizon,
-            search_filter=search_filter,
-            refresh=refresh,
-            db=db,
-        )
-    )
+    params = {
+        "company": company,
+        "date_from": date_from,
+        "date_to": date_to,
+        "horizon": horizon,
+        "search_filter": search_filter,
+    }
+    version = None if refresh else get_trends_snapshot_version(**params, db=db)
+    if version is not None:
+        etag = request_etag(request, version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    payload = get_trends_snapshot(**params, refresh=refresh, db=db)
+    if version is None:
+        version = get_trends_snapshot_version(**params, db=db)
+    headers = cache_headers(request_etag(request, version)) if version is not None else None
+    return model_response(TrendsSnapshotResponse, payload, headers=headers)
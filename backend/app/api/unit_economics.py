@@ -3,6 +3,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, Query
 
 from app.api.deps import get_admin_user
+from app.api.routing import ProfiledRoute
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.unit_economics import (
@@ -19,7 +20,7 @@ from app.services.unit_economics import (
 )
 
 
-router = APIRouter(prefix="/unit-economics", tags=["unit-economics"])
+router = APIRouter(prefix="/unit-economics", tags=["unit-economics"], route_class=ProfiledRoute)
 
 
 @router.get("/summary", response_model=UnitEconomicsSummaryResponse)
@@ -13,6 +13,14 @@ class Settings:
     app_host: str = os.getenv("APP_HOST", "0.0.0.0")
     app_port: int = int(os.getenv("APP_PORT", "8000"))
     timezone: str = os.getenv("TZ", "Europe/Moscow")
+    # Responses at least this large are gzipped for clients that accept it (0 disables compression).
+    gzip_minimum_size: int = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+    gzip_level: int = int(os.getenv("GZIP_LEVEL", "6"))
+    # Sent with ETags on snapshot-backed responses: clients revalidate every poll and get 304 when unchanged.
+    snapshot_cache_control: str = os.getenv("SNAPSHOT_CACHE_CONTROL", "private, no-cache")
+    # Point both at a local stand-in (python scripts/ozon_stub.py) for offline runs and benchmarks.
+    ozon_perf_base: str = os.getenv("OZON_PERF_BASE", "https://api-performance.ozon.ru").rstrip("/")
+    ozon_seller_base: str = os.getenv("OZON_SELLER_BASE", "https://api-seller.ozon.ru").rstrip("/")
 
 
 def get_settings() -> Settings:
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.profiler import SamplingProfiler, profiled_threads
+from app.core.request_context import current_route, request_labels
+from app.core.timing import collect_timings
+from app.core.tracing import finish_server_span, server_span, tracing_enabled
+from app.services.profiling import (
+    DEFAULT_INTERVAL_MS,
+    claim_armed_request,
+    may_be_armed,
+    new_profile_name,
+    save_profile,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class RequestLabelsMiddleware:
+    """Label everything a request does (upstream calls, timings) with its company and route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        query = parse_qs((scope.get("query_string") or b"").decode("latin-1"))
+        company = (query.get("company") or [""])[0].strip() or "default"
+        with request_labels(company=company, http_scope=scope):
+            await self.app(scope, receive, send)
+
+
+def _header(scope: Scope, name: bytes) -> str:
+    for key, value in scope.get("headers") or []:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return ""
+
+
+def _is_admin_authorization(authorization: str) -> bool:
+    from app.core.security import decode_access_token
+    from app.db.session import SessionLocal
+    from app.models.user import User
+
+    scheme, _sep, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user_id = int(decode_access_token(token.strip()).get("sub"))
+    except Exception:
+        return False
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        return bool(user is not None and user.is_active and user.is_admin)
+    finally:
+        db.close()
+
+
+class RequestTimingMiddleware:
+    """Collect per-request timings, send them as ``Server-Timing`` and log one line per request.
+
+    Admins can add ``X-Debug-Timings: 1`` (or ``?debug_timings=1``) to get the full breakdown
+    merged into JSON object responses under ``debug_timings``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        query = parse_qs((scope.get("query_string") or b"").decode("latin-1"))
+        debug_requested = _header(scope, b"x-debug-timings") == "1" or (query.get("debug_timings") or [""])[0] == "1"
+        debug = debug_requested and await run_in_threadpool(_is_admin_authorization, _header(scope, b"authorization"))
+        status_code = 500
+        start_message: dict | None = None
+        body_chunks: list[bytes] = []
+
+        with collect_timings() as timings:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code, start_message
+                if message["type"] == "http.response.start":
+                    status_code = int(message.get("status", 500))
+                    headers = MutableHeaders(scope=message)
+                    if debug and headers.get("content-type", "").startswith("application/json"):
+                        start_message = message
+                        return
+                    headers.append("Server-Timing", timings.server_timing())
+                    await send(message)
+                    return
+                if message["type"] == "http.response.body" and start_message is not None:
+                    body_chunks.append(message.get("body", b""))
+                    if message.get("more_body", False):
+                        return
+                    body = b"".join(body_chunks)
+                    try:
+                        payload = json.loads(body or b"null")
+                        if isinstance(payload, dict):
+                            payload["debug_timings"] = timings.summary()
+                            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+                    except ValueError:
+                        pass
+                    headers = MutableHeaders(scope=start_message)
+                    headers["content-length"] = str(len(body))
+                    headers.append("Server-Timing", timings.server_timing())
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body, "more_body": False})
+                    return
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                summary = timings.summary()
+                logger.info(
+                    "request timing %s %s status=%s total_ms=%s db_queries=%s db_ms=%s upstream_calls=%s upstream_ms=%s",
+                    scope.get("method", ""),
+                    current_route() or scope.get("path", ""),
+                    status_code,
+                    summary["total_ms"],
+                    summary["db_queries"],
+                    summary["db_ms"],
+                    summary["upstream_calls"],
+                    summary["upstream_ms"],
+                    extra={"path": scope.get("path", ""), "status": status_code, **summary},
+                )
+
+
+_profile_slot = threading.Lock()
+
+
+def _claim_armed_request(method: str, path: str) -> float | None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return claim_armed_request(db, method, path)
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    """Sample-profile requests armed via ``/api/profiling/arm`` or sent by an admin with ``X-Profile: 1``.
+
+    Unprofiled requests only pay for a check of the locally cached armed route and a header lookup. One
+    request per process is profiled at a time; others arriving meanwhile run normally and do not spend an
+    armed request. Only the threads running the profiled request are sampled.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope.get("method", "")
+        path = scope.get("path", "")
+        interval_ms = None
+        if may_be_armed(method, path) and _profile_slot.acquire(blocking=False):
+            try:
+                interval_ms = await run_in_threadpool(_claim_armed_request, method, path)
+            except Exception:
+                logger.exception("profiling arm check failed", extra={"path": path})
+            if interval_ms is None:
+                _profile_slot.release()
+        if interval_ms is None and _header(scope, b"x-profile") == "1":
+            if await run_in_threadpool(_is_admin_authorization, _header(scope, b"authorization")):
+                if _profile_slot.acquire(blocking=False):
+                    interval_ms = DEFAULT_INTERVAL_MS
+        if interval_ms is None:
+            await self.app(scope, receive, send)
+            return
+
+        name = new_profile_name(method, path)
+
+        async def send_with_profile_name(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Name", name)
+            await send(message)
+
+        with profiled_threads() as threads:
+            profiler = SamplingProfiler(name, interval_ms=interval_ms, threads=threads).start()
+            try:
+                await self.app(scope, receive, send_with_profile_name)
+            finally:
+                profile = profiler.stop()
+                _profile_slot.release()
+                try:
+                    await run_in_threadpool(save_profile, profile)
+                except Exception:
+                    logger.exception("request profile save failed", extra={"profile": name})
+
+
+class TracingMiddleware:
+    """Wrap each request in an OpenTelemetry server span named after the matched route."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = int(message.get("status", 500))
+            await send(message)
+
+        with server_span(scope) as current:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                finish_server_span(current, status_code=status_code)
@@ -0,0 +1,196 @@
+"""Small wall-clock sampling profiler built on ``sys._current_frames``.
+
+A sampler thread records the Python stack of busy threads at a fixed interval: every other
+thread, or only the threads registered for one request (``profiled_threads``). Threads parked
+in ``threading``/``queue``/``selectors`` waits are skipped, so idle pool threads and the idle
+event loop do not show up. Output is speedscope JSON or collapsed stacks (``a;b;c 12``) for
+flamegraph tools.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+_IDLE_FILES = {"threading.py", "queue.py", "selectors.py"}
+_BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+Frame = tuple[str, str, int]
+
+# Thread idents running the profiled request; None outside of one. Thread pools started through
+# ``run_in_threadpool``/``submit_with_context`` copy the context, so their threads see the same set.
+_request_threads: contextvars.ContextVar[set[int] | None] = contextvars.ContextVar("profiled_threads", default=None)
+
+
+@contextmanager
+def profiled_threads() -> Iterator[set[int]]:
+    """Start collecting the threads of the current request, beginning with the calling one."""
+    threads = {threading.get_ident()}
+    token = _request_threads.set(threads)
+    try:
+        yield threads
+    finally:
+        _request_threads.reset(token)
+
+
+@contextmanager
+def profiled_thread() -> Iterator[None]:
+    """Count the calling thread as part of the profiled request while the block runs."""
+    threads = _request_threads.get()
+    ident = threading.get_ident()
+    if threads is None or ident in threads:
+        yield
+        return
+    threads.add(ident)
+    try:
+        yield
+    finally:
+        threads.discard(ident)
+
+
+def profiled_call(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap ``fn`` so that the thread calling it is sampled with the request that called it."""
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if _request_threads.get() is None:
+            return fn(*args, **kwargs)
+        with profiled_thread():
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _frame_key(frame) -> Frame:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_BACKEND_ROOT):
+        filename = os.path.relpath(filename, _BACKEND_ROOT)
+    return code.co_name, filename, code.co_firstlineno
+
+
+def _frame_label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({filename}:{line})"
+
+
+@dataclass
+class Profile:
+    name: str
+    interval_ms: float
+    duration_ms: float
+    stacks: Counter = field(default_factory=Counter)
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.stacks.values())
+
+    def to_collapsed(self) -> str:
+        lines = [
+            ";".join([thread] + [_frame_label(frame).replace(";", ",") for frame in stack]) + f" {count}"
+            for (thread, stack), count in sorted(self.stacks.items(), key=lambda item: -item[1])
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def to_speedscope(self) -> dict[str, Any]:
+        frames: list[dict[str, Any]] = []
+        index: dict[tuple, int] = {}
+
+        def frame_index(key: tuple) -> int:
+            position = index.get(key)
+            if position is None:
+                position = len(frames)
+                index[key] = position
+                if len(key) == 1:
+                    frames.append({"name": key[0]})
+                else:
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            return position
+
+        samples: list[list[int]] = []
+        weights: list[float] = []
+        for (thread, stack), count in self.stacks.items():
+            samples.append([frame_index((thread,))] + [frame_index(frame) for frame in stack])
+            weights.append(round(count * self.interval_ms, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "ozon-ads-local sampling profiler",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self.name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 3),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+class SamplingProfiler:
+    def __init__(
+        self,
+        name: str,
+        *,
+        interval_ms: float = 5.0,
+        max_depth: int = 128,
+        threads: set[int] | None = None,
+    ) -> None:
+        self.name = name
+        self.interval_ms = max(1.0, float(interval_ms))
+        self.max_depth = max_depth
+        # Live set of thread idents to sample (see ``profiled_threads``); None samples every thread.
+        self.threads = threads
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started_at = 0.0
+
+    def _sample(self) -> None:
+        own_ident = threading.get_ident()
+        wanted = frozenset(self.threads) if self.threads is not None else None
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or (wanted is not None and ident not in wanted):
+                continue
+            if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                continue
+            stack: list[Frame] = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_key(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self._stacks[(f"thread {names.get(ident, ident)}", tuple(stack))] += 1
+
+    def _run(self) -> None:
+        interval = self.interval_ms / 1000
+        while not self._stop.wait(interval):
+            self._sample()
+
+    def start(self) -> "SamplingProfiler":
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        return Profile(
+            name=self.name,
+            interval_ms=self.interval_ms,
+            duration_ms=round((time.perf_counter() - self._started_at) * 1000, 2),
+            stacks=self._stacks,
+        )
@@ -0,0 +1,59 @@
+"""Context variables describing who triggered the current work (company and API route or job).
+
+Thread pools do not inherit context variables, so work fanned out to executors should be
+submitted through ``submit_with_context``, which also lets a request profile sample those threads.
+"""
+from __future__ import annotations
+
+import contextvars
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from app.core.profiler import profiled_call
+
+_company: contextvars.ContextVar[str] = contextvars.ContextVar("request_company", default="")
+_route: contextvars.ContextVar[str] = contextvars.ContextVar("request_route", default="")
+_http_scope: contextvars.ContextVar[dict | None] = contextvars.ContextVar("request_http_scope", default=None)
+
+
+def current_company() -> str:
+    return _company.get()
+
+
+def current_route() -> str:
+    route = _route.get()
+    if route:
+        return route
+    scope = _http_scope.get()
+    if scope is None:
+        return ""
+    # The router stores the matched route on the scope once it has dispatched the request.
+    path = getattr(scope.get("route"), "path", None) or "unmatched"
+    return f"{scope.get('method', 'GET')} {path}"
+
+
+@contextmanager
+def request_labels(
+    *,
+    company: str | None = None,
+    route: str | None = None,
+    http_scope: dict | None = None,
+) -> Iterator[None]:
+    tokens = []
+    if http_scope is not None:
+        tokens.append((_http_scope, _http_scope.set(http_scope)))
+    if company is not None:
+        tokens.append((_company, _company.set(str(company))))
+    if route is not None:
+        tokens.append((_route, _route.set(str(route))))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def submit_with_context(executor: Executor, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+    context = contextvars.copy_context()
+    return executor.submit(context.run, profiled_call(fn), *args, **kwargs)
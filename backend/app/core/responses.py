@@ -0,0 +1,178 @@
+"""Fast JSON responses for the large nested payloads (stocks workspace, storage and trends snapshots).
+
+The services already build these payloads from plain Python values. Passing them through the Pydantic response
+model costs three rounds of work: the route builds the model, FastAPI validates it again and dumps it back to
+dicts, and then ``json.dumps`` encodes the result. ``model_response`` replaces all of that with a single pass. It
+keeps only the model's fields, fills in defaults and normalises ``int``/``float``/``bool`` scalars the way Pydantic
+would. It then encodes the result once with orjson. Routes keep ``response_model=`` so the OpenAPI schema is
+unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import types
+import typing
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable
+
+import pydantic_core
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+
+try:
+    import orjson
+except ImportError:  # pydantic-core's encoder is the fallback; it is slower but still native
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # numpy / pandas scalars, Timestamps and the odd Decimal or set left in cached rows.
+    if hasattr(value, "item") and callable(value.item):
+        return value.item()
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+else:
+
+    def dumps(content: Any) -> bytes:
+        return pydantic_core.to_json(content, fallback=_default, inf_nan_mode="null")
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` encoded with orjson (NaN/inf become ``null``, numpy values are accepted)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _to_int(value: Any) -> Any:
+    return value if type(value) is int else int(value)
+
+
+def _to_float(value: Any) -> Any:
+    return value if type(value) is float else float(value)
+
+
+def _to_bool(value: Any) -> Any:
+    return value if type(value) is bool else bool(value)
+
+
+_SCALARS: dict[Any, Callable[[Any], Any]] = {int: _to_int, float: _to_float, bool: _to_bool}
+
+
+def _converter(annotation: Any) -> Callable[[Any], Any]:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _model_shaper(annotation)
+    if annotation in _SCALARS:
+        return _SCALARS[annotation]
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin in (typing.Union, types.UnionType):
+        members = [arg for arg in args if arg is not type(None)]
+        if len(members) != 1:
+            return _identity
+        inner = _converter(members[0])
+        if inner is _identity:
+            return _identity
+        return lambda value: None if value is None else inner(value)
+    if origin is list and args:
+        item = _converter(args[0])
+        if item is _identity:
+            return _identity
+        return lambda value: [item(entry) for entry in value]
+    return _identity
+
+
+@lru_cache(maxsize=None)
+def _model_shaper(model: type[BaseModel]) -> Callable[[dict], dict]:
+    plan: list[tuple[str, Callable[[Any], Any], Any]] = []
+    for name, field in model.model_fields.items():
+        plan.append((name, _converter(field.annotation), field))
+
+    def shape(data: Any) -> dict:
+        if isinstance(data, BaseModel):
+            data = data.__dict__
+        shaped = {}
+        for name, convert, field in plan:
+            if name in data:
+                value = data[name]
+            elif field.is_required():
+                raise ValueError(f"{model.__name__}.{name} is missing")
+            else:
+                value = field.get_default(call_default_factory=True)
+                if isinstance(value, BaseModel):
+                    value = value.model_dump()
+            shaped[name] = convert(value)
+        return shaped
+
+    return shape
+
+
+def shape_for_model(model: type[BaseModel], data: dict) -> dict:
+    """Project ``data`` onto ``model``'s fields without building model instances."""
+    return _model_shaper(model)(data)
+
+
+def model_response(model: type[BaseModel], data: dict, *, headers: dict[str, str] | None = None) -> FastJSONResponse:
+    return FastJSONResponse(shape_for_model(model, data), headers=headers)
+
+
+def etag_for(*parts: Any) -> str:
+    """Strong ETag for a snapshot version plus the request parameters that shape the body."""
+    return '"' + hashlib.sha1(dumps(parts)).hexdigest() + '"'
+
+
+def _content_coding(request: Request) -> str:
+    # GZipMiddleware compresses for any request whose Accept-Encoding mentions gzip, so the same check tells which
+    # representation of a snapshot body this request gets.
+    if get_settings().gzip_minimum_size > 0 and "gzip" in request.headers.get("accept-encoding", ""):
+        return "gzip"
+    return "identity"
+
+
+def request_etag(request: Request, version: Any) -> str:
+    """ETag of the body this request gets; the gzip and identity representations carry different tags."""
+    etag = etag_for(version, request.url.path, sorted(request.query_params.multi_items()))
+    coding = _content_coding(request)
+    return etag if coding == "identity" else f'{etag[:-1]}-{coding}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match", "")
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, and proxies that re-encode the body weaken the tag.
+    return any(tag.strip() == "*" or tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    # The ETag depends on Accept-Encoding, so shared caches must key stored responses (200 and 304) on it too.
+    return {"ETag": etag, "Cache-Control": get_settings().snapshot_cache_control, "Vary": "Accept-Encoding"}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
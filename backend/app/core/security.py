@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import base64
+import hashlib
 import os
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
 import jwt
 from passlib.context import CryptContext
 
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
+
 
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-me-32-bytes-min")
 ALGORITHM = "HS256"
@@ -32,3 +39,25 @@ def create_access_token(subject: str) -> str:
 
 def decode_access_token(token: str) -> dict:
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+@lru_cache(maxsize=1)
+def _fernet() -> Fernet:
+    # Imported on first use; the key is derived from SECRET_KEY, so changing it makes stored values unreadable.
+    from cryptography.fernet import Fernet
+
+    return Fernet(base64.urlsafe_b64encode(hashlib.sha256(f"fernet:{SECRET_KEY}".encode("utf-8")).digest()))
+
+
+def encrypt_secret(value: str) -> str:
+    return _fernet().encrypt(value.encode("utf-8")).decode("ascii")
+
+
+def decrypt_secret(value: str) -> str | None:
+    """The value stored by ``encrypt_secret``; None if it was not encrypted with the current ``SECRET_KEY``."""
+    from cryptography.fernet import InvalidToken
+
+    try:
+        return _fernet().decrypt(value.encode("ascii")).decode("utf-8")
+    except (InvalidToken, UnicodeError):
+        return None
@@ -0,0 +1,146 @@
+"""Per-request timing breakdown: named stages, DB queries and upstream HTTP time.
+
+A collector is active only inside ``collect_timings()`` (the request middleware and worker jobs
+open one); outside of it ``timed`` and the record helpers do nothing.
+"""
+from __future__ import annotations
+
+import contextvars
+import re
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_METRIC_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class RequestTimings:
+    def __init__(self) -> None:
+        self.started_at = perf_counter()
+        self.stages: dict[str, float] = {}
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.upstream_calls = 0
+        self.upstream_ms = 0.0
+        self._lock = Lock()
+
+    def add_stage(self, name: str, ms: float) -> None:
+        with self._lock:
+            self.stages[name] = round(self.stages.get(name, 0.0) + float(ms), 2)
+
+    def add_db_query(self, ms: float) -> None:
+        with self._lock:
+            self.db_queries += 1
+            self.db_ms += float(ms)
+
+    def add_upstream_call(self, ms: float) -> None:
+        with self._lock:
+            self.upstream_calls += 1
+            self.upstream_ms += float(ms)
+
+    def total_ms(self) -> float:
+        return _ms(perf_counter() - self.started_at)
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "total_ms": self.total_ms(),
+                "db_queries": self.db_queries,
+                "db_ms": round(self.db_ms, 2),
+                "upstream_calls": self.upstream_calls,
+                "upstream_ms": round(self.upstream_ms, 2),
+                "stages": dict(self.stages),
+            }
+
+    def server_timing(self) -> str:
+        summary = self.summary()
+        parts = [
+            f"total;dur={summary['total_ms']}",
+            f'db;dur={summary["db_ms"]};desc="{summary["db_queries"]} queries"',
+            f'upstream;dur={summary["upstream_ms"]};desc="{summary["upstream_calls"]} calls"',
+        ]
+        for name, ms in summary["stages"].items():
+            parts.append(f"{_METRIC_NAME.sub('_', name)};dur={ms}")
+        return ", ".join(parts)
+
+
+_current: contextvars.ContextVar[RequestTimings | None] = contextvars.ContextVar("request_timings", default=None)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current.get()
+
+
+@contextmanager
+def collect_timings() -> Iterator[RequestTimings]:
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started_at = perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_stage(stage, _ms(perf_counter() - started_at))
+
+
+def record_upstream_time(seconds: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.add_upstream_call(_ms(seconds))
+
+
+class StageTimings(dict):
+    """``*_ms`` dict for response payloads that also feeds the active request collector."""
+
+    def __setitem__(self, key: str, value: float) -> None:
+        super().__setitem__(key, value)
+        timings = _current.get()
+        if timings is not None and key != "total_ms":
+            timings.add_stage(key[:-3] if key.endswith("_ms") else key, float(value or 0))
+
+
+def instrument_engine(engine: Engine) -> None:
+    if getattr(engine, "_request_timing_instrumented", False):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("request_timing_started", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("request_timing_started")
+        if not started:
+            return
+        started_at = started.pop()
+        timings = _current.get()
+        if timings is not None:
+            timings.add_db_query(_ms(perf_counter() - started_at))
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        started = connection.info.get("request_timing_started") if connection is not None else None
+        if started:
+            started.pop()
+
+    engine._request_timing_instrumented = True
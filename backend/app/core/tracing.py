@@ -0,0 +1,209 @@
+"""OpenTelemetry tracing for routes, service stages, SQL queries and Ozon calls.
+
+Tracing is off unless ``TRACING_EXPORTER`` is set to ``otlp`` (standard ``OTEL_EXPORTER_OTLP_*``
+variables apply), ``console`` or ``file`` (JSON lines to ``TRACING_FILE``). When it is off, or the
+OpenTelemetry SDK is not installed, ``span`` and ``traced`` only check a module flag.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.request_context import current_company, current_route
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # tracing stays disabled without the OpenTelemetry packages
+    propagate = trace = SpanKind = Status = StatusCode = None
+
+logger = logging.getLogger("uvicorn.error")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_tracer = None
+_provider = None
+_ATTRIBUTE_LIST_LIMIT = 50
+_STATEMENT_LIMIT = 2000
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def _build_exporter(kind: str):
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if kind == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter()
+    if kind == "console":
+        return ConsoleSpanExporter()
+    if kind == "file":
+        from app.services.storage_paths import backend_data_path
+
+        path = os.getenv("TRACING_FILE", "").strip() or str(backend_data_path("traces.jsonl"))
+        return ConsoleSpanExporter(
+            out=open(path, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    raise ValueError(f"Unknown TRACING_EXPORTER: {kind}")
+
+
+def setup_tracing(service_name: str, *, span_exporter=None) -> bool:
+    """Install a tracer provider from the environment (or for ``span_exporter``); returns whether tracing is on."""
+    global _tracer, _provider
+    kind = os.getenv("TRACING_EXPORTER", "").strip().lower()
+    if span_exporter is None and kind in {"", "none", "off"}:
+        return False
+    if trace is None:
+        logger.warning("TRACING_EXPORTER=%s but opentelemetry is not installed; tracing disabled", kind)
+        return False
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    if span_exporter is not None:
+        provider.add_span_processor(SimpleSpanProcessor(span_exporter))
+    else:
+        provider.add_span_processor(BatchSpanProcessor(_build_exporter(kind)))
+    _provider = provider
+    _tracer = provider.get_tracer("ozon-ads-local")
+    logger.info("tracing enabled", extra={"service": service_name, "exporter": kind or "custom"})
+    return True
+
+
+def shutdown_tracing() -> None:
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = None
+    _provider = None
+
+
+def _attribute_value(value: Any) -> Any:
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return [str(item) for item in list(value)[:_ATTRIBUTE_LIST_LIMIT]]
+    return str(value)
+
+
+def _attributes(attributes: dict[str, Any]) -> dict[str, Any]:
+    result = {key: _attribute_value(value) for key, value in attributes.items() if value is not None}
+    company = current_company()
+    if company and "company" not in result:
+        result["company"] = company
+    return result
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Open a child span of the current one; ``company`` defaults to the request label."""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=_attributes(attributes)) as current:
+        yield current
+
+
+def traced(name: str | None = None) -> Callable[[F], F]:
+    def decorator(func: F) -> F:
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def record_finished_span(name: str, *, seconds: float, error: bool = False, **attributes: Any) -> None:
+    """Record a span for work that just finished and took ``seconds`` (e.g. one HTTP attempt)."""
+    if _tracer is None:
+        return
+    end_ns = time.time_ns()
+    finished = _tracer.start_span(
+        name,
+        kind=SpanKind.CLIENT,
+        start_time=end_ns - int(max(0.0, seconds) * 1e9),
+        attributes=_attributes(attributes),
+    )
+    if error:
+        finished.set_status(Status(StatusCode.ERROR))
+    finished.end(end_time=end_ns)
+
+
+def instrument_engine_tracing(engine: Engine) -> None:
+    if getattr(engine, "_tracing_instrumented", False):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _tracer is None:
+            return
+        query_span = _tracer.start_span(
+            "db.query",
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": engine.dialect.name, "db.statement": str(statement)[:_STATEMENT_LIMIT]},
+        )
+        conn.info.setdefault("tracing_spans", []).append(query_span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("tracing_spans")
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        spans = connection.info.get("tracing_spans") if connection is not None else None
+        if spans:
+            query_span = spans.pop()
+            query_span.record_exception(exception_context.original_exception)
+            query_span.set_status(Status(StatusCode.ERROR))
+            query_span.end()
+
+    engine._tracing_instrumented = True
+
+
+@contextmanager
+def server_span(scope: dict) -> Iterator[Any]:
+    """Server span for an ASGI request, continuing an incoming W3C ``traceparent`` when present."""
+    if _tracer is None:
+        yield None
+        return
+    method = scope.get("method", "")
+    carrier = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope.get("headers") or []}
+    with _tracer.start_as_current_span(
+        f"{method} {scope.get('path', '')}",
+        context=propagate.extract(carrier),
+        kind=SpanKind.SERVER,
+        attributes=_attributes({"http.method": method, "http.target": scope.get("path", "")}),
+    ) as current:
+        yield current
+
+
+def finish_server_span(current: Any, *, status_code: int) -> None:
+    route = current_route()
+    if route:
+        current.update_name(route)
+        current.set_attribute("http.route", route)
+    current.set_attribute("http.status_code", status_code)
+    if status_code >= 500:
+        current.set_status(Status(StatusCode.ERROR))
@@ -5,21 +5,34 @@ from threading import Lock
 from app.db.base import Base
 from app.db.session import engine
 from app.models import (
+    BackgroundJob,
     BidChange,
     Campaign,
     CampaignComment,
     CampaignDailyMetric,
     CampaignHourlySnapshot,
     CampaignProduct,
+    FboOrdersHourly,
+    FboPostingItem,
+    FboPostingSyncState,
+    LeaderLease,
     MainOverviewCache,
     MarketplaceCredential,
     Organization,
+    PerfApiToken,
+    ProfilingArm,
+    RawPayload,
+    RawPayloadDictionary,
     RunningGoal,
     RunningWorkout,
     StockWarehousePreference,
+    ShipmentCell,
     ShipmentEvent,
     ShipmentHistory,
     ShipmentTransit,
+    StorageBundleItems,
+    StorageOrderLots,
+    StorageRefreshRun,
     StorageSnapshotCache,
     TrendsSnapshotCache,
     UnitEconomicsOverride,
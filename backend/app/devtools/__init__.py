@@ -0,0 +1 @@
+"""Developer tooling: local Ozon API stand-in and benchmarking helpers."""
@@ -0,0 +1,649 @@
+"""Micro-benchmarks for the report and workspace builders.
+
+Each benchmark runs one builder over deterministic synthetic inputs at a given scale
+(``realistic`` is a mid-size seller, ``10x`` stretches SKU, campaign and lot counts tenfold).
+Ozon-facing edges (company config, API loaders) are replaced with the fixtures; database reads
+go to an in-memory SQLite seeded with the same data. Results carry the best wall time over
+``repeat`` runs and the tracemalloc peak of one extra run, and can be compared to a baseline.
+"""
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import random
+import tracemalloc
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from functools import cached_property
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable
+from unittest.mock import patch
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+SCALES = {"realistic": 1, "10x": 10}
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / "benchmarks" / "baseline.json"
+BENCH_COMPANY = "bench"
+BENCH_SELLER_CLIENT_ID = "bench-client"
+BENCH_END_DATE = date(2026, 3, 31)
+BENCH_CITIES = (
+    "Москва",
+    "Санкт-Петербург",
+    "Казань",
+    "Екатеринбург",
+    "Новосибирск",
+    "Краснодар",
+    "Ростов",
+    "Самара",
+    "Уфа",
+    "Воронеж",
+    "Омск",
+    "Пермь",
+)
+# Absolute slack under which a slower run is treated as noise, whatever the ratio.
+MIN_TIME_DELTA_MS = 2.0
+MIN_PEAK_DELTA_KIB = 256.0
+
+
+@dataclass
+class BenchResult:
+    name: str
+    scale: str
+    best_ms: float
+    median_ms: float
+    peak_kib: float
+    runs: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.scale}"
+
+
+class BenchFixtures:
+    """Synthetic inputs for one scale; every dataset is built on first use."""
+
+    def __init__(self, scale: int = 1, *, seed: int = 1, days: int = 30, campaigns: int = 80, skus: int = 400) -> None:
+        self.scale = max(1, int(scale))
+        self.seed = seed
+        self.days = days
+        self.campaign_count = campaigns * self.scale
+        self.sku_count = skus * self.scale
+        self.date_to = BENCH_END_DATE
+        self.date_from = BENCH_END_DATE - timedelta(days=days - 1)
+
+    def _random(self, salt: str) -> random.Random:
+        return random.Random(f"{self.seed}:{self.scale}:{salt}")
+
+    def day_strings(self, days: int | None = None) -> list[str]:
+        count = days or self.days
+        return [(self.date_to - timedelta(days=offset)).isoformat() for offset in range(count - 1, -1, -1)]
+
+    def sku(self, index: int) -> str:
+        return str(100_000_000 + index)
+
+    def article(self, index: int) -> str:
+        return f"ART-{index:06d}"
+
+    @cached_property
+    def campaigns(self) -> list[dict]:
+        return [{"id": str(1_000_000 + index), "title": f"Campaign {index}"} for index in range(self.campaign_count)]
+
+    @cached_property
+    def products_by_campaign_id(self) -> dict[str, list[dict]]:
+        rng = self._random("products")
+        out: dict[str, list[dict]] = {}
+        for index, campaign in enumerate(self.campaigns):
+            size = 1 if index % 3 else rng.randint(2, 6)
+            out[campaign["id"]] = [
+                {
+                    "sku": self.sku((index * 5 + offset) % self.sku_count),
+                    "offer_id": self.article((index * 5 + offset) % self.sku_count),
+                    "title": f"Product {(index * 5 + offset) % self.sku_count}",
+                    "bid": str(rng.randint(5, 60) * 1_000_000),
+                }
+                for offset in range(size)
+            ]
+        return out
+
+    @cached_property
+    def stats_by_campaign_id(self) -> dict[str, dict]:
+        rng = self._random("stats")
+        out: dict[str, dict] = {}
+        for campaign in self.campaigns:
+            views = rng.randint(1_000, 200_000)
+            clicks = rng.randint(10, max(11, views // 40))
+            spent = clicks * rng.uniform(3, 40)
+            out[campaign["id"]] = {
+                "moneySpent": f"{spent:,.2f}".replace(",", " ").replace(".", ","),
+                "views": str(views),
+                "clicks": str(clicks),
+                "clickPrice": f"{spent / clicks:.2f}".replace(".", ","),
+                "toCart": str(clicks // 4),
+                "orders": str(clicks // 12),
+                "ordersMoney": f"{spent * rng.uniform(2, 8):.2f}".replace(".", ","),
+            }
+        return out
+
+    @cached_property
+    def sales_map(self) -> dict[str, tuple[float, int]]:
+        rng = self._random("sales")
+        out: dict[str, tuple[float, int]] = {}
+        for index in range(self.sku_count):
+            units = rng.randint(0, 300)
+            out[self.sku(index)] = (units * rng.uniform(150, 1500), units)
+        return out
+
+    @cached_property
+    def ads_daily_by_campaign(self) -> dict[tuple[str, str], dict]:
+        rng = self._random("ads_daily")
+        out: dict[tuple[str, str], dict] = {}
+        for day in self.day_strings():
+            for campaign in self.campaigns:
+                views = rng.randint(0, 8_000)
+                clicks = rng.randint(0, max(1, views // 30))
+                spent = clicks * rng.uniform(3, 40)
+                out[(day, campaign["id"])] = {
+                    "money_spent": spent,
+                    "views": views,
+                    "clicks": clicks,
+                    "click_price": spent / clicks if clicks else 0.0,
+                    "orders": clicks // 10,
+                    "orders_money_ads": spent * rng.uniform(2, 8),
+                }
+        return out
+
+    @cached_property
+    def seller_by_day_sku(self) -> dict[tuple[str, str], tuple[float, int]]:
+        rng = self._random("seller_day_sku")
+        out: dict[tuple[str, str], tuple[float, int]] = {}
+        for day in self.day_strings():
+            for index in range(self.sku_count):
+                units = rng.randint(0, 12)
+                if units:
+                    out[(day, self.sku(index))] = (units * rng.uniform(150, 1500), units)
+        return out
+
+    @cached_property
+    def seller_by_day(self) -> dict[str, tuple[float, int]]:
+        out: dict[str, tuple[float, int]] = {}
+        for (day, _sku), (revenue, units) in self.seller_by_day_sku.items():
+            total_revenue, total_units = out.get(day, (0.0, 0))
+            out[day] = (total_revenue + revenue, total_units + units)
+        return out
+
+    @cached_property
+    def ads_daily_rows_by_campaign(self) -> dict[str, list[dict]]:
+        out: dict[str, list[dict]] = {campaign["id"]: [] for campaign in self.campaigns}
+        for (day, campaign_id), stats in self.ads_daily_by_campaign.items():
+            out[campaign_id].append({"day": day, **stats})
+        return out
+
+    @cached_property
+    def overview_daily_df(self) -> pd.DataFrame:
+        rng = self._random("overview")
+        rows = []
+        for day in self.day_strings(180 * self.scale):
+            views = rng.randint(20_000, 400_000)
+            clicks = rng.randint(200, max(201, views // 30))
+            spent = clicks * rng.uniform(3, 40)
+            revenue = spent * rng.uniform(3, 12)
+            rows.append(
+                {
+                    "day": day,
+                    "money_spent": spent,
+                    "views": views,
+                    "clicks": clicks,
+                    "orders": clicks // 10,
+                    "orders_money_ads": revenue * rng.uniform(0.1, 0.6),
+                    "total_revenue": revenue,
+                    "ordered_units": int(revenue // 600),
+                    "ebitda": revenue * rng.uniform(0.05, 0.3),
+                    "avoidable": rng.uniform(0, 5_000),
+                    "avoidable_breakdown": [
+                        {"label": "Хранение", "amount": rng.uniform(0, 3_000)},
+                        {"label": "Возвраты", "amount": rng.uniform(0, 2_000)},
+                    ],
+                }
+            )
+        return pd.DataFrame(rows)
+
+    @cached_property
+    def stock_rows(self) -> list[dict]:
+        rng = self._random("stocks")
+        rows: list[dict] = []
+        for index in range(self.sku_count):
+            for city in BENCH_CITIES:
+                if rng.random() < 0.25:
+                    continue
+                rows.append(
+                    {
+                        "sku": self.sku(index),
+                        "article": self.article(index),
+                        "title": f"Product {index}",
+                        "offer_id": self.article(index),
+                        "cluster": city,
+                        "turnover_grade": rng.choice(["", "DEFICIT", "POPULAR", "ACTUAL", "SURPLUS"]),
+                        "available_stock_count": float(rng.randint(0, 200)),
+                        "ads_cluster": round(rng.uniform(0, 6), 2),
+                        "transit_stock_count": float(rng.choice([0, 0, 0, rng.randint(1, 40)])),
+                    }
+                )
+        return rows
+
+    @cached_property
+    def storage_lots(self) -> pd.DataFrame:
+        rng = self._random("lots")
+        rows = []
+        for index in range(self.sku_count):
+            for city in BENCH_CITIES[: rng.randint(2, len(BENCH_CITIES))]:
+                sales_per_day = round(rng.uniform(0, 4), 3)
+                for _lot in range(rng.randint(1, 4)):
+                    arrival = self.date_to - timedelta(days=rng.randint(0, 150))
+                    fee_from = arrival + timedelta(days=120)
+                    rows.append(
+                        {
+                            "city": city,
+                            "city_key": city.upper(),
+                            "article": self.article(index),
+                            "arrival_date": arrival.isoformat(),
+                            "fee_from_date": fee_from.isoformat(),
+                            "days_until_fee_start": max(0, (fee_from - self.date_to).days),
+                            "qty_remaining_from_lot": rng.randint(0, 120),
+                            "item_volume_liters": round(rng.uniform(0.2, 4.0), 3),
+                            "sales_per_day": sales_per_day,
+                        }
+                    )
+        return pd.DataFrame(rows)
+
+    @cached_property
+    def trend_sales_df(self) -> pd.DataFrame:
+        rng = self._random("trend_sales")
+        rows = []
+        for day in self.day_strings(60):
+            for index in range(self.sku_count):
+                units = rng.randint(0, 10)
+                rows.append({"sku": self.sku(index), "day": day, "revenue": units * rng.uniform(150, 1500), "ordered_units": units})
+        df = pd.DataFrame(rows)
+        df["day"] = pd.to_datetime(df["day"])
+        return df
+
+    @cached_property
+    def trend_catalog_df(self) -> pd.DataFrame:
+        words = ("чай", "зеленый", "черный", "улун", "пуэр", "травяной", "набор", "подарочный", "жасмин", "мята")
+        rng = self._random("catalog")
+        return pd.DataFrame(
+            [
+                {
+                    "sku": self.sku(index),
+                    "product_id": str(500_000 + index),
+                    "title": " ".join(rng.sample(words, 3)) + f" {index}",
+                    "offer_id": self.article(index),
+                }
+                for index in range(self.sku_count)
+            ]
+        )
+
+    @cached_property
+    def trend_query_df(self) -> pd.DataFrame:
+        rng = self._random("queries")
+        words = ("чай", "зеленый", "купить", "листовой", "пуэр", "шу", "улун", "молочный", "подарок", "набор")
+        rows = []
+        for index in range(40):
+            for _query in range(8):
+                rows.append(
+                    {
+                        "sku": self.sku(index),
+                        "query": " ".join(rng.sample(words, 3)),
+                        "searches": float(rng.randint(10, 5_000)),
+                        "growth": round(rng.uniform(-50, 150), 1),
+                        "revenue": round(rng.uniform(0, 50_000), 2),
+                    }
+                )
+        return pd.DataFrame(rows)
+
+    @cached_property
+    def unit_costs_df(self) -> pd.DataFrame:
+        rng = self._random("unit_costs")
+        return pd.DataFrame(
+            [
+                {
+                    "sku": self.sku(index),
+                    "sheet_name": f"Product {index}",
+                    "tea_cost": round(rng.uniform(30, 300), 2),
+                    "package_cost": round(rng.uniform(5, 40), 2),
+                    "label_cost": round(rng.uniform(1, 5), 2),
+                    "packing_cost": round(rng.uniform(5, 25), 2),
+                    "is_active": True,
+                }
+                for index in range(self.sku_count)
+            ]
+        )
+
+    @cached_property
+    def unit_sales_df(self) -> pd.DataFrame:
+        rows = [
+            {"sku": sku, "name": f"Product {int(sku) - 100_000_000}", "day": day, "revenue": revenue, "ordered_units": units}
+            for (day, sku), (revenue, units) in self.seller_by_day_sku.items()
+        ]
+        return pd.DataFrame(rows)
+
+    @cached_property
+    def finance_balance_payload(self) -> dict:
+        services = [
+            ("logistics", -120_000.0),
+            ("cross_docking", -8_000.0),
+            ("goods_processing_in_shipment", -3_500.0),
+            ("pay_per_click", -60_000.0),
+            ("promotion_with_cost_per_order", -12_000.0),
+            ("acquiring", -9_000.0),
+            ("reverse_logistics", -4_000.0),
+            ("partner_returns_cancellations_processing", -1_200.0),
+            ("product_placement_in_ozon_warehouses", -7_500.0),
+            ("points_for_reviews", -900.0),
+        ]
+        return {"cashflows": {"services": [{"name": name, "amount": {"value": value}} for name, value in services]}}
+
+    def seed_shipments(self, db: Session) -> None:
+        from app.models.shipment_event import ShipmentEvent
+        from app.models.shipment_history import ShipmentHistory
+        from app.services.shipment_history import refresh_shipment_cells
+        from app.services.stocks_snapshot import _normalize_city
+
+        rng = self._random("shipments")
+        now = datetime(self.date_to.year, self.date_to.month, self.date_to.day)
+        pairs = {(row["article"], _normalize_city(row["cluster"])) for row in self.stock_rows}
+        for article, city_key in sorted(pairs):
+            if rng.random() < 0.4:
+                continue
+            events = [now - timedelta(days=rng.randint(1, 200)) for _ in range(rng.randint(1, 4))]
+            for event_at in events:
+                db.add(
+                    ShipmentEvent(
+                        company_name=BENCH_COMPANY,
+                        seller_client_id=BENCH_SELLER_CLIENT_ID,
+                        article=article,
+                        city_key=city_key,
+                        city=city_key,
+                        event_at=event_at,
+                        quantity=rng.randint(5, 80),
+                    )
+                )
+            db.add(
+                ShipmentHistory(
+                    company_name=BENCH_COMPANY,
+                    seller_client_id=BENCH_SELLER_CLIENT_ID,
+                    article=article,
+                    city_key=city_key,
+                    shipments_count=len(events),
+                    first_shipment_at=min(events),
+                    last_shipment_at=max(events),
+                    updated_at=now,
+                )
+            )
+        db.flush()
+        refresh_shipment_cells(db, company_name=BENCH_COMPANY, seller_client_id=BENCH_SELLER_CLIENT_ID)
+        db.commit()
+
+
+def _bench_config() -> tuple[str, dict[str, str]]:
+    return BENCH_COMPANY, {"seller_client_id": BENCH_SELLER_CLIENT_ID, "seller_api_key": "bench-key"}
+
+
+def _report_rows(fx: BenchFixtures, _stack: ExitStack) -> Callable[[], Any]:
+    from app.services.campaign_reporting import build_report_rows
+
+    campaigns, stats, sales, products = fx.campaigns, fx.stats_by_campaign_id, fx.sales_map, fx.products_by_campaign_id
+    return lambda: build_report_rows(
+        running_campaigns=campaigns,
+        stats_by_campaign_id=stats,
+        sales_map=sales,
+        products_by_campaign_id=products,
+    )
+
+
+def _campaign_daily_rows(fx: BenchFixtures, _stack: ExitStack) -> Callable[[], Any]:
+    from app.services.campaign_reporting import build_campaign_daily_rows
+
+    date_from, date_to = fx.date_from.isoformat(), fx.date_to.isoformat()
+    seller_by_day_sku, ads_daily, products = fx.seller_by_day_sku, fx.ads_daily_by_campaign, fx.products_by_campaign_id
+
+    def run():
+        return [
+            build_campaign_daily_rows(
+                campaign_id=campaign["id"],
+                date_from=date_from,
+                date_to=date_to,
+                seller_by_day_sku=seller_by_day_sku,
+                ads_daily_by_campaign=ads_daily,
+                items=products[campaign["id"]],
+            )
+            for campaign in fx.campaigns
+        ]
+
+    return run
+
+
+def _daily_breakdown(fx: BenchFixtures, _stack: ExitStack) -> Callable[[], Any]:
+    from app.services.campaign_reporting import compute_daily_breakdown
+
+    rows_by_campaign, seller_by_day = fx.ads_daily_rows_by_campaign, fx.seller_by_day
+    return lambda: [compute_daily_breakdown(rows, seller_by_day) for rows in rows_by_campaign.values()]
+
+
+def _stocks_workspace(fx: BenchFixtures, stack: ExitStack) -> Callable[[], Any]:
+    from app.db.base import Base
+    from app.services import shipment_history, stock_warehouse_preferences, stocks_snapshot
+    from app.services.columnar import ColumnTable
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False, future=True)()
+    stack.callback(engine.dispose)
+    stack.callback(db.close)
+    fx.seed_shipments(db)
+
+    # The stocks pickle is converted once and then served from memory, so the table is built outside the timed run.
+    table = ColumnTable.from_records(fx.stock_rows)
+    stack.enter_context(patch.object(stocks_snapshot, "resolve_company_config", lambda _company: _bench_config()))
+    stack.enter_context(patch.object(stocks_snapshot, "build_stock_table_cached", lambda **_kwargs: (table, fx.sku_count, None)))
+    for module in (shipment_history, stock_warehouse_preferences):
+        stack.enter_context(patch.object(module, "create_all", lambda: None))
+    return lambda: stocks_snapshot.get_stocks_workspace(company=BENCH_COMPANY, db=db)
+
+
+def _fee_risk_forecast(fx: BenchFixtures, _stack: ExitStack) -> Callable[[], Any]:
+    from app.services.legacy_compat import build_fee_risk_forecast_table
+
+    lots = fx.storage_lots
+    return lambda: build_fee_risk_forecast_table(lots)
+
+
+def _fee_projection(fx: BenchFixtures, _stack: ExitStack) -> Callable[[], Any]:
+    from app.services.legacy_compat import build_fee_projection_table
+
+    lots = fx.storage_lots
+    return lambda: build_fee_projection_table(lots)
+
+
+def _trend_snapshot(fx: BenchFixtures, stack: ExitStack) -> Callable[[], Any]:
+    from app.services import trends_domain
+
+    sales, catalog, queries = fx.trend_sales_df, fx.trend_catalog_df, fx.trend_query_df
+    stack.enter_context(patch.object(trends_domain, "load_sales_history", lambda **_kwargs: sales.copy()))
+    stack.enter_context(patch.object(trends_domain, "load_catalog", lambda **_kwargs: catalog.copy()))
+    stack.enter_context(patch.object(trends_domain, "load_query_signals", lambda **_kwargs: queries.copy()))
+    stack.enter_context(patch.object(trends_domain, "load_external_suggestion_signals", lambda **_kwargs: {}))
+    date_from = fx.date_to - timedelta(days=59)
+    return lambda: trends_domain.build_trend_snapshot(
+        date_from=date_from,
+        date_to=fx.date_to,
+        seller_client_id=BENCH_SELLER_CLIENT_ID,
+        seller_api_key="bench-key",
+        horizon="month",
+        company_name=BENCH_COMPANY,
+    )
+
+
+def _weekly_aggregate(fx: BenchFixtures, _stack: ExitStack) -> Callable[[], Any]:
+    from app.services.main_overview import _campaign_weekly_aggregate
+
+    daily = fx.overview_daily_df
+    return lambda: _campaign_weekly_aggregate(daily, target_drr_pct=20.0)
+
+
+def _unit_economics_summary(fx: BenchFixtures, stack: ExitStack) -> Callable[[], Any]:
+    from app.services import unit_economics
+
+    costs, sales, payload = fx.unit_costs_df, fx.unit_sales_df, fx.finance_balance_payload
+    stack.enter_context(patch.object(unit_economics, "resolve_company_config", lambda _company: _bench_config()))
+    stack.enter_context(patch.object(unit_economics, "load_effective_unit_costs", lambda *_args, **_kwargs: costs.copy()))
+    stack.enter_context(patch.object(unit_economics, "_load_sales_by_sku_day_rows", lambda *_args, **_kwargs: sales.copy()))
+    stack.enter_context(patch.object(unit_economics, "seller_finance_balance", lambda **_kwargs: payload))
+    date_from, date_to = fx.date_from.isoformat(), fx.date_to.isoformat()
+    return lambda: unit_economics.get_unit_economics_summary(company=BENCH_COMPANY, date_from=date_from, date_to=date_to)
+
+
+BENCHMARKS: dict[str, Callable[[BenchFixtures, ExitStack], Callable[[], Any]]] = {
+    "build_report_rows": _report_rows,
+    "build_campaign_daily_rows": _campaign_daily_rows,
+    "compute_daily_breakdown": _daily_breakdown,
+    "stocks_workspace": _stocks_workspace,
+    "build_fee_risk_forecast_table": _fee_risk_forecast,
+    "build_fee_projection_table": _fee_projection,
+    "build_trend_snapshot": _trend_snapshot,
+    "campaign_weekly_aggregate": _weekly_aggregate,
+    "unit_economics_summary": _unit_economics_summary,
+}
+
+
+def measure(
+    fn: Callable[[], Any],
+    *,
+    repeat: int = 5,
+    budget_s: float = 20.0,
+    memory: bool = True,
+) -> tuple[list[float], float]:
+    """Return per-run wall times (ms) after one warm-up, and the tracemalloc peak (KiB) of one more run.
+
+    Slow builders get fewer timed runs so one benchmark stays within roughly ``budget_s``; a warm-up
+    longer than the whole budget counts as the only timed run.
+    """
+    started = perf_counter()
+    fn()
+    warmup_s = perf_counter() - started
+    times: list[float] = []
+    if warmup_s >= budget_s:
+        times.append(warmup_s * 1000)
+    runs = 0 if times else max(1, min(repeat, int(budget_s / warmup_s) if warmup_s > 0 else repeat))
+    for _ in range(runs):
+        gc.collect()
+        started = perf_counter()
+        fn()
+        times.append((perf_counter() - started) * 1000)
+    if not memory:
+        return times, 0.0
+    gc.collect()
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline_bytes, _peak = tracemalloc.get_traced_memory()
+    fn()
+    _current, peak = tracemalloc.get_traced_memory()
+    if not already_tracing:
+        tracemalloc.stop()
+    return times, max(0, peak - baseline_bytes) / 1024
+
+
+def run_benchmarks(
+    *,
+    scales: list[str] | None = None,
+    names: list[str] | None = None,
+    repeat: int = 5,
+    budget_s: float = 20.0,
+    memory: bool = True,
+    fixtures: dict[str, BenchFixtures] | None = None,
+    progress: Callable[[BenchResult], None] | None = None,
+) -> list[BenchResult]:
+    results: list[BenchResult] = []
+    for scale in scales or list(SCALES):
+        fx = (fixtures or {}).get(scale) or BenchFixtures(SCALES[scale])
+        for name in names or list(BENCHMARKS):
+            with ExitStack() as stack:
+                fn = BENCHMARKS[name](fx, stack)
+                times, peak_kib = measure(fn, repeat=repeat, budget_s=budget_s, memory=memory)
+            result = BenchResult(
+                name=name,
+                scale=scale,
+                best_ms=round(min(times), 3),
+                median_ms=round(median(times), 3),
+                peak_kib=round(peak_kib, 1),
+                runs=len(times),
+            )
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return results
+
+
+def load_baseline(path: Path = DEFAULT_BASELINE) -> dict[str, dict]:
+    if not path.is_file():
+        return {}
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    return dict(payload.get("results") or {})
+
+
+def save_baseline(results: list[BenchResult], path: Path = DEFAULT_BASELINE) -> None:
+    existing = load_baseline(path)
+    for result in results:
+        previous_peak = float((existing.get(result.key) or {}).get("peak_kib") or 0.0)
+        existing[result.key] = {
+            "best_ms": result.best_ms,
+            "median_ms": result.median_ms,
+            "peak_kib": result.peak_kib or previous_peak,
+        }
+    payload = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "pandas": pd.__version__,
+            "updated_at": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+        },
+        "results": dict(sorted(existing.items())),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def find_regressions(
+    results: list[BenchResult],
+    baseline: dict[str, dict],
+    *,
+    threshold: float = 0.25,
+    memory_threshold: float | None = None,
+) -> list[str]:
+    """Describe every result slower (best time) or hungrier (peak) than baseline beyond the threshold."""
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    problems: list[str] = []
+    for result in results:
+        base = baseline.get(result.key)
+        if not base:
+            continue
+        base_ms = float(base.get("best_ms") or 0.0)
+        if base_ms and result.best_ms > base_ms * (1 + threshold) and result.best_ms - base_ms > MIN_TIME_DELTA_MS:
+            problems.append(f"{result.key}: time {result.best_ms:.1f} ms vs baseline {base_ms:.1f} ms (+{(result.best_ms / base_ms - 1) * 100:.0f}%)")
+        base_kib = float(base.get("peak_kib") or 0.0)
+        if base_kib and result.peak_kib > base_kib * (1 + memory_threshold) and result.peak_kib - base_kib > MIN_PEAK_DELTA_KIB:
+            problems.append(f"{result.key}: peak {result.peak_kib:.0f} KiB vs baseline {base_kib:.0f} KiB (+{(result.peak_kib / base_kib - 1) * 100:.0f}%)")
+    return problems
+
+
+def results_as_dicts(results: list[BenchResult]) -> list[dict]:
+    return [asdict(result) for result in results]
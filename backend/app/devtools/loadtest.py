@@ -0,0 +1,403 @@
+"""End-to-end load test of the API against the Ozon stand-in.
+
+The harness drives a weighted mix of dashboard requests at rising concurrency levels. Each step
+runs for a fixed time with one client thread per concurrent user. Per step it records latency
+percentiles (overall and per endpoint), throughput, status codes, and upstream amplification
+(Ozon stub requests per API request, read from ``/__stub/stats``). It also samples the RSS of the
+API and job worker process trees. Reports are JSON plus a Markdown summary that can be diffed
+against the report of another version.
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import requests
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+LOADTEST_COMPANY = "loadtest"
+
+
+@dataclass
+class LoadRequest:
+    name: str
+    method: str
+    path: str
+    weight: float = 1.0
+    params: dict[str, Any] = field(default_factory=dict)
+    json_body: dict[str, Any] | None = None
+
+
+def default_mix(*, end_date: date, campaign_id: str, sku: str, company: str = LOADTEST_COMPANY) -> list[LoadRequest]:
+    """The dashboard mix: mostly report and overview reads, some workspace/storage, a few bid writes."""
+    week = {"company": company, "date_from": (end_date - timedelta(days=6)).isoformat(), "date_to": end_date.isoformat()}
+    month = {"company": company, "date_from": (end_date - timedelta(days=29)).isoformat(), "date_to": end_date.isoformat()}
+    return [
+        LoadRequest("campaigns_report", "GET", "/api/campaigns/report", 3, week),
+        LoadRequest("campaigns_report_month", "GET", "/api/campaigns/report", 1, month),
+        LoadRequest("main_overview", "GET", "/api/campaigns/main-overview", 2, month),
+        LoadRequest("stocks_workspace", "GET", "/api/stocks/workspace", 2, week),
+        LoadRequest("storage_snapshot", "GET", "/api/storage/snapshot", 1, {"company": company}),
+        LoadRequest(
+            "bids_apply",
+            "POST",
+            "/api/bids/apply",
+            0.5,
+            json_body={"company": company, "campaign_id": campaign_id, "sku": sku, "bid_rub": 25.0, "reason": "load test"},
+        ),
+    ]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _latency_summary(values: list[float]) -> dict[str, float]:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50), 1),
+        "p95_ms": round(percentile(values, 95), 1),
+        "p99_ms": round(percentile(values, 99), 1),
+        "max_ms": round(max(values), 1) if values else 0.0,
+    }
+
+
+def _children(pid: int) -> list[int]:
+    out: list[int] = []
+    for task in Path(f"/proc/{pid}/task").glob("*/children"):
+        try:
+            out.extend(int(item) for item in task.read_text().split())
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def process_tree_rss_kib(pid: int) -> int:
+    """RSS of a process and its descendants from /proc (0 where /proc is unavailable)."""
+    total = 0
+    pending = [pid]
+    seen: set[int] = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            status = Path(f"/proc/{current}/status").read_text()
+        except OSError:
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                total += int(line.split()[1])
+                break
+        pending.extend(_children(current))
+    return total
+
+
+class RssSampler:
+    def __init__(self, pids: list[int], interval_s: float = 0.25) -> None:
+        self.pids = pids
+        self.interval_s = interval_s
+        self.samples: list[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="loadtest-rss", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.samples.append(sum(process_tree_rss_kib(pid) for pid in self.pids))
+            self._stop.wait(self.interval_s)
+
+    def __enter__(self) -> "RssSampler":
+        if self.pids:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=2)
+
+    def summary(self) -> dict[str, int]:
+        if not self.samples:
+            return {"rss_start_kib": 0, "rss_peak_kib": 0, "rss_end_kib": 0}
+        return {"rss_start_kib": self.samples[0], "rss_peak_kib": max(self.samples), "rss_end_kib": self.samples[-1]}
+
+
+def stub_total(stub_url: str) -> int | None:
+    if not stub_url:
+        return None
+    try:
+        return int(requests.get(f"{stub_url.rstrip('/')}/__stub/stats", timeout=10).json().get("total") or 0)
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def run_step(
+    *,
+    base_url: str,
+    mix: list[LoadRequest],
+    concurrency: int,
+    duration_s: float,
+    stub_url: str = "",
+    pids: list[int] | None = None,
+    timeout_s: float = 120.0,
+    seed: int = 1,
+) -> dict[str, Any]:
+    latencies: dict[str, list[float]] = {item.name: [] for item in mix}
+    statuses: dict[str, int] = {}
+    errors: list[str] = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration_s
+    weights = [item.weight for item in mix]
+
+    def user(index: int) -> None:
+        rng = random.Random(f"{seed}:{concurrency}:{index}")
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            item = rng.choices(mix, weights=weights)[0]
+            started = time.perf_counter()
+            try:
+                response = session.request(
+                    item.method,
+                    f"{base_url.rstrip('/')}{item.path}",
+                    params=item.params or None,
+                    json=item.json_body,
+                    timeout=timeout_s,
+                )
+                status = str(response.status_code)
+            except requests.RequestException as exc:
+                status = type(exc).__name__
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status.isdigit() and int(status) < 400:
+                    latencies[item.name].append(elapsed_ms)
+                elif len(errors) < 20:
+                    errors.append(f"{item.name}: {status}")
+        session.close()
+
+    upstream_before = stub_total(stub_url)
+    started = time.perf_counter()
+    with RssSampler(pids or []) as sampler:
+        threads = [threading.Thread(target=user, args=(index,), daemon=True) for index in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall_s = time.perf_counter() - started
+    upstream_after = stub_total(stub_url)
+
+    total = sum(statuses.values())
+    ok = sum(len(values) for values in latencies.values())
+    upstream_calls = (
+        upstream_after - upstream_before if upstream_before is not None and upstream_after is not None else None
+    )
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(wall_s, 2),
+        "requests": total,
+        "ok": ok,
+        "error_rate": round((total - ok) / total, 4) if total else 0.0,
+        "throughput_rps": round(ok / wall_s, 2) if wall_s > 0 else 0.0,
+        "latency": _latency_summary([value for values in latencies.values() for value in values]),
+        "endpoints": {name: _latency_summary(values) for name, values in latencies.items()},
+        "statuses": dict(sorted(statuses.items())),
+        "errors": errors,
+        "upstream_calls": upstream_calls,
+        "upstream_per_request": round(upstream_calls / total, 2) if upstream_calls is not None and total else None,
+        **sampler.summary(),
+    }
+
+
+def run_load_test(
+    *,
+    base_url: str,
+    mix: list[LoadRequest],
+    concurrency_levels: list[int],
+    duration_s: float,
+    stub_url: str = "",
+    pids: list[int] | None = None,
+    warmup: bool = True,
+    label: str = "",
+) -> dict[str, Any]:
+    if warmup:
+        # One pass over every request fills the caches, so step 1 measures steady state.
+        session = requests.Session()
+        for item in mix:
+            try:
+                session.request(item.method, f"{base_url.rstrip('/')}{item.path}", params=item.params or None, json=item.json_body, timeout=300)
+            except requests.RequestException:
+                pass
+        session.close()
+    steps = [
+        run_step(base_url=base_url, mix=mix, concurrency=level, duration_s=duration_s, stub_url=stub_url, pids=pids)
+        for level in concurrency_levels
+    ]
+    return {
+        "label": label,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "mix": [asdict(item) for item in mix],
+        "steps": steps,
+    }
+
+
+def _delta(current: float | None, previous: float | None) -> str:
+    if current is None or not previous:
+        return ""
+    return f" ({(current / previous - 1) * 100:+.0f}%)"
+
+
+def render_markdown(report: dict[str, Any], previous: dict[str, Any] | None = None) -> str:
+    previous_steps = {step["concurrency"]: step for step in (previous or {}).get("steps", [])}
+    lines = [f"# Load test {report.get('label') or ''}".rstrip(), ""]
+    if previous:
+        lines += [f"Compared with: {previous.get('label') or previous.get('created_at', '')}", ""]
+    lines += [
+        "| users | rps | p50 ms | p95 ms | p99 ms | errors | upstream/req | peak RSS MiB |",
+        "|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for step in report["steps"]:
+        before = previous_steps.get(step["concurrency"], {})
+        before_latency = before.get("latency", {})
+        rss_mib = step["rss_peak_kib"] / 1024
+        lines.append(
+            "| {users} | {rps}{rps_d} | {p50}{p50_d} | {p95}{p95_d} | {p99}{p99_d} | {errors:.1%} | {upstream} | {rss}{rss_d} |".format(
+                users=step["concurrency"],
+                rps=step["throughput_rps"],
+                rps_d=_delta(step["throughput_rps"], before.get("throughput_rps")),
+                p50=step["latency"]["p50_ms"],
+                p50_d=_delta(step["latency"]["p50_ms"], before_latency.get("p50_ms")),
+                p95=step["latency"]["p95_ms"],
+                p95_d=_delta(step["latency"]["p95_ms"], before_latency.get("p95_ms")),
+                p99=step["latency"]["p99_ms"],
+                p99_d=_delta(step["latency"]["p99_ms"], before_latency.get("p99_ms")),
+                errors=step["error_rate"],
+                upstream="" if step["upstream_per_request"] is None else step["upstream_per_request"],
+                rss=f"{rss_mib:.0f}",
+                rss_d=_delta(step["rss_peak_kib"], before.get("rss_peak_kib")),
+            )
+        )
+    lines += ["", "## Per endpoint p95 ms", ""]
+    names = list(report["steps"][0]["endpoints"]) if report["steps"] else []
+    lines += ["| users | " + " | ".join(names) + " |", "|---:|" + "---:|" * len(names)]
+    for step in report["steps"]:
+        before = previous_steps.get(step["concurrency"], {}).get("endpoints", {})
+        cells = [
+            f"{step['endpoints'][name]['p95_ms']}{_delta(step['endpoints'][name]['p95_ms'], (before.get(name) or {}).get('p95_ms'))}"
+            for name in names
+        ]
+        lines.append(f"| {step['concurrency']} | " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def write_report(report: dict[str, Any], out_dir: Path, previous: dict[str, Any] | None = None) -> tuple[Path, Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"loadtest-{time.strftime('%Y%m%d-%H%M%S')}"
+    json_path = out_dir / f"{stem}.json"
+    md_path = out_dir / f"{stem}.md"
+    json_path.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    md_path.write_text(render_markdown(report, previous), encoding="utf-8")
+    return json_path, md_path
+
+
+class BackendProcess:
+    """``uvicorn app.main:app`` in a subprocess with the Ozon bases and company credentials set."""
+
+    def __init__(
+        self,
+        *,
+        port: int,
+        stub_url: str,
+        database_url: str,
+        data_dir: str,
+        workers: int = 1,
+        company: str = LOADTEST_COMPANY,
+        with_worker: bool = False,
+        extra_env: dict[str, str] | None = None,
+    ) -> None:
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.workers = workers
+        self.with_worker = with_worker
+        self.env = {
+            **os.environ,
+            "DATABASE_URL": database_url,
+            "BACKEND_DATA_DIR": data_dir,
+            "OZON_PERF_BASE": stub_url,
+            "OZON_SELLER_BASE": stub_url,
+            "COMPANY_NAME": company,
+            "PERF_CLIENT_ID": "loadtest-perf",
+            "PERF_CLIENT_SECRET": "loadtest-secret",
+            "SELLER_CLIENT_ID": "loadtest-seller",
+            "SELLER_API_KEY": "loadtest-key",
+            **(extra_env or {}),
+        }
+        self.process: subprocess.Popen | None = None
+        self.worker: subprocess.Popen | None = None
+
+    def start(self, timeout_s: float = 60.0) -> "BackendProcess":
+        command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(self.port),
+            "--workers",
+            str(self.workers),
+            "--log-level",
+            "warning",
+        ]
+        self.process = subprocess.Popen(command, cwd=str(BACKEND_ROOT), env=self.env)
+        if self.with_worker:
+            self.worker = subprocess.Popen([sys.executable, "-m", "app.workers.worker"], cwd=str(BACKEND_ROOT), env=self.env)
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"backend exited with code {self.process.returncode}")
+            try:
+                if requests.get(f"{self.url}/api/health", timeout=2).ok:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"backend did not answer on {self.url} within {timeout_s:.0f}s")
+
+    @property
+    def pids(self) -> list[int]:
+        return [process.pid for process in (self.process, self.worker) if process is not None]
+
+    def stop(self) -> None:
+        for process in (self.worker, self.process):
+            if process is None or process.poll() is not None:
+                continue
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def __enter__(self) -> "BackendProcess":
+        return self.start()
+
+    def __exit__(self, *_exc) -> None:
+        self.stop()
@@ -0,0 +1,6 @@
+"""Local record/replay stand-in for the Ozon Performance and Seller APIs."""
+
+from app.devtools.ozon_stub.dataset import StubDataset
+from app.devtools.ozon_stub.server import StubConfig, create_stub_app
+
+__all__ = ["StubConfig", "StubDataset", "create_stub_app"]
@@ -0,0 +1,460 @@
+"""Deterministic synthetic Ozon data generated on demand.
+
+Every value is derived from a hash of ``(seed, kind, ids...)``, so pages can be served at any
+scale without materialising the whole dataset and the same request always gets the same answer.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+CLUSTERS = (
+    ("4039", "Москва, МО и Дальние регионы", "ХОРУГВИНО_РФЦ"),
+    ("4002", "Санкт-Петербург и СЗО", "СПБ_ШУШАРЫ_РФЦ"),
+    ("4007", "Казань", "КАЗАНЬ_РФЦ_НОВЫЙ"),
+    ("4012", "Екатеринбург", "ЕКАТЕРИНБУРГ_РФЦ"),
+    ("4018", "Новосибирск", "НОВОСИБИРСК_РФЦ"),
+    ("4021", "Краснодар", "АДЫГЕЙСК_РФЦ"),
+    ("4071", "Ростов", "РОСТОВ_РФЦ"),
+    ("4025", "Самара", "САМАРА_РФЦ"),
+)
+DROPOFF_WAREHOUSE = ("22000001", "ПУШКИНО_1_РФЦ")
+SUPPLY_STATES = ("COMPLETED", "COMPLETED", "COMPLETED", "IN_TRANSIT", "READY_TO_SUPPLY", "CANCELLED")
+POSTING_STATUSES = ("delivered", "delivered", "delivering", "awaiting_deliver", "cancelled")
+SERVICE_NAMES = (
+    "logistics",
+    "reverse_logistics",
+    "cross_docking",
+    "goods_processing_in_shipment",
+    "marketing",
+    "acquiring",
+    "storage",
+)
+
+SKU_BASE = 100_000_000
+PRODUCT_ID_BASE = 500_000
+CAMPAIGN_ID_BASE = 1_000_000
+ORDER_ID_BASE = 70_000_000
+
+
+def _money(value: float) -> str:
+    return f"{value:.2f}".replace(".", ",")
+
+
+def _day(value: str, default: date) -> date:
+    try:
+        return date.fromisoformat(str(value or "")[:10])
+    except ValueError:
+        return default
+
+
+@dataclass
+class StubDataset:
+    campaigns: int = 20
+    skus: int = 500
+    supply_orders: int = 200
+    days: int = 60
+    postings_per_day: int = 50
+    seed: int = 1
+    end_date: date = field(default_factory=date.today)
+
+    def rand(self, *parts: Any) -> float:
+        digest = hashlib.blake2b(":".join(str(part) for part in (self.seed,) + parts).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2**64
+
+    def randint(self, low: int, high: int, *parts: Any) -> int:
+        return low + int(self.rand(*parts) * (high - low + 1))
+
+    @property
+    def start_date(self) -> date:
+        return self.end_date - timedelta(days=self.days - 1)
+
+    def days_between(self, date_from: str, date_to: str) -> list[date]:
+        start = max(self.start_date, _day(date_from, self.start_date))
+        end = min(self.end_date, _day(date_to, self.end_date))
+        return [start + timedelta(days=offset) for offset in range((end - start).days + 1)] if start <= end else []
+
+    def sku(self, index: int) -> int:
+        return SKU_BASE + index
+
+    def sku_index(self, sku: Any) -> int | None:
+        try:
+            index = int(sku) - SKU_BASE
+        except (TypeError, ValueError):
+            return None
+        return index if 0 <= index < self.skus else None
+
+    def product_index(self, product_id: Any) -> int | None:
+        try:
+            index = int(product_id) - PRODUCT_ID_BASE
+        except (TypeError, ValueError):
+            return None
+        return index if 0 <= index < self.skus else None
+
+    def offer_index(self, offer_id: Any) -> int | None:
+        text = str(offer_id or "")
+        if not text.startswith("ART-"):
+            return None
+        try:
+            index = int(text[4:])
+        except ValueError:
+            return None
+        return index if 0 <= index < self.skus else None
+
+    def product(self, index: int) -> dict[str, Any]:
+        return {
+            "id": PRODUCT_ID_BASE + index,
+            "product_id": PRODUCT_ID_BASE + index,
+            "sku": self.sku(index),
+            "offer_id": f"ART-{index:06d}",
+            "name": f"Товар {index}",
+            "price": str(self.randint(300, 5000, "price", index)),
+        }
+
+    def product_list(self, *, last_id: str, limit: int) -> dict[str, Any]:
+        start = int(last_id) if str(last_id or "").isdigit() else 0
+        end = min(self.skus, start + max(1, limit))
+        items = [{"product_id": PRODUCT_ID_BASE + index, "offer_id": f"ART-{index:06d}"} for index in range(start, end)]
+        return {"result": {"items": items, "total": self.skus, "last_id": str(end) if end < self.skus else ""}}
+
+    def product_info_list(self, product_ids: list[Any]) -> dict[str, Any]:
+        indexes = [self.product_index(product_id) for product_id in product_ids]
+        return {"items": [self.product(index) for index in indexes if index is not None]}
+
+    def product_info_stocks(self, offer_ids: list[Any]) -> dict[str, Any]:
+        items = []
+        for offer_id in offer_ids:
+            index = self.offer_index(offer_id)
+            if index is None:
+                continue
+            present = sum(self.cluster_stock(index, cluster_id)[0] for cluster_id, _name, _warehouse in self.sku_clusters(index))
+            items.append(
+                {
+                    "offer_id": f"ART-{index:06d}",
+                    "product_id": PRODUCT_ID_BASE + index,
+                    "stocks": [
+                        {"type": "fbo", "present": present, "reserved": self.randint(0, 3, "reserved", index)},
+                        {"type": "fbs", "present": 0, "reserved": 0},
+                    ],
+                }
+            )
+        return {"items": items, "total": len(items), "cursor": ""}
+
+    def sku_clusters(self, index: int) -> list[tuple[str, str, str]]:
+        count = self.randint(1, len(CLUSTERS), "clusters", index)
+        offset = self.randint(0, len(CLUSTERS) - 1, "cluster-offset", index)
+        return [CLUSTERS[(offset + step) % len(CLUSTERS)] for step in range(count)]
+
+    def cluster_stock(self, index: int, cluster_id: str) -> tuple[int, int]:
+        available = self.randint(0, 120, "stock", index, cluster_id)
+        transit = self.randint(0, 40, "transit", index, cluster_id) if self.rand("has-transit", index, cluster_id) < 0.3 else 0
+        return available, transit
+
+    def analytics_stocks(self, skus: list[Any], cluster_ids: list[Any] | None = None) -> dict[str, Any]:
+        wanted_clusters = {str(value) for value in cluster_ids or []}
+        items = []
+        for sku in skus:
+            index = self.sku_index(sku)
+            if index is None:
+                continue
+            for cluster_id, cluster_name, _warehouse in self.sku_clusters(index):
+                if wanted_clusters and cluster_id not in wanted_clusters:
+                    continue
+                available, transit = self.cluster_stock(index, cluster_id)
+                items.append(
+                    {
+                        "sku": self.sku(index),
+                        "offer_id": f"ART-{index:06d}",
+                        "name": f"Товар {index}",
+                        "cluster_id": int(cluster_id),
+                        "cluster_name": cluster_name,
+                        "macrolocal_cluster_id": int(cluster_id),
+                        "available_stock_count": available,
+                        "transit_stock_count": transit,
+                        "ads_cluster": round(self.rand("ads", index, cluster_id) * 4, 2),
+                        "turnover_grade_cluster": ("GREEN", "YELLOW", "RED", "NO_SALES")[self.randint(0, 3, "grade", index, cluster_id)],
+                    }
+                )
+        return {"items": items}
+
+    def ordered_units(self, index: int, day: date) -> int:
+        return self.randint(0, 6, "units", index, day.isoformat()) if self.rand("sold", index, day.isoformat()) < 0.35 else 0
+
+    def _metric(self, name: str, index: int, days: list[date]) -> float:
+        units = sum(self.ordered_units(index, day) for day in days)
+        price = float(self.product(index)["price"])
+        if name == "ordered_units":
+            return units
+        if name == "revenue":
+            return round(units * price, 2)
+        if name in {"hits_view", "hits_view_search", "session_view"}:
+            return units * 40 + self.randint(0, 200, name, index, days[0].isoformat() if days else "")
+        return round(self.rand(name, index) * 100, 2)
+
+    def analytics_data(self, body: dict[str, Any]) -> dict[str, Any]:
+        days = self.days_between(body.get("date_from", ""), body.get("date_to", ""))
+        dimensions = list(body.get("dimension") or ["sku"])
+        metrics = list(body.get("metrics") or ["revenue", "ordered_units"])
+        by_day = "day" in dimensions
+        limit = max(1, int(body.get("limit") or 1000))
+        offset = max(0, int(body.get("offset") or 0))
+        total = self.skus * (len(days) if by_day else 1) if days else 0
+        data = []
+        for position in range(offset, min(total, offset + limit)):
+            index, day_offset = divmod(position, len(days)) if by_day else (position, 0)
+            row_days = [days[day_offset]] if by_day else days
+            dims = []
+            for dimension in dimensions:
+                if dimension == "day":
+                    dims.append({"id": row_days[0].isoformat(), "name": ""})
+                else:
+                    dims.append({"id": str(self.sku(index)), "name": f"Товар {index}"})
+            data.append({"dimensions": dims, "metrics": [self._metric(metric, index, row_days) for metric in metrics]})
+        return {"result": {"data": data, "totals": []}, "timestamp": datetime.utcnow().isoformat()}
+
+    def product_queries(self, body: dict[str, Any]) -> dict[str, Any]:
+        per_sku = max(1, int(body.get("limit_by_sku") or 5))
+        items = []
+        for sku in body.get("skus") or []:
+            index = self.sku_index(sku)
+            if index is None:
+                continue
+            for rank in range(per_sku):
+                current = self.randint(10, 5000, "query-current", index, rank)
+                previous = self.randint(10, 5000, "query-previous", index, rank)
+                items.append(
+                    {
+                        "sku": str(self.sku(index)),
+                        "query": f"запрос {index % 97} {rank}",
+                        "searches": current,
+                        "period_current": current,
+                        "period_previous": previous,
+                        "revenue": round(self.rand("query-revenue", index, rank) * 10000, 2),
+                    }
+                )
+        return {"items": items, "page_count": 1, "total": len(items)}
+
+    def finance_balance(self, body: dict[str, Any]) -> dict[str, Any]:
+        days = self.days_between(body.get("date_from", ""), body.get("date_to", ""))
+        scale = max(1, self.skus // 100)
+        key = (days[0].isoformat() if days else "", len(days))
+        sales = round(sum(self.rand("sales", day.isoformat()) for day in days) * 50000 * scale, 2)
+        services = [
+            {"name": name, "amount": {"value": -round(self.rand("service", name, *key) * sales * 0.05, 2), "currency_code": "RUB"}}
+            for name in SERVICE_NAMES
+        ]
+        opening = round(self.rand("opening", *key) * 1_000_000, 2)
+        accrued = round(sales * 0.7, 2)
+        return {
+            "total": {
+                "opening_balance": {"value": opening, "currency_code": "RUB"},
+                "closing_balance": {"value": round(opening + accrued, 2), "currency_code": "RUB"},
+                "accrued": {"value": accrued, "currency_code": "RUB"},
+                "payments": [{"value": -round(accrued * 0.5, 2), "currency_code": "RUB"}],
+            },
+            "cashflows": {
+                "sales": {"amount": {"value": sales, "currency_code": "RUB"}, "fee": {"value": -round(sales * 0.15, 2), "currency_code": "RUB"}},
+                "services": services,
+            },
+        }
+
+    def posting(self, day: date, number: int) -> dict[str, Any]:
+        created_at = datetime.combine(day, time()) + timedelta(seconds=int(self.rand("posting-time", day.isoformat(), number) * 86399))
+        products = []
+        for line in range(self.randint(1, 3, "posting-lines", day.isoformat(), number)):
+            index = self.randint(0, self.skus - 1, "posting-sku", day.isoformat(), number, line)
+            products.append(
+                {
+                    "sku": self.sku(index),
+                    "offer_id": f"ART-{index:06d}",
+                    "name": f"Товар {index}",
+                    "quantity": self.randint(1, 3, "posting-qty", day.isoformat(), number, line),
+                    "price": self.product(index)["price"],
+                }
+            )
+        return {
+            "posting_number": f"{ORDER_ID_BASE + day.toordinal() % 100000}-{number:04d}-1",
+            "order_id": int(f"{day.toordinal()}{number:04d}"),
+            "status": POSTING_STATUSES[self.randint(0, len(POSTING_STATUSES) - 1, "posting-status", day.isoformat(), number)],
+            "created_at": created_at.isoformat() + "Z",
+            "in_process_at": created_at.isoformat() + "Z",
+            "products": products,
+        }
+
+    def postings(self, body: dict[str, Any]) -> dict[str, Any]:
+        window = body.get("filter") or {}
+        days = self.days_between(str(window.get("since") or ""), str(window.get("to") or ""))
+        limit = max(1, int(body.get("limit") or 1000))
+        offset = max(0, int(body.get("offset") or 0))
+        total = len(days) * self.postings_per_day
+        result = []
+        for position in range(offset, min(total, offset + limit)):
+            day_offset, number = divmod(position, self.postings_per_day)
+            result.append(self.posting(days[day_offset], number))
+        return {"result": result}
+
+    def campaign_id(self, index: int) -> int:
+        return CAMPAIGN_ID_BASE + index
+
+    def campaign_index(self, campaign_id: Any) -> int | None:
+        try:
+            index = int(campaign_id) - CAMPAIGN_ID_BASE
+        except (TypeError, ValueError):
+            return None
+        return index if 0 <= index < self.campaigns else None
+
+    def campaign(self, index: int) -> dict[str, Any]:
+        running = self.rand("campaign-state", index) < 0.8
+        return {
+            "id": str(self.campaign_id(index)),
+            "title": f"Кампания {index}",
+            "state": "CAMPAIGN_STATE_RUNNING" if running else "CAMPAIGN_STATE_STOPPED",
+            "advObjectType": "SKU",
+            "fromDate": self.start_date.isoformat(),
+            "toDate": "",
+            "dailyBudget": "0",
+            "budget": "0",
+            "paymentType": "CPC",
+        }
+
+    def campaign_list(self) -> dict[str, Any]:
+        return {"list": [self.campaign(index) for index in range(self.campaigns)], "total": str(self.campaigns)}
+
+    def campaign_sku_indexes(self, campaign_index: int) -> range:
+        return range(campaign_index, self.skus, max(1, self.campaigns))
+
+    def campaign_products(self, campaign_id: Any, *, page: int, page_size: int) -> dict[str, Any]:
+        index = self.campaign_index(campaign_id)
+        skus = list(self.campaign_sku_indexes(index)) if index is not None else []
+        start = (max(1, page) - 1) * max(1, page_size)
+        products = [
+            {
+                "sku": str(self.sku(sku_index)),
+                "bid": str(self.randint(5, 60, "bid", index, sku_index) * 1_000_000),
+                "title": f"Товар {sku_index}",
+            }
+            for sku_index in skus[start : start + max(1, page_size)]
+        ]
+        return {"products": products, "total": str(len(skus))}
+
+    def _campaign_day(self, index: int, day: date) -> dict[str, float]:
+        views = self.randint(0, 4000, "views", index, day.isoformat())
+        clicks = int(views * self.rand("ctr", index, day.isoformat()) * 0.05)
+        spend = round(clicks * (5 + self.rand("cpc", index, day.isoformat()) * 20), 2)
+        orders = int(clicks * self.rand("cr", index, day.isoformat()) * 0.1)
+        return {
+            "views": views,
+            "clicks": clicks,
+            "money": spend,
+            "orders": orders,
+            "orders_money": round(orders * self.randint(300, 5000, "aov", index), 2),
+            "to_cart": int(clicks * 0.2),
+        }
+
+    def _stats_row(self, index: int, totals: dict[str, float]) -> dict[str, Any]:
+        clicks = int(totals["clicks"])
+        return {
+            "id": str(self.campaign_id(index)),
+            "title": f"Кампания {index}",
+            "views": str(int(totals["views"])),
+            "clicks": str(clicks),
+            "toCart": str(int(totals["to_cart"])),
+            "moneySpent": _money(totals["money"]),
+            "clickPrice": _money(totals["money"] / clicks if clicks else 0),
+            "orders": str(int(totals["orders"])),
+            "ordersMoney": _money(totals["orders_money"]),
+        }
+
+    def campaign_stats(self, campaign_ids: list[Any], date_from: str, date_to: str) -> dict[str, Any]:
+        days = self.days_between(date_from, date_to)
+        rows = []
+        for campaign_id in campaign_ids:
+            index = self.campaign_index(campaign_id)
+            if index is None:
+                continue
+            totals = {"views": 0, "clicks": 0, "money": 0.0, "orders": 0, "orders_money": 0.0, "to_cart": 0}
+            for day in days:
+                for key, value in self._campaign_day(index, day).items():
+                    totals[key] += value
+            rows.append(self._stats_row(index, totals))
+        return {"rows": rows, "totals": {}}
+
+    def campaign_daily_stats(self, campaign_ids: list[Any], date_from: str, date_to: str) -> dict[str, Any]:
+        rows = []
+        for campaign_id in campaign_ids:
+            index = self.campaign_index(campaign_id)
+            if index is None:
+                continue
+            for day in self.days_between(date_from, date_to):
+                row = self._stats_row(index, self._campaign_day(index, day))
+                row["date"] = day.isoformat()
+                rows.append(row)
+        return {"rows": rows}
+
+    def order_id(self, index: int) -> int:
+        return ORDER_ID_BASE + index
+
+    def supply_order_list(self, *, last_id: str, limit: int) -> dict[str, Any]:
+        start = int(last_id) if str(last_id or "").isdigit() else 0
+        end = min(self.supply_orders, start + max(1, limit))
+        return {
+            "order_ids": [str(self.order_id(index)) for index in range(start, end)],
+            "last_id": str(end) if end < self.supply_orders else "",
+        }
+
+    def supply_order(self, index: int) -> dict[str, Any]:
+        state = SUPPLY_STATES[self.randint(0, len(SUPPLY_STATES) - 1, "order-state", index)]
+        created = datetime.combine(self.start_date, time()) + timedelta(hours=self.randint(0, self.days * 24 - 1, "order-created", index))
+        supplies = []
+        for supply in range(self.randint(1, 3, "supplies", index)):
+            cluster_id, _cluster_name, warehouse = CLUSTERS[self.randint(0, len(CLUSTERS) - 1, "supply-cluster", index, supply)]
+            supplies.append(
+                {
+                    "supply_id": f"{self.order_id(index)}{supply}",
+                    "bundle_id": f"bundle-{index}-{supply}",
+                    "state": state,
+                    "macrolocal_cluster_id": cluster_id,
+                    "storage_warehouse": {"warehouse_id": f"2{cluster_id}000", "name": warehouse},
+                }
+            )
+        return {
+            "order_id": str(self.order_id(index)),
+            "order_number": f"SO-{index}",
+            "state": state,
+            "created_date": created.isoformat() + "Z",
+            "state_updated_date": (created + timedelta(days=3)).isoformat() + "Z",
+            "drop_off_warehouse": {"warehouse_id": DROPOFF_WAREHOUSE[0], "name": DROPOFF_WAREHOUSE[1]},
+            "timeslot": {"timeslot": {"from": (created + timedelta(days=1)).isoformat() + "Z", "to": (created + timedelta(days=1, hours=1)).isoformat() + "Z"}},
+            "supplies": supplies,
+        }
+
+    def supply_orders_by_ids(self, order_ids: list[Any]) -> dict[str, Any]:
+        orders = []
+        for order_id in order_ids:
+            try:
+                index = int(order_id) - ORDER_ID_BASE
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < self.supply_orders:
+                orders.append(self.supply_order(index))
+        return {"orders": orders}
+
+    def bundle_items(self, bundle_id: str, *, last_id: str, limit: int) -> dict[str, Any]:
+        size = self.randint(3, 40, "bundle-size", bundle_id)
+        start = int(last_id) if str(last_id or "").isdigit() else 0
+        end = min(size, start + max(1, limit))
+        items = []
+        for position in range(start, end):
+            index = self.randint(0, self.skus - 1, "bundle-sku", bundle_id, position)
+            items.append(
+                {
+                    "sku": self.sku(index),
+                    "offer_id": f"ART-{index:06d}",
+                    "name": f"Товар {index}",
+                    "quantity": self.randint(1, 50, "bundle-qty", bundle_id, position),
+                }
+            )
+        has_next = end < size
+        return {"items": items, "has_next": has_next, "last_id": str(end) if has_next else "", "total_count": size}
@@ -0,0 +1,105 @@
+"""Anonymised request/response recordings for the Ozon stand-in.
+
+Recordings are JSON files keyed by method, path and the anonymised query/body, so a replay finds
+the response as long as the client sends the same request it sent while recording.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+ANON_PREFIX = "anon-"
+# String values under these keys identify the seller, its products or its buyers.
+SENSITIVE_KEYS = {
+    "access_token",
+    "client_id",
+    "client_secret",
+    "name",
+    "title",
+    "offer_id",
+    "offerId",
+    "posting_number",
+    "query",
+    "search_text",
+    "searchText",
+    "address",
+    "city",
+}
+_SLUG = re.compile(r"[^A-Za-z0-9]+")
+
+
+def _pseudonym(value: str) -> str:
+    if not value or value.startswith(ANON_PREFIX):
+        return value
+    return f"{ANON_PREFIX}{hashlib.sha1(value.encode('utf-8')).hexdigest()[:12]}"
+
+
+def anonymize(value: Any, key: str = "", *, parent: str = "") -> Any:
+    """Replace identifying strings with stable pseudonyms; already anonymised values are kept.
+
+    Warehouse names are left alone: the backend derives cities from them.
+    """
+    if isinstance(value, dict):
+        return {item_key: anonymize(item_value, item_key, parent=key) for item_key, item_value in value.items()}
+    if isinstance(value, list):
+        return [anonymize(item, key, parent=parent) for item in value]
+    if isinstance(value, str) and key in SENSITIVE_KEYS and "warehouse" not in parent:
+        return _pseudonym(value)
+    return value
+
+
+def recording_key(method: str, path: str, query: list[tuple[str, str]], body: Any) -> str:
+    canonical = json.dumps(
+        {
+            "method": method.upper(),
+            "path": path,
+            "query": sorted([key, anonymize(value, key)] for key, value in query),
+            "body": anonymize(body),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    digest = hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+    return f"{method.lower()}_{_SLUG.sub('_', path).strip('_')}_{digest}"
+
+
+class RecordingStore:
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def save(
+        self,
+        key: str,
+        *,
+        method: str,
+        path: str,
+        query: list[tuple[str, str]],
+        body: Any,
+        status: int,
+        response: Any,
+    ) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        record = {
+            "method": method.upper(),
+            "path": path,
+            "query": [[key_, anonymize(value, key_)] for key_, value in query],
+            "body": anonymize(body),
+            "status": int(status),
+            "response": anonymize(response),
+        }
+        self._path(key).write_text(json.dumps(record, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(list(self.directory.glob("*.json"))) if self.directory.is_dir() else 0
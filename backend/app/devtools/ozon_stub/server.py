@@ -0,0 +1,285 @@
+"""Local stand-in for the Ozon Performance and Seller APIs.
+
+Both APIs are served from one app (their paths do not overlap); point ``OZON_PERF_BASE`` and
+``OZON_SELLER_BASE`` at it. Modes:
+
+- ``synthetic``: answer from :class:`StubDataset`;
+- ``record``: proxy to the real APIs and save anonymised responses;
+- ``replay``: answer from recordings, falling back to synthetic data unless ``strict``.
+
+Latency, jitter and 429 injection (every N-th request or with a probability, always with
+``Retry-After``) apply in every mode. ``GET /__stub/stats`` returns request counters.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import requests
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.devtools.ozon_stub.dataset import StubDataset
+from app.devtools.ozon_stub.recording import RecordingStore, recording_key
+from app.services.integrations.metrics import endpoint_label
+
+REAL_PERF_BASE = "https://api-performance.ozon.ru"
+REAL_SELLER_BASE = "https://api-seller.ozon.ru"
+
+Query = list[tuple[str, str]]
+Handler = Callable[[StubDataset, re.Match, Query, dict], Any]
+
+
+@dataclass
+class StubConfig:
+    mode: str = "synthetic"
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    throttle_every: int = 0
+    throttle_probability: float = 0.0
+    retry_after_seconds: float = 1.0
+    recordings_dir: str = ""
+    strict: bool = False
+    upstream_perf_base: str = REAL_PERF_BASE
+    upstream_seller_base: str = REAL_SELLER_BASE
+    seed: int = 1
+    dataset: StubDataset = field(default_factory=StubDataset)
+
+
+def _query_values(query: Query, name: str) -> list[str]:
+    return [value for key, value in query if key == name]
+
+
+def _query_value(query: Query, name: str, default: str = "") -> str:
+    values = _query_values(query, name)
+    return values[0] if values else default
+
+
+def _supply_order_get(data: StubDataset, _match, _query, body: dict) -> Any:
+    order_ids = body.get("order_ids") or body.get("supply_order_ids") or body.get("ids") or []
+    return data.supply_orders_by_ids(order_ids)
+
+
+ROUTES: list[tuple[str, re.Pattern, Handler]] = [
+    ("POST", re.compile(r"^/api/client/token$"), lambda data, _m, _q, _b: {"access_token": f"stub-token-{data.seed}", "expires_in": 1800, "token_type": "Bearer"}),
+    ("GET", re.compile(r"^/api/client/campaign$"), lambda data, _m, _q, _b: data.campaign_list()),
+    (
+        "GET",
+        re.compile(r"^/api/client/campaign/(?P<campaign_id>[^/]+)/v2/products$"),
+        lambda data, match, query, _b: data.campaign_products(
+            match["campaign_id"],
+            page=int(_query_value(query, "page", "1") or 1),
+            page_size=int(_query_value(query, "pageSize", "100") or 100),
+        ),
+    ),
+    ("PUT", re.compile(r"^/api/client/campaign/(?P<campaign_id>[^/]+)/products$"), lambda _d, _m, _q, body: {"bids": body.get("bids") or []}),
+    (
+        "GET",
+        re.compile(r"^/api/client/statistics/campaign/product/json$"),
+        lambda data, _m, query, _b: data.campaign_stats(
+            _query_values(query, "campaignIds"), _query_value(query, "dateFrom"), _query_value(query, "dateTo")
+        ),
+    ),
+    (
+        "GET",
+        re.compile(r"^/api/client/statistics/daily/json$"),
+        lambda data, _m, query, _b: data.campaign_daily_stats(
+            _query_values(query, "campaignIds"), _query_value(query, "dateFrom"), _query_value(query, "dateTo")
+        ),
+    ),
+    ("POST", re.compile(r"^/v1/analytics/data$"), lambda data, _m, _q, body: data.analytics_data(body)),
+    ("POST", re.compile(r"^/v1/analytics/product-queries/details$"), lambda data, _m, _q, body: data.product_queries(body)),
+    ("POST", re.compile(r"^/v1/finance/balance$"), lambda data, _m, _q, body: data.finance_balance(body)),
+    (
+        "POST",
+        re.compile(r"^/v3/product/list$"),
+        lambda data, _m, _q, body: data.product_list(last_id=str(body.get("last_id") or ""), limit=int(body.get("limit") or 1000)),
+    ),
+    ("POST", re.compile(r"^/v3/product/info/list$"), lambda data, _m, _q, body: data.product_info_list(body.get("product_id") or [])),
+    (
+        "POST",
+        re.compile(r"^/v4/product/info/stocks$"),
+        lambda data, _m, _q, body: data.product_info_stocks((body.get("filter") or {}).get("offer_id") or []),
+    ),
+    ("POST", re.compile(r"^/v2/posting/fbo/list$"), lambda data, _m, _q, body: data.postings(body)),
+    (
+        "POST",
+        re.compile(r"^/v1/analytics/stocks$"),
+        lambda data, _m, _q, body: data.analytics_stocks(body.get("skus") or [], body.get("cluster_ids")),
+    ),
+    (
+        "POST",
+        re.compile(r"^/v3/supply-order/list$"),
+        lambda data, _m, _q, body: data.supply_order_list(last_id=str(body.get("last_id") or ""), limit=int(body.get("limit") or 100)),
+    ),
+    ("POST", re.compile(r"^/v3/supply-order/get$"), _supply_order_get),
+    (
+        "POST",
+        re.compile(r"^/v1/supply-order/bundle$"),
+        lambda data, _m, _q, body: data.bundle_items(
+            str((body.get("bundle_ids") or [""])[0]),
+            last_id=str(body.get("last_id") or ""),
+            limit=int(body.get("limit") or 100),
+        ),
+    ),
+]
+
+
+def _synthetic_response(data: StubDataset, method: str, path: str, query: Query, body: dict) -> tuple[int, Any]:
+    for route_method, pattern, handler in ROUTES:
+        match = pattern.match(path)
+        if match and route_method == method:
+            return 200, handler(data, match, query, body)
+    return 404, {"code": 5, "message": f"stub: no handler for {method} {path}"}
+
+
+class StubState:
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self.store = RecordingStore(config.recordings_dir) if config.recordings_dir else None
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.requests: Counter = Counter()
+        self.throttled: Counter = Counter()
+        self.replay_misses = 0
+        self.recorded = 0
+
+    def should_throttle(self, endpoint: str) -> bool:
+        with self._lock:
+            self.total += 1
+            self.requests[endpoint] += 1
+            throttle = bool(self.config.throttle_every) and self.total % self.config.throttle_every == 0
+            if not throttle and self.config.throttle_probability > 0:
+                throttle = self._random.random() < self.config.throttle_probability
+            if throttle:
+                self.throttled[endpoint] += 1
+            return throttle
+
+    def latency_seconds(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(0, self.config.jitter_ms) if self.config.jitter_ms > 0 else 0.0
+        return max(0.0, self.config.latency_ms + jitter) / 1000
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.config.mode,
+                "total": self.total,
+                "requests": dict(self.requests),
+                "throttled": dict(self.throttled),
+                "replay_misses": self.replay_misses,
+                "recorded": self.recorded,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.total = 0
+            self.requests.clear()
+            self.throttled.clear()
+            self.replay_misses = 0
+            self.recorded = 0
+
+
+def _forward(config: StubConfig, method: str, path: str, query: Query, headers: dict, raw_body: bytes) -> tuple[int, Any]:
+    base = config.upstream_perf_base if path.startswith("/api/client") else config.upstream_seller_base
+    forwarded_headers = {
+        key: value
+        for key, value in headers.items()
+        if key.lower() in {"authorization", "client-id", "api-key", "content-type", "accept"}
+    }
+    response = requests.request(method, f"{base.rstrip('/')}{path}", params=query, data=raw_body, headers=forwarded_headers, timeout=120)
+    try:
+        return response.status_code, response.json()
+    except ValueError:
+        return response.status_code, {"text": response.text}
+
+
+def _parse_body(raw_body: bytes, content_type: str) -> dict:
+    if not raw_body:
+        return {}
+    if "json" in content_type:
+        try:
+            payload = json.loads(raw_body)
+        except ValueError:
+            return {}
+        return payload if isinstance(payload, dict) else {"items": payload}
+    if "form" in content_type:
+        from urllib.parse import parse_qsl
+
+        return dict(parse_qsl(raw_body.decode("utf-8")))
+    return {}
+
+
+def create_stub_app(config: StubConfig | None = None) -> FastAPI:
+    config = config or StubConfig()
+    if config.mode not in {"synthetic", "record", "replay"}:
+        raise ValueError(f"Unknown stub mode: {config.mode}")
+    if config.mode in {"record", "replay"} and not config.recordings_dir:
+        raise ValueError(f"Stub mode {config.mode} needs recordings_dir")
+    state = StubState(config)
+    app = FastAPI(title="Ozon API stub", docs_url=None, redoc_url=None, openapi_url=None)
+    app.state.stub = state
+
+    @app.get("/__stub/stats")
+    def stub_stats():
+        return state.stats()
+
+    @app.post("/__stub/reset")
+    def stub_reset():
+        state.reset()
+        return state.stats()
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT"])
+    async def stub_endpoint(path: str, request: Request):
+        method = request.method.upper()
+        path = f"/{path}"
+        query = list(request.query_params.multi_items())
+        raw_body = await request.body()
+        body = _parse_body(raw_body, request.headers.get("content-type", ""))
+        endpoint = f"{method} {endpoint_label(path)}"
+
+        delay = state.latency_seconds()
+        if delay:
+            await asyncio.sleep(delay)
+        if state.should_throttle(endpoint):
+            retry_after = config.retry_after_seconds
+            return JSONResponse(
+                {"code": 8, "message": "stub: too many requests"},
+                status_code=429,
+                headers={"Retry-After": f"{retry_after:g}"},
+            )
+
+        if config.mode == "record":
+            status, payload = await run_in_threadpool(_forward, config, method, path, query, dict(request.headers), raw_body)
+            state.store.save(
+                recording_key(method, path, query, body),
+                method=method,
+                path=path,
+                query=query,
+                body=body,
+                status=status,
+                response=payload,
+            )
+            state.recorded += 1
+            return JSONResponse(state.store.load(recording_key(method, path, query, body))["response"], status_code=status)
+
+        if config.mode == "replay":
+            record = state.store.load(recording_key(method, path, query, body))
+            if record is not None:
+                return JSONResponse(record["response"], status_code=int(record.get("status") or 200))
+            state.replay_misses += 1
+            if config.strict:
+                return JSONResponse({"code": 5, "message": f"stub: no recording for {method} {path}"}, status_code=404)
+
+        status, payload = await run_in_threadpool(_synthetic_response, config.dataset, method, path, query, body)
+        return JSONResponse(payload, status_code=status)
+
+    return app
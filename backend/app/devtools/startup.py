@@ -0,0 +1,73 @@
+"""Import-time profile of the API process start.
+
+``python -X importtime`` reports, per imported module, the microseconds spent in the module itself and
+including its own imports. Importing ``app.main`` builds the application (``app = create_app()``), so the
+cumulative time of ``app.main`` is what a worker pays before it can serve the first request. Heavy
+libraries (pandas, numpy, requests) are imported inside the functions that use them and must stay out of
+that profile.
+"""
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+STARTUP_MODULE = "app.main"
+STARTUP_BUDGET_MS = 1500.0
+LAZY_MODULES = ("pandas", "numpy", "requests")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """Entries of ``-X importtime`` output in the order they finished; other lines are skipped."""
+    entries = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append(ImportTime(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def profile_imports(module: str = STARTUP_MODULE, *, cwd: Path = BACKEND_ROOT) -> list[ImportTime]:
+    """Import ``module`` in a fresh interpreter and return its import-time profile."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed:\n" + "\n".join(errors[-20:]))
+    return parse_importtime(result.stderr)
+
+
+def module_ms(entries: list[ImportTime], module: str) -> float:
+    """Cumulative milliseconds of ``module``; 0 when it was not imported."""
+    return next((entry.cumulative_us / 1000 for entry in entries if entry.module == module), 0.0)
+
+
+def eager_heavy_imports(entries: list[ImportTime], lazy_modules: tuple[str, ...] = LAZY_MODULES) -> list[str]:
+    """Top-level packages from ``lazy_modules`` that the profiled import pulled in."""
+    imported = {entry.module.split(".")[0] for entry in entries}
+    return [name for name in lazy_modules if name in imported]
+
+
+def slowest(entries: list[ImportTime], *, prefix: str = "", cumulative: bool = False, limit: int = 20) -> list[ImportTime]:
+    """Entries by self (or cumulative) time, slowest first; ``prefix`` keeps only matching modules (e.g. ``app.``)."""
+    matching = [entry for entry in entries if entry.module.startswith(prefix)]
+    return sorted(matching, key=lambda entry: entry.cumulative_us if cumulative else entry.self_us, reverse=True)[:limit]
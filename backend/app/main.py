@@ -1,18 +1,19 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from starlette.middleware.gzip import GZipMiddleware
 
+from app.api.metrics import router as metrics_router
 from app.api.router import build_api_router
 from app.core.config import get_settings
+from app.core.middleware import ProfilingMiddleware, RequestLabelsMiddleware, RequestTimingMiddleware, TracingMiddleware
+from app.core.timing import instrument_engine
+from app.core.tracing import instrument_engine_tracing, setup_tracing, shutdown_tracing
 from app.db.bootstrap import create_all
-from app.services.auto_bids import auto_bids_scheduler_loop
-from app.services.campaign_hourly import campaign_hourly_scheduler_loop
-from app.services.finance_telegram import finance_telegram_scheduler_loop
-from app.services.shipment_history_scheduler import shipment_history_scheduler_loop
+from app.db.session import engine
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -22,44 +23,32 @@ def create_app() -> FastAPI:
 
     @asynccontextmanager
     async def lifespan(_: FastAPI):
+        # Schedulers and heavy refreshes run in the job worker (python -m app.workers.worker).
         create_all()
-        scheduler_task = asyncio.create_task(
-            shipment_history_scheduler_loop(settings.timezone),
-            name="shipment-history-daily-scheduler",
-        )
-        finance_telegram_task = asyncio.create_task(
-            finance_telegram_scheduler_loop(settings.timezone),
-            name="finance-telegram-daily-scheduler",
-        )
-        auto_bids_task = asyncio.create_task(
-            auto_bids_scheduler_loop(settings.timezone),
-            name="auto-bids-daily-scheduler",
-        )
-        campaign_hourly_task = asyncio.create_task(
-            campaign_hourly_scheduler_loop(settings.timezone),
-            name="campaign-hourly-scheduler",
-        )
-        try:
-            yield
-        finally:
-            for task, task_name in [
-                (scheduler_task, "shipment_history scheduler"),
-                (finance_telegram_task, "finance telegram scheduler"),
-                (auto_bids_task, "auto bids scheduler"),
-                (campaign_hourly_task, "campaign hourly scheduler"),
-            ]:
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    logger.info("%s stopped", task_name)
+        from app.services.raw_archive_replay import ensure_inline_payloads_migrated
+
+        ensure_inline_payloads_migrated(engine)
+        yield
+        shutdown_tracing()
 
     app = FastAPI(
         title=settings.app_name,
         debug=settings.debug,
         lifespan=lifespan,
     )
+    instrument_engine(engine)
+    setup_tracing("ozon-ads-api")
+    instrument_engine_tracing(engine)
+    # Added first so they run inside RequestLabelsMiddleware and see the route labels.
+    app.add_middleware(ProfilingMiddleware)
+    app.add_middleware(RequestTimingMiddleware)
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(RequestLabelsMiddleware)
+    if settings.gzip_minimum_size > 0:
+        # Outermost, so timings, debug payloads and profiles see the uncompressed body.
+        app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size, compresslevel=settings.gzip_level)
     app.include_router(build_api_router(), prefix=settings.api_prefix)
+    app.include_router(metrics_router)
     return app
 
 
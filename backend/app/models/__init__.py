@@ -1,36 +1,56 @@
 from app.models.bids import BidChange, CampaignComment
 from app.models.campaign import Campaign, CampaignDailyMetric, CampaignProduct
 from app.models.campaign_hourly import CampaignHourlySnapshot
+from app.models.fbo_posting import FboOrdersHourly, FboPostingItem, FboPostingSyncState
+from app.models.job import BackgroundJob
+from app.models.lease import LeaderLease
 from app.models.main_overview_cache import MainOverviewCache
 from app.models.organization import MarketplaceCredential, Organization
+from app.models.perf_token import PerfApiToken
+from app.models.profiling_arm import ProfilingArm
+from app.models.raw_payload import RawPayload, RawPayloadDictionary
 from app.models.running_goal import RunningGoal
 from app.models.running_workout import RunningWorkout
 from app.models.stock_warehouse_preference import StockWarehousePreference
+from app.models.shipment_cell import ShipmentCell
 from app.models.shipment_event import ShipmentEvent
 from app.models.shipment_history import ShipmentHistory
 from app.models.shipment_transit import ShipmentTransit
-from app.models.storage import StorageSnapshotCache
+from app.models.storage import StorageBundleItems, StorageOrderLots, StorageRefreshRun, StorageSnapshotCache
 from app.models.trends import TrendsSnapshotCache
 from app.models.unit_economics import UnitEconomicsOverride
 from app.models.user import OrganizationMembership, User
 
 __all__ = [
+    "BackgroundJob",
     "BidChange",
     "Campaign",
     "CampaignComment",
     "CampaignDailyMetric",
     "CampaignHourlySnapshot",
     "CampaignProduct",
+    "FboOrdersHourly",
+    "FboPostingItem",
+    "FboPostingSyncState",
+    "LeaderLease",
     "MainOverviewCache",
     "MarketplaceCredential",
     "OrganizationMembership",
     "Organization",
+    "PerfApiToken",
+    "ProfilingArm",
+    "RawPayload",
+    "RawPayloadDictionary",
     "RunningGoal",
     "RunningWorkout",
     "StockWarehousePreference",
+    "ShipmentCell",
     "ShipmentEvent",
     "ShipmentHistory",
     "ShipmentTransit",
+    "StorageBundleItems",
+    "StorageOrderLots",
+    "StorageRefreshRun",
     "StorageSnapshotCache",
     "TrendsSnapshotCache",
     "UnitEconomicsOverride",
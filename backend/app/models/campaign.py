@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Date, DateTime, Float, ForeignKey, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -32,7 +32,8 @@ class CampaignProduct(Base):
     sku: Mapped[str] = mapped_column(String(128), index=True)
     title: Mapped[str] = mapped_column(String(255), default="", nullable=False)
     current_bid_micro: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    raw_payload_json: Mapped[str] = mapped_column(Text, default="{}", nullable=False)
+    # raw_payloads.id of the product as the API returned it.
+    raw_payload_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     last_synced_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     campaign: Mapped["Campaign"] = relationship(back_populates="products")
@@ -53,8 +54,8 @@ class CampaignDailyMetric(Base):
     total_revenue: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
     ordered_units: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     total_drr_pct: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
-    raw_ads_json: Mapped[str] = mapped_column(Text, default="{}", nullable=False)
-    raw_seller_json: Mapped[str] = mapped_column(Text, default="{}", nullable=False)
+    raw_ads_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    raw_seller_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     campaign: Mapped["Campaign"] = relationship(back_populates="daily_metrics")
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, Float, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Date, DateTime, Float, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -24,6 +24,8 @@ class CampaignHourlySnapshot(Base):
     views: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     clicks: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     money_spent: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
-    raw_ads_json: Mapped[str] = mapped_column(Text, default="{}", nullable=False)
+    orders: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # raw_payloads.id of the ads statistics row; cleared by the retention job after CAMPAIGN_HOURLY_RAW_DAYS.
+    raw_ads_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
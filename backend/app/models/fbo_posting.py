@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Index, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class FboPostingItem(Base):
+    __tablename__ = "fbo_posting_items"
+    __table_args__ = (
+        UniqueConstraint("company", "posting_number", "sku", name="uq_fbo_posting_item"),
+        Index("ix_fbo_posting_items_company_day", "company", "day"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    company: Mapped[str] = mapped_column(String(128), index=True)
+    posting_number: Mapped[str] = mapped_column(String(128), index=True)
+    sku: Mapped[str] = mapped_column(String(128), index=True)
+    status: Mapped[str] = mapped_column(String(64), default="", nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    day: Mapped[date] = mapped_column(Date)
+    hour: Mapped[int] = mapped_column(Integer)
+    quantity: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class FboOrdersHourly(Base):
+    __tablename__ = "fbo_orders_hourly"
+    __table_args__ = (
+        UniqueConstraint("company", "day", "hour", "sku", name="uq_fbo_orders_hourly"),
+        Index("ix_fbo_orders_hourly_lookup", "company", "day", "sku"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    company: Mapped[str] = mapped_column(String(128))
+    day: Mapped[date] = mapped_column(Date)
+    hour: Mapped[int] = mapped_column(Integer)
+    sku: Mapped[str] = mapped_column(String(128))
+    quantity: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class FboPostingSyncState(Base):
+    __tablename__ = "fbo_posting_sync_state"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    company: Mapped[str] = mapped_column(String(128), unique=True, index=True)
+    synced_from: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    synced_to: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_created_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class PerfApiToken(Base):
+    __tablename__ = "perf_api_tokens"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # sha256 of client id and secret, so the secret itself is never stored here.
+    credential_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    client_id: Mapped[str] = mapped_column(String(128), default="", nullable=False)
+    # Fernet-encrypted with a key derived from SECRET_KEY (app.core.security.encrypt_secret).
+    access_token: Mapped[str] = mapped_column(Text, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
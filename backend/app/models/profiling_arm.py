@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ProfilingArm(Base):
+    """Route armed for sampling; shared by every API process through the database."""
+
+    __tablename__ = "profiling_arms"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    path: Mapped[str] = mapped_column(String(512), nullable=False)
+    method: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    remaining: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    interval_ms: Mapped[float] = mapped_column(Float, default=5.0, nullable=False)
+    armed_by: Mapped[str] = mapped_column(String(255), default="", nullable=False)
+    armed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ShipmentCell(Base):
+    """Shipment history, events and transit for one (article, city_key), kept in step by the shipment syncs."""
+
+    __tablename__ = "shipment_cells"
+    __table_args__ = (UniqueConstraint("company_name", "seller_client_id", "article", "city_key", name="uq_shipment_cell"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    company_name: Mapped[str] = mapped_column(Text, default="", nullable=False)
+    seller_client_id: Mapped[str] = mapped_column(Text, default="", nullable=False)
+    article: Mapped[str] = mapped_column(Text, default="", nullable=False)
+    city_key: Mapped[str] = mapped_column(Text, default="", nullable=False)
+    shipments_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    history_updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    total_quantity: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    events_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_event_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    transit_quantity: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # [[quantity, event_at ISO, city], ...], newest first: the FIFO order the paid-storage split walks.
+    events_json: Mapped[str] = mapped_column(Text, default="[]", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Text
+from sqlalchemy import DateTime, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -19,3 +19,59 @@ class StorageSnapshotCache(Base):
     source_ref: Mapped[str] = mapped_column(Text, default="", nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class StorageBundleItems(Base):
+    """Items of one supply bundle as returned by ``/v1/supply-order/bundle``; bundles do not change once filled."""
+
+    __tablename__ = "storage_bundle_items"
+    __table_args__ = (
+        UniqueConstraint("seller_client_id", "bundle_id", "dropoff_warehouse_id", "storage_key", name="uq_storage_bundle_items"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    seller_client_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    bundle_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    dropoff_warehouse_id: Mapped[str] = mapped_column(String(64), default="", nullable=False)
+    # Storage warehouse id, or the macrolocal cluster id for supplies without one.
+    storage_key: Mapped[str] = mapped_column(String(64), default="", nullable=False)
+    items_json: Mapped[str] = mapped_column(Text, default="[]", nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class StorageOrderLots(Base):
+    """Lots built from one supply order, reused while the order's signature (state, supplies, dates) is unchanged."""
+
+    __tablename__ = "storage_order_lots"
+    __table_args__ = (UniqueConstraint("seller_client_id", "order_id", name="uq_storage_order_lots"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    seller_client_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    order_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    signature: Mapped[str] = mapped_column(String(64), default="", nullable=False)
+    lots_json: Mapped[str] = mapped_column(Text, default="[]", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class StorageRefreshRun(Base):
+    """One storage rebuild: current stage and progress, plus checkpoints of finished stages for a resumed attempt."""
+
+    __tablename__ = "storage_refresh_runs"
+    __table_args__ = (Index("ix_storage_refresh_runs_lookup", "company_name", "seller_client_id", "version", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    company_name: Mapped[str] = mapped_column(String(128), default="", nullable=False)
+    seller_client_id: Mapped[str] = mapped_column(String(64), default="", nullable=False)
+    version: Mapped[str] = mapped_column(String(32), default="", nullable=False)
+    status: Mapped[str] = mapped_column(String(32), default="running", nullable=False)
+    stage: Mapped[str] = mapped_column(String(32), default="", nullable=False)
+    stage_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    stage_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    # {stage: output} for finished stages; {stage: {"ms": ..., "items": ...}} for reporting.
+    checkpoint_json: Mapped[str] = mapped_column(Text, default="{}", nullable=False)
+    stages_json: Mapped[str] = mapped_column(Text, default="{}", nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
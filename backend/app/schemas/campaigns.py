@@ -44,12 +44,26 @@ class CampaignReportRowResponse(BaseModel):
     comment_all: str = ""
 
 
+class CampaignReportTimingResponse(BaseModel):
+    running_campaigns_ms: float = 0
+    token_ms: float = 0
+    seller_sales_ms: float = 0
+    ads_stats_ms: float = 0
+    products_ms: float = 0
+    sku_offer_map_ms: float = 0
+    bid_log_ms: float = 0
+    comments_ms: float = 0
+    rows_ms: float = 0
+    total_ms: float = 0
+
+
 class CampaignReportResponse(BaseModel):
     company: str
     date_from: str
     date_to: str
     target_drr_pct: float
     running_campaigns_count: int
+    timings: CampaignReportTimingResponse = Field(default_factory=CampaignReportTimingResponse)
     rows: list[CampaignReportRowResponse]
 
 
@@ -205,4 +219,6 @@ class CampaignHourlyResponse(BaseModel):
     selected_campaign_id: str
     selected_campaign_title: str
     last_sample_at: str | None = None
+    granularity: str = "hourly"
+    day_total: CampaignHourlySampleResponse | None = None
     rows: list[CampaignHourlyRowResponse]
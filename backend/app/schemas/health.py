@@ -5,3 +5,21 @@ class HealthResponse(BaseModel):
     status: str
     service: str
     environment: str
+
+
+class CacheStatsItem(BaseModel):
+    name: str
+    entries: int
+    max_entries: int
+    approx_bytes: int
+    max_bytes: int | None = None
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    expirations: int
+
+
+class CacheStatsResponse(BaseModel):
+    items: list[CacheStatsItem]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    dedup_key: str | None = None
+    payload: dict[str, Any] = Field(default_factory=dict)
+    result: Any = None
+    last_error: str | None = None
+    attempts: int
+    max_attempts: int
+    timeout_seconds: int
+    run_after: str | None = None
+    locked_by: str | None = None
+    started_at: str | None = None
+    finished_at: str | None = None
+    created_at: str | None = None
+
+
+class JobListResponse(BaseModel):
+    items: list[JobResponse]
+
+
+class JobEnqueueRequest(BaseModel):
+    kind: str
+    payload: dict[str, Any] = Field(default_factory=dict)
+    dedup_key: str | None = None
+
+
+class JobEnqueueResponse(BaseModel):
+    created: bool
+    job: JobResponse
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class PageResponse(BaseModel):
+    offset: int
+    limit: int | None = None
+    total: int
+    returned: int
+    next_cursor: str | None = None
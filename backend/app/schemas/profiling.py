@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class ProfilingArmRequest(BaseModel):
+    path: str = Field(min_length=1, description="Exact request path, e.g. /api/storage/snapshot")
+    method: str | None = None
+    count: int = Field(default=1, ge=1, le=50)
+    interval_ms: float = Field(default=5.0, ge=1, le=1000)
+
+
+class ProfilingStateResponse(BaseModel):
+    armed: bool
+    path: str | None = None
+    method: str | None = None
+    remaining: int = 0
+    interval_ms: float | None = None
+    armed_by: str | None = None
+    armed_at: str | None = None
+
+
+class ProfileItem(BaseModel):
+    name: str
+    created_at: str
+    speedscope_file: str
+    collapsed_file: str | None = None
+    size_bytes: int
+
+
+class ProfileListResponse(BaseModel):
+    items: list[ProfileItem]
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
 
+from app.schemas.pagination import PageResponse
+
 
 class StockRowResponse(BaseModel):
     sku: str
@@ -100,6 +102,7 @@ class StocksWorkspaceResponse(BaseModel):
     columns: list[str]
     columns_meta: list[StocksWorkspaceColumnResponse] = Field(default_factory=list)
     rows: list[StocksWorkspaceRowResponse]
+    page: PageResponse | None = None
 
 
 class StocksWarehousePreferencesUpdateRequest(BaseModel):
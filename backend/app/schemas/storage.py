@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from app.schemas.pagination import PageResponse
+
 
 class StorageRiskRowResponse(BaseModel):
     city: str
@@ -13,6 +15,26 @@ class StorageRiskRowResponse(BaseModel):
     estimated_daily_fee_rub: float
 
 
+class StorageFeeProjectionDayResponse(BaseModel):
+    day: int
+    date: str
+    estimated_daily_fee_rub: float
+
+
+class StorageRefreshProgressResponse(BaseModel):
+    status: str
+    active: bool = False
+    stage: str = ""
+    done: int = 0
+    total: int = 0
+    attempts: int = 1
+    stages: dict[str, dict] = {}
+    last_error: str | None = None
+    started_at: str | None = None
+    updated_at: str | None = None
+    finished_at: str | None = None
+
+
 class StorageSnapshotResponse(BaseModel):
     company: str
     seller_client_id: str
@@ -20,10 +42,14 @@ class StorageSnapshotResponse(BaseModel):
     cache_source: str = ""
     refresh_started: bool = False
     refresh_in_progress: bool = False
+    refresh_progress: StorageRefreshProgressResponse | None = None
     sku_count: int
     order_count: int
     ship_lot_count: int
     stock_articles_count: int
     lot_rows: list[dict]
     risk_rows: list[StorageRiskRowResponse]
+    fee_projection: list[StorageFeeProjectionDayResponse] = []
     unknown_stock_rows: list[dict]
+    lot_page: PageResponse | None = None
+    risk_page: PageResponse | None = None
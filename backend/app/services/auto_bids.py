@@ -1,14 +1,13 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 import os
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-import requests
-
+from app.core.request_context import request_labels
+from app.core.tracing import span
 from app.services.bid_commands import apply_bid_command
 from app.services.bid_history import load_bid_changes
 from app.services.campaign_reporting import (
@@ -246,7 +245,7 @@ def build_company_bid_decisions(*, config: CompanyAutoBidConfig, day: str) -> li
         batch_size=15,
     )
     token = perf_token(client_id=config.perf_client_id, client_secret=config.perf_client_secret)
-    products_by_campaign_id = load_products_parallel(token, running_ids, page_size=100)
+    products_by_campaign_id = load_products_parallel(token, running_ids, page_size=100, company=config.name)
     campaign_skus = sorted(
         {
             str(item.get("sku")).strip()
@@ -381,6 +380,8 @@ def build_telegram_message(*, company: str, day: str, decisions: list[BidDecisio
 
 
 def _send_telegram_message(*, token: str, chat_id: str, text: str) -> None:
+    import requests
+
     response = requests.post(
         f"https://api.telegram.org/bot{token}/sendMessage",
         json={"chat_id": chat_id, "text": text},
@@ -402,8 +403,9 @@ def run_auto_bids_for_yesterday(*, dry_run: bool = False, send_telegram: bool =
 
     for config in companies:
         try:
-            decisions = build_company_bid_decisions(config=config, day=day)
-            _apply_decisions(decisions=decisions, dry_run=dry_run)
+            with request_labels(company=config.name), span("auto_bids.company", day=str(day), dry_run=dry_run):
+                decisions = build_company_bid_decisions(config=config, day=day)
+                _apply_decisions(decisions=decisions, dry_run=dry_run)
             all_decisions.extend(decisions)
             if send_telegram:
                 if not token:
@@ -436,32 +438,3 @@ def run_auto_bids_for_yesterday(*, dry_run: bool = False, send_telegram: bool =
                     ),
                 )
     return all_decisions
-
-
-def _seconds_until_next_run(now: datetime, target_hour: int = 9) -> float:
-    target = now.replace(hour=target_hour, minute=0, second=0, microsecond=0)
-    if now >= target:
-        target += timedelta(days=1)
-    return max(1.0, (target - now).total_seconds())
-
-
-async def auto_bids_scheduler_loop(timezone_name: str) -> None:
-    enabled = os.getenv("AUTO_BIDS_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
-    if not enabled:
-        logger.info("auto bids scheduler disabled")
-        return
-    try:
-        tz = ZoneInfo(timezone_name)
-    except Exception:
-        logger.exception("invalid timezone for auto bids scheduler", extra={"timezone": timezone_name})
-        tz = ZoneInfo("Europe/Moscow")
-
-    while True:
-        now = datetime.now(tz)
-        sleep_seconds = _seconds_until_next_run(now, target_hour=int(os.getenv("AUTO_BIDS_HOUR", "8")))
-        logger.info("auto bids scheduler sleeping", extra={"next_run": (now + timedelta(seconds=sleep_seconds)).isoformat()})
-        await asyncio.sleep(sleep_seconds)
-        try:
-            await asyncio.to_thread(run_auto_bids_for_yesterday, dry_run=False, send_telegram=True)
-        except Exception:
-            logger.exception("auto bids scheduler cycle failed")
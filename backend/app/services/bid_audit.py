@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import pandas as pd
-
 from app.services.bid_log import load_bid_changes_df, load_campaign_comments_df
 
 def get_recent_bid_changes(*, company: str | None = None, limit: int = 20) -> list[dict]:
+    import pandas as pd
+
     df = load_bid_changes_df()
     if df is None or df.empty:
         return []
@@ -2,8 +2,8 @@ from __future__ import annotations
 
 from app.services.company_config import resolve_company_config
 from app.services.bid_history import append_campaign_comment, apply_bid_and_log
+from app.services.campaign_products import get_campaign_products_cached, record_campaign_product_bid
 from app.services.integrations.ozon_ads import (
-    get_campaign_products_all,
     perf_token,
     update_campaign_product_bids,
 )
@@ -23,6 +23,9 @@ def apply_bid_command(
     perf_client_secret = (config.get("perf_client_secret") or "").strip() or None
     token = perf_token(client_id=perf_client_id, client_secret=perf_client_secret)
 
+    def load_products(products_token: str, products_campaign_id: str) -> list[dict]:
+        return get_campaign_products_cached(products_token, products_campaign_id, company=company_name)
+
     result = apply_bid_and_log(
         token=token,
         campaign_id=str(campaign_id),
@@ -30,10 +33,16 @@ def apply_bid_command(
         bid_rub=float(bid_rub),
         reason=str(reason),
         comment=str(comment),
-        products_loader=get_campaign_products_all,
+        products_loader=load_products,
         bid_updater=update_campaign_product_bids,
         log_path=str(backend_data_path("bid_changes.csv")),
     )
+    record_campaign_product_bid(
+        company=company_name,
+        campaign_id=str(campaign_id),
+        sku=str(sku),
+        bid_micro=result.new_bid_micro,
+    )
 
     return {
         "company": company_name,
@@ -7,11 +7,11 @@ import os
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from zoneinfo import ZoneInfo
 
-import pandas as pd
-import requests
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 BID_LOG_COLUMNS = [
@@ -131,6 +131,8 @@ def append_campaign_comment(
 
 
 def load_campaign_comments_from_bid_log(path: str) -> pd.DataFrame:
+    import pandas as pd
+
     if _use_gist_backend():
         df = _load_gist_rows()
     else:
@@ -156,6 +158,8 @@ def load_campaign_comments_from_bid_log(path: str) -> pd.DataFrame:
 
 
 def load_bid_changes(path: str) -> pd.DataFrame:
+    import pandas as pd
+
     if _use_gist_backend():
         df = _load_gist_rows()
     elif _use_gsheet_backend():
@@ -313,6 +317,8 @@ def _append_gsheet_row(payload: dict[str, Any]) -> None:
 
 
 def _load_gsheet_rows() -> pd.DataFrame:
+    import pandas as pd
+
     worksheet = _get_gsheet_ws()
     values = worksheet.get_all_values()
     if not values or len(values) <= 1:
@@ -334,6 +340,8 @@ def _gist_headers(token: str) -> dict[str, str]:
 
 
 def _load_gist_payload() -> tuple[list[dict[str, Any]], str]:
+    import requests
+
     gist_id, token, filename = _get_gist_config()
     resp = requests.get(f"https://api.github.com/gists/{gist_id}", headers=_gist_headers(token), timeout=30)
     resp.raise_for_status()
@@ -349,6 +357,8 @@ def _load_gist_payload() -> tuple[list[dict[str, Any]], str]:
 
 
 def _save_gist_payload(rows: list[dict[str, Any]], filename: str) -> None:
+    import requests
+
     gist_id, token, _ = _get_gist_config()
     payload = {"files": {filename: {"content": json.dumps(rows, ensure_ascii=False, indent=2)}}}
     resp = requests.patch(
@@ -367,6 +377,8 @@ def _append_gist_row(payload: dict[str, Any]) -> None:
 
 
 def _load_gist_rows() -> pd.DataFrame:
+    import pandas as pd
+
     rows, _filename = _load_gist_payload()
     if not rows:
         return pd.DataFrame(columns=BID_LOG_COLUMNS)
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
 from app.services.bid_history import load_bid_changes, load_campaign_comments_from_bid_log
 from app.services.storage_paths import backend_data_path, legacy_root_path
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def _bid_changes_path() -> Path:
     return backend_data_path("bid_changes.csv")
@@ -25,6 +28,8 @@ def _legacy_campaign_comments_path() -> Path:
 
 
 def load_bid_changes_df(path: str = "bid_changes.csv") -> pd.DataFrame:
+    import pandas as pd
+
     if path != "bid_changes.csv":
         return load_bid_changes(path=str(Path(path).resolve()))
 
@@ -49,6 +54,8 @@ def load_bid_changes_df(path: str = "bid_changes.csv") -> pd.DataFrame:
 
 
 def _normalize_comments_df(df: pd.DataFrame) -> pd.DataFrame:
+    import pandas as pd
+
     if df is None or df.empty:
         return pd.DataFrame(columns=["ts", "day", "week", "company", "campaign_id", "comment"])
     out = df.copy()
@@ -89,6 +96,8 @@ def _normalize_legacy_company_name(value: str) -> str:
 
 
 def load_campaign_comments_df(path: str = "campaign_comments.csv") -> pd.DataFrame:
+    import pandas as pd
+
     if path != "campaign_comments.csv":
         shared_df = _normalize_comments_df(load_campaign_comments_from_bid_log(path=str(_bid_changes_path())))
         resolved = Path(path).resolve()
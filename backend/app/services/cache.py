@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+_SIZE_DEPTH_LIMIT = 4
+
+_registry_lock = RLock()
+_registry: dict[str, "TTLCache"] = {}
+
+
+def approx_size(value: Any, _depth: int = 0) -> int:
+    """Rough in-memory footprint of a cached value in bytes.
+
+    Containers are walked a few levels deep; DataFrames report their own deep memory usage and objects
+    exposing ``approx_bytes`` (column tables, snapshot views) report that.
+    """
+    footprint = getattr(value, "approx_bytes", None)
+    if isinstance(footprint, int):
+        return footprint
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage) and hasattr(value, "columns"):
+        try:
+            return int(memory_usage(index=True, deep=True).sum())
+        except Exception:
+            pass
+    size = sys.getsizeof(value, 0)
+    if _depth >= _SIZE_DEPTH_LIMIT:
+        return size
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += approx_size(key, _depth + 1) + approx_size(item, _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += approx_size(item, _depth + 1)
+    return size
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTL, entry and byte bounds, and usage counters."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl_seconds: float,
+        max_entries: int = 128,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] = approx_size,
+    ) -> None:
+        self.name = name
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self._sizeof = sizeof
+        self._lock = RLock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        with _registry_lock:
+            _registry[name] = self
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _is_fresh(self, stored_at: float, now: float) -> bool:
+        return now - stored_at < self.ttl_seconds
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if not self._is_fresh(entry[0], now):
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, *, stored_at: float | None = None) -> None:
+        """Store a value; ``stored_at`` backdates the entry (monotonic clock) when it was loaded elsewhere."""
+        try:
+            size = max(0, int(self._sizeof(value)))
+        except Exception:
+            size = 0
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() if stored_at is None else stored_at, value, size)
+            self._bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1
+        ):
+            key = next(iter(self._entries))
+            self._drop(key)
+            self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Fresh value without touching LRU order or counters."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._is_fresh(entry[0], now):
+                return default
+            return entry[1]
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._drop(key)
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if not self._is_fresh(entry[0], now)]
+            for key in expired:
+                self._drop(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "approx_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def cache_stats() -> list[dict[str, Any]]:
+    with _registry_lock:
+        caches = sorted(_registry.values(), key=lambda item: item.name)
+    for cache in caches:
+        cache.purge_expired()
+    return [cache.stats() for cache in caches]
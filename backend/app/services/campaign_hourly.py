@@ -1,26 +1,36 @@
 from __future__ import annotations
 
-import asyncio
-import json
 import logging
 import os
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
-import requests
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session, aliased
 
+from app.core.request_context import request_labels
 from app.db.bootstrap import create_all
 from app.db.session import SessionLocal
 from app.models.campaign_hourly import CampaignHourlySnapshot
+from app.models.raw_payload import RawPayload
+from app.services.campaign_products import get_campaign_products_cached
 from app.services.campaign_reporting import fetch_ads_stats_by_campaign_from_credentials, parse_money
 from app.services.company_config import default_company_from_env, load_runtime_company_configs, resolve_company_config
-from app.services.integrations.ozon_ads import get_campaign_products_all, get_running_campaigns, perf_token
+from app.services.fbo_postings import extract_postings, load_fbo_orders_by_hour, parse_posting_datetime
+from app.services.integrations.ozon_ads import get_running_campaigns, perf_token
 from app.services.integrations.ozon_seller import seller_posting_fbo_list
+from app.services.raw_archive import KIND_CAMPAIGN_HOURLY_ADS, delete_payloads, store_payload
 
 logger = logging.getLogger("uvicorn.error")
 
+# Days (before today) kept at full hourly granularity; older days keep only their end-of-day sample.
+CAMPAIGN_HOURLY_FULL_DAYS = int(os.getenv("CAMPAIGN_HOURLY_FULL_DAYS", "30"))
+# Days (before today) whose samples keep their archived raw stats row.
+CAMPAIGN_HOURLY_RAW_DAYS = int(os.getenv("CAMPAIGN_HOURLY_RAW_DAYS", "7"))
+# SQLite rewrites the whole file on VACUUM, so it only runs once this share of the file's pages is free.
+CAMPAIGN_HOURLY_VACUUM_FREE_RATIO = float(os.getenv("CAMPAIGN_HOURLY_VACUUM_FREE_RATIO", "0.2"))
+
 
 @dataclass(frozen=True)
 class HourlyCompanyConfig:
@@ -61,7 +71,8 @@ def _upsert_snapshot(
     views: int,
     clicks: int,
     money_spent: float,
-    raw_ads_json: dict,
+    orders: int,
+    raw_ads: dict,
 ) -> None:
     existing = (
         db.query(CampaignHourlySnapshot)
@@ -74,27 +85,21 @@ def _upsert_snapshot(
         .one_or_none()
     )
     if existing is None:
-        db.add(
-            CampaignHourlySnapshot(
-                company=company,
-                campaign_id=str(campaign_id),
-                campaign_title=campaign_title,
-                day=day,
-                sample_hour=int(sample_hour),
-                sample_at=sample_at,
-                views=int(views),
-                clicks=int(clicks),
-                money_spent=float(money_spent),
-                raw_ads_json=json.dumps(raw_ads_json, ensure_ascii=False),
-            )
+        existing = CampaignHourlySnapshot(
+            company=company,
+            campaign_id=str(campaign_id),
+            campaign_title=campaign_title,
+            day=day,
+            sample_hour=int(sample_hour),
         )
-        return
+        db.add(existing)
     existing.campaign_title = campaign_title
     existing.sample_at = sample_at
     existing.views = int(views)
     existing.clicks = int(clicks)
     existing.money_spent = float(money_spent)
-    existing.raw_ads_json = json.dumps(raw_ads_json, ensure_ascii=False)
+    existing.orders = int(orders)
+    existing.raw_ads_id = store_payload(db, KIND_CAMPAIGN_HOURLY_ADS, raw_ads, existing.raw_ads_id)
 
 
 def collect_campaign_hourly_snapshot_for_company(
@@ -105,6 +110,8 @@ def collect_campaign_hourly_snapshot_for_company(
     perf_client_secret: str,
     now: datetime | None = None,
 ) -> int:
+    import requests
+
     create_all()
     tz = ZoneInfo(os.getenv("TZ", "Europe/Moscow"))
     now_value = now or datetime.now(tz)
@@ -148,7 +155,8 @@ def collect_campaign_hourly_snapshot_for_company(
                 views=int(parse_money(row.get("views"))),
                 clicks=int(parse_money(row.get("clicks"))),
                 money_spent=float(parse_money(row.get("moneySpent"))),
-                raw_ads_json=row,
+                orders=int(parse_money(row.get("orders"))),
+                raw_ads=row,
             )
             saved_count += 1
         return saved_count
@@ -170,13 +178,14 @@ def collect_campaign_hourly_snapshots_for_all_companies(now: datetime | None = N
     for config in companies:
         db = SessionLocal()
         try:
-            total += collect_campaign_hourly_snapshot_for_company(
-                db=db,
-                company=config.name,
-                perf_client_id=config.perf_client_id,
-                perf_client_secret=config.perf_client_secret,
-                now=now,
-            )
+            with request_labels(company=config.name):
+                total += collect_campaign_hourly_snapshot_for_company(
+                    db=db,
+                    company=config.name,
+                    perf_client_id=config.perf_client_id,
+                    perf_client_secret=config.perf_client_secret,
+                    now=now,
+                )
             logger.info("campaign hourly snapshot collected", extra={"company": config.name})
         except Exception:
             db.rollback()
@@ -186,66 +195,121 @@ def collect_campaign_hourly_snapshots_for_all_companies(now: datetime | None = N
     return total
 
 
+def _sqlite_free_ratio(connection) -> float:
+    page_count = connection.execute(text("PRAGMA page_count")).scalar() or 0
+    freelist_count = connection.execute(text("PRAGMA freelist_count")).scalar() or 0
+    return freelist_count / page_count if page_count else 0.0
+
+
+def _vacuum_hourly_snapshots(db: Session) -> bool:
+    """Vacuum the table and the archive; returns whether it ran."""
+    bind = db.get_bind()
+    if bind.dialect.name == "sqlite":
+        statement = "VACUUM"
+    elif bind.dialect.name == "postgresql":
+        statement = f"VACUUM (ANALYZE) {CampaignHourlySnapshot.__tablename__}, {RawPayload.__tablename__}"
+    else:
+        return False
+    # VACUUM cannot run inside a transaction.
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if statement == "VACUUM" and _sqlite_free_ratio(connection) < CAMPAIGN_HOURLY_VACUUM_FREE_RATIO:
+            return False
+        connection.execute(text(statement))
+    return True
+
+
+def compact_campaign_hourly_snapshots(
+    db: Session,
+    *,
+    today: date,
+    full_days: int = CAMPAIGN_HOURLY_FULL_DAYS,
+    raw_days: int = CAMPAIGN_HOURLY_RAW_DAYS,
+    vacuum: bool = True,
+    batch_size: int = 1000,
+) -> dict:
+    """Apply the hourly snapshot retention and return what changed.
+
+    Days older than ``full_days`` keep only their latest sample: samples are cumulative for the day, so that row
+    holds the day's totals. Rows older than ``raw_days`` lose their archived raw stats row. The table and the
+    archive are vacuumed when anything changed (on SQLite only once enough of the file is free pages).
+    """
+    create_all()
+    full_cutoff = today - timedelta(days=max(1, int(full_days)))
+    raw_cutoff = today - timedelta(days=max(1, int(raw_days)))
+
+    later = aliased(CampaignHourlySnapshot)
+    end_of_day_hour = (
+        select(func.max(later.sample_hour))
+        .where(
+            later.company == CampaignHourlySnapshot.company,
+            later.campaign_id == CampaignHourlySnapshot.campaign_id,
+            later.day == CampaignHourlySnapshot.day,
+        )
+        .scalar_subquery()
+    )
+    superseded = db.query(CampaignHourlySnapshot).filter(
+        CampaignHourlySnapshot.day < full_cutoff, CampaignHourlySnapshot.sample_hour < end_of_day_hour
+    )
+    delete_payloads(db, [payload_id for (payload_id,) in superseded.with_entities(CampaignHourlySnapshot.raw_ads_id)])
+    deleted = superseded.delete(synchronize_session=False)
+    db.commit()
+
+    raw_dropped = 0
+    while True:
+        rows = (
+            db.query(CampaignHourlySnapshot.id, CampaignHourlySnapshot.raw_ads_id)
+            .filter(CampaignHourlySnapshot.day < raw_cutoff, CampaignHourlySnapshot.raw_ads_id.isnot(None))
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        delete_payloads(db, [payload_id for _row_id, payload_id in rows])
+        db.bulk_update_mappings(CampaignHourlySnapshot, [{"id": row_id, "raw_ads_id": None} for row_id, _payload_id in rows])
+        db.commit()
+        raw_dropped += len(rows)
+
+    vacuumed = bool(vacuum and (deleted or raw_dropped)) and _vacuum_hourly_snapshots(db)
+    return {"deleted": int(deleted or 0), "raw_dropped": raw_dropped, "vacuumed": vacuumed}
+
+
+def compact_campaign_hourly_snapshots_now(now: datetime | None = None) -> dict:
+    tz = ZoneInfo(os.getenv("TZ", "Europe/Moscow"))
+    today = (now or datetime.now(tz)).date()
+    db = SessionLocal()
+    try:
+        result = compact_campaign_hourly_snapshots(db, today=today)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    logger.info("campaign hourly retention applied", extra=result)
+    return result
+
+
 def _snapshot_payload(snapshot: CampaignHourlySnapshot | None) -> dict | None:
     if snapshot is None:
         return None
-    raw_payload = _snapshot_raw(snapshot)
     return {
         "sample_hour": snapshot.sample_hour,
         "sample_at": snapshot.sample_at.isoformat() if snapshot.sample_at else None,
         "views": snapshot.views,
         "clicks": snapshot.clicks,
         "money_spent": snapshot.money_spent,
-        "orders": int(parse_money(raw_payload.get("orders"))),
+        "orders": snapshot.orders,
     }
 
 
-def _snapshot_raw(snapshot: CampaignHourlySnapshot | None) -> dict:
-    if snapshot is None:
-        return {}
-    try:
-        raw = json.loads(snapshot.raw_ads_json or "{}")
-    except Exception:
-        return {}
-    return raw if isinstance(raw, dict) else {}
-
-
 def _ads_orders_delta(start_sample: CampaignHourlySnapshot | None, end_sample: CampaignHourlySnapshot | None) -> int:
     if start_sample is None or end_sample is None:
         return 0
-    start_raw = _snapshot_raw(start_sample)
-    end_raw = _snapshot_raw(end_sample)
-    return max(0, int(parse_money(end_raw.get("orders")) - parse_money(start_raw.get("orders"))))
-
-
-def _extract_postings(payload: dict) -> list[dict]:
-    result = payload.get("result") if isinstance(payload, dict) else None
-    if isinstance(result, list):
-        return [item for item in result if isinstance(item, dict)]
-    if isinstance(result, dict):
-        postings = result.get("postings") or result.get("items") or []
-        return [item for item in postings if isinstance(item, dict)]
-    postings = payload.get("postings") if isinstance(payload, dict) else []
-    return [item for item in postings if isinstance(item, dict)]
-
-
-def _parse_datetime(value: str, tz: ZoneInfo) -> datetime | None:
-    text = str(value or "").strip()
-    if not text:
-        return None
-    if text.endswith("Z"):
-        text = f"{text[:-1]}+00:00"
-    try:
-        parsed = datetime.fromisoformat(text)
-    except ValueError:
-        return None
-    if parsed.tzinfo is None:
-        return parsed.replace(tzinfo=tz)
-    return parsed.astimezone(tz)
+    return max(0, int(end_sample.orders - start_sample.orders))
 
 
 def _campaign_skus(
     *,
+    company: str,
     campaign_id: str,
     perf_client_id: str | None,
     perf_client_secret: str | None,
@@ -253,7 +317,7 @@ def _campaign_skus(
     if not campaign_id:
         return []
     token = perf_token(client_id=perf_client_id, client_secret=perf_client_secret)
-    products = get_campaign_products_all(token, campaign_id)
+    products = get_campaign_products_cached(token, campaign_id, company=company)
     skus = sorted({str(item.get("sku") or "").strip() for item in products if str(item.get("sku") or "").strip()})
     return skus
 
@@ -287,14 +351,14 @@ def _total_fbo_orders_by_hour(
             client_id=seller_client_id,
             api_key=seller_api_key,
         )
-        postings = _extract_postings(payload)
+        postings = extract_postings(payload)
         if not postings:
             break
         for posting in postings:
             status = str(posting.get("status") or "").lower()
             if "cancel" in status:
                 continue
-            created_at = _parse_datetime(str(posting.get("created_at") or posting.get("in_process_at") or ""), tz)
+            created_at = parse_posting_datetime(str(posting.get("created_at") or posting.get("in_process_at") or ""), tz)
             if created_at is None or created_at.date() != target_day:
                 continue
             quantity = 0
@@ -321,6 +385,8 @@ def get_campaign_hourly_report(
     day: str,
     campaign_id: str | None = None,
 ) -> dict:
+    import requests
+
     create_all()
     company_name, config = resolve_company_config(company)
     perf_client_id = (config.get("perf_client_id") or "").strip() or None
@@ -352,6 +418,7 @@ def get_campaign_hourly_report(
     title_by_id = {item["campaign_id"]: item["title"] for item in campaign_options}
 
     target_day = date.fromisoformat(str(day))
+    today = datetime.now(ZoneInfo(os.getenv("TZ", "Europe/Moscow"))).date()
     snapshots = (
         db.query(CampaignHourlySnapshot)
         .filter(
@@ -369,17 +436,27 @@ def get_campaign_hourly_report(
     total_orders_by_hour: dict[int, int] = {}
     try:
         campaign_skus = _campaign_skus(
+            company=company_name,
             campaign_id=selected_campaign_id,
             perf_client_id=perf_client_id,
             perf_client_secret=perf_client_secret,
         )
-        total_orders_by_hour = _total_fbo_orders_by_hour(
+        ingested_orders_by_hour = load_fbo_orders_by_hour(
+            db,
+            company=company_name,
             target_day=target_day,
             skus=campaign_skus,
-            seller_client_id=seller_client_id,
-            seller_api_key=seller_api_key,
-            timezone_name=os.getenv("TZ", "Europe/Moscow"),
         )
+        if ingested_orders_by_hour is not None:
+            total_orders_by_hour = ingested_orders_by_hour
+        else:
+            total_orders_by_hour = _total_fbo_orders_by_hour(
+                target_day=target_day,
+                skus=campaign_skus,
+                seller_client_id=seller_client_id,
+                seller_api_key=seller_api_key,
+                timezone_name=os.getenv("TZ", "Europe/Moscow"),
+            )
     except Exception:
         logger.exception(
             "campaign hourly total seller orders failed",
@@ -420,39 +497,7 @@ def get_campaign_hourly_report(
         "last_sample_at": max((snapshot.sample_at for snapshot in latest_by_hour.values()), default=None).isoformat()
         if latest_by_hour
         else None,
+        "granularity": "daily" if target_day < today - timedelta(days=max(1, CAMPAIGN_HOURLY_FULL_DAYS)) else "hourly",
+        "day_total": _snapshot_payload(latest_by_hour[max(latest_by_hour)]) if latest_by_hour else None,
         "rows": rows,
     }
-
-
-def _seconds_until_next_hour_sample(now: datetime, delay_minutes: int) -> float:
-    delay = timedelta(minutes=max(0, delay_minutes))
-    next_sample = now.replace(minute=0, second=0, microsecond=0) + delay
-    if next_sample <= now:
-        next_sample += timedelta(hours=1)
-    return max(1.0, (next_sample - now).total_seconds())
-
-
-async def campaign_hourly_scheduler_loop(timezone_name: str) -> None:
-    enabled = os.getenv("CAMPAIGN_HOURLY_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
-    if not enabled:
-        logger.info("campaign hourly scheduler disabled")
-        return
-    try:
-        tz = ZoneInfo(timezone_name)
-    except Exception:
-        logger.exception("invalid timezone for campaign hourly scheduler", extra={"timezone": timezone_name})
-        tz = ZoneInfo("Europe/Moscow")
-    try:
-        delay_minutes = int(os.getenv("CAMPAIGN_HOURLY_DELAY_MINUTES", "10"))
-    except ValueError:
-        delay_minutes = 10
-
-    while True:
-        now = datetime.now(tz)
-        sleep_seconds = _seconds_until_next_hour_sample(now, delay_minutes)
-        logger.info("campaign hourly scheduler sleeping", extra={"next_run": (now + timedelta(seconds=sleep_seconds)).isoformat()})
-        await asyncio.sleep(sleep_seconds)
-        try:
-            await asyncio.to_thread(collect_campaign_hourly_snapshots_for_all_companies)
-        except Exception:
-            logger.exception("campaign hourly scheduler cycle failed")
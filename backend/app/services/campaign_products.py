@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime
+from threading import RLock
+
+from sqlalchemy import or_
+
+from app.db.bootstrap import create_all
+from app.db.session import SessionLocal
+from app.models.campaign import Campaign, CampaignProduct
+from app.models.organization import Organization
+from app.services.cache import TTLCache
+from app.services.integrations.ozon_ads import get_campaign_products_all
+from app.services.raw_archive import KIND_CAMPAIGN_PRODUCT, delete_payloads, load_payloads, store_payloads
+
+logger = logging.getLogger("uvicorn.error")
+
+CACHE_TTL_SECONDS = 5 * 60
+_BID_KEYS = ("bid", "current_bid", "currentBid")
+
+_lock = RLock()
+_cache = TTLCache("campaign_products", ttl_seconds=CACHE_TTL_SECONDS, max_entries=512, max_bytes=64 * 1024 * 1024)
+
+
+def _copy_items(items: list[dict]) -> list[dict]:
+    return [dict(item) for item in items or []]
+
+
+def _to_bid_micro(value) -> int | None:
+    if value is None:
+        return None
+    try:
+        return int(float(str(value).strip().replace(" ", "").replace(",", ".")))
+    except Exception:
+        return None
+
+
+def _item_bid_micro(item: dict) -> int | None:
+    for key in _BID_KEYS:
+        if item.get(key) is not None:
+            return _to_bid_micro(item.get(key))
+    return None
+
+
+def _set_item_bid(item: dict, bid_micro: int) -> None:
+    item["bid"] = str(int(bid_micro))
+    for key in _BID_KEYS[1:]:
+        if key in item:
+            item[key] = str(int(bid_micro))
+
+
+def _find_organization(db, company: str) -> Organization | None:
+    return (
+        db.query(Organization)
+        .filter(or_(Organization.slug == company, Organization.name == company))
+        .first()
+    )
+
+
+def _find_campaign(db, organization_id: int, campaign_id: str) -> Campaign | None:
+    return (
+        db.query(Campaign)
+        .filter(Campaign.organization_id == organization_id)
+        .filter(Campaign.external_campaign_id == str(campaign_id))
+        .first()
+    )
+
+
+def _load_from_db(company: str, campaign_id: str) -> tuple[float, list[dict]] | None:
+    db = SessionLocal()
+    try:
+        create_all()
+        organization = _find_organization(db, company)
+        if organization is None:
+            return None
+        campaign = _find_campaign(db, organization.id, campaign_id)
+        if campaign is None or campaign.last_synced_at is None:
+            return None
+        age_seconds = (datetime.utcnow() - campaign.last_synced_at).total_seconds()
+        if age_seconds < 0 or age_seconds >= CACHE_TTL_SECONDS:
+            return None
+        rows = (
+            db.query(CampaignProduct)
+            .filter(CampaignProduct.campaign_id == campaign.id)
+            .order_by(CampaignProduct.id.asc())
+            .all()
+        )
+        payloads = load_payloads(db, [row.raw_payload_id for row in rows])
+        items: list[dict] = []
+        for row in rows:
+            item = payloads.get(row.raw_payload_id)
+            if not isinstance(item, dict):
+                item = {}
+            item.setdefault("sku", row.sku)
+            item.setdefault("title", row.title)
+            if row.current_bid_micro is not None:
+                _set_item_bid(item, row.current_bid_micro)
+            items.append(item)
+        return age_seconds, items
+    except Exception:
+        logger.exception("campaign products db read failed", extra={"company": company, "campaign_id": campaign_id})
+        return None
+    finally:
+        db.close()
+
+
+def _save_to_db(company: str, campaign_id: str, items: list[dict]) -> None:
+    db = SessionLocal()
+    try:
+        create_all()
+        organization = _find_organization(db, company)
+        if organization is None:
+            return
+        now = datetime.utcnow()
+        campaign = _find_campaign(db, organization.id, campaign_id)
+        if campaign is None:
+            campaign = Campaign(organization_id=organization.id, external_campaign_id=str(campaign_id))
+            db.add(campaign)
+            db.flush()
+        campaign.last_synced_at = now
+
+        existing = {
+            row.sku: row
+            for row in db.query(CampaignProduct).filter(CampaignProduct.campaign_id == campaign.id).all()
+        }
+        seen: set[str] = set()
+        stored: list[tuple[CampaignProduct, dict]] = []
+        for item in items:
+            sku = str(item.get("sku") or "").strip()
+            if not sku or sku in seen:
+                continue
+            seen.add(sku)
+            row = existing.get(sku)
+            if row is None:
+                row = CampaignProduct(campaign_id=campaign.id, sku=sku)
+                db.add(row)
+            row.title = str(item.get("title") or "")[:255]
+            row.current_bid_micro = _item_bid_micro(item)
+            row.last_synced_at = now
+            stored.append((row, item))
+        payload_ids = store_payloads(
+            db, KIND_CAMPAIGN_PRODUCT, [item for _row, item in stored], [row.raw_payload_id for row, _item in stored]
+        )
+        for (row, _item), payload_id in zip(stored, payload_ids):
+            row.raw_payload_id = payload_id
+        dropped = [row for sku, row in existing.items() if sku not in seen]
+        delete_payloads(db, [row.raw_payload_id for row in dropped])
+        for row in dropped:
+            db.delete(row)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("campaign products db write failed", extra={"company": company, "campaign_id": campaign_id})
+    finally:
+        db.close()
+
+
+def get_campaign_products_cached(
+    token: str,
+    campaign_id: str,
+    *,
+    company: str,
+    page_size: int = 100,
+    force_refresh: bool = False,
+) -> list[dict]:
+    key = (str(company), str(campaign_id))
+    now = time.monotonic()
+    if not force_refresh:
+        with _lock:
+            cached = _cache.get(key)
+            if cached is not None:
+                return _copy_items(cached)
+
+        stored = _load_from_db(key[0], key[1])
+        if stored is not None:
+            age_seconds, items = stored
+            with _lock:
+                _cache.set(key, items, stored_at=now - age_seconds)
+            return _copy_items(items)
+
+    items = get_campaign_products_all(token, key[1], page_size=page_size)
+    with _lock:
+        _cache.set(key, _copy_items(items))
+    _save_to_db(key[0], key[1], items)
+    return _copy_items(items)
+
+
+def record_campaign_product_bid(*, company: str, campaign_id: str, sku: str, bid_micro: int) -> None:
+    key = (str(company), str(campaign_id))
+    sku = str(sku).strip()
+    with _lock:
+        cached = _cache.peek(key)
+        if cached:
+            for item in cached:
+                if str(item.get("sku") or "").strip() == sku:
+                    _set_item_bid(item, bid_micro)
+
+    db = SessionLocal()
+    try:
+        create_all()
+        organization = _find_organization(db, key[0])
+        if organization is None:
+            return
+        campaign = _find_campaign(db, organization.id, key[1])
+        if campaign is None:
+            return
+        row = (
+            db.query(CampaignProduct)
+            .filter(CampaignProduct.campaign_id == campaign.id)
+            .filter(CampaignProduct.sku == sku)
+            .first()
+        )
+        if row is None:
+            return
+        # The archived payload stays as the API returned it; reads apply current_bid_micro on top.
+        row.current_bid_micro = int(bid_micro)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("campaign products bid write-through failed", extra={"company": company, "campaign_id": campaign_id})
+    finally:
+        db.close()
+
@@ -1,39 +1,28 @@
 from __future__ import annotations
 
-import time
-from threading import RLock
 from typing import Any
 
+from app.services.cache import TTLCache
+
 CACHE_TTL_SECONDS = 60 * 60
 
-_lock = RLock()
-_cache: dict[tuple[str, str, str, float], tuple[float, dict[str, Any]]] = {}
+_cache = TTLCache("campaign_report", ttl_seconds=CACHE_TTL_SECONDS, max_entries=256, max_bytes=128 * 1024 * 1024)
 
 
 def get_campaign_report_cache(key: tuple[str, str, str, float]) -> dict[str, Any] | None:
-    now = time.monotonic()
-    with _lock:
-        cached = _cache.get(key)
-        if not cached:
-            return None
-        cached_at, payload = cached
-        if now - cached_at >= CACHE_TTL_SECONDS:
-            _cache.pop(key, None)
-            return None
-        return dict(payload)
+    cached = _cache.get(key)
+    if cached is None:
+        return None
+    return dict(cached)
 
 
 def set_campaign_report_cache(key: tuple[str, str, str, float], payload: dict[str, Any]) -> None:
-    with _lock:
-        _cache[key] = (time.monotonic(), dict(payload))
+    _cache.set(key, dict(payload))
 
 
 def invalidate_campaign_report_cache(company: str | None = None) -> None:
-    with _lock:
-        if not company:
-            _cache.clear()
-            return
-        normalized = str(company)
-        for key in list(_cache.keys()):
-            if key[0] == normalized:
-                _cache.pop(key, None)
+    if not company:
+        _cache.clear()
+        return
+    normalized = str(company)
+    _cache.pop_where(lambda key: key[0] == normalized)
@@ -3,13 +3,22 @@ from __future__ import annotations
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timedelta
 import json
+import logging
 
+from app.core.request_context import submit_with_context
+from app.core.tracing import span
+from app.services.campaign_products import get_campaign_products_cached
 from app.services.integrations.ozon_ads import (
     get_campaign_products_all,
     get_campaign_stats_json,
+    iter_campaign_daily_stats_rows,
     perf_token,
 )
 
+logger = logging.getLogger("uvicorn.error")
+
+RANGE_STATS_MAX_DAYS = 62
+
 
 def parse_money(value) -> float:
     if value is None:
@@ -224,31 +233,50 @@ def campaign_display_fields(campaign_title: str, items: list[dict]):
     return "several", "several", None, skus
 
 
-def load_products_parallel(token: str, campaign_ids: list[str], page_size: int = 100) -> dict[str, list[dict]]:
+def load_products_parallel(
+    token: str,
+    campaign_ids: list[str],
+    page_size: int = 100,
+    company: str | None = None,
+) -> dict[str, list[dict]]:
     if not campaign_ids:
         return {}
 
     output: dict[str, list[dict]] = {str(campaign_id): [] for campaign_id in campaign_ids}
     max_workers = min(4, max(1, len(campaign_ids)))
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_map = {
-            executor.submit(get_campaign_products_all, token, str(campaign_id), page_size): str(campaign_id)
-            for campaign_id in campaign_ids
-        }
-        for future in as_completed(future_map):
-            campaign_id = future_map[future]
-            output[campaign_id] = future.result()
+    def load_one(campaign_id: str) -> list[dict]:
+        with span("campaign_products.load", campaign_id=campaign_id):
+            if company:
+                return get_campaign_products_cached(token, campaign_id, company=company, page_size=page_size)
+            return get_campaign_products_all(token, campaign_id, page_size)
+
+    with span("load_products_parallel", company=company, campaign_ids=campaign_ids, campaign_count=len(campaign_ids)):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_map = {
+                submit_with_context(executor, load_one, str(campaign_id)): str(campaign_id)
+                for campaign_id in campaign_ids
+            }
+            for future in as_completed(future_map):
+                campaign_id = future_map[future]
+                output[campaign_id] = future.result()
 
     return output
 
 
 def fetch_ads_stats_by_campaign(token: str, date_from: str, date_to: str, running_ids: list[str], batch_size: int):
     stats_by_campaign_id: dict[str, dict] = {}
-    for batch in chunks(running_ids, int(batch_size)):
-        stats = get_campaign_stats_json(token, date_from, date_to, batch)
-        for row in stats.get("rows", []) or []:
-            stats_by_campaign_id[str(row.get("id"))] = row
+    with span(
+        "fetch_ads_stats_by_campaign",
+        campaign_ids=running_ids,
+        campaign_count=len(running_ids),
+        date_from=date_from,
+        date_to=date_to,
+    ):
+        for batch in chunks(running_ids, int(batch_size)):
+            stats = get_campaign_stats_json(token, date_from, date_to, batch)
+            for row in stats.get("rows", []) or []:
+                stats_by_campaign_id[str(row.get("id"))] = row
     return stats_by_campaign_id
 
 
@@ -265,6 +293,118 @@ def fetch_ads_stats_by_campaign_from_credentials(
     return fetch_ads_stats_by_campaign(token, date_from, date_to, running_ids, batch_size)
 
 
+def _campaign_day_metrics(row: dict) -> dict:
+    spend = _to_num(row.get("moneySpent", 0))
+    clicks = _to_int_round(row.get("clicks", 0))
+    click_price_api = _to_num(row.get("clickPrice", 0))
+    return {
+        "money_spent": float(spend),
+        "views": _to_int_round(row.get("views", 0)),
+        "clicks": clicks,
+        "click_price": float((spend / clicks) if clicks > 0 else click_price_api),
+        "orders_money_ads": float(_to_num(row.get("ordersMoney", 0))),
+        "orders": _to_int_round(row.get("orders", 0)),
+    }
+
+
+def _stats_row_day(value) -> str:
+    text = str(value or "").strip()[:10]
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y"):
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return ""
+
+
+def _fold_daily_totals(days: list[str], by_campaign_day: dict[tuple[str, str], dict]) -> list[dict]:
+    totals_by_day = {
+        day_str: {
+            "day": day_str,
+            "views": 0,
+            "clicks": 0,
+            "money_spent": 0.0,
+            "orders_money_ads": 0.0,
+            "orders": 0,
+        }
+        for day_str in days
+    }
+    for (day_str, _campaign_id), metrics in by_campaign_day.items():
+        total = totals_by_day.get(day_str)
+        if total is None:
+            continue
+        total["views"] += metrics["views"]
+        total["clicks"] += metrics["clicks"]
+        total["money_spent"] += metrics["money_spent"]
+        total["orders_money_ads"] += metrics["orders_money_ads"]
+        total["orders"] += metrics["orders"]
+    return [totals_by_day[day_str] for day_str in days]
+
+
+def _fetch_ads_daily_by_campaign_range(
+    token: str,
+    start: date,
+    end: date,
+    running_ids: list[str],
+    batch_size: int,
+) -> dict[tuple[str, str], dict]:
+    windows: list[tuple[str, str]] = []
+    window_start = start
+    while window_start <= end:
+        window_end = min(end, window_start + timedelta(days=RANGE_STATS_MAX_DAYS - 1))
+        windows.append((window_start.isoformat(), window_end.isoformat()))
+        window_start = window_end + timedelta(days=1)
+    jobs = [(window_from, window_to, batch) for window_from, window_to in windows for batch in chunks(running_ids, int(batch_size))]
+
+    def fetch_one(window_from: str, window_to: str, batch: list[str]) -> dict[tuple[str, str], dict]:
+        output: dict[tuple[str, str], dict] = {}
+        for row in iter_campaign_daily_stats_rows(token, window_from, window_to, batch):
+            day_str = _stats_row_day(row.get("date"))
+            if not day_str:
+                continue
+            key = (day_str, str(row.get("id")))
+            metrics = _campaign_day_metrics(row)
+            previous = output.get(key)
+            if previous is not None:
+                for field in ["money_spent", "views", "clicks", "orders_money_ads", "orders"]:
+                    metrics[field] += previous[field]
+                if metrics["clicks"] > 0:
+                    metrics["click_price"] = metrics["money_spent"] / metrics["clicks"]
+            output[key] = metrics
+        return output
+
+    by_campaign_day: dict[tuple[str, str], dict] = {}
+    max_workers = min(5, max(1, len(jobs)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [submit_with_context(executor, fetch_one, *job) for job in jobs]
+        for future in as_completed(futures):
+            by_campaign_day.update(future.result())
+    return by_campaign_day
+
+
+def _fetch_ads_daily_by_campaign_per_day(
+    token: str,
+    days: list[str],
+    running_ids: list[str],
+    batch_size: int,
+) -> dict[tuple[str, str], dict]:
+    def fetch_one_day(day_str: str) -> dict[tuple[str, str], dict]:
+        day_by_campaign: dict[tuple[str, str], dict] = {}
+        for batch in chunks(running_ids, int(batch_size)):
+            stats_day = get_campaign_stats_json(token, day_str, day_str, batch)
+            for row in stats_day.get("rows", []) or []:
+                day_by_campaign[(day_str, str(row.get("id")))] = _campaign_day_metrics(row)
+        return day_by_campaign
+
+    by_campaign_day: dict[tuple[str, str], dict] = {}
+    max_workers = min(5, max(1, len(days)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [submit_with_context(executor, fetch_one_day, day_str) for day_str in days]
+        for future in as_completed(futures):
+            by_campaign_day.update(future.result())
+    return by_campaign_day
+
+
 def fetch_ads_daily_totals(
     token: str,
     date_from: str,
@@ -272,69 +412,35 @@ def fetch_ads_daily_totals(
     running_ids: list[str],
     batch_size: int,
     return_by_campaign: bool = False,
+    use_range_stats: bool = True,
 ):
+    """Daily ads totals, plus per-(day, campaign) metrics when ``return_by_campaign`` is set.
+
+    The range mode asks the daily statistics endpoint for the whole period per campaign batch;
+    the per-day mode issues one product statistics call per day and batch and is used as the
+    fallback when the range endpoint is unavailable.
+    """
+    import requests
+
     start = datetime.fromisoformat(date_from).date()
     end = datetime.fromisoformat(date_to).date()
     days = [day.isoformat() for day in daterange(start, end)]
 
-    def fetch_one_day(day_str: str):
-        day_spend = 0.0
-        day_views = 0
-        day_clicks = 0
-        day_orders_money = 0.0
-        day_orders = 0
-        day_by_campaign = {} if return_by_campaign else None
-
-        for batch in chunks(running_ids, int(batch_size)):
-            stats_day = get_campaign_stats_json(token, day_str, day_str, batch)
-            for row in stats_day.get("rows", []) or []:
-                spend = _to_num(row.get("moneySpent", 0))
-                views = _to_int_round(row.get("views", 0))
-                clicks = _to_int_round(row.get("clicks", 0))
-                orders_money = _to_num(row.get("ordersMoney", 0))
-                orders = _to_int_round(row.get("orders", 0))
-                click_price_api = _to_num(row.get("clickPrice", 0))
-                click_price = (spend / clicks) if clicks > 0 else click_price_api
-
-                day_spend += spend
-                day_views += views
-                day_clicks += clicks
-                day_orders_money += orders_money
-                day_orders += orders
-
-                if return_by_campaign and day_by_campaign is not None:
-                    campaign_id = str(row.get("id"))
-                    day_by_campaign[(day_str, campaign_id)] = {
-                        "money_spent": float(spend),
-                        "views": views,
-                        "clicks": clicks,
-                        "click_price": float(click_price),
-                        "orders_money_ads": float(orders_money),
-                        "orders": orders,
-                    }
-
-        return {
-            "day": day_str,
-            "views": day_views,
-            "clicks": day_clicks,
-            "money_spent": float(day_spend),
-            "orders_money_ads": float(day_orders_money),
-            "orders": int(day_orders),
-        }, day_by_campaign
-
-    totals_by_day: dict[str, dict] = {}
-    by_campaign_day = {} if return_by_campaign else None
-    max_workers = min(5, max(1, len(days)))
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_map = {executor.submit(fetch_one_day, day_str): day_str for day_str in days}
-        for future in as_completed(future_map):
-            day_str = future_map[future]
-            row, day_by_campaign = future.result()
-            totals_by_day[day_str] = row
-            if return_by_campaign and by_campaign_day is not None and day_by_campaign:
-                by_campaign_day.update(day_by_campaign)
-
-    totals = [totals_by_day[day_str] for day_str in days]
+    by_campaign_day: dict[tuple[str, str], dict] | None = None
+    if use_range_stats and running_ids and days:
+        try:
+            by_campaign_day = _fetch_ads_daily_by_campaign_range(token, start, end, running_ids, batch_size)
+        except requests.RequestException as exc:
+            # A streamed body can also break after the status line; both fall back to per-day requests.
+            if exc.response is not None and exc.response.status_code == 429:
+                raise
+            logger.warning("range ads statistics failed, falling back to per-day requests", exc_info=True)
+        except (ValueError, TypeError):
+            logger.warning("range ads statistics unreadable, falling back to per-day requests", exc_info=True)
+    if by_campaign_day is None:
+        by_campaign_day = _fetch_ads_daily_by_campaign_per_day(token, days, running_ids, batch_size)
+
+    totals = _fold_daily_totals(days, by_campaign_day)
     if return_by_campaign:
         return totals, by_campaign_day
     return totals
@@ -0,0 +1,141 @@
+"""Columnar in-memory tables for stock rows and storage lots.
+
+Stock rows and storage lots arrive as lists of dicts (pickled caches, JSON snapshots). Keeping them that way
+costs a dict per row plus a separate string object for every repeated city, article or grade, and each
+consumer rebuilds a DataFrame and converts it back. ``ColumnTable`` stores one NumPy array per column.
+Text columns are interned: an ``int32`` code per row plus one vocabulary array. Row dicts are built only at
+the API boundary (``records``) and only for the rows being returned.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+def _intern(values: np.ndarray) -> tuple[np.ndarray, np.ndarray] | None:
+    """Codes and vocabulary for an object column; ``None`` when a value is unhashable."""
+    import numpy as np
+
+    index: dict[tuple[type, Any], int] = {}
+    vocab: list[Any] = []
+    codes = np.empty(len(values), dtype=np.int32)
+    try:
+        for position, value in enumerate(values):
+            # Keyed by type as well, so 1, 1.0 and True keep their own entries.
+            key = (value.__class__, value)
+            code = index.get(key)
+            if code is None:
+                code = index[key] = len(vocab)
+                vocab.append(value)
+            codes[position] = code
+    except TypeError:
+        return None
+    uniques = np.empty(len(vocab), dtype=object)
+    uniques[:] = vocab
+    return codes, uniques
+
+
+def _to_python(values: np.ndarray) -> list:
+    import pandas as pd
+
+    if values.dtype.kind in "biufcO":
+        return values.tolist()
+    # datetime64 / timedelta64 come back as Timestamps and Timedeltas, as DataFrame.to_dict does.
+    return pd.Series(values).tolist()
+
+
+class ColumnTable:
+    """Equal-length named columns: NumPy arrays for numbers, flags and dates, interned codes for text."""
+
+    __slots__ = ("size", "_columns", "_vocab")
+
+    def __init__(self, size: int, columns: dict[str, np.ndarray], vocab: dict[str, np.ndarray] | None = None) -> None:
+        self.size = int(size)
+        self._columns = columns
+        self._vocab = vocab or {}
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "ColumnTable":
+        columns: dict[str, np.ndarray] = {}
+        vocab: dict[str, np.ndarray] = {}
+        for name in frame.columns:
+            values = frame[name].to_numpy()
+            if values.dtype == object:
+                interned = _intern(values)
+                if interned is not None:
+                    values, vocab[str(name)] = interned
+            columns[str(name)] = values
+        return cls(len(frame), columns, vocab)
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "ColumnTable":
+        """Column types are inferred the way ``pd.DataFrame(records)`` infers them; missing keys become NaN."""
+        import pandas as pd
+
+        return cls.from_frame(pd.DataFrame(list(records)))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._columns)
+
+    def is_numeric(self, name: str) -> bool:
+        return name not in self._vocab and self._columns[name].dtype.kind in "biuf"
+
+    def codes(self, name: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """``(codes, vocabulary)`` for an interned text column, else ``None``."""
+        if name not in self._vocab:
+            return None
+        return self._columns[name], self._vocab[name]
+
+    def values(self, name: str) -> np.ndarray:
+        """Decoded column; a missing column reads as all ``None``."""
+        import numpy as np
+
+        if name not in self._columns:
+            return np.full(self.size, None, dtype=object)
+        if name in self._vocab:
+            return self._vocab[name][self._columns[name]]
+        return self._columns[name]
+
+    def map(self, name: str, fn: Callable[[Any], Any], *, dtype: Any = object) -> np.ndarray:
+        """``fn`` applied per row, evaluated once per distinct value for interned columns."""
+        import numpy as np
+
+        if name in self._vocab:
+            mapped = np.fromiter((fn(value) for value in self._vocab[name]), dtype=dtype, count=len(self._vocab[name]))
+            return mapped[self._columns[name]]
+        return np.fromiter((fn(value) for value in self.values(name)), dtype=dtype, count=self.size)
+
+    def take(self, positions: np.ndarray) -> "ColumnTable":
+        import numpy as np
+
+        positions = np.asarray(positions, dtype=np.intp)
+        return ColumnTable(len(positions), {name: values[positions] for name, values in self._columns.items()}, self._vocab)
+
+    def records(self, positions: np.ndarray | None = None) -> list[dict]:
+        """Row dicts for ``positions`` (all rows by default), matching ``DataFrame.to_dict("records")``."""
+        table = self if positions is None else self.take(positions)
+        names = table.names
+        columns = [_to_python(table.values(name)) for name in names]
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+    @property
+    def approx_bytes(self) -> int:
+        size = sum(values.nbytes for values in self._columns.values())
+        for vocab in self._vocab.values():
+            size += vocab.nbytes + sum(sys.getsizeof(value) for value in vocab.tolist())
+        for name, values in self._columns.items():
+            if values.dtype == object and name not in self._vocab:
+                size += sum(sys.getsizeof(value) for value in values.tolist())
+        return size
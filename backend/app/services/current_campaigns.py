@@ -1,12 +1,11 @@
 from __future__ import annotations
 
 import json
-import time
 from datetime import date, timedelta
-
-import pandas as pd
+from typing import TYPE_CHECKING
 
 from app.services.bid_log import load_bid_changes_df, load_campaign_comments_df
+from app.services.cache import TTLCache
 from app.services.campaign_reporting import (
     build_campaign_daily_rows,
     campaign_display_fields,
@@ -18,11 +17,24 @@ from app.services.integrations.ozon_ads import get_running_campaigns, perf_token
 from app.services.integrations.ozon_seller import seller_analytics_sku_day
 from app.services.main_overview import _campaign_weekly_aggregate
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 TEST_META_PREFIX = "__test_meta__:"
 CURRENT_CAMPAIGN_CACHE_TTL_SECONDS = 300
 
-_seller_daily_cache: dict[tuple[str, str, str], tuple[float, tuple[dict, dict, dict]]] = {}
-_ads_daily_cache: dict[tuple[str, str, str, str], tuple[float, tuple[pd.DataFrame, dict]]] = {}
+_seller_daily_cache = TTLCache(
+    "current_campaigns.seller_daily",
+    ttl_seconds=CURRENT_CAMPAIGN_CACHE_TTL_SECONDS,
+    max_entries=64,
+    max_bytes=64 * 1024 * 1024,
+)
+_ads_daily_cache = TTLCache(
+    "current_campaigns.ads_daily",
+    ttl_seconds=CURRENT_CAMPAIGN_CACHE_TTL_SECONDS,
+    max_entries=512,
+    max_bytes=64 * 1024 * 1024,
+)
 
 
 def _num(value) -> float:
@@ -88,20 +100,16 @@ def _cached_seller_analytics_sku_day(
     seller_client_id: str | None,
     seller_api_key: str | None,
 ) -> tuple[dict, dict, dict]:
-    key = (company_name, date_from, date_to)
-    now = time.monotonic()
-    cached = _seller_daily_cache.get(key)
-    if cached and now - cached[0] < CURRENT_CAMPAIGN_CACHE_TTL_SECONDS:
-        return cached[1]
-    value = seller_analytics_sku_day(
-        date_from,
-        date_to,
-        limit=1000,
-        client_id=seller_client_id,
-        api_key=seller_api_key,
+    return _seller_daily_cache.get_or_load(
+        (company_name, date_from, date_to),
+        lambda: seller_analytics_sku_day(
+            date_from,
+            date_to,
+            limit=1000,
+            client_id=seller_client_id,
+            api_key=seller_api_key,
+        ),
     )
-    _seller_daily_cache[key] = (now, value)
-    return value
 
 
 def _cached_ads_daily_totals(
@@ -112,21 +120,17 @@ def _cached_ads_daily_totals(
     date_to: str,
     campaign_id: str,
 ) -> tuple[pd.DataFrame, dict]:
-    key = (company_name, date_from, date_to, campaign_id)
-    now = time.monotonic()
-    cached = _ads_daily_cache.get(key)
-    if cached and now - cached[0] < CURRENT_CAMPAIGN_CACHE_TTL_SECONDS:
-        return cached[1]
-    value = fetch_ads_daily_totals(
-        token,
-        date_from,
-        date_to,
-        [campaign_id],
-        10,
-        return_by_campaign=True,
+    return _ads_daily_cache.get_or_load(
+        (company_name, date_from, date_to, campaign_id),
+        lambda: fetch_ads_daily_totals(
+            token,
+            date_from,
+            date_to,
+            [campaign_id],
+            10,
+            return_by_campaign=True,
+        ),
     )
-    _ads_daily_cache[key] = (now, value)
-    return value
 
 
 def _build_bid_change_maps(bid_log_df, *, campaign_id: str, sku: str, date_from: str, date_to: str):
@@ -269,6 +273,8 @@ def get_current_campaign_detail(
     campaign_id: str | None = None,
     target_drr_pct: float = 20.0,
 ) -> dict:
+    import pandas as pd
+
     company_name, config = resolve_company_config(company)
     perf_client_id = (config.get("perf_client_id") or "").strip() or None
     perf_client_secret = (config.get("perf_client_secret") or "").strip() or None
@@ -327,7 +333,7 @@ def get_current_campaign_detail(
         }
 
     token = perf_token(client_id=perf_client_id, client_secret=perf_client_secret)
-    products_by_campaign_id = load_products_parallel(token, [selected_id], page_size=100)
+    products_by_campaign_id = load_products_parallel(token, [selected_id], page_size=100, company=company_name)
     items = products_by_campaign_id.get(selected_id, []) or []
     out_sku, _out_title, _out_bid, skus = campaign_display_fields(selected.get("title", ""), items)
     single_sku = out_sku if len(skus) == 1 else ""
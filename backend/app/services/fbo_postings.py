@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import logging
+import os
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.request_context import request_labels
+from app.db.bootstrap import create_all
+from app.db.session import SessionLocal
+from app.models.fbo_posting import FboOrdersHourly, FboPostingItem, FboPostingSyncState
+from app.services.company_config import default_company_from_env, load_runtime_company_configs
+from app.services.integrations.ozon_seller import seller_posting_fbo_list
+
+logger = logging.getLogger("uvicorn.error")
+
+BACKFILL_DAYS = 7
+RESYNC_OVERLAP = timedelta(hours=2)
+# Incremental ingests only see postings created in the last RESYNC_OVERLAP; a posting cancelled later is picked up
+# by the status recheck, which fetches postings created in the last FBO_POSTINGS_RECHECK_DAYS days again.
+STATUS_RECHECK_DAYS = int(os.getenv("FBO_POSTINGS_RECHECK_DAYS", "7"))
+PAGE_LIMIT = 1000
+_IN_CHUNK = 500
+
+
+def extract_postings(payload: dict) -> list[dict]:
+    """Posting dicts of a posting list response, whichever envelope it uses."""
+    result = payload.get("result") if isinstance(payload, dict) else None
+    if isinstance(result, list):
+        return [item for item in result if isinstance(item, dict)]
+    if isinstance(result, dict):
+        postings = result.get("postings") or result.get("items") or []
+        return [item for item in postings if isinstance(item, dict)]
+    postings = payload.get("postings") if isinstance(payload, dict) else []
+    return [item for item in postings if isinstance(item, dict)]
+
+
+def parse_posting_datetime(value: str, tz: ZoneInfo) -> datetime | None:
+    """An Ozon ISO timestamp in ``tz`` (naive values are taken as ``tz``); None when missing or invalid."""
+    text = str(value or "").strip()
+    if not text:
+        return None
+    if text.endswith("Z"):
+        text = f"{text[:-1]}+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=tz)
+    return parsed.astimezone(tz)
+
+
+def _to_utc_text(value: datetime) -> str:
+    return value.astimezone(ZoneInfo("UTC")).isoformat().replace("+00:00", "Z")
+
+
+def _quantity(value) -> int:
+    try:
+        return int(float(str(value or 0).replace(",", ".")))
+    except Exception:
+        return 0
+
+
+def _chunks(items: list, size: int):
+    for index in range(0, len(items), size):
+        yield items[index : index + size]
+
+
+def _iter_company_credentials() -> list[tuple[str, str, str]]:
+    configs = load_runtime_company_configs()
+    if configs:
+        items = sorted(configs.items())
+    else:
+        items = [("default", default_company_from_env())]
+    result: list[tuple[str, str, str]] = []
+    for company_name, config in items:
+        seller_client_id = (config.get("seller_client_id") or "").strip()
+        seller_api_key = (config.get("seller_api_key") or "").strip()
+        if not seller_client_id or not seller_api_key:
+            continue
+        result.append((company_name, seller_client_id, seller_api_key))
+    return result
+
+
+def _fetch_postings(
+    *,
+    since: datetime,
+    to: datetime,
+    seller_client_id: str,
+    seller_api_key: str,
+) -> list[dict]:
+    postings: list[dict] = []
+    offset = 0
+    while True:
+        payload = seller_posting_fbo_list(
+            since=_to_utc_text(since),
+            to=_to_utc_text(to),
+            limit=PAGE_LIMIT,
+            offset=offset,
+            client_id=seller_client_id,
+            api_key=seller_api_key,
+        )
+        page = extract_postings(payload)
+        if not page:
+            break
+        postings.extend(page)
+        if len(page) < PAGE_LIMIT:
+            break
+        offset += PAGE_LIMIT
+    return postings
+
+
+def _rebuild_hourly_rollup(db: Session, *, company: str, days: set[date]) -> None:
+    for days_chunk in _chunks(sorted(days), _IN_CHUNK):
+        (
+            db.query(FboOrdersHourly)
+            .filter(FboOrdersHourly.company == company)
+            .filter(FboOrdersHourly.day.in_(days_chunk))
+            .delete(synchronize_session=False)
+        )
+        totals = (
+            db.query(
+                FboPostingItem.day,
+                FboPostingItem.hour,
+                FboPostingItem.sku,
+                func.sum(FboPostingItem.quantity),
+            )
+            .filter(FboPostingItem.company == company)
+            .filter(FboPostingItem.day.in_(days_chunk))
+            .filter(FboPostingItem.status.notilike("%cancel%"))
+            .group_by(FboPostingItem.day, FboPostingItem.hour, FboPostingItem.sku)
+            .all()
+        )
+        db.bulk_save_objects(
+            [
+                FboOrdersHourly(company=company, day=day, hour=int(hour), sku=str(sku), quantity=int(quantity or 0))
+                for day, hour, sku, quantity in totals
+                if int(quantity or 0) > 0
+            ]
+        )
+
+
+def _local_now(now: datetime | None) -> tuple[datetime, ZoneInfo]:
+    tz = ZoneInfo(os.getenv("TZ", "Europe/Moscow"))
+    now_value = now or datetime.now(tz)
+    if now_value.tzinfo is None:
+        now_value = now_value.replace(tzinfo=tz)
+    return now_value.astimezone(tz), tz
+
+
+def _store_postings(db: Session, *, company: str, postings: list[dict], tz: ZoneInfo) -> datetime | None:
+    """Replace the stored items of ``postings`` and rebuild the rollup of every day they touch.
+
+    Returns the latest creation time among the postings.
+    """
+    items: dict[tuple[str, str], FboPostingItem] = {}
+    affected_days: set[date] = set()
+    last_created_at = None
+    for posting in postings:
+        posting_number = str(posting.get("posting_number") or "").strip()
+        created_at = parse_posting_datetime(str(posting.get("created_at") or posting.get("in_process_at") or ""), tz)
+        if not posting_number or created_at is None:
+            continue
+        created_naive = created_at.replace(tzinfo=None)
+        status = str(posting.get("status") or "").lower()
+        for product in posting.get("products") or []:
+            sku = str(product.get("sku") or "").strip()
+            if not sku:
+                continue
+            key = (posting_number, sku)
+            item = items.get(key)
+            if item is None:
+                item = FboPostingItem(
+                    company=company,
+                    posting_number=posting_number,
+                    sku=sku,
+                    status=status[:64],
+                    created_at=created_naive,
+                    day=created_naive.date(),
+                    hour=created_naive.hour,
+                    quantity=0,
+                )
+                items[key] = item
+            item.quantity += _quantity(product.get("quantity"))
+        affected_days.add(created_naive.date())
+        if last_created_at is None or created_naive > last_created_at:
+            last_created_at = created_naive
+
+    posting_numbers = sorted({posting_number for posting_number, _sku in items})
+    for numbers_chunk in _chunks(posting_numbers, _IN_CHUNK):
+        previous_days = (
+            db.query(FboPostingItem.day)
+            .filter(FboPostingItem.company == company)
+            .filter(FboPostingItem.posting_number.in_(numbers_chunk))
+            .distinct()
+            .all()
+        )
+        affected_days.update(day for (day,) in previous_days)
+        (
+            db.query(FboPostingItem)
+            .filter(FboPostingItem.company == company)
+            .filter(FboPostingItem.posting_number.in_(numbers_chunk))
+            .delete(synchronize_session=False)
+        )
+    if items:
+        db.bulk_save_objects(list(items.values()))
+    if affected_days:
+        _rebuild_hourly_rollup(db, company=company, days=affected_days)
+    return last_created_at
+
+
+def ingest_fbo_postings_for_company(
+    db: Session,
+    *,
+    company: str,
+    seller_client_id: str,
+    seller_api_key: str,
+    now: datetime | None = None,
+) -> int:
+    create_all()
+    now_local, tz = _local_now(now)
+
+    state = db.query(FboPostingSyncState).filter(FboPostingSyncState.company == company).one_or_none()
+    if state is None:
+        start_day = now_local.date() - timedelta(days=BACKFILL_DAYS)
+        since_local = datetime(start_day.year, start_day.month, start_day.day, tzinfo=tz)
+    else:
+        anchor = min(state.last_created_at or state.synced_to, state.synced_to)
+        since_local = (anchor - RESYNC_OVERLAP).replace(tzinfo=tz)
+
+    postings = _fetch_postings(
+        since=since_local,
+        to=now_local,
+        seller_client_id=seller_client_id,
+        seller_api_key=seller_api_key,
+    )
+    newest = _store_postings(db, company=company, postings=postings, tz=tz)
+    last_created_at = state.last_created_at if state is not None else None
+    if newest is not None and (last_created_at is None or newest > last_created_at):
+        last_created_at = newest
+
+    since_naive = since_local.replace(tzinfo=None)
+    now_naive = now_local.replace(tzinfo=None)
+    if state is None:
+        db.add(
+            FboPostingSyncState(
+                company=company,
+                synced_from=since_naive,
+                synced_to=now_naive,
+                last_created_at=last_created_at,
+            )
+        )
+    else:
+        state.synced_from = min(state.synced_from, since_naive)
+        state.synced_to = now_naive
+        state.last_created_at = last_created_at
+    db.commit()
+    return len(postings)
+
+
+def recheck_fbo_posting_statuses_for_company(
+    db: Session,
+    *,
+    company: str,
+    seller_client_id: str,
+    seller_api_key: str,
+    now: datetime | None = None,
+    days: int = STATUS_RECHECK_DAYS,
+) -> int:
+    """Fetch the postings created in the last ``days`` days again, so later cancellations leave the rollup.
+
+    Covers the ingested window only and leaves the incremental cursor alone. Returns the postings fetched.
+    """
+    create_all()
+    now_local, tz = _local_now(now)
+    state = db.query(FboPostingSyncState).filter(FboPostingSyncState.company == company).one_or_none()
+    if state is None or days <= 0:
+        return 0
+    since_naive = max(state.synced_from, now_local.replace(tzinfo=None) - timedelta(days=days))
+    to_naive = state.synced_to
+    if since_naive >= to_naive:
+        return 0
+    postings = _fetch_postings(
+        since=since_naive.replace(tzinfo=tz),
+        to=to_naive.replace(tzinfo=tz),
+        seller_client_id=seller_client_id,
+        seller_api_key=seller_api_key,
+    )
+    _store_postings(db, company=company, postings=postings, tz=tz)
+    db.commit()
+    return len(postings)
+
+
+def _run_for_all_companies(run, action: str, now: datetime | None) -> int:
+    companies = _iter_company_credentials()
+    if not companies:
+        logger.info("fbo postings run skipped: no seller credentials configured", extra={"action": action})
+        return 0
+    total = 0
+    for company_name, seller_client_id, seller_api_key in companies:
+        db = SessionLocal()
+        try:
+            with request_labels(company=company_name):
+                postings = run(
+                    db,
+                    company=company_name,
+                    seller_client_id=seller_client_id,
+                    seller_api_key=seller_api_key,
+                    now=now,
+                )
+            total += postings
+            logger.info("fbo postings run done", extra={"action": action, "company": company_name, "postings": postings})
+        except Exception:
+            db.rollback()
+            logger.exception("fbo postings run failed", extra={"action": action, "company": company_name})
+        finally:
+            db.close()
+    return total
+
+
+def ingest_fbo_postings_for_all_companies(now: datetime | None = None) -> int:
+    return _run_for_all_companies(ingest_fbo_postings_for_company, "ingest", now)
+
+
+def recheck_fbo_posting_statuses_for_all_companies(now: datetime | None = None) -> int:
+    return _run_for_all_companies(recheck_fbo_posting_statuses_for_company, "recheck", now)
+
+
+def load_fbo_orders_by_hour(
+    db: Session,
+    *,
+    company: str,
+    target_day: date,
+    skus: list[str],
+) -> dict[int, int] | None:
+    """Per-hour FBO ordered units for the SKUs, or None when the day is outside the ingested window."""
+    state = db.query(FboPostingSyncState).filter(FboPostingSyncState.company == company).one_or_none()
+    day_start = datetime(target_day.year, target_day.month, target_day.day)
+    if state is None or state.synced_from > day_start or state.synced_to < day_start:
+        return None
+    if not skus:
+        return {}
+    rows = (
+        db.query(FboOrdersHourly.hour, func.sum(FboOrdersHourly.quantity))
+        .filter(FboOrdersHourly.company == company)
+        .filter(FboOrdersHourly.day == target_day)
+        .filter(FboOrdersHourly.sku.in_([str(sku) for sku in skus]))
+        .group_by(FboOrdersHourly.hour)
+        .all()
+    )
+    return {int(hour): int(quantity) for hour, quantity in rows if int(quantity or 0) > 0}
@@ -1,14 +1,12 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 import os
 import re
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-import requests
-
+from app.core.request_context import request_labels
 from app.services.company_config import default_company_from_env, load_runtime_company_configs
 from app.services.finance_summary import get_finance_summary
 
@@ -118,6 +116,8 @@ def resolve_company_chat_id(company_name: str, company_index: int, company_count
 
 
 def _send_telegram_message(*, token: str, chat_id: str, text: str) -> None:
+    import requests
+
     response = requests.post(
         f"https://api.telegram.org/bot{token}/sendMessage",
         json={"chat_id": chat_id, "text": text},
@@ -155,7 +155,8 @@ def send_yesterday_finance_reports() -> None:
             logger.info("finance telegram report skipped: no chat id", extra={"company": company_name})
             continue
         try:
-            summary = get_finance_summary(company=company_name, date_from=yesterday, date_to=yesterday)
+            with request_labels(company=company_name):
+                summary = get_finance_summary(company=company_name, date_from=yesterday, date_to=yesterday)
             rows = summary.get("rows", []) or []
             if not rows:
                 logger.info("finance telegram report skipped: empty finance rows", extra={"company": company_name})
@@ -165,29 +166,3 @@ def send_yesterday_finance_reports() -> None:
             logger.info("finance telegram report sent", extra={"company": company_name, "day": yesterday})
         except Exception:
             logger.exception("finance telegram report failed", extra={"company": company_name})
-
-
-def _seconds_until_next_run(now: datetime, target_hour: int = 8) -> float:
-    target = now.replace(hour=target_hour, minute=0, second=0, microsecond=0)
-    if now >= target:
-        target += timedelta(days=1)
-    return max(1.0, (target - now).total_seconds())
-
-
-async def finance_telegram_scheduler_loop(timezone_name: str) -> None:
-    try:
-        tz = ZoneInfo(timezone_name)
-    except Exception:
-        logger.exception("invalid timezone for finance telegram scheduler", extra={"timezone": timezone_name})
-        tz = ZoneInfo("Europe/Moscow")
-
-    while True:
-        now = datetime.now(tz)
-        sleep_seconds = _seconds_until_next_run(now, target_hour=8)
-        next_run = now + timedelta(seconds=sleep_seconds)
-        logger.info("finance telegram scheduler sleeping", extra={"next_run": next_run.isoformat()})
-        await asyncio.sleep(sleep_seconds)
-        try:
-            await asyncio.to_thread(send_yesterday_finance_reports)
-        except Exception:
-            logger.exception("finance telegram scheduler cycle failed")
@@ -0,0 +1,107 @@
+"""Incremental reading of large JSON response bodies.
+
+``iter_json_array`` yields the items of one array member of a top-level JSON object while the body is still
+arriving, so a report with many rows is folded row by row instead of being decoded into one document first.
+Other members are decoded and discarded. Only the current item and the unread tail of the body are buffered.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\r\n"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                self.buffer = self.buffer[self.pos :] + self._text.decode(chunk)
+                self.pos = 0
+                return True
+        self.buffer = self.buffer[self.pos :] + self._text.decode(b"", final=True)
+        self.pos = 0
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it; ``""`` at the end of the body."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill() and self.pos >= len(self.buffer):
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Unexpected JSON input: expected {char!r}, got {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number (or literal) that ends the buffer may continue in the next chunk.
+            if end == len(self.buffer) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """Items of the array ``key`` of a top-level object, read from ``chunks`` of UTF-8 bytes.
+
+    A missing or ``null`` member yields nothing; malformed input raises ``ValueError``.
+    """
+    reader = _Reader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        name = reader.value()
+        if not isinstance(name, str):
+            raise ValueError("Unexpected JSON input: object key is not a string")
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.peek() == ",":
+                        reader.pos += 1
+                        continue
+                    reader.expect("]")
+                    break
+        else:
+            item = reader.value()
+            if name == key and item is not None:
+                raise ValueError(f"Unexpected JSON input: {key!r} is not an array")
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        return
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import re
+from urllib.parse import urlsplit
+
+from app.core.metrics import Counter, Histogram
+from app.core.request_context import current_company, current_route
+from app.core.timing import record_upstream_time
+from app.core.tracing import record_finished_span
+
+_LABELS = ("service", "endpoint", "company", "route")
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{32,36})$")
+
+UPSTREAM_REQUESTS = Counter(
+    "ozon_upstream_requests_total",
+    "Ozon API HTTP attempts by endpoint and response status.",
+    _LABELS + ("method", "status"),
+)
+UPSTREAM_LATENCY = Histogram(
+    "ozon_upstream_request_duration_seconds",
+    "Latency of single Ozon API HTTP attempts.",
+    _LABELS,
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+UPSTREAM_RETRIES = Counter(
+    "ozon_upstream_retries_total",
+    "Ozon API attempts that were retried, by reason.",
+    _LABELS + ("reason",),
+)
+UPSTREAM_BACKOFF = Counter(
+    "ozon_upstream_backoff_seconds_total",
+    "Seconds slept before retrying Ozon API calls.",
+    _LABELS,
+)
+UPSTREAM_RESPONSE_BYTES = Histogram(
+    "ozon_upstream_response_bytes",
+    "Size of Ozon API response bodies.",
+    _LABELS,
+    buckets=(1_000, 10_000, 100_000, 1_000_000, 10_000_000, 50_000_000),
+)
+
+
+def endpoint_label(url: str) -> str:
+    path = urlsplit(url).path or "/"
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+def _labels(service: str, url: str, fallback_company: str = "") -> dict[str, str]:
+    return {
+        "service": service,
+        "endpoint": endpoint_label(url),
+        "company": current_company() or fallback_company or "unknown",
+        "route": current_route() or "unknown",
+    }
+
+
+def record_upstream_call(
+    service: str,
+    method: str,
+    url: str,
+    *,
+    status: int | str,
+    seconds: float,
+    response_bytes: int | None = None,
+    fallback_company: str = "",
+) -> None:
+    labels = _labels(service, url, fallback_company)
+    UPSTREAM_REQUESTS.inc(method=method.upper(), status=str(status), **labels)
+    UPSTREAM_LATENCY.observe(seconds, **labels)
+    record_upstream_time(seconds)
+    if response_bytes is not None:
+        UPSTREAM_RESPONSE_BYTES.observe(response_bytes, **labels)
+    record_finished_span(
+        f"ozon.{service} {method.upper()} {labels['endpoint']}",
+        seconds=seconds,
+        error=not str(status).isdigit() or int(status) >= 400,
+        **{
+            "http.method": method.upper(),
+            "http.url.path": urlsplit(url).path,
+            "http.status_code": str(status),
+            "http.response_bytes": response_bytes,
+            "ozon.service": service,
+            "company": labels["company"],
+        },
+    )
+
+
+def record_upstream_retry(
+    service: str,
+    url: str,
+    *,
+    reason: str,
+    backoff_seconds: float,
+    fallback_company: str = "",
+) -> None:
+    labels = _labels(service, url, fallback_company)
+    UPSTREAM_RETRIES.inc(reason=reason, **labels)
+    UPSTREAM_BACKOFF.inc(max(0.0, backoff_seconds), **labels)
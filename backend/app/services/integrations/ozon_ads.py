@@ -1,11 +1,18 @@
+from __future__ import annotations
+
 import os
 import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterator
+
+from app.core.config import get_settings
+from app.services.integrations.json_stream import iter_json_array
+from app.services.integrations.metrics import record_upstream_call, record_upstream_retry
 
-import requests
+if TYPE_CHECKING:
+    import requests
 
-PERF_BASE = "https://api-performance.ozon.ru"
-_SESSION = requests.Session()
-_TOKEN_CACHE: dict[tuple[str, str], tuple[str, float]] = {}
+PERF_BASE = get_settings().ozon_perf_base
 _TOKEN_TTL_SECONDS = 25 * 60
 _RETRY_STATUS = {429, 500, 502, 503, 504}
 _MAX_RETRIES = 3
@@ -19,11 +26,33 @@ def must_env(name: str) -> str:
     return value
 
 
+@lru_cache(maxsize=1)
+def _session() -> requests.Session:
+    # Created on first use so that importing this module does not load requests.
+    import requests
+
+    return requests.Session()
+
+
 def _request_with_retry(method: str, url: str, **kwargs) -> requests.Response:
+    import requests
+
     last_error: Exception | None = None
     for attempt in range(_MAX_RETRIES):
+        started_at = time.perf_counter()
         try:
-            response = _SESSION.request(method, url, **kwargs)
+            response = _session().request(method, url, **kwargs)
+            record_upstream_call(
+                "performance",
+                method,
+                url,
+                status=response.status_code,
+                seconds=time.perf_counter() - started_at,
+                # A streamed body has not been read yet; its declared length is the best available size.
+                response_bytes=int(response.headers.get("Content-Length") or 0)
+                if kwargs.get("stream")
+                else len(response.content or b""),
+            )
             if response.status_code in _RETRY_STATUS and attempt < (_MAX_RETRIES - 1):
                 retry_after = response.headers.get("Retry-After")
                 if retry_after:
@@ -33,42 +62,58 @@ def _request_with_retry(method: str, url: str, **kwargs) -> requests.Response:
                         delay = _RETRY_BASE_DELAY * (2**attempt)
                 else:
                     delay = _RETRY_BASE_DELAY * (2**attempt)
-                time.sleep(max(0.2, delay))
+                delay = max(0.2, delay)
+                record_upstream_retry("performance", url, reason=str(response.status_code), backoff_seconds=delay)
+                # A streamed body was never read; closing hands the connection back to the pool before the retry.
+                response.close()
+                time.sleep(delay)
                 continue
             return response
         except requests.RequestException as exc:
+            record_upstream_call(
+                "performance",
+                method,
+                url,
+                status="error",
+                seconds=time.perf_counter() - started_at,
+            )
             last_error = exc
             if attempt >= (_MAX_RETRIES - 1):
                 raise
-            time.sleep(_RETRY_BASE_DELAY * (2**attempt))
+            delay = _RETRY_BASE_DELAY * (2**attempt)
+            record_upstream_retry("performance", url, reason="network", backoff_seconds=delay)
+            time.sleep(delay)
 
     if last_error:
         raise last_error
     raise RuntimeError("Failed to execute request")
 
 
-def perf_token(client_id: str | None = None, client_secret: str | None = None) -> str:
+def request_perf_token(client_id: str, client_secret: str) -> tuple[str, int]:
+    """Fetch a new Performance API token; returns the token and its lifetime in seconds."""
     url = f"{PERF_BASE}/api/client/token"
-    resolved_id = client_id or must_env("PERF_CLIENT_ID")
-    resolved_secret = client_secret or must_env("PERF_CLIENT_SECRET")
-    cache_key = (resolved_id, resolved_secret)
-    cached = _TOKEN_CACHE.get(cache_key)
-    if cached:
-        token, ts = cached
-        if (time.time() - ts) < _TOKEN_TTL_SECONDS:
-            return token
-
     data = {
-        "client_id": resolved_id,
-        "client_secret": resolved_secret,
+        "client_id": client_id,
+        "client_secret": client_secret,
         "grant_type": "client_credentials",
     }
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
     response = _request_with_retry("POST", url, data=data, headers=headers, timeout=30)
     response.raise_for_status()
-    token = response.json()["access_token"]
-    _TOKEN_CACHE[cache_key] = (token, time.time())
-    return token
+    payload = response.json()
+    try:
+        expires_in = int(payload.get("expires_in") or _TOKEN_TTL_SECONDS)
+    except (TypeError, ValueError):
+        expires_in = _TOKEN_TTL_SECONDS
+    return payload["access_token"], max(1, expires_in)
+
+
+def perf_token(client_id: str | None = None, client_secret: str | None = None) -> str:
+    from app.services.perf_tokens import get_perf_token
+
+    resolved_id = client_id or must_env("PERF_CLIENT_ID")
+    resolved_secret = client_secret or must_env("PERF_CLIENT_SECRET")
+    return get_perf_token(resolved_id, resolved_secret)
 
 
 def get_campaigns(token: str) -> list[dict]:
@@ -126,6 +171,20 @@ def get_campaign_stats_json(token: str, date_from: str, date_to: str, campaign_i
     return response.json()
 
 
+def iter_campaign_daily_stats_rows(token: str, date_from: str, date_to: str, campaign_ids: list[str]) -> Iterator[dict]:
+    """Rows of the daily statistics report, parsed while the body streams in."""
+    url = f"{PERF_BASE}/api/client/statistics/daily/json"
+    headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+    params = [("dateFrom", date_from), ("dateTo", date_to)]
+    params += [("campaignIds", str(campaign_id)) for campaign_id in campaign_ids]
+    response = _request_with_retry("GET", url, headers=headers, params=params, timeout=60, stream=True)
+    with response:
+        response.raise_for_status()
+        for row in iter_json_array(response.iter_content(chunk_size=64 * 1024), "rows"):
+            if isinstance(row, dict):
+                yield row
+
+
 def update_campaign_product_bids(token: str, campaign_id: str, bids: list[dict]) -> dict:
     url = f"{PERF_BASE}/api/client/campaign/{campaign_id}/products"
     headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
@@ -2,11 +2,31 @@ from __future__ import annotations
 
 import os
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterator
 
-import requests
+from app.core.config import get_settings
+from app.core.tracing import traced
+from app.services.integrations.metrics import record_upstream_call, record_upstream_retry
+from app.services.integrations.rate_limit import RateLimiter
 
-SELLER_BASE = "https://api-seller.ozon.ru"
-_SESSION = requests.Session()
+if TYPE_CHECKING:
+    import requests
+
+SELLER_BASE = get_settings().ozon_seller_base
+_rate_limiter: ContextVar[RateLimiter | None] = ContextVar("seller_rate_limiter", default=None)
+
+
+@contextmanager
+def seller_rate_limit(limiter: RateLimiter) -> Iterator[None]:
+    """Pace every seller request made in this context (and in threads submitted with its context)."""
+    token = _rate_limiter.set(limiter)
+    try:
+        yield
+    finally:
+        _rate_limiter.reset(token)
 
 
 def must_env(name: str) -> str:
@@ -16,6 +36,14 @@ def must_env(name: str) -> str:
     return value
 
 
+@lru_cache(maxsize=1)
+def _session() -> requests.Session:
+    # Created on first use so that importing this module does not load requests.
+    import requests
+
+    return requests.Session()
+
+
 def parse_money(value) -> float:
     if value is None:
         return 0.0
@@ -36,12 +64,28 @@ def _post_with_backoff(
     timeout: int = 60,
     max_retries: int = 6,
 ):
+    import requests
+
     backoff = 2.0
     last_exc = None
+    client_company = f"client:{headers.get('Client-Id')}" if headers.get("Client-Id") else ""
 
+    limiter = _rate_limiter.get()
     for _attempt in range(max_retries):
+        if limiter is not None:
+            limiter.wait()
+        started_at = time.perf_counter()
         try:
-            response = _SESSION.post(url, json=body, headers=headers, timeout=timeout)
+            response = _session().post(url, json=body, headers=headers, timeout=timeout)
+            record_upstream_call(
+                "seller",
+                "POST",
+                url,
+                status=response.status_code,
+                seconds=time.perf_counter() - started_at,
+                response_bytes=len(response.content or b""),
+                fallback_company=client_company,
+            )
 
             if response.status_code == 429:
                 retry_after = response.headers.get("Retry-After")
@@ -53,11 +97,19 @@ def _post_with_backoff(
                 else:
                     sleep_s = max(backoff, 10.0)
 
+                record_upstream_retry("seller", url, reason="429", backoff_seconds=sleep_s, fallback_company=client_company)
                 time.sleep(sleep_s)
                 backoff = min(backoff * 2, 70.0)
                 continue
 
             if 500 <= response.status_code < 600:
+                record_upstream_retry(
+                    "seller",
+                    url,
+                    reason=str(response.status_code),
+                    backoff_seconds=backoff,
+                    fallback_company=client_company,
+                )
                 time.sleep(backoff)
                 backoff = min(backoff * 2, 70.0)
                 continue
@@ -67,6 +119,15 @@ def _post_with_backoff(
         except requests.HTTPError:
             raise
         except requests.RequestException as exc:
+            record_upstream_call(
+                "seller",
+                "POST",
+                url,
+                status="error",
+                seconds=time.perf_counter() - started_at,
+                fallback_company=client_company,
+            )
+            record_upstream_retry("seller", url, reason="network", backoff_seconds=backoff, fallback_company=client_company)
             last_exc = exc
             time.sleep(backoff)
             backoff = min(backoff * 2, 70.0)
@@ -76,6 +137,7 @@ def _post_with_backoff(
     raise RuntimeError("Seller request failed without exception")
 
 
+@traced("seller_analytics_sku_day")
 def seller_analytics_sku_day(
     date_from: str,
     date_to: str,
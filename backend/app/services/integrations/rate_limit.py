@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import time
+from threading import Lock
+
+
+class RateLimiter:
+    """Spaces request starts at least ``1 / rate`` seconds apart across all threads sharing the limiter.
+
+    A ``rate`` of zero or less disables the limit.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / float(rate) if rate and rate > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self.interval
+        if start_at > now:
+            time.sleep(start_at - now)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.bootstrap import create_all
+from app.models.job import BackgroundJob
+
+logger = logging.getLogger("uvicorn.error")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+DEFAULT_TIMEOUT_SECONDS = 30 * 60
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 30 * 60
+STALE_GRACE_SECONDS = 60
+_ERROR_TEXT_LIMIT = 8000
+
+
+def job_payload(job: BackgroundJob) -> dict[str, Any]:
+    try:
+        payload = json.loads(job.payload_json or "{}")
+    except Exception:
+        payload = {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def job_to_dict(job: BackgroundJob) -> dict[str, Any]:
+    result: Any = None
+    if job.result_json:
+        try:
+            result = json.loads(job.result_json)
+        except Exception:
+            result = job.result_json
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "dedup_key": job.dedup_key,
+        "payload": job_payload(job),
+        "result": result,
+        "last_error": job.last_error,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "timeout_seconds": job.timeout_seconds,
+        "run_after": job.run_after.isoformat() if job.run_after else None,
+        "locked_by": job.locked_by,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+    }
+
+
+def _active_job_by_key(db: Session, dedup_key: str) -> BackgroundJob | None:
+    return db.query(BackgroundJob).filter(BackgroundJob.dedup_key == dedup_key).one_or_none()
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: dict[str, Any] | None = None,
+    *,
+    dedup_key: str | None = None,
+    run_after: datetime | None = None,
+    timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> tuple[BackgroundJob, bool]:
+    """Queue a job and return ``(job, created)``.
+
+    When a queued or running job already holds ``dedup_key`` that job is returned instead.
+    """
+    create_all()
+    if dedup_key:
+        existing = _active_job_by_key(db, dedup_key)
+        if existing is not None:
+            return existing, False
+    job = BackgroundJob(
+        kind=kind,
+        status=JOB_QUEUED,
+        dedup_key=dedup_key or None,
+        payload_json=json.dumps(payload or {}, ensure_ascii=False, default=str),
+        max_attempts=max(1, int(max_attempts)),
+        timeout_seconds=max(1, int(timeout_seconds)),
+        run_after=run_after or datetime.utcnow(),
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        existing = _active_job_by_key(db, dedup_key or "")
+        if existing is None:
+            raise
+        return existing, False
+    db.refresh(job)
+    logger.info("job enqueued", extra={"job_id": job.id, "kind": kind, "dedup_key": dedup_key})
+    return job, True
+
+
+def claim_next_job(db: Session, *, worker_id: str, kinds: list[str] | None = None) -> BackgroundJob | None:
+    now = datetime.utcnow()
+    query = (
+        db.query(BackgroundJob.id)
+        .filter(BackgroundJob.status == JOB_QUEUED)
+        .filter(BackgroundJob.run_after <= now)
+    )
+    if kinds:
+        query = query.filter(BackgroundJob.kind.in_(kinds))
+    candidates = query.order_by(BackgroundJob.run_after.asc(), BackgroundJob.id.asc()).limit(5).with_for_update(skip_locked=True).all()
+    for (job_id,) in candidates:
+        claimed = db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id)
+            .where(BackgroundJob.status == JOB_QUEUED)
+            .values(
+                status=JOB_RUNNING,
+                locked_by=worker_id,
+                started_at=now,
+                attempts=BackgroundJob.attempts + 1,
+                updated_at=now,
+            )
+        )
+        if claimed.rowcount == 1:
+            db.commit()
+            return db.get(BackgroundJob, job_id)
+    db.rollback()
+    return None
+
+
+def complete_job(db: Session, job_id: int, result: Any = None) -> None:
+    job = db.get(BackgroundJob, job_id)
+    if job is None:
+        return
+    job.status = JOB_SUCCEEDED
+    job.dedup_key = None
+    job.locked_by = None
+    job.finished_at = datetime.utcnow()
+    job.last_error = None
+    job.result_json = json.dumps(result, ensure_ascii=False, default=str) if result is not None else None
+    db.commit()
+
+
+def _retry_delay_seconds(attempts: int) -> float:
+    return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+
+
+def fail_job(db: Session, job_id: int, error: str) -> str:
+    """Record a failed attempt; the job is re-queued with backoff until it runs out of attempts."""
+    job = db.get(BackgroundJob, job_id)
+    if job is None:
+        return JOB_FAILED
+    now = datetime.utcnow()
+    job.last_error = str(error or "")[-_ERROR_TEXT_LIMIT:]
+    job.locked_by = None
+    if job.attempts < job.max_attempts:
+        job.status = JOB_QUEUED
+        job.run_after = now + timedelta(seconds=_retry_delay_seconds(job.attempts))
+    else:
+        job.status = JOB_FAILED
+        job.dedup_key = None
+        job.finished_at = now
+    db.commit()
+    logger.warning(
+        "job attempt failed",
+        extra={"job_id": job.id, "kind": job.kind, "attempts": job.attempts, "status": job.status},
+    )
+    return job.status
+
+
+def release_job(db: Session, job_id: int) -> None:
+    """Put a running job back in the queue without spending an attempt (worker shutdown)."""
+    job = db.get(BackgroundJob, job_id)
+    if job is None or job.status != JOB_RUNNING:
+        return
+    job.status = JOB_QUEUED
+    job.locked_by = None
+    job.attempts = max(0, job.attempts - 1)
+    job.run_after = datetime.utcnow()
+    db.commit()
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Fail attempts whose worker disappeared: running past their timeout plus a grace period."""
+    create_all()
+    now = datetime.utcnow()
+    running = db.query(BackgroundJob).filter(BackgroundJob.status == JOB_RUNNING).all()
+    stale_ids = [
+        job.id
+        for job in running
+        if job.started_at is not None
+        and job.started_at + timedelta(seconds=job.timeout_seconds + STALE_GRACE_SECONDS) < now
+    ]
+    for job_id in stale_ids:
+        fail_job(db, job_id, "worker lost while running the job")
+    return len(stale_ids)
+
+
+def last_enqueued_at(db: Session, kind: str) -> datetime | None:
+    create_all()
+    return db.query(func.max(BackgroundJob.created_at)).filter(BackgroundJob.kind == kind).scalar()
+
+
+def get_job(db: Session, job_id: int) -> BackgroundJob | None:
+    create_all()
+    return db.get(BackgroundJob, job_id)
+
+
+def list_jobs(
+    db: Session,
+    *,
+    status: str | None = None,
+    kind: str | None = None,
+    limit: int = 50,
+) -> list[BackgroundJob]:
+    create_all()
+    query = db.query(BackgroundJob)
+    if status:
+        query = query.filter(BackgroundJob.status == status)
+    if kind:
+        query = query.filter(BackgroundJob.kind == kind)
+    return query.order_by(BackgroundJob.id.desc()).limit(max(1, min(int(limit), 500))).all()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.bootstrap import create_all
+from app.models.lease import LeaderLease
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def acquire_lease(db: Session, name: str, *, holder: str, ttl_seconds: float) -> bool:
+    """Take or renew the named lease; True while ``holder`` owns it.
+
+    A lease held by someone else can only be taken over after it expires, so a dead holder is
+    replaced once its last renewal runs out.
+    """
+    create_all()
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=max(1.0, float(ttl_seconds)))
+    renewed = db.execute(
+        update(LeaderLease)
+        .where(LeaderLease.name == name)
+        .where(LeaderLease.holder == holder)
+        .values(expires_at=expires_at, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if renewed.rowcount == 1:
+        db.commit()
+        return True
+    taken_over = db.execute(
+        update(LeaderLease)
+        .where(LeaderLease.name == name)
+        .where(LeaderLease.expires_at < now)
+        .values(holder=holder, acquired_at=now, expires_at=expires_at, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if taken_over.rowcount == 1:
+        db.commit()
+        logger.info("lease taken over", extra={"lease": name, "holder": holder})
+        return True
+    db.rollback()
+    if db.query(LeaderLease.id).filter(LeaderLease.name == name).first() is not None:
+        return False
+    db.add(LeaderLease(name=name, holder=holder, acquired_at=now, expires_at=expires_at))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    logger.info("lease acquired", extra={"lease": name, "holder": holder})
+    return True
+
+
+def release_lease(db: Session, name: str, *, holder: str) -> None:
+    create_all()
+    db.query(LeaderLease).filter(LeaderLease.name == name).filter(LeaderLease.holder == holder).delete(
+        synchronize_session=False
+    )
+    db.commit()
+
+
+def current_lease_holder(db: Session, name: str) -> str | None:
+    create_all()
+    lease = db.query(LeaderLease).filter(LeaderLease.name == name).one_or_none()
+    if lease is None or lease.expires_at < datetime.utcnow():
+        return None
+    return lease.holder
@@ -3,8 +3,10 @@ from __future__ import annotations
 from datetime import datetime
 from pathlib import Path
 import pickle
+from typing import TYPE_CHECKING
 
-import pandas as pd
+from app.services.cache import TTLCache
+from app.services.columnar import ColumnTable
 from app.services.integrations.ozon_seller import (
     seller_analytics_stocks,
     seller_product_info_list,
@@ -13,6 +15,10 @@ from app.services.integrations.ozon_seller import (
 )
 from app.services.storage_paths import BACKEND_DATA_DIR, REPO_ROOT
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
 
 def chunked(values: list[str], size: int):
     for i in range(0, len(values), size):
@@ -287,6 +293,49 @@ def build_stocks_rows_cached(
     return rows, sku_count, ts
 
 
+# Columnar copies of the stocks pickle, kept while the file on disk is unchanged.
+_stock_tables = TTLCache("stocks.tables", ttl_seconds=24 * 60 * 60, max_entries=16, max_bytes=256 * 1024 * 1024, sizeof=lambda entry: entry[0].approx_bytes)
+
+
+def _cache_file_stamp(seller_client_id: str, version: str) -> tuple[str, int, int] | None:
+    files = find_stocks_cache_files(seller_client_id, version)
+    if not files:
+        return None
+    try:
+        stat = files[0].stat()
+    except OSError:
+        return None
+    return str(files[0]), stat.st_mtime_ns, stat.st_size
+
+
+def build_stock_table_cached(
+    *,
+    seller_client_id: str,
+    seller_api_key: str,
+    version: str = "v2",
+    max_age_hours: int = 24,
+) -> tuple[ColumnTable, int, datetime | None]:
+    """``build_stocks_rows_cached`` as a ``ColumnTable``; the pickle is read and converted once per change."""
+    key = (seller_client_id, version)
+    stamp = _cache_file_stamp(seller_client_id, version)
+    cached = _stock_tables.get(key)
+    if cached is not None and stamp is not None and cached[3] == stamp:
+        table, sku_count, ts, _stamp = cached
+        if ts is not None and (datetime.now() - ts).total_seconds() <= max_age_hours * 3600:
+            return table, sku_count, ts
+    rows, sku_count, ts = build_stocks_rows_cached(
+        seller_client_id=seller_client_id,
+        seller_api_key=seller_api_key,
+        version=version,
+        max_age_hours=max_age_hours,
+    )
+    table = ColumnTable.from_records(rows)
+    stamp = _cache_file_stamp(seller_client_id, version)
+    if stamp is not None:
+        _stock_tables.set(key, (table, sku_count, ts, stamp))
+    return table, sku_count, ts
+
+
 def find_storage_cache_files(seller_client_id: str, preferred_version: str) -> list[Path]:
     search_roots = [BACKEND_DATA_DIR, REPO_ROOT]
     out: list[Path] = []
@@ -318,7 +367,67 @@ def load_storage_cache_payload(seller_client_id: str, preferred_version: str) ->
     return {}, None, None
 
 
-def build_fee_risk_forecast_table(df_lots: pd.DataFrame) -> pd.DataFrame:
+FEE_FREE_DAYS = 120
+FEE_RUB_PER_LITER_DAY = 2.5
+FEE_FORECAST_DAYS = 90
+
+# Liters per item, per store; articles missing here have no known volume and no fee.
+ITEM_VOLUME_LITERS_BY_SELLER: dict[str, dict[str, float]] = {
+    "3319846": {  # Aura tea
+        "Шу пуэр лист200": 1.34,
+        "Шу пуэр лист100": 0.99,
+        "пуэр пресс": 0.56,
+        "Black_Ceylon_50": 0.56,
+        "Green_Mol_100": 0.99,
+        "AURA_TEA_41": 1.34,
+        "Black_Ceylon_100": 0.99,
+        "Black_Assam_100": 0.99,
+        "Green_Te_100": 0.99,
+        "Black_Erl_200": 1.34,
+        "Green_Te_200": 1.34,
+        "Black_Assam_200": 1.34,
+        "Black_Erl_100": 0.99,
+        "Green_Gan_100": 0.99,
+        "Green_Mol_200": 1.34,
+        "Black_Ceylon_200": 1.34,
+        "Green_Gan_200": 1.34,
+        "AURA_TEA_07": 0.56,
+        "Black_Erl_50": 0.56,
+        "Black_Assam_50": 0.56,
+        "Green_Gan_50": 0.56,
+        "Green_Mol_50": 0.56,
+        "Green_Te_50": 0.56,
+    },
+    "3813927": {  # Osome tea
+        "Nabor_Green": 1.02,
+        "Nabor_black": 1.46,
+        "Black_Ceylon_200": 1.15,
+        "Green_Te_50": 0.20,
+        "Black_Erl_200": 1.47,
+        "Green_Mol_200": 0.61,
+        "Green_Gan_500": 1.51,
+        "Black_Erl_50": 0.43,
+        "Green_Te_200": 0.61,
+        "Green_Gan_50": 0.20,
+        "Black_Ceylon_50": 0.34,
+        "Green_Mol_50": 0.20,
+        "Green_Gan_200": 0.61,
+    },
+}
+
+
+def item_volume_liters_for_store(seller_client_id: str | None) -> dict[str, float]:
+    return ITEM_VOLUME_LITERS_BY_SELLER.get(str(seller_client_id or "").strip(), {})
+
+
+def _fee_risk_lots(df_lots: pd.DataFrame) -> pd.DataFrame:
+    """Lots reaching paid storage within ``FEE_FORECAST_DAYS``, in FIFO order per (city_key, article).
+
+    Adds the per-group sales rate, the running lot total up to and before each lot, and the lot quantity that
+    is expected to still be on the shelf when its fee starts.
+    """
+    import pandas as pd
+
     need_cols = {
         "city",
         "city_key",
@@ -339,57 +448,123 @@ def build_fee_risk_forecast_table(df_lots: pd.DataFrame) -> pd.DataFrame:
     work["days_until_fee_start"] = pd.to_numeric(work["days_until_fee_start"], errors="coerce").fillna(0.0)
     work["fee_from_date_dt"] = pd.to_datetime(work["fee_from_date"], errors="coerce")
     work["arrival_date_dt"] = pd.to_datetime(work.get("arrival_date"), errors="coerce")
-    work = work[(work["qty_remaining_from_lot"] > 0) & (work["days_until_fee_start"] <= 90)].copy()
+    work = work[(work["qty_remaining_from_lot"] > 0) & (work["days_until_fee_start"] <= FEE_FORECAST_DAYS)]
+    work = work.dropna(subset=["city_key", "article"])
     if work.empty:
         return pd.DataFrame()
 
-    out_rows: list[dict] = []
-    for (_, _), grp in work.groupby(["city_key", "article"], as_index=False):
-        grp = grp.sort_values(
-            by=["arrival_date_dt", "fee_from_date_dt"],
-            ascending=[True, True],
-            na_position="last",
-        ).copy()
-        if grp.empty:
-            continue
-        sales_per_day = float(grp["sales_per_day"].replace([pd.NA], 0).fillna(0).iloc[0])
-        sales_per_day = max(0.0, sales_per_day)
-        qtys = grp["qty_remaining_from_lot"].tolist()
-        prefix: list[float] = []
-        total = 0.0
-        for qty in qtys:
-            total += float(max(0.0, qty))
-            prefix.append(total)
-        for i, row in enumerate(grp.itertuples(index=False)):
-            lot_qty = float(max(0.0, qtys[i]))
-            days = max(0.0, float(getattr(row, "days_until_fee_start", 0.0)))
-            sold_until_fee = sales_per_day * days
-            rem_up_to_i = max(0.0, prefix[i] - sold_until_fee)
-            rem_up_to_prev = max(0.0, (prefix[i - 1] if i > 0 else 0.0) - sold_until_fee)
-            qty_expected = max(0.0, min(lot_qty, rem_up_to_i - rem_up_to_prev))
-            if qty_expected <= 0:
-                continue
-            unit_volume = float(max(0.0, getattr(row, "item_volume_liters", 0.0)))
-            volume_expected = qty_expected * unit_volume
-            fee_per_day = volume_expected * 2.5
-            out_rows.append(
-                {
-                    "city": getattr(row, "city", ""),
-                    "article": getattr(row, "article", ""),
-                    "fee_from_date": getattr(row, "fee_from_date", ""),
-                    "days_until_fee_start": int(round(days)),
-                    "sales_per_day": round(sales_per_day, 3),
-                    "qty_remaining_now": int(round(lot_qty)),
-                    "qty_expected_at_fee_start": int(round(qty_expected)),
-                    "volume_expected_liters": round(volume_expected, 3),
-                    "estimated_daily_fee_rub": round(fee_per_day, 2),
-                }
-            )
-    if not out_rows:
+    # Group order, then FIFO (oldest arrival first) inside a group; both sorts are stable.
+    work = work.sort_values(
+        by=["city_key", "article", "arrival_date_dt", "fee_from_date_dt"],
+        ascending=[True, True, True, True],
+        na_position="last",
+    ).reset_index(drop=True)
+    group_keys = [work["city_key"], work["article"]]
+    lot_qty = work["qty_remaining_from_lot"].clip(lower=0.0)
+    work["lot_qty"] = lot_qty
+    work["prefix_qty"] = lot_qty.groupby(group_keys, sort=False).cumsum()
+    work["prefix_before_qty"] = work["prefix_qty"].groupby(group_keys, sort=False).shift(fill_value=0.0)
+    work["group_sales_per_day"] = work["sales_per_day"].groupby(group_keys, sort=False).transform("first").clip(lower=0.0)
+    work["days"] = work["days_until_fee_start"].clip(lower=0.0)
+    work["unit_volume"] = work["item_volume_liters"].clip(lower=0.0)
+    sold_until_fee = work["group_sales_per_day"] * work["days"]
+    work["qty_expected"] = _remaining_in_lot(work, sold_until_fee.to_numpy())
+    return work
+
+
+def _remaining_in_lot(work: pd.DataFrame, sold: np.ndarray) -> np.ndarray:
+    """Quantity left in each lot after ``sold`` units of its group were sold oldest-lot-first."""
+    import numpy as np
+
+    prefix = work["prefix_qty"].to_numpy()
+    prefix_before = work["prefix_before_qty"].to_numpy()
+    lot_qty = work["lot_qty"].to_numpy()
+    if sold.ndim == 2:
+        prefix, prefix_before, lot_qty = prefix[:, None], prefix_before[:, None], lot_qty[:, None]
+    rem_up_to_i = np.maximum(0.0, prefix - sold)
+    rem_up_to_prev = np.maximum(0.0, prefix_before - sold)
+    return np.maximum(0.0, np.minimum(lot_qty, rem_up_to_i - rem_up_to_prev))
+
+
+def _rounded(values: np.ndarray, digits: int) -> list[float]:
+    # Python's round, not np.round: the two disagree on some halves and the numbers must not move.
+    return [round(value, digits) for value in values.tolist()]
+
+
+def build_fee_risk_forecast_table(df_lots: pd.DataFrame) -> pd.DataFrame:
+    import numpy as np
+    import pandas as pd
+
+    work = _fee_risk_lots(df_lots)
+    if work.empty:
         return pd.DataFrame()
-    out = pd.DataFrame(out_rows)
+    work = work[work["qty_expected"] > 0]
+    if work.empty:
+        return pd.DataFrame()
+
+    volume_expected = work["qty_expected"].to_numpy() * work["unit_volume"].to_numpy()
+    out = pd.DataFrame(
+        {
+            "city": work["city"].to_numpy(),
+            "article": work["article"].to_numpy(),
+            "fee_from_date": work["fee_from_date"].to_numpy(),
+            "days_until_fee_start": np.rint(work["days"].to_numpy()).astype(np.int64),
+            "sales_per_day": _rounded(work["group_sales_per_day"].to_numpy(), 3),
+            "qty_remaining_now": np.rint(work["lot_qty"].to_numpy()).astype(np.int64),
+            "qty_expected_at_fee_start": np.rint(work["qty_expected"].to_numpy()).astype(np.int64),
+            "volume_expected_liters": _rounded(volume_expected, 3),
+            "estimated_daily_fee_rub": _rounded(volume_expected * FEE_RUB_PER_LITER_DAY, 2),
+        }
+    )
     return out.sort_values(
         by=["fee_from_date", "city", "article"],
         ascending=[True, True, True],
         na_position="last",
     )
+
+
+def build_fee_projection_table(df_lots: pd.DataFrame, *, horizon_days: int = FEE_FORECAST_DAYS) -> pd.DataFrame:
+    """Estimated paid-storage fee per (city, article) for each of the next ``horizon_days`` days.
+
+    Uses the forecast's model: sales drain the oldest lots first at the group's daily rate, and a lot is
+    charged for whatever is left of it from its fee start day on. Only days with a fee produce rows.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = ["city", "city_key", "article", "day", "estimated_daily_fee_rub"]
+    work = _fee_risk_lots(df_lots)
+    if work.empty or horizon_days <= 0:
+        return pd.DataFrame(columns=columns)
+    work = work[work["days"] < horizon_days].reset_index(drop=True)
+    if work.empty:
+        return pd.DataFrame(columns=columns)
+
+    group_ids = work.groupby(["city_key", "article"], sort=False).ngroup().to_numpy()
+    group_count = int(group_ids.max()) + 1
+    days = np.arange(horizon_days, dtype=float)
+    fees = np.zeros((group_count, horizon_days), dtype=float)
+    sales_per_day = work["group_sales_per_day"].to_numpy()
+    fee_start = work["days"].to_numpy()
+    rate = work["unit_volume"].to_numpy() * FEE_RUB_PER_LITER_DAY
+    # Chunked so the lots x days matrix stays small on large sellers.
+    for start in range(0, len(work), 8192):
+        chunk = slice(start, start + 8192)
+        sold = sales_per_day[chunk, None] * days[None, :]
+        remaining = _remaining_in_lot(work.iloc[chunk], sold)
+        charged = days[None, :] >= fee_start[chunk, None]
+        np.add.at(fees, group_ids[chunk], remaining * charged * rate[chunk, None])
+
+    group_rows, day_index = np.nonzero(fees > 0)
+    _ids, first_lot = np.unique(group_ids, return_index=True)
+    lot_of_row = first_lot[group_rows]
+    return pd.DataFrame(
+        {
+            "city": work["city"].to_numpy()[lot_of_row],
+            "city_key": work["city_key"].to_numpy()[lot_of_row],
+            "article": work["article"].to_numpy()[lot_of_row],
+            "day": day_index.astype(np.int64),
+            "estimated_daily_fee_rub": np.round(fees[group_rows, day_index], 2),
+        },
+        columns=columns,
+    )
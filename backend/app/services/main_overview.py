@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import json
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 
-import pandas as pd
 from sqlalchemy.orm import Session
 
 from app.services.bid_log import load_bid_changes_df, load_campaign_comments_df
@@ -15,6 +15,9 @@ from app.services.unit_economics import get_unit_economics_summary
 from app.db.bootstrap import create_all
 from app.models.main_overview_cache import MainOverviewCache
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 AVOIDABLE_BREAKDOWN_LABELS = [
     "Комиссия за выплату",
@@ -80,6 +83,8 @@ def _daily_rows_with_legacy_main_logic(
     perf_client_secret: str | None,
     target_drr_pct: float,
 ) -> pd.DataFrame:
+    import pandas as pd
+
     running_ids = [str(campaign.get("id")) for campaign in running_campaigns if campaign.get("id") is not None]
     if not running_ids:
         return pd.DataFrame()
@@ -209,6 +214,8 @@ def _daily_rows_with_legacy_main_logic(
 
 
 def _campaign_weekly_aggregate(df_daily_raw: pd.DataFrame, target_drr_pct: float) -> pd.DataFrame:
+    import pandas as pd
+
     if df_daily_raw.empty:
         return pd.DataFrame()
 
@@ -298,6 +305,8 @@ def _campaign_weekly_aggregate(df_daily_raw: pd.DataFrame, target_drr_pct: float
 
 
 def get_main_overview(*, company: str | None, date_from: str, date_to: str, target_drr_pct: float = 20.0) -> dict:
+    import pandas as pd
+
     company_name, config = resolve_company_config(company)
     perf_client_id = (config.get("perf_client_id") or "").strip() or None
     perf_client_secret = (config.get("perf_client_secret") or "").strip() or None
@@ -454,6 +463,29 @@ def get_main_overview(*, company: str | None, date_from: str, date_to: str, targ
     }
 
 
+def get_main_overview_version(
+    *,
+    company: str | None,
+    date_from: str,
+    date_to: str,
+    target_drr_pct: float = 20.0,
+    db: Session,
+) -> str | None:
+    """``updated_at`` of the cached overview for these parameters, without loading the payload."""
+    company_name, _config = resolve_company_config(company)
+    create_all()
+    updated_at = (
+        db.query(MainOverviewCache.updated_at)
+        .filter(MainOverviewCache.company_name == company_name)
+        .filter(MainOverviewCache.date_from == str(date_from))
+        .filter(MainOverviewCache.date_to == str(date_to))
+        .filter(MainOverviewCache.target_drr_pct == f"{float(target_drr_pct):.4f}")
+        .limit(1)
+        .scalar()
+    )
+    return updated_at.isoformat() if updated_at else None
+
+
 def get_main_overview_cached(
     *,
     company: str | None,
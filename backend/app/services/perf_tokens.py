@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.core.security import decrypt_secret, encrypt_secret
+from app.db.bootstrap import create_all
+from app.db.session import SessionLocal
+from app.models.perf_token import PerfApiToken
+from app.services.cache import TTLCache
+from app.services.company_config import default_company_from_env, load_runtime_company_configs
+from app.services.integrations.ozon_ads import request_perf_token
+from app.services.leases import acquire_lease, release_lease
+
+logger = logging.getLogger("uvicorn.error")
+
+# Requests treat a token with less than this left as expired and refresh it inline.
+MIN_REMAINING_SECONDS = 60
+# The worker refreshes tokens ahead of expiry once they have less than this left.
+PROACTIVE_REFRESH_SECONDS = 10 * 60
+FLIGHT_LEASE_SECONDS = 30
+FLIGHT_WAIT_SECONDS = 15
+_FLIGHT_POLL_SECONDS = 0.25
+
+_local = TTLCache("perf_tokens", ttl_seconds=60 * 60, max_entries=64)
+_flight_guard = threading.Lock()
+_flight_locks: dict[str, threading.Lock] = {}
+
+
+def _credential_hash(client_id: str, client_secret: str) -> str:
+    return hashlib.sha256(f"{client_id}\0{client_secret}".encode("utf-8")).hexdigest()
+
+
+def _flight_lock(key: str) -> threading.Lock:
+    with _flight_guard:
+        lock = _flight_locks.get(key)
+        if lock is None:
+            lock = threading.Lock()
+            _flight_locks[key] = lock
+        return lock
+
+
+def _usable(entry: tuple[str, datetime] | None, min_remaining_seconds: float) -> bool:
+    if not entry:
+        return False
+    return (entry[1] - datetime.utcnow()).total_seconds() > min_remaining_seconds
+
+
+def _load_stored(key: str) -> tuple[str, datetime] | None:
+    db = SessionLocal()
+    try:
+        create_all()
+        row = db.query(PerfApiToken).filter(PerfApiToken.credential_hash == key).one_or_none()
+        if row is None:
+            return None
+        # A row written in plaintext or under another SECRET_KEY reads as missing and is fetched again.
+        token = decrypt_secret(row.access_token)
+        return (token, row.expires_at) if token else None
+    except Exception:
+        logger.exception("perf token store read failed")
+        return None
+    finally:
+        db.close()
+
+
+def _save_stored(key: str, client_id: str, token: str, expires_at: datetime) -> None:
+    db = SessionLocal()
+    try:
+        create_all()
+        row = db.query(PerfApiToken).filter(PerfApiToken.credential_hash == key).one_or_none()
+        if row is None:
+            row = PerfApiToken(credential_hash=key, client_id=str(client_id)[:128])
+            db.add(row)
+        row.access_token = encrypt_secret(token)
+        row.expires_at = expires_at
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("perf token store write failed")
+    finally:
+        db.close()
+
+
+def _fetch(client_id: str, client_secret: str, key: str) -> str:
+    token, expires_in = request_perf_token(client_id, client_secret)
+    expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
+    _local.set(key, (token, expires_at))
+    _save_stored(key, client_id, token, expires_at)
+    logger.info("perf token refreshed", extra={"client_id": client_id, "expires_in": expires_in})
+    return token
+
+
+def _refresh_single_flight(client_id: str, client_secret: str, key: str, *, min_remaining_seconds: float) -> str:
+    """Refresh through a cross-process lease; non-holders wait for the holder's token instead."""
+    lease_name = f"perf_token:{key[:32]}"
+    holder = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    db = SessionLocal()
+    acquired = False
+    try:
+        try:
+            acquired = acquire_lease(db, lease_name, holder=holder, ttl_seconds=FLIGHT_LEASE_SECONDS)
+        except Exception:
+            db.rollback()
+            logger.exception("perf token lease failed; refreshing without it")
+            return _fetch(client_id, client_secret, key)
+        if not acquired:
+            deadline = time.monotonic() + FLIGHT_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(_FLIGHT_POLL_SECONDS)
+                stored = _load_stored(key)
+                if _usable(stored, min_remaining_seconds):
+                    _local.set(key, stored)
+                    return stored[0]
+        return _fetch(client_id, client_secret, key)
+    finally:
+        if acquired:
+            try:
+                release_lease(db, lease_name, holder=holder)
+            except Exception:
+                db.rollback()
+        db.close()
+
+
+def get_perf_token(client_id: str, client_secret: str) -> str:
+    key = _credential_hash(client_id, client_secret)
+    cached = _local.get(key)
+    if _usable(cached, MIN_REMAINING_SECONDS):
+        return cached[0]
+    with _flight_lock(key):
+        cached = _local.peek(key)
+        if _usable(cached, MIN_REMAINING_SECONDS):
+            return cached[0]
+        stored = _load_stored(key)
+        if _usable(stored, MIN_REMAINING_SECONDS):
+            _local.set(key, stored)
+            return stored[0]
+        return _refresh_single_flight(client_id, client_secret, key, min_remaining_seconds=MIN_REMAINING_SECONDS)
+
+
+def _iter_perf_credentials() -> list[tuple[str, str, str]]:
+    configs = load_runtime_company_configs()
+    items = sorted(configs.items()) if configs else [("default", default_company_from_env())]
+    result: list[tuple[str, str, str]] = []
+    for company_name, config in items:
+        client_id = (config.get("perf_client_id") or "").strip()
+        client_secret = (config.get("perf_client_secret") or "").strip()
+        if client_id and client_secret:
+            result.append((company_name, client_id, client_secret))
+    return result
+
+
+def refresh_expiring_perf_tokens() -> int:
+    """Refresh every configured company's token that is missing or close to expiry."""
+    refreshed = 0
+    for company_name, client_id, client_secret in _iter_perf_credentials():
+        key = _credential_hash(client_id, client_secret)
+        if _usable(_load_stored(key), PROACTIVE_REFRESH_SECONDS):
+            continue
+        try:
+            with _flight_lock(key):
+                _refresh_single_flight(
+                    client_id,
+                    client_secret,
+                    key,
+                    min_remaining_seconds=PROACTIVE_REFRESH_SECONDS,
+                )
+            refreshed += 1
+        except Exception:
+            logger.exception("perf token proactive refresh failed", extra={"company": company_name})
+    return refreshed
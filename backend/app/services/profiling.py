@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.profiler import Profile
+from app.db.bootstrap import create_all
+from app.models.profiling_arm import ProfilingArm
+from app.services.storage_paths import backend_data_path
+
+logger = logging.getLogger("uvicorn.error")
+
+PROFILES_DIRNAME = "profiles"
+DEFAULT_INTERVAL_MS = 5.0
+MAX_ARMED_REQUESTS = 50
+SPEEDSCOPE_SUFFIX = ".speedscope.json"
+COLLAPSED_SUFFIX = ".collapsed.txt"
+_PROFILE_FILE = re.compile(r"^[A-Za-z0-9_.-]+\.(speedscope\.json|collapsed\.txt)$")
+
+# Requests read this per-process copy of the armed route instead of the database; it is refreshed when a
+# request could be a candidate and the copy is older than ARM_CACHE_SECONDS.
+ARM_CACHE_SECONDS = float(os.getenv("PROFILE_ARM_CACHE_SECONDS", "2"))
+_armed_route: tuple[float, str | None, str | None] = (float("-inf"), None, None)
+
+
+def _keep_profiles() -> int:
+    try:
+        return max(1, int(os.getenv("PROFILE_KEEP", "50")))
+    except ValueError:
+        return 50
+
+
+def profiles_dir() -> Path:
+    path = backend_data_path(PROFILES_DIRNAME)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _remember_arm(arm: ProfilingArm | None) -> None:
+    global _armed_route
+    if arm is None or arm.remaining <= 0:
+        _armed_route = (time.monotonic(), None, None)
+    else:
+        _armed_route = (time.monotonic(), arm.path, arm.method)
+
+
+def _arm_state(arm: ProfilingArm) -> dict[str, Any]:
+    return {
+        "path": arm.path,
+        "method": arm.method,
+        "remaining": arm.remaining,
+        "interval_ms": arm.interval_ms,
+        "armed_by": arm.armed_by,
+        "armed_at": arm.armed_at.isoformat(),
+    }
+
+
+def _current_arm(db: Session) -> ProfilingArm | None:
+    return (
+        db.query(ProfilingArm)
+        .filter(ProfilingArm.remaining > 0)
+        .order_by(ProfilingArm.id.desc())
+        .first()
+    )
+
+
+def arm_profiling(
+    db: Session,
+    path: str,
+    *,
+    count: int,
+    method: str | None = None,
+    interval_ms: float = DEFAULT_INTERVAL_MS,
+    armed_by: str = "",
+) -> dict[str, Any]:
+    """Profile the next ``count`` requests to ``path`` (exact match), whichever API process serves them."""
+    create_all()
+    db.query(ProfilingArm).delete(synchronize_session=False)
+    arm = ProfilingArm(
+        path=path,
+        method=(method or "").upper() or None,
+        remaining=max(1, min(int(count), MAX_ARMED_REQUESTS)),
+        interval_ms=max(1.0, float(interval_ms)),
+        armed_by=armed_by,
+        armed_at=datetime.utcnow(),
+    )
+    db.add(arm)
+    db.commit()
+    db.refresh(arm)
+    _remember_arm(arm)
+    return _arm_state(arm)
+
+
+def disarm_profiling(db: Session) -> None:
+    create_all()
+    db.query(ProfilingArm).delete(synchronize_session=False)
+    db.commit()
+    _remember_arm(None)
+
+
+def profiling_state(db: Session) -> dict[str, Any] | None:
+    create_all()
+    arm = _current_arm(db)
+    return _arm_state(arm) if arm is not None else None
+
+
+def may_be_armed(method: str, path: str) -> bool:
+    """Cheap per-request check: False when this process knows the request is not armed."""
+    checked_at, armed_path, armed_method = _armed_route
+    if time.monotonic() - checked_at > ARM_CACHE_SECONDS:
+        return True
+    return armed_path == path and armed_method in (None, method.upper())
+
+
+def claim_armed_request(db: Session, method: str, path: str) -> float | None:
+    """Return the sampling interval if this request should be profiled, spending one armed request.
+
+    The decrement is conditional on the count still being positive, so API processes racing for the last
+    armed request cannot both win it.
+    """
+    create_all()
+    arm = _current_arm(db)
+    _remember_arm(arm)
+    if arm is None or arm.path != path or arm.method not in (None, method.upper()):
+        return None
+    remaining, interval_ms = arm.remaining, float(arm.interval_ms)
+    claimed = db.execute(
+        update(ProfilingArm)
+        .where(ProfilingArm.id == arm.id)
+        .where(ProfilingArm.remaining > 0)
+        .values(remaining=ProfilingArm.remaining - 1)
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount != 1:
+        db.rollback()
+        return None
+    db.commit()
+    if remaining <= 1:
+        _remember_arm(None)
+    return interval_ms
+
+
+def new_profile_name(method: str, path: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", f"{method} {path}").strip("-").lower()[:60]
+    return f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{slug}-{uuid.uuid4().hex[:6]}"
+
+
+def _prune_profiles(directory: Path) -> None:
+    speedscope_files = sorted(directory.glob(f"*{SPEEDSCOPE_SUFFIX}"), key=lambda item: item.stat().st_mtime, reverse=True)
+    for stale in speedscope_files[_keep_profiles():]:
+        base = stale.name[: -len(SPEEDSCOPE_SUFFIX)]
+        for path in (stale, directory / f"{base}{COLLAPSED_SUFFIX}"):
+            path.unlink(missing_ok=True)
+
+
+def save_profile(profile: Profile) -> None:
+    directory = profiles_dir()
+    (directory / f"{profile.name}{SPEEDSCOPE_SUFFIX}").write_text(
+        json.dumps(profile.to_speedscope(), ensure_ascii=False),
+        encoding="utf-8",
+    )
+    (directory / f"{profile.name}{COLLAPSED_SUFFIX}").write_text(profile.to_collapsed(), encoding="utf-8")
+    _prune_profiles(directory)
+    logger.info(
+        "request profile saved",
+        extra={"profile": profile.name, "samples": profile.sample_count, "duration_ms": profile.duration_ms},
+    )
+
+
+def list_profiles() -> list[dict[str, Any]]:
+    directory = profiles_dir()
+    items: list[dict[str, Any]] = []
+    for path in sorted(directory.glob(f"*{SPEEDSCOPE_SUFFIX}"), key=lambda item: item.stat().st_mtime, reverse=True):
+        name = path.name[: -len(SPEEDSCOPE_SUFFIX)]
+        collapsed = directory / f"{name}{COLLAPSED_SUFFIX}"
+        items.append(
+            {
+                "name": name,
+                "created_at": datetime.utcfromtimestamp(path.stat().st_mtime).isoformat(),
+                "speedscope_file": path.name,
+                "collapsed_file": collapsed.name if collapsed.exists() else None,
+                "size_bytes": path.stat().st_size,
+            }
+        )
+    return items
+
+
+def profile_file(filename: str) -> Path | None:
+    if not _PROFILE_FILE.match(filename or ""):
+        return None
+    path = profiles_dir() / filename
+    return path if path.is_file() else None
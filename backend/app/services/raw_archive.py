@@ -0,0 +1,279 @@
+"""Compressed archive of raw upstream payloads.
+
+Hot tables keep typed columns and a ``raw_payloads.id``; the payload itself is stored here as compressed JSON.
+With ``zstandard`` installed payloads are zstd-compressed against a dictionary trained per kind by the worker job
+``raw_archive.train_dictionaries`` (never while storing). Without it they are zlib-compressed against a preset
+dictionary built from recent payloads of the kind. Every row records its codec and dictionary, so
+rows written either way stay readable as long as their codec is available.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import zlib
+from threading import Lock
+from typing import Any, Iterable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.raw_payload import RawPayload, RawPayloadDictionary
+
+try:
+    import zstandard
+except ImportError:  # zlib with a preset dictionary is the fallback; small payloads compress worse with it
+    zstandard = None
+
+logger = logging.getLogger("uvicorn.error")
+
+CODEC = "zstd" if zstandard is not None else "zlib"
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 9
+# train_missing_dictionaries gives a kind its first dictionary once it has this many payloads;
+# training reads the newest DICTIONARY_SAMPLES.
+DICTIONARY_MIN_SAMPLES = 200
+DICTIONARY_SAMPLES = 2000
+# zlib only looks back 32 KiB, so a larger preset dictionary would not be used.
+DICTIONARY_SIZE = 16 * 1024
+
+KIND_CAMPAIGN_PRODUCT = "campaign_products.item"
+KIND_CAMPAIGN_DAILY_ADS = "campaign_daily.ads"
+KIND_CAMPAIGN_DAILY_SELLER = "campaign_daily.seller"
+KIND_CAMPAIGN_HOURLY_ADS = "campaign_hourly.ads"
+
+_lock = Lock()
+# Dictionaries never change once written: id -> bytes, and the newest one per (kind, codec).
+_dictionaries: dict[int, bytes] = {}
+_current: dict[tuple[str, str], int] = {}
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _compress(raw: bytes, codec: str, dictionary: bytes | None) -> bytes:
+    if codec == "zstd":
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(raw)
+    compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary) if dictionary else zlib.compressobj(ZLIB_LEVEL)
+    return compressor.compress(raw) + compressor.flush()
+
+
+def _decompress(data: bytes, codec: str, dictionary: bytes | None) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("raw payload is zstd-compressed but the zstandard package is not installed")
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+    if codec == "zlib":
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+    raise ValueError(f"Unknown raw payload codec: {codec}")
+
+
+def _dictionary_data(db: Session, dictionary_id: int | None) -> bytes | None:
+    if dictionary_id is None:
+        return None
+    with _lock:
+        data = _dictionaries.get(dictionary_id)
+    if data is None:
+        data = db.query(RawPayloadDictionary.data).filter(RawPayloadDictionary.id == dictionary_id).scalar()
+        if data is None:
+            raise ValueError(f"Unknown raw payload dictionary: {dictionary_id}")
+        with _lock:
+            _dictionaries[dictionary_id] = data
+    return data
+
+
+def _zlib_dictionary(samples: list[bytes]) -> bytes:
+    """Recent payloads back to back, newest last: zlib prefers matches close to the data being compressed."""
+    out = b""
+    for sample in samples:
+        if sample not in out:
+            out = (out + sample)[-DICTIONARY_SIZE:]
+    return out
+
+
+def train_dictionary(db: Session, kind: str) -> int | None:
+    """Train a dictionary for ``kind`` from its newest payloads; later writes of the kind use it."""
+    rows = (
+        db.query(RawPayload.id, RawPayload.codec, RawPayload.dictionary_id, RawPayload.data)
+        .filter(RawPayload.kind == kind)
+        .order_by(RawPayload.id.desc())
+        .limit(DICTIONARY_SAMPLES)
+        .all()
+    )
+    if len(rows) < DICTIONARY_MIN_SAMPLES:
+        return None
+    samples = [_decompress(data, codec, _dictionary_data(db, dictionary_id)) for _id, codec, dictionary_id, data in reversed(rows)]
+    if CODEC == "zstd":
+        try:
+            data = zstandard.train_dictionary(DICTIONARY_SIZE, samples).as_bytes()
+        except zstandard.ZstdError:
+            logger.warning("raw payload dictionary training failed", extra={"kind": kind}, exc_info=True)
+            return None
+    else:
+        data = _zlib_dictionary(samples)
+    row = RawPayloadDictionary(kind=kind, codec=CODEC, sample_count=len(samples), data=data)
+    db.add(row)
+    db.flush()
+    with _lock:
+        _dictionaries[row.id] = data
+        _current[(kind, CODEC)] = row.id
+    logger.info("raw payload dictionary trained", extra={"kind": kind, "codec": CODEC, "samples": len(samples)})
+    return row.id
+
+
+def train_missing_dictionaries(db: Session) -> dict[str, int]:
+    """Train the first dictionary of every kind with enough payloads and none for the current codec yet.
+
+    Returns the new dictionary id per kind. Each one is committed as it is trained.
+    """
+    trained_kinds = {
+        kind for (kind,) in db.query(RawPayloadDictionary.kind).filter(RawPayloadDictionary.codec == CODEC).distinct()
+    }
+    counts = db.query(RawPayload.kind, func.count(RawPayload.id)).group_by(RawPayload.kind).order_by(RawPayload.kind).all()
+    trained: dict[str, int] = {}
+    for kind, count in counts:
+        if kind in trained_kinds or count < DICTIONARY_MIN_SAMPLES:
+            continue
+        dictionary_id = train_dictionary(db, kind)
+        db.commit()
+        if dictionary_id is not None:
+            trained[kind] = dictionary_id
+    return trained
+
+
+def train_missing_dictionaries_now() -> dict[str, int]:
+    db = SessionLocal()
+    try:
+        return train_missing_dictionaries(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _current_dictionary(db: Session, kind: str) -> int | None:
+    with _lock:
+        dictionary_id = _current.get((kind, CODEC))
+    if dictionary_id is not None:
+        return dictionary_id
+    dictionary_id = (
+        db.query(func.max(RawPayloadDictionary.id))
+        .filter(RawPayloadDictionary.kind == kind, RawPayloadDictionary.codec == CODEC)
+        .scalar()
+    )
+    if dictionary_id is None:
+        # Training reads thousands of payloads, so it is left to train_missing_dictionaries (worker job, migrate).
+        return None
+    with _lock:
+        _current[(kind, CODEC)] = dictionary_id
+    return dictionary_id
+
+
+def store_payloads(db: Session, kind: str, payloads: list[Any], payload_ids: Iterable[int | None] | None = None) -> list[int]:
+    """Archive ``payloads`` and return their ids, in order.
+
+    A payload whose entry in ``payload_ids`` names an existing row overwrites that row, so a hot row keeps one
+    archived payload. The session is flushed but not committed.
+    """
+    payload_ids = list(payload_ids) if payload_ids is not None else [None] * len(payloads)
+    dictionary_id = _current_dictionary(db, kind)
+    dictionary = _dictionary_data(db, dictionary_id)
+    existing = {row.id: row for row in _rows(db, [payload_id for payload_id in payload_ids if payload_id is not None])}
+    rows = []
+    for payload, payload_id in zip(payloads, payload_ids):
+        raw = _encode(payload)
+        row = existing.get(payload_id) if payload_id is not None else None
+        if row is None:
+            row = RawPayload(kind=kind)
+            db.add(row)
+        row.codec = CODEC
+        row.dictionary_id = dictionary_id
+        row.raw_size = len(raw)
+        row.data = _compress(raw, CODEC, dictionary)
+        rows.append(row)
+    db.flush()
+    return [row.id for row in rows]
+
+
+def store_payload(db: Session, kind: str, payload: Any, payload_id: int | None = None) -> int:
+    return store_payloads(db, kind, [payload], [payload_id])[0]
+
+
+def _rows(db: Session, payload_ids: list[int]) -> list[RawPayload]:
+    rows: list[RawPayload] = []
+    unique_ids = sorted(set(payload_ids))
+    for start in range(0, len(unique_ids), 500):
+        rows.extend(db.query(RawPayload).filter(RawPayload.id.in_(unique_ids[start : start + 500])).all())
+    return rows
+
+
+def load_payloads(db: Session, payload_ids: Iterable[int | None]) -> dict[int, Any]:
+    """Decoded payloads by id; ids without a row are left out."""
+    out: dict[int, Any] = {}
+    for row in _rows(db, [payload_id for payload_id in payload_ids if payload_id is not None]):
+        out[row.id] = json.loads(_decompress(row.data, row.codec, _dictionary_data(db, row.dictionary_id)))
+    return out
+
+
+def delete_payloads(db: Session, payload_ids: Iterable[int | None]) -> int:
+    unique_ids = sorted({payload_id for payload_id in payload_ids if payload_id is not None})
+    deleted = 0
+    for start in range(0, len(unique_ids), 500):
+        deleted += (
+            db.query(RawPayload).filter(RawPayload.id.in_(unique_ids[start : start + 500])).delete(synchronize_session=False)
+        )
+    return deleted
+
+
+def recompress_payloads(db: Session, kind: str, *, batch_size: int = 500) -> int:
+    """Rewrite payloads of ``kind`` not yet stored with the current codec and dictionary; returns the count."""
+    dictionary_id = _current_dictionary(db, kind)
+    dictionary = _dictionary_data(db, dictionary_id)
+    rewritten = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(RawPayload)
+            .filter(RawPayload.kind == kind, RawPayload.id > last_id)
+            .order_by(RawPayload.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        for row in rows:
+            if row.codec == CODEC and row.dictionary_id == dictionary_id:
+                continue
+            raw = _decompress(row.data, row.codec, _dictionary_data(db, row.dictionary_id))
+            row.codec = CODEC
+            row.dictionary_id = dictionary_id
+            row.data = _compress(raw, CODEC, dictionary)
+            rewritten += 1
+        last_id = rows[-1].id
+        db.commit()
+    return rewritten
+
+
+def archive_stats(db: Session) -> list[dict]:
+    rows = (
+        db.query(
+            RawPayload.kind,
+            RawPayload.codec,
+            func.count(RawPayload.id),
+            func.sum(RawPayload.raw_size),
+            func.sum(func.length(RawPayload.data)),
+        )
+        .group_by(RawPayload.kind, RawPayload.codec)
+        .order_by(RawPayload.kind, RawPayload.codec)
+        .all()
+    )
+    return [
+        {"kind": kind, "codec": codec, "payloads": int(count), "raw_bytes": int(raw or 0), "stored_bytes": int(stored or 0)}
+        for kind, codec, count, raw, stored in rows
+    ]
@@ -0,0 +1,224 @@
+"""Typed columns rebuilt from archived raw payloads, and the move of inline JSON columns into the archive.
+
+Each replayable kind names the hot table that references it and how its typed columns derive from the payload.
+Replaying a kind recomputes those columns for every row that still has a payload, e.g. after a parsing fix.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.campaign import CampaignDailyMetric, CampaignProduct
+from app.models.campaign_hourly import CampaignHourlySnapshot
+from app.services.raw_archive import (
+    KIND_CAMPAIGN_DAILY_ADS,
+    KIND_CAMPAIGN_DAILY_SELLER,
+    KIND_CAMPAIGN_HOURLY_ADS,
+    KIND_CAMPAIGN_PRODUCT,
+    load_payloads,
+    store_payloads,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _money(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value or 0).strip().replace(" ", "").replace(",", "."))
+    except ValueError:
+        return 0.0
+
+
+def _stats_columns(payload: Any, fields: tuple[tuple[str, str, type], ...]) -> dict:
+    """Columns for the stats fields present in ``payload``; absent fields keep their stored value."""
+    if not isinstance(payload, dict):
+        return {}
+    return {column: kind(_money(payload[key])) for column, key, kind in fields if key in payload}
+
+
+_HOURLY_FIELDS = (
+    ("views", "views", int),
+    ("clicks", "clicks", int),
+    ("money_spent", "moneySpent", float),
+    ("orders", "orders", int),
+)
+_DAILY_ADS_FIELDS = _HOURLY_FIELDS + (
+    ("click_price", "clickPrice", float),
+    ("orders_money_ads", "ordersMoney", float),
+)
+
+
+def _product_columns(payload: Any) -> dict:
+    # The bid is left alone: bid changes are written through to current_bid_micro, not to the archived payload.
+    if not isinstance(payload, dict) or "title" not in payload:
+        return {}
+    return {"title": str(payload.get("title") or "")[:255]}
+
+
+@dataclass(frozen=True)
+class Replayer:
+    model: Any
+    ref_column: str
+    derive: Callable[[Any], dict]
+
+
+REPLAYERS: dict[str, Replayer] = {
+    KIND_CAMPAIGN_HOURLY_ADS: Replayer(CampaignHourlySnapshot, "raw_ads_id", lambda payload: _stats_columns(payload, _HOURLY_FIELDS)),
+    KIND_CAMPAIGN_DAILY_ADS: Replayer(CampaignDailyMetric, "raw_ads_id", lambda payload: _stats_columns(payload, _DAILY_ADS_FIELDS)),
+    KIND_CAMPAIGN_PRODUCT: Replayer(CampaignProduct, "raw_payload_id", _product_columns),
+}
+
+
+def replay_payloads(db: Session, kind: str, *, batch_size: int = 500) -> int:
+    """Recompute the typed columns of every row referencing a payload of ``kind``; returns the rows changed."""
+    replayer = REPLAYERS.get(kind)
+    if replayer is None:
+        raise ValueError(f"No replay for raw payload kind: {kind}")
+    model = replayer.model
+    ref = getattr(model, replayer.ref_column)
+    changed = 0
+    last_id = 0
+    while True:
+        rows = db.query(model).filter(ref.isnot(None), model.id > last_id).order_by(model.id.asc()).limit(batch_size).all()
+        if not rows:
+            break
+        payloads = load_payloads(db, [getattr(row, replayer.ref_column) for row in rows])
+        for row in rows:
+            payload_id = getattr(row, replayer.ref_column)
+            if payload_id not in payloads:
+                continue
+            values = replayer.derive(payloads[payload_id])
+            if any(getattr(row, column) != value for column, value in values.items()):
+                for column, value in values.items():
+                    setattr(row, column, value)
+                changed += 1
+        last_id = rows[-1].id
+        db.commit()
+    return changed
+
+
+@dataclass(frozen=True)
+class InlineColumn:
+    table: str
+    column: str
+    ref_column: str
+    kind: str
+
+
+# JSON text columns that older databases still have, and where their payloads go.
+INLINE_COLUMNS = (
+    InlineColumn("campaign_products", "raw_payload_json", "raw_payload_id", KIND_CAMPAIGN_PRODUCT),
+    InlineColumn("campaign_daily_metrics", "raw_ads_json", "raw_ads_id", KIND_CAMPAIGN_DAILY_ADS),
+    InlineColumn("campaign_daily_metrics", "raw_seller_json", "raw_seller_id", KIND_CAMPAIGN_DAILY_SELLER),
+    InlineColumn("campaign_hourly_snapshots", "raw_ads_json", "raw_ads_id", KIND_CAMPAIGN_HOURLY_ADS),
+)
+# Placeholder reference held by rows while their batch is being archived; never committed.
+_CLAIMED = -1
+# Typed columns added next to the move; filled by replaying the table's kind.
+_ADDED_COLUMNS = {"campaign_hourly_snapshots": {"orders": ("INTEGER NOT NULL DEFAULT 0", KIND_CAMPAIGN_HOURLY_ADS)}}
+
+
+def _decode(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def pending_inline_columns(bind: Engine) -> list[InlineColumn]:
+    """Inline JSON columns this database still has and that ``migrate_inline_payloads`` has yet to move."""
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    return [
+        spec
+        for spec in INLINE_COLUMNS
+        if spec.table in tables and spec.column in {column["name"] for column in inspector.get_columns(spec.table)}
+    ]
+
+
+def ensure_inline_payloads_migrated(bind: Engine) -> None:
+    """Refuse to start on a database whose inline JSON columns have not been moved to the archive.
+
+    The models no longer map those columns and they are NOT NULL without a default, so reads and writes on these
+    tables would fail request by request.
+    """
+    pending = pending_inline_columns(bind)
+    if pending:
+        columns = ", ".join(f"{spec.table}.{spec.column}" for spec in pending)
+        raise RuntimeError(f"Raw payload columns not migrated ({columns}); run backend/scripts/raw_archive.py migrate")
+
+
+def _claim_batch(db: Session, spec: InlineColumn, batch_size: int) -> list[tuple[int, str]]:
+    # Claiming with UPDATE ... WHERE ref IS NULL makes a batch belong to exactly one run: a concurrent run waits on the
+    # row locks and then skips rows that are no longer NULL. The placeholder is replaced before the commit.
+    rows = db.execute(
+        text(
+            f"UPDATE {spec.table} SET {spec.ref_column} = :claimed "
+            f"WHERE {spec.ref_column} IS NULL AND id IN ("
+            f"SELECT id FROM {spec.table} "
+            f"WHERE {spec.ref_column} IS NULL AND {spec.column} IS NOT NULL AND {spec.column} NOT IN ('', '{{}}') "
+            f"ORDER BY id LIMIT :limit) "
+            f"RETURNING id, {spec.column}"
+        ),
+        {"claimed": _CLAIMED, "limit": batch_size},
+    ).all()
+    return sorted((row_id, value) for row_id, value in rows)
+
+
+def migrate_inline_payloads(
+    bind: Engine,
+    *,
+    batch_size: int = 500,
+    keep_alive: Callable[[], None] | None = None,
+) -> int:
+    """Move inline JSON columns into the archive, then drop them; returns the payloads moved.
+
+    Run by ``scripts/raw_archive.py migrate`` before the API and workers start on a database created before the
+    archive. Each batch is claimed, archived and linked in one transaction, so an interrupted run can simply be
+    started again. ``keep_alive`` is called after every batch (the script renews its lease there).
+    """
+    moved = 0
+    replay_kinds: set[str] = set()
+    with Session(bind) as db:
+        for spec in pending_inline_columns(bind):
+            columns = {column["name"] for column in inspect(bind).get_columns(spec.table)}
+            if spec.ref_column not in columns:
+                db.execute(text(f"ALTER TABLE {spec.table} ADD COLUMN {spec.ref_column} INTEGER"))
+            for column, (ddl, kind) in _ADDED_COLUMNS.get(spec.table, {}).items():
+                if column not in columns:
+                    db.execute(text(f"ALTER TABLE {spec.table} ADD COLUMN {column} {ddl}"))
+                # Also after an interrupted run: rows archived back then have not been replayed yet.
+                replay_kinds.add(kind)
+            db.commit()
+            while True:
+                rows = _claim_batch(db, spec, batch_size)
+                if not rows:
+                    db.rollback()
+                    break
+                payload_ids = store_payloads(db, spec.kind, [_decode(value) for _row_id, value in rows])
+                db.execute(
+                    text(f"UPDATE {spec.table} SET {spec.ref_column} = :payload_id WHERE id = :row_id AND {spec.ref_column} = :claimed"),
+                    [
+                        {"payload_id": payload_id, "row_id": row_id, "claimed": _CLAIMED}
+                        for (row_id, _value), payload_id in zip(rows, payload_ids)
+                    ],
+                )
+                db.commit()
+                moved += len(rows)
+                if keep_alive is not None:
+                    keep_alive()
+            db.execute(text(f"ALTER TABLE {spec.table} DROP COLUMN {spec.column}"))
+            db.commit()
+            logger.info("raw payload column moved to archive", extra={"table": spec.table, "column": spec.column})
+        for kind in sorted(replay_kinds):
+            replay_payloads(db, kind)
+    return moved
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import base64
+import math
+from typing import TYPE_CHECKING, Any, Iterable
+
+from app.services.columnar import ColumnTable
+from app.services.shipment_history import normalize_city
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def _cursor_scope(version: str, rows: str) -> str:
+    return f"{version}:{rows}" if rows else version
+
+
+def encode_cursor(version: str, offset: int, *, rows: str = "") -> str:
+    """Opaque cursor for ``offset`` in the snapshot ``version``; ``rows`` names the row list when a response pages several."""
+    raw = f"{_cursor_scope(version, rows)}:{int(offset)}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, version: str, *, rows: str = "") -> int:
+    """Offset stored in ``cursor``; a cursor from another snapshot version or another row list is rejected."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        cursor_scope, _sep, offset = raw.rpartition(":")
+        value = int(offset)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if value < 0:
+        raise ValueError("Invalid cursor")
+    if cursor_scope != _cursor_scope(version, rows):
+        if cursor_scope.partition(":")[0] == version:
+            raise ValueError(f"Cursor belongs to another row list, not {rows or 'these'} rows")
+        raise ValueError("Cursor belongs to an older snapshot; reload the first page")
+    return value
+
+
+def resolve_offset(*, version: str, offset: int = 0, cursor: str | None = None, rows: str = "") -> int:
+    return decode_cursor(cursor, version, rows=rows) if cursor else max(0, int(offset or 0))
+
+
+def page_info(*, version: str, offset: int, limit: int | None, total: int, returned: int, rows: str = "") -> dict:
+    end = offset + returned
+    return {
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "returned": returned,
+        "next_cursor": encode_cursor(version, end, rows=rows) if limit is not None and end < total else None,
+    }
+
+
+def city_keys(values: Iterable[str] | None) -> set[str]:
+    """Normalised city keys for a ``city`` filter (labels and keys are both accepted)."""
+    return {normalize_city(value) for value in values or () if str(value or "").strip()}
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or value == "" or (isinstance(value, float) and math.isnan(value))
+
+
+def _first_present(row: dict, fields: tuple[str, ...]) -> Any:
+    return next((row.get(field) for field in fields if not _is_missing(row.get(field))), None)
+
+
+class RowIndex:
+    """Search keys, city keys and lazily built sort keys over a fixed list of row dicts or a ``ColumnTable``.
+
+    Rows are never copied or rebuilt; filters produce boolean masks and sorts produce index arrays. For a
+    table, text keys are computed once per distinct value and row dicts are only built for returned pages.
+    """
+
+    def __init__(
+        self,
+        rows: list[dict] | ColumnTable,
+        *,
+        search_fields: tuple[str, ...],
+        city_field: str | tuple[str, ...] | None = None,
+        sortable: Iterable[str] | None = None,
+    ) -> None:
+        import numpy as np
+
+        self.rows = rows
+        self.size = len(rows)
+        city_fields = (city_field,) if isinstance(city_field, str) else city_field
+        if isinstance(rows, ColumnTable):
+            parts = [rows.map(field, lambda value: str(value or "").lower()) for field in search_fields]
+            self._search = parts[0].tolist() if len(parts) == 1 else [" ".join(items) for items in zip(*parts)]
+            self.cities = None if not city_fields else self._table_cities(rows, city_fields)
+            self.sortable = set(sortable) if sortable is not None else set(rows.names)
+        else:
+            self._search = [" ".join(str(row.get(field) or "") for field in search_fields).lower() for row in rows]
+            self.cities = None
+            if city_fields:
+                self.cities = np.array([normalize_city(_first_present(row, city_fields)) for row in rows], dtype=object)
+            self.sortable = set(sortable) if sortable is not None else {key for row in rows for key in row}
+        self._sort_keys: dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def _table_cities(table: ColumnTable, fields: tuple[str, ...]) -> np.ndarray:
+        import numpy as np
+
+        keys = np.full(len(table), normalize_city(None), dtype=object)
+        for field in reversed(fields):
+            if field in table:
+                present = table.map(field, lambda value: not _is_missing(value), dtype=bool)
+                keys = np.where(present, table.map(field, normalize_city), keys)
+        return keys
+
+    def _values(self, field: str) -> list:
+        if isinstance(self.rows, ColumnTable):
+            return self.rows.values(field).tolist()
+        return [row.get(field) for row in self.rows]
+
+    def match(self, *, search: str = "", cities: set[str] | None = None) -> np.ndarray:
+        import numpy as np
+
+        mask = np.ones(self.size, dtype=bool)
+        needle = str(search or "").strip().lower()
+        if needle:
+            mask &= np.fromiter((needle in key for key in self._search), dtype=bool, count=self.size)
+        if cities and self.cities is not None:
+            mask &= np.isin(self.cities, list(cities))
+        return mask
+
+    def sort_key(self, field: str) -> np.ndarray:
+        """Ascending float key per row (NaN for missing values); strings sort by case-folded rank."""
+        import numpy as np
+
+        key = self._sort_keys.get(field)
+        if key is not None:
+            return key
+        if field not in self.sortable:
+            raise ValueError(f"Unknown sort field: {field}")
+        if isinstance(self.rows, ColumnTable) and field in self.rows and self.rows.is_numeric(field):
+            key = self.rows.values(field).astype(float)
+            self._sort_keys[field] = key
+            return key
+        values = self._values(field)
+        present = [value for value in values if not _is_missing(value)]
+        if all(isinstance(value, (int, float)) for value in present):
+            key = np.array([np.nan if _is_missing(value) else float(value) for value in values], dtype=float)
+        else:
+            ranks = {text: rank for rank, text in enumerate(sorted({str(value).casefold() for value in present}))}
+            key = np.array([np.nan if _is_missing(value) else ranks[str(value).casefold()] for value in values], dtype=float)
+        self._sort_keys[field] = key
+        return key
+
+    def order(self, mask: np.ndarray, sort: str = "", extra: dict[str, np.ndarray] | None = None) -> np.ndarray:
+        """Row positions passing ``mask``, sorted by ``sort`` (``-field`` for descending, missing values last)."""
+        import numpy as np
+
+        positions = np.flatnonzero(mask)
+        field = str(sort or "").strip()
+        if not field:
+            return positions
+        descending = field.startswith("-")
+        field = field.lstrip("+-")
+        key = extra[field] if extra and field in extra else self.sort_key(field)
+        values = key[positions].astype(float)
+        if descending:
+            values = -values
+        missing = np.isnan(values)
+        return positions[np.lexsort((positions, np.where(missing, 0.0, values), missing))]
+
+    def page(self, positions: np.ndarray, *, offset: int, limit: int | None) -> list[dict]:
+        selected = positions[offset:] if limit is None else positions[offset : offset + limit]
+        if isinstance(self.rows, ColumnTable):
+            return self.rows.records(selected)
+        return [self.rows[position] for position in selected.tolist()]
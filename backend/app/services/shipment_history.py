@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime, timezone
 from typing import Iterable
 
@@ -211,6 +212,8 @@ def sync_shipment_history(
             for (article, city_key), count in aggregates.items()
         ]
         db.bulk_save_objects(rows)
+    db.flush()
+    refresh_shipment_cells(db, company_name=company_name, seller_client_id=seller_client_id)
     db.commit()
 
 
@@ -341,192 +344,171 @@ def _sync_shipment_history_from_events(
         )
 
 
-def load_shipment_pairs(
+def refresh_shipment_cells(
     db: Session,
     *,
     company_name: str,
     seller_client_id: str,
-) -> tuple[set[tuple[str, str]], datetime | None]:
-    if not seller_client_id:
-        return set(), None
-    create_all()
-    from app.models.shipment_history import ShipmentHistory
-
-    rows = (
-        db.query(ShipmentHistory)
-        .filter(ShipmentHistory.company_name == str(company_name or ""))
-        .filter(ShipmentHistory.seller_client_id == str(seller_client_id or ""))
-        .filter(ShipmentHistory.shipments_count > 0)
-        .all()
-    )
-    if not rows:
-        return set(), None
-    pairs = {
-        (str(item.article or "").strip(), str(item.city_key or "").strip())
-        for item in rows
-        if str(item.article or "").strip() and str(item.city_key or "").strip()
-    }
-    ts = max((item.updated_at for item in rows if item.updated_at is not None), default=None)
-    return pairs, ts
-
-
-def load_shipment_city_totals(
-    db: Session,
-    *,
-    company_name: str,
-    seller_client_id: str,
-) -> dict[str, int]:
-    if not seller_client_id:
-        return {}
-    create_all()
+) -> int:
+    """Rebuild the per-(article, city_key) aggregate from shipment history, events and transit (no commit)."""
+    from app.models.shipment_cell import ShipmentCell
     from app.models.shipment_event import ShipmentEvent
-
-    rows = (
-        db.query(ShipmentEvent.city_key, func.sum(ShipmentEvent.quantity))
-        .filter(ShipmentEvent.company_name == str(company_name or ""))
-        .filter(ShipmentEvent.seller_client_id == str(seller_client_id or ""))
-        .filter(ShipmentEvent.city_key != "")
-        .group_by(ShipmentEvent.city_key)
-        .all()
-    )
-    return {
-        str(city_key or "").strip(): int(total or 0)
-        for city_key, total in rows
-        if str(city_key or "").strip() and int(total or 0) > 0
-    }
-
-
-def has_unknown_shipment_city(
-    db: Session,
-    *,
-    company_name: str,
-    seller_client_id: str,
-) -> bool:
-    if db is None or not seller_client_id:
-        return False
-    create_all()
     from app.models.shipment_history import ShipmentHistory
     from app.models.shipment_transit import ShipmentTransit
 
-    common_filters = {
-        "company_name": str(company_name or ""),
-        "seller_client_id": str(seller_client_id or ""),
-    }
-    history_exists = (
-        db.query(ShipmentHistory.id)
-        .filter(ShipmentHistory.company_name == common_filters["company_name"])
-        .filter(ShipmentHistory.seller_client_id == common_filters["seller_client_id"])
-        .filter(ShipmentHistory.city_key == "UNKNOWN")
-        .filter(ShipmentHistory.shipments_count > 0)
-        .first()
-        is not None
-    )
-    if history_exists:
-        return True
-    return (
-        db.query(ShipmentTransit.id)
-        .filter(ShipmentTransit.company_name == common_filters["company_name"])
-        .filter(ShipmentTransit.seller_client_id == common_filters["seller_client_id"])
-        .filter(ShipmentTransit.city_key == "UNKNOWN")
-        .filter(ShipmentTransit.quantity > 0)
-        .first()
-        is not None
-    )
-
-
-def load_shipment_events_map(
-    db: Session,
-    *,
-    company_name: str,
-    seller_client_id: str,
-    articles: set[str],
-    city_keys: set[str],
-    per_cell_limit: int = 5,
-) -> dict[tuple[str, str], dict]:
-    if not seller_client_id or not articles or not city_keys:
-        return {}
-    create_all()
-    from app.models.shipment_event import ShipmentEvent
+    company_name = str(company_name or "")
+    seller_client_id = str(seller_client_id or "")
+    cells: dict[tuple[str, str], dict] = {}
 
-    rows = (
-        db.query(ShipmentEvent)
-        .filter(ShipmentEvent.company_name == str(company_name or ""))
-        .filter(ShipmentEvent.seller_client_id == str(seller_client_id or ""))
-        .filter(ShipmentEvent.article.in_(sorted(articles)))
-        .filter(ShipmentEvent.city_key.in_(sorted(city_keys)))
-        .order_by(ShipmentEvent.event_at.desc())
-        .all()
-    )
-    out: dict[tuple[str, str], dict] = {}
-    for item in rows:
-        article = str(item.article or "").strip()
-        city_key = str(item.city_key or "").strip()
-        if not article or not city_key:
-            continue
-        key = (article, city_key)
-        entry = out.get(key)
+    def cell(article: object, city_key: object) -> dict | None:
+        key = (str(article or "").strip(), str(city_key or "").strip())
+        if not key[0] or not key[1]:
+            return None
+        entry = cells.get(key)
         if entry is None:
-            entry = {
+            entry = cells[key] = {
+                "shipments_count": 0,
+                "history_updated_at": None,
                 "total_quantity": 0,
                 "events_count": 0,
                 "last_event_at": None,
+                "transit_quantity": 0,
                 "events": [],
-                "events_for_calc": [],
             }
-            out[key] = entry
-        qty = int(item.quantity or 0)
+        return entry
+
+    history = (
+        db.query(ShipmentHistory.article, ShipmentHistory.city_key, ShipmentHistory.shipments_count, ShipmentHistory.updated_at)
+        .filter(ShipmentHistory.company_name == company_name)
+        .filter(ShipmentHistory.seller_client_id == seller_client_id)
+        .filter(ShipmentHistory.shipments_count > 0)
+    )
+    for article, city_key, count, updated_at in history:
+        entry = cell(article, city_key)
+        if entry is None:
+            continue
+        entry["shipments_count"] += int(count or 0)
+        if updated_at is not None and (entry["history_updated_at"] is None or updated_at > entry["history_updated_at"]):
+            entry["history_updated_at"] = updated_at
+
+    events = (
+        db.query(ShipmentEvent.article, ShipmentEvent.city_key, ShipmentEvent.city, ShipmentEvent.quantity, ShipmentEvent.event_at)
+        .filter(ShipmentEvent.company_name == company_name)
+        .filter(ShipmentEvent.seller_client_id == seller_client_id)
+        .order_by(ShipmentEvent.event_at.desc(), ShipmentEvent.id)
+    )
+    for article, city_key, city, quantity, event_at in events:
+        entry = cell(article, city_key)
+        if entry is None:
+            continue
+        qty = int(quantity or 0)
         entry["total_quantity"] += qty
         entry["events_count"] += 1
         if entry["last_event_at"] is None:
-            entry["last_event_at"] = item.event_at
-        entry["events_for_calc"].append(
-            {
-                "quantity": qty,
-                "event_at": item.event_at,
-            }
-        )
-        if len(entry["events"]) < max(1, int(per_cell_limit)):
-            entry["events"].append(
+            entry["last_event_at"] = event_at
+        entry["events"].append([qty, event_at.isoformat() if event_at else None, str(city or "").strip()])
+
+    transit = (
+        db.query(ShipmentTransit.article, ShipmentTransit.city_key, func.sum(ShipmentTransit.quantity))
+        .filter(ShipmentTransit.company_name == company_name)
+        .filter(ShipmentTransit.seller_client_id == seller_client_id)
+        .group_by(ShipmentTransit.article, ShipmentTransit.city_key)
+    )
+    for article, city_key, quantity in transit:
+        entry = cell(article, city_key)
+        if entry is not None:
+            entry["transit_quantity"] += int(quantity or 0)
+
+    (
+        db.query(ShipmentCell)
+        .filter(ShipmentCell.company_name == company_name)
+        .filter(ShipmentCell.seller_client_id == seller_client_id)
+        .delete(synchronize_session=False)
+    )
+    if cells:
+        db.bulk_insert_mappings(
+            ShipmentCell,
+            [
                 {
-                    "quantity": qty,
-                    "event_at": item.event_at,
-                    "city": str(item.city or "").strip(),
+                    "company_name": company_name,
+                    "seller_client_id": seller_client_id,
+                    "article": article,
+                    "city_key": city_key,
+                    "shipments_count": entry["shipments_count"],
+                    "history_updated_at": entry["history_updated_at"],
+                    "total_quantity": entry["total_quantity"],
+                    "events_count": entry["events_count"],
+                    "last_event_at": entry["last_event_at"],
+                    "transit_quantity": entry["transit_quantity"],
+                    "events_json": json.dumps(entry["events"], ensure_ascii=False, separators=(",", ":")),
                 }
-            )
-    return out
+                for (article, city_key), entry in cells.items()
+            ],
+        )
+    return len(cells)
 
 
-def load_shipment_transit_map(
-    db: Session,
+def load_shipment_cells(
+    db: Session | None,
     *,
     company_name: str,
     seller_client_id: str,
-    articles: set[str],
-    city_keys: set[str] | None = None,
-) -> dict[tuple[str, str], int]:
-    if db is None or not seller_client_id or not articles:
+) -> dict[tuple[str, str], dict]:
+    """All shipment aggregates of a seller keyed by (article, city_key), read in one query.
+
+    Read-only: the storage sync and the shipment rebuild keep the aggregate up to date.
+    """
+    if db is None or not seller_client_id:
         return {}
     create_all()
-    from app.models.shipment_transit import ShipmentTransit
+    from app.models.shipment_cell import ShipmentCell
 
-    query = (
-        db.query(ShipmentTransit)
-        .filter(ShipmentTransit.company_name == str(company_name or ""))
-        .filter(ShipmentTransit.seller_client_id == str(seller_client_id or ""))
-        .filter(ShipmentTransit.article.in_(sorted(articles)))
+    rows = (
+        db.query(
+            ShipmentCell.article,
+            ShipmentCell.city_key,
+            ShipmentCell.shipments_count,
+            ShipmentCell.history_updated_at,
+            ShipmentCell.total_quantity,
+            ShipmentCell.events_count,
+            ShipmentCell.last_event_at,
+            ShipmentCell.transit_quantity,
+            ShipmentCell.events_json,
+        )
+        .filter(ShipmentCell.company_name == str(company_name or ""))
+        .filter(ShipmentCell.seller_client_id == str(seller_client_id or ""))
+        .all()
     )
-    if city_keys:
-        query = query.filter(ShipmentTransit.city_key.in_(sorted(city_keys)))
-    rows = query.all()
-    out: dict[tuple[str, str], int] = {}
-    for item in rows:
-        article = str(item.article or "").strip()
-        city_key = str(item.city_key or "").strip()
-        if not article or not city_key:
-            continue
-        key = (article, city_key)
-        out[key] = out.get(key, 0) + int(item.quantity or 0)
-    return out
+    return {
+        (article, city_key): {
+            "shipments_count": int(shipments_count or 0),
+            "history_updated_at": history_updated_at,
+            "total_quantity": int(total_quantity or 0),
+            "events_count": int(events_count or 0),
+            "last_event_at": last_event_at,
+            "transit_quantity": int(transit_quantity or 0),
+            "events_json": events_json,
+        }
+        for article, city_key, shipments_count, history_updated_at, total_quantity, events_count, last_event_at, transit_quantity, events_json in rows
+    }
+
+
+def shipment_cell_events(cell: dict, *, per_cell_limit: int = 5) -> dict:
+    """Decoded events of one aggregate: every event for the paid-storage split, the newest few for display."""
+    events_for_calc: list[dict] = []
+    events: list[dict] = []
+    for quantity, event_at, city in json.loads(cell.get("events_json") or "[]"):
+        parsed = datetime.fromisoformat(event_at) if event_at else None
+        events_for_calc.append({"quantity": int(quantity or 0), "event_at": parsed})
+        if len(events) < max(1, int(per_cell_limit)):
+            events.append({"quantity": int(quantity or 0), "event_at": parsed, "city": city})
+    return {
+        "total_quantity": int(cell.get("total_quantity") or 0),
+        "events_count": int(cell.get("events_count") or 0),
+        "last_event_at": cell.get("last_event_at"),
+        "events": events,
+        "events_for_calc": events_for_calc,
+    }
 
 
 def _completed_order_ids(
@@ -711,6 +693,8 @@ def rebuild_shipment_history_from_api(
             seller_client_id=seller_client_id,
             events=[],
         )
+        db.flush()
+        refresh_shipment_cells(db, company_name=company_name, seller_client_id=seller_client_id)
         db.commit()
         return 0
 
@@ -824,5 +808,7 @@ def rebuild_shipment_history_from_api(
         seller_client_id=seller_client_id,
         events=events,
     )
+    db.flush()
+    refresh_shipment_cells(db, company_name=company_name, seller_client_id=seller_client_id)
     db.commit()
     return len(events)
@@ -1,9 +1,6 @@
 from __future__ import annotations
 
-import asyncio
 import logging
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
 
 from app.db.session import SessionLocal
 from app.services.company_config import default_company_from_env, load_runtime_company_configs
@@ -110,32 +107,3 @@ def refresh_stocks_and_shipment_history_for_all_companies() -> None:
             "shipments_rows_total": total_shipment_rows,
         },
     )
-
-
-def _seconds_until_next_run(now: datetime, target_hour: int = 5) -> float:
-    target = now.replace(hour=target_hour, minute=0, second=0, microsecond=0)
-    if now >= target:
-        target = target + timedelta(days=1)
-    delta = target - now
-    return max(1.0, delta.total_seconds())
-
-
-async def shipment_history_scheduler_loop(timezone_name: str) -> None:
-    try:
-        tz = ZoneInfo(timezone_name)
-    except Exception:
-        logger.exception("invalid timezone for shipment_history scheduler", extra={"timezone": timezone_name})
-        tz = ZoneInfo("UTC")
-    while True:
-        now = datetime.now(tz)
-        sleep_seconds = _seconds_until_next_run(now, target_hour=5)
-        next_run = now + timedelta(seconds=sleep_seconds)
-        logger.info(
-            "shipment_history scheduler sleeping",
-            extra={"next_run": next_run.isoformat()},
-        )
-        await asyncio.sleep(sleep_seconds)
-        try:
-            await asyncio.to_thread(refresh_stocks_and_shipment_history_for_all_companies)
-        except Exception:
-            logger.exception("daily caches scheduler cycle failed")
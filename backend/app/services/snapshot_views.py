@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy.orm import Session
+
+from app.core.responses import dumps
+from app.core.timing import timed
+from app.services.cache import TTLCache, approx_size
+from app.services.columnar import ColumnTable
+from app.services.company_config import resolve_company_config
+from app.services.legacy_compat import FEE_FORECAST_DAYS
+from app.services.row_index import RowIndex, city_keys, page_info, resolve_offset
+from app.services.shipment_history import normalize_city
+from app.services.stocks_snapshot import get_stocks_workspace
+from app.services.storage_pipeline import storage_refresh_progress
+from app.services.storage_snapshot import STORAGE_CACHE_VERSION, get_storage_snapshot, storage_snapshot_stamp
+
+if TYPE_CHECKING:
+    import numpy as np
+
+WORKSPACE_VIEW_TTL_SECONDS = int(os.getenv("STOCKS_WORKSPACE_VIEW_TTL_SECONDS", "300"))
+PAID_STORAGE_FILTERS = {"ALL", "PAID", "SOON_30", "SOON_60"}
+WORKSPACE_ROW_SORTS = ("article", "title", "revenue", "ordered_units", "drr_pct")
+WORKSPACE_CELL_SORTS = ("stock", "need60", "in_transit", "candidates", "paid_storage", "paid_storage_soon_30", "paid_storage_soon_60")
+
+
+def _view_size(view: Any) -> int:
+    return view.approx_bytes
+
+
+_workspace_views = TTLCache(
+    "stocks.workspace_views",
+    ttl_seconds=WORKSPACE_VIEW_TTL_SECONDS,
+    max_entries=32,
+    max_bytes=512 * 1024 * 1024,
+    sizeof=_view_size,
+)
+# Storage views are checked against the stored snapshot's updated_at, so the TTL only bounds memory.
+_storage_views = TTLCache("storage.snapshot_views", ttl_seconds=6 * 60 * 60, max_entries=32, max_bytes=512 * 1024 * 1024, sizeof=_view_size)
+
+
+def _as_table(rows: Any) -> ColumnTable:
+    return rows if isinstance(rows, ColumnTable) else ColumnTable.from_records(rows or [])
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha1(json.dumps(parts, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class StocksWorkspaceView:
+    """A built stocks workspace with per-cell metric matrices for filtering and sorting pages of articles."""
+
+    def __init__(self, payload: dict) -> None:
+        import numpy as np
+
+        self.payload = payload
+        rows = payload.get("rows") or []
+        columns = [str(city) for city in payload.get("columns") or []]
+        meta = payload.get("columns_meta") or []
+        self.column_keys = [str(item.get("city_key") or normalize_city(item.get("city"))) for item in meta] or [
+            normalize_city(city) for city in columns
+        ]
+        self.columns = columns
+        # Content hash (build timings excluded): a rebuild with the same data keeps ETags and cursors valid.
+        self.version = hashlib.sha1(dumps({key: value for key, value in payload.items() if key != "timings"})).hexdigest()[:16]
+        self.index = RowIndex(rows, search_fields=("article", "title"), sortable=WORKSPACE_ROW_SORTS)
+        shape = (len(rows), len(columns))
+        fields = ("stock", "need60", "in_transit", "paid_storage_qty", "paid_storage_soon_30_qty", "paid_storage_soon_60_qty")
+        values = {field: np.zeros(shape, dtype=np.int64) for field in fields}
+        self.candidates = np.zeros(shape, dtype=bool)
+        for row_position, row in enumerate(rows):
+            for column_position, cell in enumerate((row.get("cells") or [])[: len(columns)]):
+                for field in fields:
+                    values[field][row_position, column_position] = int(cell.get(field) or 0)
+                self.candidates[row_position, column_position] = bool(cell.get("is_candidate"))
+        self.values = values
+        self.approx_bytes = approx_size(payload) + sum(array.nbytes for array in values.values())
+
+    def _columns_for(self, cities: set[str], labels: set[str]) -> list[int]:
+        if not cities:
+            return list(range(len(self.columns)))
+        return [position for position, key in enumerate(self.column_keys) if key in cities or self.columns[position] in labels]
+
+    def page(
+        self,
+        *,
+        search: str = "",
+        cities: list[str] | None = None,
+        candidates_only: bool = False,
+        paid_storage: str = "ALL",
+        sort: str = "",
+        offset: int = 0,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> dict:
+        offset = resolve_offset(version=self.version, offset=offset, cursor=cursor)
+        labels = {str(city).strip() for city in cities or () if str(city).strip()}
+        selected = self._columns_for(city_keys(cities), labels)
+        mask = self.index.match(search=search)
+
+        def cell_total(field: str) -> np.ndarray:
+            return self.values[field][:, selected].sum(axis=1)
+
+        if candidates_only:
+            mask &= self.candidates[:, selected].any(axis=1)
+        paid_storage = str(paid_storage or "ALL").upper()
+        if paid_storage not in PAID_STORAGE_FILTERS:
+            paid_storage = "ALL"
+        if paid_storage == "PAID":
+            mask &= cell_total("paid_storage_qty") > 0
+        elif paid_storage in {"SOON_30", "SOON_60"}:
+            soon_field = "paid_storage_soon_30_qty" if paid_storage == "SOON_30" else "paid_storage_soon_60_qty"
+            mask &= (cell_total("paid_storage_qty") + cell_total(soon_field)) > 0
+
+        sort_field = str(sort or "").strip().lstrip("+-")
+        extra: dict[str, np.ndarray] = {}
+        if sort_field in WORKSPACE_CELL_SORTS:
+            if sort_field == "candidates":
+                extra[sort_field] = self.candidates[:, selected].sum(axis=1).astype(float)
+            else:
+                source = sort_field if sort_field in {"stock", "need60", "in_transit"} else f"{sort_field}_qty"
+                extra[sort_field] = cell_total(source).astype(float)
+        positions = self.index.order(mask, sort, extra)
+        rows = self.index.page(positions, offset=offset, limit=limit)
+        if len(selected) != len(self.columns):
+            rows = [{**row, "cells": [row["cells"][position] for position in selected]} for row in rows]
+
+        payload = dict(self.payload)
+        if len(selected) != len(self.columns):
+            payload["columns"] = [self.columns[position] for position in selected]
+            meta = payload.get("columns_meta") or []
+            payload["columns_meta"] = [meta[position] for position in selected] if meta else []
+        payload["rows"] = rows
+        payload["page"] = page_info(version=self.version, offset=offset, limit=limit, total=len(positions), returned=len(rows))
+        return payload
+
+
+class StorageSnapshotView:
+    """Storage lots and fee-risk rows with search, city and fee-date filters for paged reads.
+
+    Lots, risk rows and the per-day fee projection are held as ``ColumnTable``s; only the rows of the requested
+    page become dicts, and the projection is summed over the rows matching the search and city filters.
+    """
+
+    def __init__(self, payload: dict, *, stamp: str | None) -> None:
+        import numpy as np
+
+        lot_rows = _as_table(payload.get("lot_rows"))
+        risk_rows = _as_table(payload.get("risk_rows"))
+        projection_rows = _as_table(payload.get("fee_projection_rows"))
+        self.payload = {**payload, "lot_rows": lot_rows, "risk_rows": risk_rows, "fee_projection_rows": projection_rows}
+        self.stamp = stamp
+        self.version = _digest(payload.get("company"), payload.get("seller_client_id"), payload.get("cache_updated_at"), stamp)
+        self.lots = RowIndex(lot_rows, search_fields=("article",), city_field=("city_key", "city"))
+        self.risks = RowIndex(risk_rows, search_fields=("article",), city_field="city")
+        self.projection = RowIndex(projection_rows, search_fields=("article",), city_field=("city_key", "city"))
+        self.projection_days = projection_rows.values("day").astype(np.int64) if "day" in projection_rows else np.zeros(0, dtype=np.int64)
+        self.projection_fees = (
+            projection_rows.values("estimated_daily_fee_rub").astype(float) if "estimated_daily_fee_rub" in projection_rows else np.zeros(0)
+        )
+        try:
+            self.projection_start = date.fromisoformat(str(payload.get("fee_projection_start") or ""))
+        except ValueError:
+            self.projection_start = date.today()
+
+        def article_text(value: Any) -> str:
+            return str(value or "")
+
+        risk_pairs = set(zip(self.risks.cities.tolist(), risk_rows.map("article", article_text).tolist()))
+        self.lot_at_risk = np.fromiter(
+            (pair in risk_pairs for pair in zip(self.lots.cities.tolist(), lot_rows.map("article", article_text).tolist())),
+            dtype=bool,
+            count=len(lot_rows),
+        )
+        self.approx_bytes = approx_size(self.payload)
+
+    def _fee_projection(self, mask: np.ndarray) -> list[dict]:
+        import numpy as np
+
+        totals = np.bincount(self.projection_days[mask], weights=self.projection_fees[mask], minlength=FEE_FORECAST_DAYS)
+        return [
+            {
+                "day": day,
+                "date": (self.projection_start + timedelta(days=day)).isoformat(),
+                "estimated_daily_fee_rub": round(float(total), 2),
+            }
+            for day, total in enumerate(totals[:FEE_FORECAST_DAYS].tolist())
+        ]
+
+    @staticmethod
+    def _within_days(index: RowIndex, days: int | None) -> np.ndarray:
+        import numpy as np
+
+        mask = np.ones(index.size, dtype=bool)
+        if days is None or not index.size or "days_until_fee_start" not in index.sortable:
+            return mask
+        key = index.sort_key("days_until_fee_start")
+        return ~np.isnan(key) & (np.nan_to_num(key, nan=np.inf) <= float(days))
+
+    def page(
+        self,
+        *,
+        search: str = "",
+        cities: list[str] | None = None,
+        fee_within_days: int | None = None,
+        risk_only: bool = False,
+        sort: str = "",
+        risk_sort: str = "",
+        offset: int = 0,
+        limit: int | None = None,
+        cursor: str | None = None,
+        risk_offset: int = 0,
+        risk_cursor: str | None = None,
+        refresh_started: bool = False,
+        refresh_in_progress: bool = False,
+        refresh_progress: dict | None = None,
+    ) -> dict:
+        """One page of lot rows and one of risk rows; each list has its own offset or cursor."""
+        offset = resolve_offset(version=self.version, offset=offset, cursor=cursor, rows="lots")
+        risk_offset = resolve_offset(version=self.version, offset=risk_offset, cursor=risk_cursor, rows="risks")
+        keys = city_keys(cities)
+        lot_mask = self.lots.match(search=search, cities=keys) & self._within_days(self.lots, fee_within_days)
+        if risk_only:
+            lot_mask &= self.lot_at_risk
+        risk_mask = self.risks.match(search=search, cities=keys) & self._within_days(self.risks, fee_within_days)
+        lot_positions = self.lots.order(lot_mask, sort)
+        risk_positions = self.risks.order(risk_mask, risk_sort)
+        lot_rows = self.lots.page(lot_positions, offset=offset, limit=limit)
+        risk_rows = self.risks.page(risk_positions, offset=risk_offset, limit=limit)
+
+        payload = dict(self.payload)
+        payload["refresh_started"] = refresh_started
+        payload["refresh_in_progress"] = refresh_in_progress
+        payload["refresh_progress"] = refresh_progress
+        payload["lot_rows"] = lot_rows
+        payload["risk_rows"] = risk_rows
+        payload["fee_projection"] = self._fee_projection(self.projection.match(search=search, cities=keys))
+        payload["lot_page"] = page_info(
+            version=self.version, offset=offset, limit=limit, total=len(lot_positions), returned=len(lot_rows), rows="lots"
+        )
+        payload["risk_page"] = page_info(
+            version=self.version,
+            offset=risk_offset,
+            limit=limit,
+            total=len(risk_positions),
+            returned=len(risk_rows),
+            rows="risks",
+        )
+        return payload
+
+
+def get_stocks_workspace_view(
+    *,
+    company: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    regional_order_min: int = 2,
+    minimum_supply: int = 5,
+    position_filter: str = "ALL",
+    assortment_filter: str = "ALL",
+    force_refresh: bool = False,
+    db: Session | None = None,
+) -> StocksWorkspaceView:
+    """Built workspace for these settings, reused across pages and filters for a few minutes."""
+    key = (
+        str(company or ""),
+        date_from,
+        date_to,
+        int(regional_order_min),
+        int(minimum_supply),
+        str(position_filter or "ALL").upper(),
+        str(assortment_filter or "ALL").upper(),
+    )
+    if not force_refresh:
+        view = _workspace_views.get(key)
+        if view is not None:
+            return view
+    payload = get_stocks_workspace(
+        company=company,
+        date_from=date_from,
+        date_to=date_to,
+        regional_order_min=regional_order_min,
+        minimum_supply=minimum_supply,
+        position_filter=position_filter,
+        assortment_filter=assortment_filter,
+        force_refresh=force_refresh,
+        db=db,
+    )
+    with timed("workspace_view"):
+        view = StocksWorkspaceView(payload)
+    _workspace_views.set(key, view)
+    return view
+
+
+def invalidate_stocks_workspace_views() -> None:
+    _workspace_views.clear()
+
+
+def get_storage_snapshot_view(
+    *,
+    company: str | None = None,
+    force_refresh: bool = False,
+    db: Session | None = None,
+) -> tuple[StorageSnapshotView, dict]:
+    """Storage view plus this request's refresh flags and progress; rebuilt only when the stored snapshot changes."""
+    company_name, config = resolve_company_config(company)
+    seller_client_id = (config.get("seller_client_id") or "").strip()
+    key = (company_name, seller_client_id)
+
+    def refresh_flags(payload: dict | None = None) -> dict:
+        flags: dict[str, Any] = {flag: bool((payload or {}).get(flag)) for flag in ("refresh_started", "refresh_in_progress")}
+        if db is not None and seller_client_id:
+            progress = storage_refresh_progress(db, company_name=company_name, seller_client_id=seller_client_id, version=STORAGE_CACHE_VERSION)
+            flags["refresh_progress"] = progress
+            flags["refresh_in_progress"] = flags["refresh_in_progress"] or bool(progress and progress["active"])
+        return flags
+
+    if db is not None and seller_client_id and not force_refresh:
+        stamp = storage_snapshot_stamp(db, company_name=company_name, seller_client_id=seller_client_id)
+        view = _storage_views.get(key)
+        if view is not None and stamp is not None and view.stamp == stamp:
+            return view, refresh_flags()
+    payload = get_storage_snapshot(company=company, force_refresh=force_refresh, db=db)
+    flags = refresh_flags(payload)
+    stamp = storage_snapshot_stamp(db, company_name=company_name, seller_client_id=seller_client_id) if db is not None and seller_client_id else None
+    with timed("storage_view"):
+        view = StorageSnapshotView(payload, stamp=stamp)
+    if stamp is not None:
+        _storage_views.set(key, view)
+    return view, flags
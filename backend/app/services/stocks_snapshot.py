@@ -4,11 +4,13 @@ import logging
 from time import perf_counter
 from datetime import date, datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
+from typing import TYPE_CHECKING
 
-import pandas as pd
 from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 
+from app.core.timing import StageTimings
+from app.core.tracing import span
 from app.models.campaign import Campaign, CampaignDailyMetric, CampaignProduct
 from app.models.organization import Organization
 from app.services.campaign_reporting import (
@@ -17,24 +19,25 @@ from app.services.campaign_reporting import (
     load_products_parallel,
     parse_money,
 )
+from app.services.columnar import ColumnTable
 from app.services.company_config import resolve_company_config
 from app.services.integrations.ozon_ads import get_running_campaigns, perf_token
 from app.services.integrations.ozon_seller import seller_analytics_sku_day
 from app.services.legacy_compat import (
+    build_stock_table_cached,
     build_stocks_rows,
-    build_stocks_rows_cached,
 )
 from app.services.shipment_history import (
-    has_unknown_shipment_city,
-    load_shipment_city_totals,
-    load_shipment_events_map,
-    load_shipment_pairs,
-    load_shipment_transit_map,
+    load_shipment_cells,
     rebuild_shipment_history_from_api,
+    shipment_cell_events,
 )
 from app.services.stock_warehouse_preferences import load_stock_warehouse_preferences
 from app.services.unit_economics import load_inactive_unit_economics_skus
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = logging.getLogger("uvicorn.error")
 MOSCOW_TZ = ZoneInfo("Europe/Moscow")
 
@@ -171,32 +174,90 @@ def _format_cache_ts(value: datetime | None, *, naive_tz) -> str | None:
     return value.isoformat()
 
 
-def _position_filter_rows(rows: list[dict], position_filter: str) -> list[dict]:
+def _position_filter_mask(table: ColumnTable, position_filter: str) -> np.ndarray:
+    import numpy as np
+
     if position_filter == "ALL":
-        return rows
-    out: list[dict] = []
-    for row in rows:
-        offer_id = str(row.get("offer_id") or "").upper()
-        is_additional = "AURA" in offer_id
-        if position_filter == "ADDITIONAL" and is_additional:
-            out.append(row)
-        if position_filter == "CORE" and not is_additional:
-            out.append(row)
-    return out
+        return np.ones(len(table), dtype=bool)
+    is_additional = table.map("offer_id", lambda value: "AURA" in str(value or "").upper(), dtype=bool)
+    return is_additional if position_filter == "ADDITIONAL" else ~is_additional
 
 
-def _assortment_filter_rows(rows: list[dict], inactive_skus: set[str], assortment_filter: str) -> list[dict]:
+def _assortment_filter_mask(table: ColumnTable, inactive_skus: set[str], assortment_filter: str) -> np.ndarray:
+    import numpy as np
+
     if assortment_filter == "ALL":
-        return rows
-    out: list[dict] = []
-    for row in rows:
-        sku = str(row.get("sku") or "").strip()
-        is_inactive = sku in inactive_skus
-        if assortment_filter == "DISCONTINUED" and is_inactive:
-            out.append(row)
-        if assortment_filter == "ACTIVE" and not is_inactive:
-            out.append(row)
-    return out
+        return np.ones(len(table), dtype=bool)
+    is_inactive = table.map("sku", lambda value: str(value or "").strip() in inactive_skus, dtype=bool)
+    return is_inactive if assortment_filter == "DISCONTINUED" else ~is_inactive
+
+
+def _is_blank(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _article_labels(table: ColumnTable) -> np.ndarray:
+    """Article per stock row; rows without one fall back to the offer id, then the SKU."""
+    source = "article" if "article" in table else ("offer_id" if "offer_id" in table else "sku")
+    text = (lambda value: "" if _is_blank(value) else str(value)) if source == "article" else str
+    labels = table.map(source, text)
+    if "sku" in table:
+        blank = table.map(source, lambda value: not text(value).strip(), dtype=bool)
+        labels[blank] = table.map("sku", str)[blank]
+    return labels
+
+
+def _first_per_group(groups: np.ndarray, values: np.ndarray, selected: np.ndarray) -> dict:
+    """First selected value per group key, in row order."""
+    import numpy as np
+
+    keys, first = np.unique(groups[selected], return_index=True)
+    return dict(zip(keys.tolist(), values[selected][first].tolist()))
+
+
+def _stock_matrices(table: ColumnTable, articles: np.ndarray) -> dict:
+    """Per (article, cluster) sums and means of the stock rows, the way the old pivot tables aggregated them.
+
+    Articles and clusters come back sorted; cells without rows hold zeros and a ``"nan"`` turnover grade.
+    """
+    import numpy as np
+
+    valid = table.map("cluster", lambda value: not _is_blank(value), dtype=bool)
+    cluster_labels = table.map("cluster", str)[valid]
+    article_index, article_pos = np.unique(articles[valid], return_inverse=True)
+    cluster_index, cluster_pos = np.unique(cluster_labels, return_inverse=True)
+    shape = (len(article_index), len(cluster_index))
+    cells = (article_pos, cluster_pos)
+
+    def column(name: str) -> np.ndarray:
+        return np.asarray(table.values(name), dtype=float)[valid]
+
+    def cell_sum(values: np.ndarray) -> np.ndarray:
+        out = np.zeros(shape, dtype=float)
+        np.add.at(out, cells, np.nan_to_num(values, nan=0.0))
+        return out
+
+    ads = column("ads_cluster")
+    ads_count = np.zeros(shape, dtype=float)
+    np.add.at(ads_count, cells, (~np.isnan(ads)).astype(float))
+    ads_sum = cell_sum(ads)
+    ads_mean = np.divide(ads_sum, ads_count, out=np.zeros(shape, dtype=float), where=ads_count > 0)
+
+    grade = np.full(shape, "nan", dtype=object)
+    grade[cells] = ""
+    flat = article_pos * len(cluster_index) + cluster_pos
+    has_grade = table.map("turnover_grade", bool, dtype=bool)[valid]
+    first_grade = _first_per_group(flat, table.map("turnover_grade", str)[valid], has_grade)
+    grade.flat[list(first_grade)] = list(first_grade.values())
+
+    return {
+        "articles": article_index.tolist(),
+        "clusters": cluster_index.tolist(),
+        "stock": cell_sum(column("available_stock_count")),
+        "transit": cell_sum(column("transit_stock_count")),
+        "ads": ads_mean,
+        "grade": grade,
+    }
 
 
 def _build_shipments_lookup(
@@ -204,15 +265,15 @@ def _build_shipments_lookup(
     *,
     company_name: str,
     db: Session | None,
-) -> tuple[set[tuple[str, str]], datetime | None]:
-    if db is None:
-        return set(), None
-    pairs, ts = load_shipment_pairs(
+) -> tuple[dict[tuple[str, str], dict], set[tuple[str, str]], datetime | None]:
+    cells = load_shipment_cells(
         db,
         company_name=company_name,
         seller_client_id=seller_client_id,
     )
-    return pairs, ts
+    pairs = {key for key, cell in cells.items() if cell["shipments_count"] > 0}
+    ts = max((cells[key]["history_updated_at"] for key in pairs if cells[key]["history_updated_at"] is not None), default=None)
+    return cells, pairs, ts
 
 
 def _parse_date(value: str | None) -> date | None:
@@ -398,6 +459,8 @@ def _build_article_drr_lookup_from_api(
 
 
 def get_stocks_snapshot(*, company: str | None = None) -> dict:
+    import pandas as pd
+
     company_name, config = resolve_company_config(company)
     seller_client_id = (config.get("seller_client_id") or "").strip()
     seller_api_key = (config.get("seller_api_key") or "").strip()
@@ -439,8 +502,10 @@ def get_stocks_workspace(
     force_refresh: bool = False,
     db: Session | None = None,
 ) -> dict:
+    import numpy as np
+
     started_at = perf_counter()
-    timings: dict[str, float] = {}
+    timings: dict[str, float] = StageTimings()
 
     def mark(key: str, checkpoint: float) -> float:
         now = perf_counter()
@@ -489,13 +554,13 @@ def get_stocks_workspace(
         }
 
     checkpoint = perf_counter()
-    base_rows, sku_count, stocks_ts = build_stocks_rows_cached(
+    stock_table, sku_count, stocks_ts = build_stock_table_cached(
         seller_client_id=seller_client_id,
         seller_api_key=seller_api_key,
         max_age_hours=0 if force_refresh else 24,
     )
     checkpoint = mark("stocks_cache_ms", checkpoint)
-    filtered_rows = _position_filter_rows(base_rows, normalized_position_filter)
+    row_mask = _position_filter_mask(stock_table, normalized_position_filter)
     if normalized_assortment_filter != "ALL":
         assortment_checkpoint = perf_counter()
         inactive_skus = load_inactive_unit_economics_skus(
@@ -503,7 +568,7 @@ def get_stocks_workspace(
             seller_client_id=seller_client_id,
             db=db,
         )
-        filtered_rows = _assortment_filter_rows(filtered_rows, inactive_skus, normalized_assortment_filter)
+        row_mask &= _assortment_filter_mask(stock_table, inactive_skus, normalized_assortment_filter)
         timings["assortment_filter_ms"] = round((perf_counter() - assortment_checkpoint) * 1000, 2)
     else:
         timings["assortment_filter_ms"] = 0
@@ -522,7 +587,7 @@ def get_stocks_workspace(
             logger.exception("stocks workspace forced shipment rebuild failed", extra={"company": company_name})
 
     checkpoint = perf_counter()
-    shipments_pairs, shipments_ts = _build_shipments_lookup(
+    shipment_cells, shipments_pairs, shipments_ts = _build_shipments_lookup(
         seller_client_id,
         company_name=company_name,
         db=db,
@@ -538,20 +603,20 @@ def get_stocks_workspace(
                 seller_api_key=seller_api_key,
             )
             timings["shipment_rebuild_ms"] = round((perf_counter() - rebuild_checkpoint) * 1000, 2)
-            shipments_pairs, shipments_ts = _build_shipments_lookup(
+            shipment_cells, shipments_pairs, shipments_ts = _build_shipments_lookup(
                 seller_client_id,
                 company_name=company_name,
                 db=db,
             )
         except Exception:
             logger.exception("stocks workspace shipment rebuild failed", extra={"company": company_name})
-            shipments_pairs, shipments_ts = set(), None
+            shipment_cells, shipments_pairs, shipments_ts = {}, set(), None
     else:
         timings.setdefault("shipment_rebuild_ms", 0)
 
     checkpoint = perf_counter()
-    df = pd.DataFrame(filtered_rows)
-    if df.empty:
+    table = stock_table if row_mask.all() else stock_table.take(np.flatnonzero(row_mask))
+    if not len(table):
         timings["dataframe_ms"] = round((perf_counter() - checkpoint) * 1000, 2)
         timings["total_ms"] = round((perf_counter() - started_at) * 1000, 2)
         logger.info(
@@ -585,28 +650,20 @@ def get_stocks_workspace(
             "rows": [],
         }
 
-    if "article" not in df.columns:
-        if "offer_id" in df.columns:
-            df["article"] = df["offer_id"].astype(str)
-        else:
-            df["article"] = df.get("sku", "").astype(str)
-    df["article"] = df["article"].fillna("").astype(str)
-    if "sku" in df.columns:
-        df.loc[df["article"].str.strip() == "", "article"] = df["sku"].astype(str)
-
+    row_articles = _article_labels(table)
     article_title_map = (
-        df.groupby("article")["title"].agg(lambda values: next((str(item) for item in values if str(item).strip()), "")).to_dict()
-        if "title" in df.columns
+        _first_per_group(row_articles, table.map("title", str), table.map("title", lambda value: bool(str(value).strip()), dtype=bool))
+        if "title" in table
         else {}
     )
     sku_article_map: dict[str, str] = {}
-    if "sku" in df.columns:
+    if "sku" in table:
+        sku_text = table.map("sku", lambda value: "" if _is_blank(value) else str(value or "").strip())
         sku_article_options: dict[str, set[str]] = {}
-        for _, item in df[["sku", "article"]].dropna().iterrows():
-            sku_text = str(item.get("sku") or "").strip()
-            article_text = str(item.get("article") or "").strip()
-            if sku_text and article_text:
-                sku_article_options.setdefault(sku_text, set()).add(article_text)
+        for sku_value, article_value in set(zip(sku_text.tolist(), row_articles.tolist())):
+            article_text = article_value.strip()
+            if sku_value and article_text:
+                sku_article_options.setdefault(sku_value, set()).add(article_text)
         sku_article_map = {
             sku: next(iter(articles))
             for sku, articles in sku_article_options.items()
@@ -631,36 +688,28 @@ def get_stocks_workspace(
             logger.exception("stocks workspace article drr lookup failed", extra={"company": company_name})
             article_metrics_map = {}
 
-    df_pivot = df.pivot_table(index="article", columns="cluster", values="available_stock_count", aggfunc="sum").sort_index()
-    df_ads = df.pivot_table(index="article", columns="cluster", values="ads_cluster", aggfunc="mean").reindex_like(df_pivot)
-    df_transit = df.pivot_table(index="article", columns="cluster", values="transit_stock_count", aggfunc="sum").reindex_like(df_pivot)
-    grade_map = df.pivot_table(
-        index="article",
-        columns="cluster",
-        values="turnover_grade",
-        aggfunc=lambda values: next((str(item) for item in values if item), ""),
-    ).reindex_like(df_pivot)
-
-    transit_lookup = load_shipment_transit_map(
-        db,
-        company_name=company_name,
-        seller_client_id=seller_client_id,
-        articles={str(article) for article in df_pivot.index.astype(str).tolist()},
-    )
+    with span("stocks.pivot", company=company_name, rows=len(table)):
+        matrices = _stock_matrices(table, row_articles)
+    article_index = matrices["articles"]
+    cluster_index = matrices["clusters"]
+
+    workspace_articles = set(article_index)
+    transit_lookup = {
+        key: cell["transit_quantity"]
+        for key, cell in shipment_cells.items()
+        if cell["transit_quantity"] and key[0] in workspace_articles
+    }
     use_supply_transit = db is not None and shipments_ts is not None
 
-    transit_for_totals = pd.DataFrame(0, index=df_pivot.index, columns=df_pivot.columns) if use_supply_transit else df_transit.fillna(0)
-    cluster_totals = df_pivot.fillna(0).sum(axis=0) + transit_for_totals.sum(axis=0)
+    cluster_sums = matrices["stock"].sum(axis=0)
+    if not use_supply_transit:
+        cluster_sums = cluster_sums + matrices["transit"].sum(axis=0)
+    cluster_totals = dict(zip(cluster_index, cluster_sums.tolist()))
     city_totals_checkpoint = perf_counter()
-    shipment_city_totals = (
-        load_shipment_city_totals(
-            db,
-            company_name=company_name,
-            seller_client_id=seller_client_id,
-        )
-        if db is not None
-        else {}
-    )
+    shipment_city_totals: dict[str, int] = {}
+    for (_article, city_key), cell in shipment_cells.items():
+        shipment_city_totals[city_key] = shipment_city_totals.get(city_key, 0) + cell["total_quantity"]
+    shipment_city_totals = {city_key: total for city_key, total in shipment_city_totals.items() if total > 0}
     timings["shipment_city_totals_ms"] = round((perf_counter() - city_totals_checkpoint) * 1000, 2)
     preferences_checkpoint = perf_counter()
     warehouse_preferences = load_stock_warehouse_preferences(
@@ -677,7 +726,7 @@ def get_stocks_workspace(
         return int(shipment_city_totals.get(city_key, 0) or 0) > 0
 
     ordered_clusters = sorted(
-        cluster_totals.index.astype(str).tolist(),
+        list(cluster_totals),
         key=lambda city: (
             0 if is_used_for_shipments(_normalize_city(str(city))) else 1,
             -int(shipment_city_totals.get(_normalize_city(str(city)), 0) or 0),
@@ -696,11 +745,11 @@ def get_stocks_workspace(
         ),
     ):
         ordered_clusters.append(_city_key_to_label(city_key))
-    if has_unknown_shipment_city(
-        db,
-        company_name=company_name,
-        seller_client_id=seller_client_id,
-    ) and "UNKNOWN" not in {_normalize_city(str(city)) for city in ordered_clusters}:
+    has_unknown_city = any(
+        city_key == "UNKNOWN" and (cell["shipments_count"] > 0 or cell["transit_quantity"] > 0)
+        for (_article, city_key), cell in shipment_cells.items()
+    )
+    if has_unknown_city and "UNKNOWN" not in {_normalize_city(str(city)) for city in ordered_clusters}:
         ordered_clusters.append("UNKNOWN")
 
     ordered_clusters = sorted(
@@ -718,63 +767,71 @@ def get_stocks_workspace(
         preferences=warehouse_preferences,
     )
 
-    df_pivot = df_pivot.reindex(columns=ordered_clusters).loc[:, lambda frame: ~frame.columns.duplicated()]
-    df_ads = df_ads.reindex(columns=ordered_clusters).loc[:, lambda frame: ~frame.columns.duplicated()]
-    df_transit = df_transit.reindex(columns=ordered_clusters).loc[:, lambda frame: ~frame.columns.duplicated()]
-    grade_map = grade_map.reindex(columns=ordered_clusters).loc[:, lambda frame: ~frame.columns.duplicated()]
-
-    stock = df_pivot.fillna(0)
-    transit = df_transit.fillna(0)
-    total_with_transit = stock + transit
-    need60 = df_ads.fillna(0) * 60.0
+    columns = list(dict.fromkeys(str(city) for city in ordered_clusters))
+    column_keys = [_normalize_city(city) for city in columns]
+    cluster_positions = {city: position for position, city in enumerate(cluster_index)}
+    source = np.array([cluster_positions.get(city, -1) for city in columns], dtype=np.intp)
+    from_data = source >= 0
+
+    def by_column(matrix: np.ndarray, fill) -> np.ndarray:
+        out = np.full((len(article_index), len(columns)), fill, dtype=matrix.dtype)
+        out[:, from_data] = matrix[:, source[from_data]]
+        return out
+
+    stock = by_column(matrices["stock"], 0.0)
+    transit = by_column(matrices["transit"], 0.0)
+    need60 = by_column(matrices["ads"], 0.0) * 60.0
+    grade_map = by_column(matrices["grade"], "nan")
+
+    article_rows = {article: position for position, article in enumerate(article_index)}
+    key_columns: dict[str, list[int]] = {}
+    for position, city_key in enumerate(column_keys):
+        key_columns.setdefault(city_key, []).append(position)
+
+    def cell_positions(pairs):
+        for (article, city_key), value in pairs:
+            row_position = article_rows.get(str(article))
+            if row_position is not None:
+                for column_position in key_columns.get(city_key, ()):
+                    yield row_position, column_position, value
 
     if use_supply_transit:
-        transit.loc[:, :] = 0
-        for article in stock.index.astype(str).tolist():
-            for city in stock.columns.astype(str).tolist():
-                city_key = _normalize_city(str(city))
-                supply_transit_qty = int(transit_lookup.get((article, city_key), 0) or 0)
-                transit.at[article, city] = supply_transit_qty
-        total_with_transit = stock + transit
+        transit[:, :] = 0
+        for row_position, column_position, qty in cell_positions(transit_lookup.items()):
+            transit[row_position, column_position] = int(qty or 0)
     elif transit_lookup:
-        for article in stock.index.astype(str).tolist():
-            for city in stock.columns.astype(str).tolist():
-                city_key = _normalize_city(str(city))
-                supply_transit_qty = int(transit_lookup.get((article, city_key), 0) or 0)
-                if supply_transit_qty > float(transit.at[article, city]):
-                    transit.at[article, city] = supply_transit_qty
-        total_with_transit = stock + transit
-
-    for column in need60.columns:
-        days = TRANSIT_DAYS_MAP.get(str(column).strip().lower(), 0)
-        if days:
-            need60[column] = need60[column] * (1.0 + (days / 60.0))
+        for row_position, column_position, qty in cell_positions(transit_lookup.items()):
+            supply_transit_qty = int(qty or 0)
+            if supply_transit_qty > transit[row_position, column_position]:
+                transit[row_position, column_position] = supply_transit_qty
+    total_with_transit = stock + transit
 
-    candidate_mask = pd.DataFrame(False, index=stock.index, columns=stock.columns)
-    for column in candidate_mask.columns:
-        city_key = _normalize_city(str(column))
-        if _is_moscow_or_spb(str(column)):
-            candidate_mask[column] = (total_with_transit[column] + float(minimum_supply)) < need60[column]
-        else:
-            candidate_mask[column] = total_with_transit[column] <= float(regional_order_min)
-        if not is_used_for_shipments(city_key):
-            candidate_mask[column] = False
+    for position, column in enumerate(columns):
+        days = TRANSIT_DAYS_MAP.get(column.strip().lower(), 0)
+        if days:
+            need60[:, position] = need60[:, position] * (1.0 + (days / 60.0))
+
+    shipped = np.zeros(stock.shape, dtype=bool)
+    for row_position, column_position, _value in cell_positions((pair, True) for pair in shipments_pairs):
+        shipped[row_position, column_position] = True
+    candidate_mask = np.zeros(stock.shape, dtype=bool)
+    for position, column in enumerate(columns):
+        if not is_used_for_shipments(column_keys[position]):
             continue
-        candidate_mask[column] = candidate_mask[column] & pd.Series(
-            [(str(article), city_key) in shipments_pairs for article in candidate_mask.index],
-            index=candidate_mask.index,
-        )
+        if _is_moscow_or_spb(column):
+            candidate_mask[:, position] = (total_with_transit[:, position] + float(minimum_supply)) < need60[:, position]
+        else:
+            candidate_mask[:, position] = total_with_transit[:, position] <= float(regional_order_min)
+        candidate_mask[:, position] &= shipped[:, position]
     checkpoint = mark("dataframe_ms", checkpoint)
 
     events_checkpoint = perf_counter()
-    shipment_events_by_cell = load_shipment_events_map(
-        db,
-        company_name=company_name,
-        seller_client_id=seller_client_id,
-        articles={str(article) for article in stock.index.astype(str).tolist()},
-        city_keys={_normalize_city(str(city)) for city in stock.columns.astype(str).tolist()},
-        per_cell_limit=6,
-    )
+    column_key_set = set(column_keys)
+    shipment_events_by_cell = {
+        key: shipment_cell_events(cell, per_cell_limit=6)
+        for key, cell in shipment_cells.items()
+        if key[0] in workspace_articles and key[1] in column_key_set
+    }
     timings["shipment_events_ms"] = round((perf_counter() - events_checkpoint) * 1000, 2)
 
     matrix_checkpoint = perf_counter()
@@ -783,15 +840,17 @@ def get_stocks_workspace(
     now_utc = datetime.utcnow()
     soon_30_cutoff = now_utc + timedelta(days=30)
     soon_60_cutoff = now_utc + timedelta(days=60)
-    for article in stock.index.astype(str).tolist():
+    stock_values, need60_values, transit_values = stock.tolist(), need60.tolist(), transit.tolist()
+    total_values, candidate_values, grade_values = total_with_transit.tolist(), candidate_mask.tolist(), grade_map.tolist()
+    for row_position, article in enumerate(article_index):
         cells: list[dict] = []
-        for city in stock.columns.astype(str).tolist():
-            city_key = _normalize_city(str(city))
-            stock_value = int(round(float(stock.at[article, city])))
-            need60_value = int(round(float(need60.at[article, city])))
-            in_transit_value = int(round(float(transit.at[article, city])))
-            total_value = int(round(float(total_with_transit.at[article, city])))
-            is_candidate = bool(candidate_mask.at[article, city])
+        for column_position, city in enumerate(columns):
+            city_key = column_keys[column_position]
+            stock_value = int(round(stock_values[row_position][column_position]))
+            need60_value = int(round(need60_values[row_position][column_position]))
+            in_transit_value = int(round(transit_values[row_position][column_position]))
+            total_value = int(round(total_values[row_position][column_position]))
+            is_candidate = candidate_values[row_position][column_position]
             shipment_meta = shipment_events_by_cell.get((article, city_key), {})
             events = shipment_meta.get("events") or []
             events_for_calc = shipment_meta.get("events_for_calc") or events
@@ -840,7 +899,7 @@ def get_stocks_workspace(
                     "need60": need60_value,
                     "in_transit": in_transit_value,
                     "total_with_transit": total_value,
-                    "turnover_grade": str(grade_map.at[article, city] or ""),
+                    "turnover_grade": grade_values[row_position][column_position],
                     "is_candidate": is_candidate,
                     "display_value": f"{stock_value} | {need60_value} | {in_transit_value}",
                     "shipment_total_qty": int(shipment_meta.get("total_quantity") or 0),
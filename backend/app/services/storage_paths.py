@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 
 REPO_ROOT = Path(__file__).resolve().parents[3]
 BACKEND_ROOT = REPO_ROOT / "backend"
-BACKEND_DATA_DIR = BACKEND_ROOT / "data"
+BACKEND_DATA_DIR = Path(os.getenv("BACKEND_DATA_DIR") or BACKEND_ROOT / "data")
 
 
 def ensure_backend_data_dir() -> Path:
@@ -0,0 +1,684 @@
+"""Staged rebuild of the storage snapshot from the seller API.
+
+The rebuild runs in four stages:
+
+``stocks``
+    Product list, SKU → offer map and cluster stocks, with the average daily sales per (city, article).
+``order_ids``
+    Every supply order id.
+``lots``
+    Orders fetched in batches of 50 and turned into lots, one per bundle item. Lots are stored per order in
+    ``storage_order_lots`` and reused while the order's signature is unchanged. Bundle items are stored in
+    ``storage_bundle_items``.
+``assemble``
+    Current stock matched to the newest lots per (city, article), and the snapshot payload.
+
+The output of each finished stage is checkpointed on its ``storage_refresh_runs`` row, and order lots are
+committed window by window, so a retried job resumes where the failed attempt stopped. The row also carries the
+current stage and its progress for the storage snapshot response. Requests are fanned out to a thread pool
+(``STORAGE_REFRESH_CONCURRENCY``) and paced by one rate limiter (``STORAGE_REFRESH_RPS``); the seller client
+still backs off on 429s.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core.request_context import submit_with_context
+from app.db.bootstrap import create_all
+from app.models.storage import StorageBundleItems, StorageOrderLots, StorageRefreshRun
+from app.services.integrations.ozon_seller import (
+    seller_analytics_stocks,
+    seller_product_info_list,
+    seller_product_list,
+    seller_rate_limit,
+)
+from app.services.integrations.rate_limit import RateLimiter
+from app.services.legacy_compat import FEE_FREE_DAYS, FEE_RUB_PER_LITER_DAY, item_volume_liters_for_store
+from app.services.shipment_history import (
+    _bundle_items,
+    _chunked,
+    _city_from_macrolocal_cluster,
+    _completed_order_ids,
+    _orders_by_ids,
+    _parse_dt,
+    normalize_city,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+STORAGE_REFRESH_CONCURRENCY = int(os.getenv("STORAGE_REFRESH_CONCURRENCY", "4"))
+STORAGE_REFRESH_RPS = float(os.getenv("STORAGE_REFRESH_RPS", "20"))
+# An unfinished run younger than this is resumed from its checkpoints; an older one starts over.
+RESUME_MAX_AGE = timedelta(hours=6)
+# A running row not touched for this long belongs to an attempt that died.
+STALE_RUN_AFTER = timedelta(minutes=30)
+RUN_HISTORY_DAYS = 30
+ORDER_WINDOW = 200
+
+RUN_RUNNING = "running"
+RUN_SUCCEEDED = "succeeded"
+RUN_FAILED = "failed"
+
+_MOSCOW_ALIASES = {
+    "НОГИНСК", "NOGINSK",
+    "ГРИВНО", "GRIVNO", "GRIVNA",
+    "ПУШКИНО", "PUSHKINO",
+    "ХОРУГВИНО", "HORUGVINO",
+    "ПЕТРОВСКОЕ", "PETROVSKOE",
+    "СОФЬИНО", "SOFINO",
+}
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except Exception:
+        return 0.0
+
+
+def _split_tokens(value: str) -> list[str]:
+    text = str(value or "").upper()
+    for char in ",.;:/\\-_()[]{}":
+        text = text.replace(char, " ")
+    return [token for token in text.split() if token and not token.isdigit()]
+
+
+def _stock_city_key(warehouse_city: str, stock_city_keys: set[str]) -> str:
+    """Stock city key a storage warehouse belongs to: exact key, Moscow-area alias, then most shared tokens."""
+    warehouse_key = normalize_city(warehouse_city)
+    if warehouse_key in stock_city_keys:
+        return warehouse_key
+    tokens = set(_split_tokens(warehouse_city) + _split_tokens(warehouse_key))
+    moscow_key = next((key for key in stock_city_keys if any(alias in str(key).upper() for alias in ("МОСК", "MOSCOW", "MOSKVA"))), None)
+    if moscow_key and tokens & _MOSCOW_ALIASES:
+        return moscow_key
+    best_key, best_score = "", 0
+    for stock_key in stock_city_keys:
+        score = len(tokens & set(_split_tokens(stock_key)))
+        if score > best_score:
+            best_key, best_score = stock_key, score
+    return best_key if best_key else warehouse_key
+
+
+def _order_signature(order: dict) -> str:
+    """Hash of the order fields its lots depend on; unchanged signature means the cached lots still hold."""
+    dropoff = order.get("drop_off_warehouse") or {}
+    supplies = []
+    for supply in order.get("supplies") or []:
+        if not isinstance(supply, dict):
+            continue
+        storage = supply.get("storage_warehouse") or {}
+        supplies.append(
+            [
+                str(supply.get("bundle_id") or "").strip(),
+                str(supply.get("state") or "").strip().upper(),
+                str(storage.get("warehouse_id") or "").strip(),
+                str(storage.get("name") or "").strip(),
+                str(storage.get("arrival_date") or "").strip(),
+            ]
+        )
+    supplies.sort()
+    parts = [
+        str(order.get(field) or "").strip() for field in ("order_id", "order_number", "created_date", "state_updated_date")
+    ] + [str(dropoff.get("warehouse_id") or "").strip(), supplies]
+    return hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _lots_to_json(lots: list[dict]) -> str:
+    return json.dumps([{**lot, "arrival_dt": lot["arrival_dt"].isoformat()} for lot in lots], ensure_ascii=False)
+
+
+def _lots_from_json(raw: str | None) -> list[dict]:
+    try:
+        lots = json.loads(raw or "[]")
+    except ValueError:
+        return []
+    out = []
+    for lot in lots if isinstance(lots, list) else []:
+        arrival_dt = _parse_dt(lot.get("arrival_dt")) if isinstance(lot, dict) else None
+        if arrival_dt is not None:
+            out.append({**lot, "arrival_dt": arrival_dt})
+    return out
+
+
+def _fan_out(pool: Executor, fn: Callable[[Any], Any], items: Iterable[Any]) -> list[Any]:
+    """``fn`` over ``items`` on the pool, results in input order; the first error is raised."""
+    futures = [submit_with_context(pool, fn, item) for item in items]
+    return [future.result() for future in futures]
+
+
+class _Progress:
+    """Stage, progress counters and checkpoints of one run row; written from the pipeline's own thread only."""
+
+    def __init__(self, db: Session, run: StorageRefreshRun) -> None:
+        self.db = db
+        self.run = run
+        self.checkpoints: dict[str, Any] = json.loads(run.checkpoint_json or "{}")
+        self.stages: dict[str, dict] = json.loads(run.stages_json or "{}")
+
+    def update(self, done: int, total: int | None = None) -> None:
+        self.run.stage_done = int(done)
+        if total is not None:
+            self.run.stage_total = int(total)
+        self.run.updated_at = datetime.utcnow()
+        self.db.commit()
+
+    def stage(self, name: str, build: Callable[[], Any], *, checkpoint: bool = True) -> Any:
+        if checkpoint and name in self.checkpoints:
+            return self.checkpoints[name]
+        self.run.stage = name
+        self.update(0, 0)
+        started_at = perf_counter()
+        output = build()
+        items = self.run.stage_total or (len(output) if isinstance(output, list) else 0)
+        self.stages[name] = {"ms": round((perf_counter() - started_at) * 1000, 2), "items": items}
+        self.run.stages_json = json.dumps(self.stages)
+        if checkpoint:
+            self.checkpoints[name] = output
+            self.run.checkpoint_json = json.dumps(self.checkpoints, ensure_ascii=False)
+        self.update(self.run.stage_total)
+        return output
+
+
+class _LotBuilder:
+    """Builds the lots of one supply order; shared by the pool's threads, with bundle items memoised per run."""
+
+    def __init__(self, *, seller_client_id: str, seller_api_key: str) -> None:
+        self.seller_client_id = seller_client_id
+        self.seller_api_key = seller_api_key
+        self.bundles: dict[tuple[str, str, str], list[dict]] = {}
+        self.fetched: dict[tuple[str, str, str], list[dict]] = {}
+        self._cluster_cities: dict[tuple[str, str], str] = {}
+        self._lock = Lock()
+
+    def _bundle(self, key: tuple[str, str, str], storage_id: str) -> list[dict]:
+        with self._lock:
+            items = self.bundles.get(key)
+        if items is None:
+            items = _bundle_items(
+                bundle_id=key[0],
+                dropoff_warehouse_id=key[1],
+                storage_warehouse_id=storage_id,
+                seller_client_id=self.seller_client_id,
+                seller_api_key=self.seller_api_key,
+            )
+            with self._lock:
+                self.bundles[key] = self.fetched[key] = items
+        return items
+
+    def _cluster_city(self, cluster_id: str, items: list[dict]) -> str:
+        sku = next((str(item.get("sku")).strip() for item in items if str(item.get("sku") or "").strip().isdigit()), "")
+        key = (cluster_id, sku)
+        with self._lock:
+            city = self._cluster_cities.get(key)
+        if city is None:
+            city = _city_from_macrolocal_cluster(
+                macrolocal_cluster_id=cluster_id,
+                items=items,
+                seller_client_id=self.seller_client_id,
+                seller_api_key=self.seller_api_key,
+            )
+            with self._lock:
+                self._cluster_cities[key] = city
+        return city
+
+    def order_lots(self, order: dict) -> list[dict] | None:
+        """Lots of ``order``, or ``None`` when a bundle could not be read (the order is retried next run)."""
+        try:
+            return self._order_lots(order)
+        except Exception:
+            logger.warning("storage lots for order %s failed", order.get("order_id"), exc_info=True)
+            return None
+
+    def _order_lots(self, order: dict) -> list[dict]:
+        order_id = str(order.get("order_id") or "").strip()
+        dropoff_id = str((order.get("drop_off_warehouse") or {}).get("warehouse_id") or "")
+        out: list[dict] = []
+        for supply in order.get("supplies") or []:
+            if not isinstance(supply, dict):
+                continue
+            storage = supply.get("storage_warehouse") or {}
+            storage_id = str(storage.get("warehouse_id") or "")
+            storage_name = str(storage.get("name") or "").strip()
+            bundle_id = str(supply.get("bundle_id") or "").strip()
+            cluster_id = str(supply.get("macrolocal_cluster_id") or "").strip()
+            if not bundle_id:
+                continue
+            arrival_dt = _parse_dt(storage.get("arrival_date")) or _parse_dt(order.get("state_updated_date")) or _parse_dt(order.get("created_date"))
+            if arrival_dt is None:
+                continue
+            items = self._bundle((bundle_id, dropoff_id, storage_id or cluster_id), storage_id)
+            if storage_id:
+                city = storage_name or storage_id
+                city_key = normalize_city(city)
+            else:
+                city = city_key = self._cluster_city(cluster_id, items)
+            for item in items:
+                article = str(item.get("offer_id") or "").strip()
+                qty = _to_float(item.get("quantity", 0))
+                if not article or qty <= 0:
+                    continue
+                out.append(
+                    {
+                        "city": city,
+                        "city_key": city_key,
+                        "storage_warehouse_name": storage_name or city,
+                        "storage_warehouse_id": storage_id,
+                        "article": article,
+                        "order_id": order_id,
+                        "order_number": str(order.get("order_number") or ""),
+                        "bundle_id": bundle_id,
+                        "arrival_dt": arrival_dt,
+                        "qty": qty,
+                    }
+                )
+        return out
+
+
+def _product_ids(*, seller_client_id: str, seller_api_key: str, visibility: str) -> list[str]:
+    out: list[str] = []
+    last_id = ""
+    seen_last_ids: set[str] = set()
+    for _ in range(1000):
+        result = seller_product_list(
+            last_id=last_id, limit=1000, visibility=visibility, client_id=seller_client_id, api_key=seller_api_key
+        ).get("result") or {}
+        items = result.get("items") or []
+        if not items:
+            break
+        out.extend(str(item["product_id"]) for item in items if item.get("product_id") is not None)
+        next_last_id = str(result.get("last_id") or "")
+        if not next_last_id or next_last_id in seen_last_ids:
+            break
+        seen_last_ids.add(next_last_id)
+        last_id = next_last_id
+    return list(dict.fromkeys(out))
+
+
+def _stocks_stage(pool: Executor, progress: _Progress, *, seller_client_id: str, seller_api_key: str) -> dict:
+    credentials = {"client_id": seller_client_id, "api_key": seller_api_key}
+    product_ids = _product_ids(seller_client_id=seller_client_id, seller_api_key=seller_api_key, visibility="ALL") or _product_ids(
+        seller_client_id=seller_client_id, seller_api_key=seller_api_key, visibility="VISIBLE"
+    )
+    sku_offer: dict[str, str] = {}
+    for response in _fan_out(pool, lambda batch: seller_product_info_list(product_ids=batch, **credentials), _chunked(product_ids, 1000)):
+        for item in response.get("items") or []:
+            if item.get("sku") is not None:
+                sku_offer[str(item["sku"])] = str(item.get("offer_id") or "").strip()
+    skus = [sku for sku in sku_offer if sku.isdigit()]
+    progress.update(0, len(skus))
+
+    # (city key, article) -> [available, ads sum, rows]; batches are merged in request order.
+    totals: dict[tuple[str, str], list[float]] = {}
+    city_labels: dict[str, str] = {}
+    batches = list(_chunked(skus, 200))
+    for position, response in enumerate(_fan_out(pool, lambda batch: seller_analytics_stocks(skus=batch, **credentials), batches)):
+        for item in response.get("items") or []:
+            sku = str(item.get("sku") or "").strip()
+            if not sku:
+                continue
+            article = str(item.get("offer_id") or "").strip() or sku_offer.get(sku, "") or sku
+            city_raw = str(item.get("cluster_name") or "").strip() or (str(item["cluster_id"]) if item.get("cluster_id") is not None else "UNKNOWN")
+            city = normalize_city(city_raw)
+            city_labels.setdefault(city, city_raw or city)
+            entry = totals.setdefault((city, article), [0.0, 0.0, 0])
+            entry[0] += _to_float(item.get("available_stock_count", 0))
+            entry[1] += _to_float(item.get("ads_cluster", 0))
+            entry[2] += 1
+        progress.update(min(len(skus), (position + 1) * 200))
+    return {
+        "sku_count": len(skus),
+        "city_labels": city_labels,
+        "stock": [[city, article, qty, ads / max(1, count)] for (city, article), (qty, ads, count) in totals.items()],
+    }
+
+
+def _store_bundles(db: Session, seller_client_id: str, bundles: dict[tuple[str, str, str], list[dict]]) -> None:
+    for (bundle_id, dropoff_id, storage_key), items in bundles.items():
+        # An empty bundle may still be filling; it is fetched again next time.
+        if not items:
+            continue
+        db.add(
+            StorageBundleItems(
+                seller_client_id=seller_client_id,
+                bundle_id=bundle_id,
+                dropoff_warehouse_id=dropoff_id,
+                storage_key=storage_key,
+                items_json=json.dumps(items, ensure_ascii=False),
+            )
+        )
+
+
+def _load_bundles(db: Session, seller_client_id: str, bundle_ids: set[str]) -> dict[tuple[str, str, str], list[dict]]:
+    out: dict[tuple[str, str, str], list[dict]] = {}
+    for chunk in _chunked(sorted(bundle_ids), 500):
+        rows = (
+            db.query(StorageBundleItems.bundle_id, StorageBundleItems.dropoff_warehouse_id, StorageBundleItems.storage_key, StorageBundleItems.items_json)
+            .filter(StorageBundleItems.seller_client_id == seller_client_id)
+            .filter(StorageBundleItems.bundle_id.in_(chunk))
+            .all()
+        )
+        for bundle_id, dropoff_id, storage_key, items_json in rows:
+            out[(bundle_id, dropoff_id, storage_key)] = json.loads(items_json or "[]")
+    return out
+
+
+def _supply_bundle_ids(order: dict) -> set[str]:
+    return {
+        str(supply.get("bundle_id") or "").strip()
+        for supply in order.get("supplies") or []
+        if isinstance(supply, dict) and str(supply.get("bundle_id") or "").strip()
+    }
+
+
+def _lots_stage(
+    db: Session,
+    pool: Executor,
+    progress: _Progress,
+    *,
+    order_ids: list[str],
+    seller_client_id: str,
+    seller_api_key: str,
+) -> list[str]:
+    """Fetch orders, rebuild the lots of changed ones and return the ids of every order the API returned."""
+    signatures = dict(
+        db.query(StorageOrderLots.order_id, StorageOrderLots.signature).filter(StorageOrderLots.seller_client_id == seller_client_id).all()
+    )
+    builder = _LotBuilder(seller_client_id=seller_client_id, seller_api_key=seller_api_key)
+    active: dict[str, None] = {}
+    active_bundles: set[str] = set()
+    failed = 0
+    progress.update(0, len(order_ids))
+    for window_start in range(0, len(order_ids), ORDER_WINDOW):
+        window = order_ids[window_start : window_start + ORDER_WINDOW]
+        orders: dict[str, dict] = {}
+        for fetched in _fan_out(
+            pool,
+            lambda batch: _orders_by_ids(order_ids=batch, seller_client_id=seller_client_id, seller_api_key=seller_api_key),
+            _chunked(window, 50),
+        ):
+            for order in fetched:
+                order_id = str(order.get("order_id") or "").strip()
+                if order_id:
+                    orders[order_id] = order
+        changed = []
+        for order_id, order in orders.items():
+            active[order_id] = None
+            active_bundles |= _supply_bundle_ids(order)
+            signature = _order_signature(order)
+            if signatures.get(order_id) != signature:
+                changed.append((order_id, order, signature))
+
+        builder.bundles = _load_bundles(db, seller_client_id, set().union(*(_supply_bundle_ids(order) for _id, order, _sig in changed)))
+        builder.fetched = {}
+        built = _fan_out(pool, lambda item: builder.order_lots(item[1]), changed)
+        rows = {
+            row.order_id: row
+            for row in db.query(StorageOrderLots)
+            .filter(StorageOrderLots.seller_client_id == seller_client_id)
+            .filter(StorageOrderLots.order_id.in_([order_id for order_id, _order, _sig in changed]))
+        }
+        for (order_id, _order, signature), lots in zip(changed, built):
+            if lots is None:
+                # Previously stored lots, if any, stay in use until the order builds again.
+                failed += 1
+                continue
+            row = rows.get(order_id)
+            if row is None:
+                row = StorageOrderLots(seller_client_id=seller_client_id, order_id=order_id)
+                db.add(row)
+            row.signature = signature
+            row.lots_json = _lots_to_json(lots)
+            signatures[order_id] = signature
+        _store_bundles(db, seller_client_id, builder.fetched)
+        progress.update(window_start + len(window))
+
+    stale_orders = [order_id for order_id in signatures if order_id not in active]
+    for chunk in _chunked(stale_orders, 500):
+        db.query(StorageOrderLots).filter(StorageOrderLots.seller_client_id == seller_client_id).filter(
+            StorageOrderLots.order_id.in_(chunk)
+        ).delete(synchronize_session=False)
+    stale_bundles = [
+        row_id
+        for row_id, bundle_id in db.query(StorageBundleItems.id, StorageBundleItems.bundle_id).filter(
+            StorageBundleItems.seller_client_id == seller_client_id
+        )
+        if bundle_id not in active_bundles
+    ]
+    for chunk in _chunked(stale_bundles, 500):
+        db.query(StorageBundleItems).filter(StorageBundleItems.id.in_(chunk)).delete(synchronize_session=False)
+    if failed:
+        logger.warning("storage lots: %s of %s orders failed to build", failed, len(active))
+    db.commit()
+    return list(active)
+
+
+def _load_lots(db: Session, seller_client_id: str, order_ids: list[str]) -> dict[tuple[str, str], list[dict]]:
+    """Lots grouped by (city_key, article), oldest arrival first, groups in order of first appearance."""
+    stored: dict[str, str] = {}
+    for chunk in _chunked(order_ids, 500):
+        stored.update(
+            db.query(StorageOrderLots.order_id, StorageOrderLots.lots_json)
+            .filter(StorageOrderLots.seller_client_id == seller_client_id)
+            .filter(StorageOrderLots.order_id.in_(chunk))
+            .all()
+        )
+    lots: dict[tuple[str, str], list[dict]] = {}
+    for order_id in order_ids:
+        for lot in _lots_from_json(stored.get(order_id)):
+            lots.setdefault((str(lot.get("city_key") or ""), str(lot.get("article") or "")), []).append(lot)
+    for group in lots.values():
+        group.sort(key=lambda lot: lot["arrival_dt"])
+    return lots
+
+
+def assemble_storage_payload(
+    *,
+    stocks: dict,
+    order_count: int,
+    lots_map: dict[tuple[str, str], list[dict]],
+    seller_client_id: str,
+    now: datetime,
+) -> dict:
+    """Snapshot payload: current stock attributed to the newest lots first, and the fee state of every lot."""
+    city_labels: dict[str, str] = stocks.get("city_labels") or {}
+    stock_by_city_article: dict[tuple[str, str], float] = {}
+    sales_rate: dict[tuple[str, str], float] = {}
+    for city, article, qty, sales_per_day in stocks.get("stock") or []:
+        key = (str(city), str(article))
+        stock_by_city_article[key] = stock_by_city_article.get(key, 0.0) + _to_float(qty)
+        sales_rate[key] = _to_float(sales_per_day)
+    stock_city_keys = set(city_labels)
+    volumes = item_volume_liters_for_store(seller_client_id)
+
+    all_lots = [lot for lots in lots_map.values() for lot in lots]
+    lots_by_stock_city: dict[tuple[str, str], list[dict]] = {}
+    for lot in all_lots:
+        article = str(lot.get("article", ""))
+        if not article:
+            continue
+        lot["_mapped_city_key"] = _stock_city_key(str(lot.get("city", "")), stock_city_keys)
+        lots_by_stock_city.setdefault((lot["_mapped_city_key"], article), []).append(lot)
+    for group in lots_by_stock_city.values():
+        group.sort(key=lambda item: item["arrival_dt"])
+
+    remaining: dict[tuple[str, str, str, str, str], float] = {}
+    unknown_stock_rows: list[dict] = []
+    for (city_key, article), group in lots_by_stock_city.items():
+        need = max(0.0, _to_float(stock_by_city_article.get((city_key, article), 0.0)))
+        for lot in reversed(group):
+            if need <= 0:
+                break
+            take = min(max(0.0, _to_float(lot.get("qty", 0))), need)
+            if take <= 0:
+                continue
+            key = (str(city_key), article, str(lot.get("order_id", "")), str(lot.get("bundle_id", "")), lot["arrival_dt"].date().isoformat())
+            remaining[key] = remaining.get(key, 0.0) + take
+            need -= take
+        if need > 0:
+            unknown_stock_rows.append(
+                {
+                    "city": city_labels.get(city_key, city_key),
+                    "article": article,
+                    "unknown_qty_not_matched_to_shipments": int(round(need)),
+                }
+            )
+
+    lot_rows: list[dict] = []
+    for lot in all_lots:
+        article = str(lot.get("article", ""))
+        if not article:
+            continue
+        arrival_date = lot["arrival_dt"].date().isoformat()
+        fee_from_dt = lot["arrival_dt"] + timedelta(days=FEE_FREE_DAYS)
+        city_key = str(lot.get("_mapped_city_key", normalize_city(str(lot.get("city", "")))))
+        qty_remaining = int(round(remaining.get((city_key, article, str(lot.get("order_id", "")), str(lot.get("bundle_id", "")), arrival_date), 0.0)))
+        days_until_fee = int(max(0, (fee_from_dt.date() - now.date()).days))
+        volume = volumes.get(article)
+        fee = round(_to_float(volume) * qty_remaining * FEE_RUB_PER_LITER_DAY, 2)
+        lot_rows.append(
+            {
+                "city": city_labels.get(city_key, city_key),
+                "shipment_city": str(lot.get("city", "")),
+                "storage_warehouse_name": str(lot.get("storage_warehouse_name", "")),
+                "storage_warehouse_id": str(lot.get("storage_warehouse_id", "")),
+                "article": article,
+                "item_volume_liters": volume,
+                "city_key": city_key,
+                "sales_per_day": round(_to_float(sales_rate.get((city_key, article), 0.0)), 6),
+                "shipped_qty": int(round(_to_float(lot.get("qty", 0)))),
+                "qty_remaining_from_lot": qty_remaining,
+                "in_current_stock": bool(qty_remaining > 0),
+                "arrival_date": arrival_date,
+                "fee_from_date": fee_from_dt.date().isoformat(),
+                "days_until_fee_start": days_until_fee,
+                "fee_started": days_until_fee == 0,
+                "order_id": str(lot.get("order_id", "")),
+                "order_number": str(lot.get("order_number", "")),
+                "bundle_id": str(lot.get("bundle_id", "")),
+                "daily_storage_fee_rub": fee if days_until_fee == 0 else 0.0,
+                "projected_storage_fee_rub": fee,
+            }
+        )
+    return {
+        "lot_rows": lot_rows,
+        "unknown_stock_rows": unknown_stock_rows,
+        "sku_count": int(stocks.get("sku_count") or 0),
+        "order_count": order_count,
+        "ship_lot_count": len(all_lots),
+        "stock_articles_count": len(stock_by_city_article),
+    }
+
+
+def _latest_run(db: Session, *, company_name: str, seller_client_id: str, version: str) -> StorageRefreshRun | None:
+    return (
+        db.query(StorageRefreshRun)
+        .filter(StorageRefreshRun.company_name == company_name)
+        .filter(StorageRefreshRun.seller_client_id == seller_client_id)
+        .filter(StorageRefreshRun.version == version)
+        .order_by(StorageRefreshRun.id.desc())
+        .first()
+    )
+
+
+def _open_run(db: Session, *, company_name: str, seller_client_id: str, version: str) -> StorageRefreshRun:
+    """The unfinished recent run to resume, or a new one."""
+    now = datetime.utcnow()
+    db.query(StorageRefreshRun).filter(StorageRefreshRun.finished_at < now - timedelta(days=RUN_HISTORY_DAYS)).delete(synchronize_session=False)
+    run = _latest_run(db, company_name=company_name, seller_client_id=seller_client_id, version=version)
+    if run is not None and run.status != RUN_SUCCEEDED and run.started_at >= now - RESUME_MAX_AGE:
+        run.status = RUN_RUNNING
+        run.attempts += 1
+        run.last_error = None
+    else:
+        run = StorageRefreshRun(company_name=company_name, seller_client_id=seller_client_id, version=version, status=RUN_RUNNING)
+        db.add(run)
+    db.commit()
+    return run
+
+
+def run_storage_pipeline(
+    db: Session,
+    *,
+    company_name: str,
+    seller_client_id: str,
+    seller_api_key: str,
+    version: str,
+    now: datetime | None = None,
+) -> tuple[dict, datetime]:
+    """Rebuild the storage payload, resuming the previous attempt's finished stages when there is one."""
+    create_all()
+    run = _open_run(db, company_name=company_name, seller_client_id=seller_client_id, version=version)
+    progress = _Progress(db, run)
+    built_at = now or datetime.now()
+    limiter = RateLimiter(STORAGE_REFRESH_RPS)
+    try:
+        with seller_rate_limit(limiter), ThreadPoolExecutor(max_workers=max(1, STORAGE_REFRESH_CONCURRENCY)) as pool:
+            stocks = progress.stage(
+                "stocks", lambda: _stocks_stage(pool, progress, seller_client_id=seller_client_id, seller_api_key=seller_api_key)
+            )
+            order_ids = progress.stage(
+                "order_ids",
+                lambda: _completed_order_ids(seller_client_id=seller_client_id, seller_api_key=seller_api_key, max_pages=2000),
+            )
+            active_order_ids = progress.stage(
+                "lots",
+                lambda: _lots_stage(
+                    db, pool, progress, order_ids=order_ids, seller_client_id=seller_client_id, seller_api_key=seller_api_key
+                ),
+            )
+            payload = progress.stage(
+                "assemble",
+                lambda: assemble_storage_payload(
+                    stocks=stocks,
+                    order_count=len(order_ids),
+                    lots_map=_load_lots(db, seller_client_id, active_order_ids),
+                    seller_client_id=seller_client_id,
+                    now=built_at,
+                ),
+                checkpoint=False,
+            )
+    except BaseException as exc:
+        db.rollback()
+        run.status = RUN_FAILED
+        run.last_error = f"{type(exc).__name__}: {exc}"[-2000:]
+        db.commit()
+        raise
+    run.status = RUN_SUCCEEDED
+    run.stage = ""
+    run.checkpoint_json = "{}"
+    run.finished_at = datetime.utcnow()
+    db.commit()
+    return payload, built_at
+
+
+def storage_refresh_progress(db: Session, *, company_name: str, seller_client_id: str, version: str) -> dict | None:
+    """Latest rebuild run for the storage snapshot response; ``active`` is false once a running row goes stale."""
+    create_all()
+    run = _latest_run(db, company_name=company_name, seller_client_id=seller_client_id, version=version)
+    if run is None:
+        return None
+    return {
+        "status": run.status,
+        "active": run.status == RUN_RUNNING and run.updated_at >= datetime.utcnow() - STALE_RUN_AFTER,
+        "stage": run.stage,
+        "done": run.stage_done,
+        "total": run.stage_total,
+        "attempts": run.attempts,
+        "stages": json.loads(run.stages_json or "{}"),
+        "last_error": run.last_error,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "updated_at": run.updated_at.isoformat() if run.updated_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+    }
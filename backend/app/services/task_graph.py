@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable
+
+from app.core.request_context import submit_with_context
+from app.core.timing import StageTimings
+
+
+@dataclass(frozen=True)
+class GraphTask:
+    name: str
+    func: Callable[..., Any]
+    deps: tuple[str, ...] = ()
+
+
+def run_task_graph(tasks: list[GraphTask], *, max_workers: int = 4) -> tuple[dict[str, Any], dict[str, float]]:
+    """Run each task once its dependencies finish, passing their results as keyword arguments.
+
+    Returns the results by task name and a ``<name>_ms`` timing per task. The first failing
+    task cancels everything not yet started and its exception is re-raised.
+    """
+    by_name = {task.name: task for task in tasks}
+    if len(by_name) != len(tasks):
+        raise ValueError("Duplicate task names in graph")
+    for task in tasks:
+        missing = [dep for dep in task.deps if dep not in by_name]
+        if missing:
+            raise ValueError(f"Task {task.name} depends on unknown tasks: {', '.join(missing)}")
+
+    results: dict[str, Any] = {}
+    timings: dict[str, float] = StageTimings()
+
+    def run(task: GraphTask) -> Any:
+        started_at = perf_counter()
+        try:
+            return task.func(**{dep: results[dep] for dep in task.deps})
+        finally:
+            timings[f"{task.name}_ms"] = round((perf_counter() - started_at) * 1000, 2)
+
+    pending = dict(by_name)
+    running: dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        while pending or running:
+            ready = [name for name, task in pending.items() if all(dep in results for dep in task.deps)]
+            for name in ready:
+                running[submit_with_context(executor, run, pending.pop(name))] = name
+            if not running:
+                raise ValueError(f"Task graph has a dependency cycle: {', '.join(sorted(pending))}")
+            done, _not_done = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    for other in running:
+                        other.cancel()
+                    raise error
+                results[name] = future.result()
+    return results, timings
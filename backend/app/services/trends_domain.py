@@ -3,8 +3,7 @@ from __future__ import annotations
 from collections import Counter, defaultdict
 from datetime import date, datetime
 import re
-
-import pandas as pd
+from typing import TYPE_CHECKING
 
 from app.services.trends_external import load_external_suggestion_signals
 from app.services.trends_scoring import (
@@ -24,6 +23,9 @@ from app.services.trends_scoring import (
 )
 from app.services.trends_sources import build_date_span, load_catalog, load_query_signals, load_sales_history
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 QUERY_NOISE_TOKENS = {
     "buy", "benefits", "recipe", "youtube", "ozon", "wb", "wildberries", "price",
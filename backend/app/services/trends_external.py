@@ -3,8 +3,6 @@ from __future__ import annotations
 from functools import lru_cache
 import re
 
-import requests
-
 
 SUGGEST_ENDPOINT = "https://suggestqueries.google.com/complete/search"
 TRANSLIT_MAP = {
@@ -35,6 +33,8 @@ def _transliterate(value: str) -> str:
 
 @lru_cache(maxsize=256)
 def _fetch_google_suggestions(term: str, hl: str, ds: str) -> tuple[str, ...]:
+    import requests
+
     params = {"client": "firefox", "hl": hl, "q": _normalize_text(term)}
     if ds:
         params["ds"] = ds
@@ -65,6 +65,36 @@ def _load_cached_snapshot_from_db(
         return None
 
 
+def get_trends_snapshot_version(
+    *,
+    company: str | None,
+    date_from: str,
+    date_to: str,
+    horizon: str = "1-3 months",
+    search_filter: str = "",
+    db: Session,
+) -> str | None:
+    """``updated_at`` of the DB-cached snapshot for these parameters, without loading the payload."""
+    create_all()
+    from app.models.trends import TrendsSnapshotCache
+
+    company_name, config = resolve_company_config(company)
+    seller_client_id = (config.get("seller_client_id") or "").strip() or None
+    updated_at = (
+        db.query(TrendsSnapshotCache.updated_at)
+        .filter(TrendsSnapshotCache.company_name == str(company_name or ""))
+        .filter(TrendsSnapshotCache.seller_client_id == str(seller_client_id or ""))
+        .filter(TrendsSnapshotCache.date_from == str(date_from))
+        .filter(TrendsSnapshotCache.date_to == str(date_to))
+        .filter(TrendsSnapshotCache.horizon == str(horizon))
+        .filter(TrendsSnapshotCache.search_filter == str(search_filter).strip().lower())
+        .order_by(TrendsSnapshotCache.updated_at.desc())
+        .limit(1)
+        .scalar()
+    )
+    return updated_at.isoformat() if updated_at else None
+
+
 def _save_cached_snapshot_to_db(
     db: Session,
     *,
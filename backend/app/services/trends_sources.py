@@ -1,12 +1,11 @@
 from __future__ import annotations
 
 from datetime import date
-from functools import lru_cache
 import os
 import re
+from typing import TYPE_CHECKING
 
-import pandas as pd
-
+from app.services.cache import TTLCache
 from app.services.integrations.ozon_seller import (
     seller_analytics_data,
     seller_product_info_list,
@@ -14,16 +13,29 @@ from app.services.integrations.ozon_seller import (
     seller_product_queries_details,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 ENABLE_QUERY_SIGNALS = os.getenv("TRENDS_ENABLE_QUERY_SIGNALS", "0").strip().lower() in {"1", "true", "yes"}
 
+_catalog_cache = TTLCache("trends.catalog", ttl_seconds=60 * 60, max_entries=32, max_bytes=128 * 1024 * 1024)
+_sales_history_cache = TTLCache("trends.sales_history", ttl_seconds=30 * 60, max_entries=64, max_bytes=128 * 1024 * 1024)
+_query_signals_cache = TTLCache("trends.query_signals", ttl_seconds=30 * 60, max_entries=64, max_bytes=32 * 1024 * 1024)
+
 
 def _normalize_text(value: str) -> str:
     return re.sub(r"\s+", " ", str(value or "").strip())
 
 
-@lru_cache(maxsize=32)
 def _load_catalog_cached(seller_client_id: str | None, seller_api_key: str | None) -> tuple[dict, ...]:
+    return _catalog_cache.get_or_load(
+        (seller_client_id, seller_api_key),
+        lambda: _fetch_catalog(seller_client_id, seller_api_key),
+    )
+
+
+def _fetch_catalog(seller_client_id: str | None, seller_api_key: str | None) -> tuple[dict, ...]:
     product_ids: list[str] = []
     last_id = ""
     seen_last_ids: set[str] = set()
@@ -79,18 +91,31 @@ def load_catalog(
     seller_client_id: str | None,
     seller_api_key: str | None,
 ) -> pd.DataFrame:
+    import pandas as pd
+
     df = pd.DataFrame(list(_load_catalog_cached(seller_client_id, seller_api_key)))
     if df.empty:
         return pd.DataFrame(columns=["sku", "product_id", "title", "offer_id"])
     return df.drop_duplicates(subset=["sku"]).copy()
 
 
-@lru_cache(maxsize=64)
 def _load_sales_history_cached(
     date_from: str,
     date_to: str,
     seller_client_id: str | None,
     seller_api_key: str | None,
+) -> tuple[dict, ...]:
+    return _sales_history_cache.get_or_load(
+        (date_from, date_to, seller_client_id, seller_api_key),
+        lambda: _fetch_sales_history(date_from, date_to, seller_client_id, seller_api_key),
+    )
+
+
+def _fetch_sales_history(
+    date_from: str,
+    date_to: str,
+    seller_client_id: str | None,
+    seller_api_key: str | None,
 ) -> tuple[dict, ...]:
     rows: list[dict] = []
     offset = 0
@@ -133,6 +158,8 @@ def load_sales_history(
     seller_client_id: str | None,
     seller_api_key: str | None,
 ) -> pd.DataFrame:
+    import pandas as pd
+
     df = pd.DataFrame(list(_load_sales_history_cached(date_from, date_to, seller_client_id, seller_api_key)))
     if df.empty:
         return pd.DataFrame(columns=["sku", "day", "revenue", "ordered_units"])
@@ -178,13 +205,25 @@ def _extract_query_row(raw: dict, sku: str) -> dict | None:
     }
 
 
-@lru_cache(maxsize=64)
 def _load_query_signals_cached(
     date_from: str,
     date_to: str,
     skus: tuple[str, ...],
     seller_client_id: str | None,
     seller_api_key: str | None,
+) -> tuple[dict, ...]:
+    return _query_signals_cache.get_or_load(
+        (date_from, date_to, tuple(skus), seller_client_id, seller_api_key),
+        lambda: _fetch_query_signals(date_from, date_to, tuple(skus), seller_client_id, seller_api_key),
+    )
+
+
+def _fetch_query_signals(
+    date_from: str,
+    date_to: str,
+    skus: tuple[str, ...],
+    seller_client_id: str | None,
+    seller_api_key: str | None,
 ) -> tuple[dict, ...]:
     if not ENABLE_QUERY_SIGNALS:
         return tuple()
@@ -236,6 +275,8 @@ def load_query_signals(
     seller_client_id: str | None,
     seller_api_key: str | None,
 ) -> pd.DataFrame:
+    import pandas as pd
+
     df = pd.DataFrame(list(_load_query_signals_cached(date_from, date_to, skus, seller_client_id, seller_api_key)))
     if df.empty:
         return pd.DataFrame(columns=["sku", "query", "searches", "growth", "revenue"])
@@ -2,9 +2,8 @@ from __future__ import annotations
 
 from io import StringIO
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
-import requests
 from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
 
@@ -18,6 +17,9 @@ from app.services.integrations.ozon_seller import (
 )
 from app.services.storage_paths import backend_data_path, legacy_root_path
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 UNIT_ECON_SOURCES = [
     {
@@ -149,6 +151,8 @@ def _get_unit_econ_products_load_path(company_name: str | None = None, seller_cl
 
 
 def _load_unit_cost_overrides(path: Path) -> pd.DataFrame:
+    import pandas as pd
+
     try:
         df = pd.read_csv(path, dtype={"sku": str})
     except Exception:
@@ -200,6 +204,8 @@ def _ensure_unit_economics_schema(db: Session) -> None:
 
 
 def _load_unit_cost_overrides_from_db(db: Session, *, company_name: str, seller_client_id: str | None) -> pd.DataFrame:
+    import pandas as pd
+
     _ensure_unit_economics_schema(db)
     from app.models.unit_economics import UnitEconomicsOverride
 
@@ -233,6 +239,8 @@ def load_inactive_unit_economics_skus(
     seller_client_id: str | None,
     db: Session | None = None,
 ) -> set[str]:
+    import pandas as pd
+
     company, _config = resolve_company_config(company_name)
     overrides = pd.DataFrame(columns=["sku", "is_active"])
     if db is not None:
@@ -303,6 +311,9 @@ def _normalize_header(text: str) -> str:
 
 
 def _load_unit_costs(sheet_id: str, gid: str) -> pd.DataFrame:
+    import pandas as pd
+    import requests
+
     response = requests.get(_sheet_csv_url(sheet_id, gid), timeout=30)
     response.raise_for_status()
     raw = pd.read_csv(StringIO(response.content.decode("utf-8-sig", errors="replace")), header=None, dtype=str).fillna("")
@@ -342,6 +353,8 @@ def _load_unit_costs(sheet_id: str, gid: str) -> pd.DataFrame:
 
 
 def load_effective_unit_costs(company_name: str | None, seller_client_id: str | None = None, db: Session | None = None) -> pd.DataFrame:
+    import pandas as pd
+
     config = get_unit_econ_sheet_config(company_name=company_name, seller_client_id=seller_client_id)
     if not config:
         return pd.DataFrame(columns=["sku", "sheet_name", "tea_cost", "package_cost", "label_cost", "packing_cost", "is_active"])
@@ -407,6 +420,8 @@ def _load_saved_unit_cost_overrides(
 
 
 def _load_sales_by_sku_day_rows(date_from: str, date_to: str, *, seller_client_id: str | None, seller_api_key: str | None) -> pd.DataFrame:
+    import pandas as pd
+
     rows: list[dict] = []
     offset = 0
     limit = 1000
@@ -446,6 +461,8 @@ def _load_sales_by_sku_day_rows(date_from: str, date_to: str, *, seller_client_i
 
 
 def _load_sales_by_sku(date_from: str, date_to: str, *, seller_client_id: str | None, seller_api_key: str | None) -> pd.DataFrame:
+    import pandas as pd
+
     df = _load_sales_by_sku_day_rows(date_from, date_to, seller_client_id=seller_client_id, seller_api_key=seller_api_key)
     if df.empty:
         return pd.DataFrame(columns=["sku", "name", "quantity", "revenue", "sale"])
@@ -519,6 +536,8 @@ def _load_finance_period_costs(date_from: str, date_to: str, *, seller_client_id
 
 
 def _apply_unit_econ_costs(sales_df: pd.DataFrame, costs_df: pd.DataFrame, finance_costs: dict[str, float]) -> pd.DataFrame:
+    import pandas as pd
+
     if sales_df.empty:
         return pd.DataFrame()
     total_units = float(pd.to_numeric(sales_df["quantity"], errors="coerce").fillna(0).sum())
@@ -567,6 +586,8 @@ def _apply_unit_econ_costs(sales_df: pd.DataFrame, costs_df: pd.DataFrame, finan
 
 
 def _build_day_sales(raw_sales_df: pd.DataFrame) -> pd.DataFrame:
+    import pandas as pd
+
     if raw_sales_df.empty:
         return pd.DataFrame()
     day_sales_df = raw_sales_df.groupby(["day", "sku"], as_index=False).agg(
@@ -625,6 +646,8 @@ def _load_sku_product_map(*, seller_client_id: str, seller_api_key: str) -> dict
 
 
 def get_unit_economics_summary(*, company: str | None, date_from: str, date_to: str, db: Session | None = None) -> dict:
+    import pandas as pd
+
     company_name, config = resolve_company_config(company)
     seller_client_id = (config.get("seller_client_id") or "").strip() or None
     seller_api_key = (config.get("seller_api_key") or "").strip() or None
@@ -695,6 +718,8 @@ def get_unit_economics_summary(*, company: str | None, date_from: str, date_to:
 
 
 def get_unit_economics_products(*, company: str | None, date_from: str, date_to: str, db: Session | None = None) -> dict:
+    import pandas as pd
+
     company_name, config = resolve_company_config(company)
     seller_client_id = (config.get("seller_client_id") or "").strip() or None
     seller_api_key = (config.get("seller_api_key") or "").strip() or None
@@ -752,6 +777,8 @@ def get_unit_economics_products(*, company: str | None, date_from: str, date_to:
 
 
 def update_unit_economics_products(*, company: str | None, rows: list[dict], db: Session | None = None) -> dict:
+    import pandas as pd
+
     company_name, config = resolve_company_config(company)
     seller_client_id = (config.get("seller_client_id") or "").strip() or None
     path = get_unit_econ_products_path(company_name=company_name, seller_client_id=seller_client_id)
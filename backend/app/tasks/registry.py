@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.services.job_queue import DEFAULT_MAX_ATTEMPTS, DEFAULT_TIMEOUT_SECONDS
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    name: str
+    func: Callable[..., Any]
+    timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+
+
+def _refresh_daily_caches() -> None:
+    from app.services.shipment_history_scheduler import refresh_stocks_and_shipment_history_for_all_companies
+
+    refresh_stocks_and_shipment_history_for_all_companies()
+
+
+def _send_finance_reports() -> None:
+    from app.services.finance_telegram import send_yesterday_finance_reports
+
+    send_yesterday_finance_reports()
+
+
+def _run_auto_bids(dry_run: bool = False, send_telegram: bool = True) -> dict:
+    from app.services.auto_bids import run_auto_bids_for_yesterday
+
+    decisions = run_auto_bids_for_yesterday(dry_run=dry_run, send_telegram=send_telegram)
+    return {"decisions": len(decisions)}
+
+
+def _collect_campaign_hourly() -> dict:
+    from app.services.campaign_hourly import collect_campaign_hourly_snapshots_for_all_companies
+
+    return {"snapshots": collect_campaign_hourly_snapshots_for_all_companies()}
+
+
+def _compact_campaign_hourly() -> dict:
+    from app.services.campaign_hourly import compact_campaign_hourly_snapshots_now
+
+    return compact_campaign_hourly_snapshots_now()
+
+
+def _ingest_fbo_postings() -> dict:
+    from app.services.fbo_postings import ingest_fbo_postings_for_all_companies
+
+    return {"postings": ingest_fbo_postings_for_all_companies()}
+
+
+def _recheck_fbo_posting_statuses() -> dict:
+    from app.services.fbo_postings import recheck_fbo_posting_statuses_for_all_companies
+
+    return {"postings": recheck_fbo_posting_statuses_for_all_companies()}
+
+
+def _refresh_perf_tokens() -> dict:
+    from app.services.perf_tokens import refresh_expiring_perf_tokens
+
+    return {"refreshed": refresh_expiring_perf_tokens()}
+
+
+def _train_raw_archive_dictionaries() -> dict:
+    from app.services.raw_archive import train_missing_dictionaries_now
+
+    return {"trained": train_missing_dictionaries_now()}
+
+
+def _refresh_storage(company_name: str, cache_version: str) -> dict:
+    from app.services.storage_snapshot import refresh_storage_snapshot
+
+    return refresh_storage_snapshot(company_name=company_name, cache_version=cache_version)
+
+
+# Handlers import their services lazily so the API process can enqueue without loading them.
+TASKS: dict[str, TaskSpec] = {
+    spec.name: spec
+    for spec in [
+        TaskSpec("daily_caches.refresh", _refresh_daily_caches, timeout_seconds=3 * 60 * 60, max_attempts=2),
+        TaskSpec("finance_telegram.send", _send_finance_reports, timeout_seconds=30 * 60, max_attempts=2),
+        # Bids are not idempotent across a partial run, so a failed attempt is not retried.
+        TaskSpec("auto_bids.run", _run_auto_bids, timeout_seconds=60 * 60, max_attempts=1),
+        TaskSpec("campaign_hourly.collect", _collect_campaign_hourly, timeout_seconds=45 * 60, max_attempts=2),
+        TaskSpec("campaign_hourly.retention", _compact_campaign_hourly, timeout_seconds=60 * 60, max_attempts=2),
+        TaskSpec("fbo_postings.ingest", _ingest_fbo_postings, timeout_seconds=30 * 60, max_attempts=2),
+        TaskSpec("fbo_postings.recheck", _recheck_fbo_posting_statuses, timeout_seconds=30 * 60, max_attempts=2),
+        TaskSpec("perf_tokens.refresh", _refresh_perf_tokens, timeout_seconds=5 * 60, max_attempts=1),
+        TaskSpec("raw_archive.train_dictionaries", _train_raw_archive_dictionaries, timeout_seconds=30 * 60, max_attempts=1),
+        TaskSpec("storage.refresh", _refresh_storage, timeout_seconds=60 * 60, max_attempts=2),
+    ]
+}
+
+
+def get_task(name: str) -> TaskSpec:
+    try:
+        return TASKS[name]
+    except KeyError as exc:
+        raise ValueError(f"Unknown job kind: {name}") from exc
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+
+def _env_flag(name: str, default: str = "1") -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def daily_at(hour: int) -> Callable[[datetime], datetime]:
+    def next_run(now: datetime) -> datetime:
+        target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+        if now >= target:
+            target += timedelta(days=1)
+        return target
+
+    return next_run
+
+
+def hourly_at(minute: int) -> Callable[[datetime], datetime]:
+    def next_run(now: datetime) -> datetime:
+        target = now.replace(minute=0, second=0, microsecond=0) + timedelta(minutes=max(0, minute))
+        while target <= now:
+            target += timedelta(hours=1)
+        return target
+
+    return next_run
+
+
+def every(minutes: int) -> Callable[[datetime], datetime]:
+    step = timedelta(minutes=max(1, minutes))
+
+    def next_run(now: datetime) -> datetime:
+        epoch = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        elapsed = now - epoch
+        return epoch + step * (elapsed // step + 1)
+
+    return next_run
+
+
+@dataclass(frozen=True)
+class ScheduleSpec:
+    task: str
+    next_run: Callable[[datetime], datetime]
+    enabled: bool = True
+    run_on_start: bool = False
+
+
+def build_schedules() -> list[ScheduleSpec]:
+    """Periodic jobs enqueued by the worker, in local time of ``TZ``."""
+    return [
+        ScheduleSpec("daily_caches.refresh", daily_at(5)),
+        ScheduleSpec("finance_telegram.send", daily_at(8)),
+        ScheduleSpec(
+            "auto_bids.run",
+            daily_at(_env_int("AUTO_BIDS_HOUR", 8)),
+            enabled=_env_flag("AUTO_BIDS_ENABLED"),
+        ),
+        ScheduleSpec(
+            "campaign_hourly.collect",
+            hourly_at(_env_int("CAMPAIGN_HOURLY_DELAY_MINUTES", 10)),
+            enabled=_env_flag("CAMPAIGN_HOURLY_ENABLED"),
+        ),
+        ScheduleSpec(
+            "campaign_hourly.retention",
+            daily_at(_env_int("CAMPAIGN_HOURLY_RETENTION_HOUR", 3)),
+            enabled=_env_flag("CAMPAIGN_HOURLY_RETENTION_ENABLED"),
+        ),
+        ScheduleSpec(
+            "fbo_postings.ingest",
+            every(_env_int("FBO_POSTINGS_INTERVAL_MINUTES", 10)),
+            enabled=_env_flag("FBO_POSTINGS_ENABLED"),
+            run_on_start=True,
+        ),
+        ScheduleSpec(
+            "fbo_postings.recheck",
+            hourly_at(_env_int("FBO_POSTINGS_RECHECK_MINUTE", 40)),
+            enabled=_env_flag("FBO_POSTINGS_ENABLED"),
+        ),
+        ScheduleSpec("perf_tokens.refresh", every(5), run_on_start=True),
+        ScheduleSpec("raw_archive.train_dictionaries", daily_at(_env_int("RAW_ARCHIVE_TRAIN_HOUR", 4))),
+    ]
@@ -0,0 +1,324 @@
+"""Background job worker.
+
+Run with ``python -m app.workers.worker`` from ``backend/``. The worker enqueues the periodic
+schedules, claims jobs from the ``background_jobs`` table and runs each one in a child process
+so a job can be killed when it exceeds its timeout.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from multiprocessing.connection import Connection
+from zoneinfo import ZoneInfo
+
+from app.core.config import get_settings
+from app.core.request_context import request_labels
+from app.core.timing import collect_timings, instrument_engine
+from app.core.tracing import instrument_engine_tracing, setup_tracing, shutdown_tracing, span
+from app.db.bootstrap import create_all
+from app.db.session import SessionLocal, engine
+from app.services.job_queue import (
+    claim_next_job,
+    complete_job,
+    enqueue_job,
+    fail_job,
+    job_payload,
+    last_enqueued_at,
+    release_job,
+    requeue_stale_jobs,
+)
+from app.services.leases import acquire_lease, release_lease
+from app.services.raw_archive_replay import ensure_inline_payloads_migrated
+from app.tasks.registry import TASKS, get_task
+from app.tasks.schedules import ScheduleSpec, build_schedules
+
+logger = logging.getLogger("uvicorn.error")
+
+STALE_CHECK_INTERVAL_SECONDS = 60
+SCHEDULER_LEASE = "worker.scheduler"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def run_job(kind: str, payload: dict):
+    spec = get_task(kind)
+    return spec.func(**payload)
+
+
+def _child_main(kind: str, payload: dict, conn: Connection) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    instrument_engine(engine)
+    setup_tracing("ozon-ads-worker")
+    instrument_engine_tracing(engine)
+    try:
+        with request_labels(company=str(payload.get("company_name") or ""), route=f"job {kind}"):
+            with collect_timings() as timings, span(f"job {kind}", job_kind=kind):
+                result = run_job(kind, payload)
+            logger.info("job timing %s", kind, extra={"kind": kind, **timings.summary()})
+        conn.send(("ok", result))
+    except BaseException:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        shutdown_tracing()
+        conn.close()
+
+
+@dataclass
+class _RunningJob:
+    job_id: int
+    kind: str
+    process: multiprocessing.process.BaseProcess
+    conn: Connection
+    deadline: float
+
+
+class Worker:
+    def __init__(
+        self,
+        *,
+        concurrency: int | None = None,
+        poll_seconds: float | None = None,
+        schedules: list[ScheduleSpec] | None = None,
+    ) -> None:
+        settings = get_settings()
+        try:
+            self.tz = ZoneInfo(settings.timezone)
+        except Exception:
+            logger.exception("invalid timezone for worker", extra={"timezone": settings.timezone})
+            self.tz = ZoneInfo("Europe/Moscow")
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = max(1, concurrency or _env_int("WORKER_CONCURRENCY", 2))
+        self.poll_seconds = max(0.2, poll_seconds or float(_env_int("WORKER_POLL_SECONDS", 2)))
+        self.shutdown_grace_seconds = _env_int("WORKER_SHUTDOWN_GRACE_SECONDS", 30)
+        self.schedules = [item for item in (schedules if schedules is not None else build_schedules()) if item.enabled]
+        self.context = multiprocessing.get_context("spawn")
+        self.running: dict[int, _RunningJob] = {}
+        self.stopping = False
+        self.lease_seconds = max(10, _env_int("WORKER_LEADER_LEASE_SECONDS", 60))
+        self.is_leader = False
+        self._next_due: dict[str, datetime] = {}
+        self._next_stale_check = 0.0
+        self._next_lease_renewal = 0.0
+
+    def stop(self, *_args) -> None:
+        self.stopping = True
+
+    def _init_schedules(self, db) -> None:
+        """Pick up the schedules after gaining leadership.
+
+        Slots that fell inside the lease window may have been missed by a previous leader that died,
+        so they are enqueued now unless a job of that kind was already created since the slot.
+        """
+        now = datetime.now(self.tz)
+        lookback = now - timedelta(seconds=self.lease_seconds * 2)
+        for schedule in self.schedules:
+            missed_slot = schedule.next_run(lookback)
+            if schedule.run_on_start:
+                next_due = now
+            elif missed_slot <= now:
+                enqueued_at = last_enqueued_at(db, schedule.task)
+                slot_utc = missed_slot.astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+                next_due = missed_slot if enqueued_at is None or enqueued_at < slot_utc else schedule.next_run(now)
+            else:
+                next_due = missed_slot
+            self._next_due[schedule.task] = next_due
+            logger.info(
+                "worker schedule registered",
+                extra={"task": schedule.task, "next_run": self._next_due[schedule.task].isoformat()},
+            )
+
+    def update_leadership(self) -> None:
+        now = time.monotonic()
+        if now < self._next_lease_renewal:
+            return
+        db = SessionLocal()
+        try:
+            leader = acquire_lease(db, SCHEDULER_LEASE, holder=self.worker_id, ttl_seconds=self.lease_seconds)
+            if leader and not self.is_leader:
+                logger.info("worker became scheduler leader", extra={"worker_id": self.worker_id})
+                self._init_schedules(db)
+            elif not leader and self.is_leader:
+                logger.warning("worker lost scheduler leadership", extra={"worker_id": self.worker_id})
+                self._next_due.clear()
+            self.is_leader = leader
+        except Exception:
+            db.rollback()
+            logger.exception("scheduler lease renewal failed")
+            self.is_leader = False
+            self._next_due.clear()
+        finally:
+            db.close()
+        self._next_lease_renewal = now + self.lease_seconds / 3
+
+    def enqueue_due_schedules(self, now: datetime | None = None) -> None:
+        if not self.is_leader:
+            return
+        now = now or datetime.now(self.tz)
+        due = [schedule for schedule in self.schedules if self._next_due.get(schedule.task, now) <= now]
+        if not due:
+            return
+        db = SessionLocal()
+        try:
+            for schedule in due:
+                slot = self._next_due.get(schedule.task, now)
+                spec = get_task(schedule.task)
+                enqueue_job(
+                    db,
+                    spec.name,
+                    {},
+                    dedup_key=f"{spec.name}@{slot.isoformat()}",
+                    timeout_seconds=spec.timeout_seconds,
+                    max_attempts=spec.max_attempts,
+                )
+                self._next_due[schedule.task] = schedule.next_run(now)
+        finally:
+            db.close()
+
+    def _start_job(self, job_id: int, kind: str, payload: dict, timeout_seconds: int) -> None:
+        parent_conn, child_conn = self.context.Pipe(duplex=False)
+        process = self.context.Process(
+            target=_child_main,
+            args=(kind, payload, child_conn),
+            name=f"job-{job_id}-{kind}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.running[job_id] = _RunningJob(
+            job_id=job_id,
+            kind=kind,
+            process=process,
+            conn=parent_conn,
+            deadline=time.monotonic() + timeout_seconds,
+        )
+        logger.info("job started", extra={"job_id": job_id, "kind": kind, "pid": process.pid})
+
+    def claim_jobs(self) -> None:
+        db = SessionLocal()
+        try:
+            while len(self.running) < self.concurrency and not self.stopping:
+                job = claim_next_job(db, worker_id=self.worker_id, kinds=sorted(TASKS))
+                if job is None:
+                    return
+                self._start_job(job.id, job.kind, job_payload(job), job.timeout_seconds)
+        finally:
+            db.close()
+
+    def reap_jobs(self) -> None:
+        if not self.running:
+            return
+        now = time.monotonic()
+        db = SessionLocal()
+        try:
+            for job_id, item in list(self.running.items()):
+                if item.conn.poll():
+                    try:
+                        status, value = item.conn.recv()
+                    except EOFError:
+                        status, value = "error", "job process exited without a result"
+                    item.process.join(timeout=5)
+                elif not item.process.is_alive():
+                    status, value = "error", f"job process exited with code {item.process.exitcode}"
+                elif now > item.deadline:
+                    item.process.terminate()
+                    item.process.join(timeout=5)
+                    status, value = "error", "job timed out"
+                else:
+                    continue
+                item.conn.close()
+                self.running.pop(job_id, None)
+                if status == "ok":
+                    complete_job(db, job_id, value)
+                    logger.info("job succeeded", extra={"job_id": job_id, "kind": item.kind})
+                else:
+                    fail_job(db, job_id, str(value))
+        finally:
+            db.close()
+
+    def check_stale_jobs(self) -> None:
+        now = time.monotonic()
+        if now < self._next_stale_check:
+            return
+        self._next_stale_check = now + STALE_CHECK_INTERVAL_SECONDS
+        db = SessionLocal()
+        try:
+            stale = requeue_stale_jobs(db)
+            if stale:
+                logger.warning("stale jobs re-queued", extra={"jobs": stale})
+        finally:
+            db.close()
+
+    def tick(self) -> None:
+        self.reap_jobs()
+        self.check_stale_jobs()
+        self.update_leadership()
+        self.enqueue_due_schedules()
+        self.claim_jobs()
+
+    def _shutdown(self) -> None:
+        if self.is_leader:
+            db = SessionLocal()
+            try:
+                release_lease(db, SCHEDULER_LEASE, holder=self.worker_id)
+            except Exception:
+                logger.exception("scheduler lease release failed")
+            finally:
+                db.close()
+            self.is_leader = False
+        deadline = time.monotonic() + self.shutdown_grace_seconds
+        while self.running and time.monotonic() < deadline:
+            self.reap_jobs()
+            time.sleep(0.5)
+        if not self.running:
+            return
+        db = SessionLocal()
+        try:
+            for job_id, item in list(self.running.items()):
+                item.process.terminate()
+                item.process.join(timeout=5)
+                item.conn.close()
+                release_job(db, job_id)
+                logger.info("job released on shutdown", extra={"job_id": job_id, "kind": item.kind})
+            self.running.clear()
+        finally:
+            db.close()
+
+    def run_forever(self) -> None:
+        create_all()
+        ensure_inline_payloads_migrated(engine)
+        logger.info(
+            "worker started",
+            extra={"worker_id": self.worker_id, "concurrency": self.concurrency, "schedules": len(self.schedules)},
+        )
+        while not self.stopping:
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("worker tick failed")
+            time.sleep(self.poll_seconds)
+        self._shutdown()
+        logger.info("worker stopped", extra={"worker_id": self.worker_id})
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    worker = Worker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
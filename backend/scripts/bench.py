@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = REPO_ROOT / "backend"
+
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.devtools.benchmarks import (
+    BENCHMARKS,
+    DEFAULT_BASELINE,
+    SCALES,
+    find_regressions,
+    load_baseline,
+    results_as_dicts,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmark the report and workspace builders on synthetic data. Exits with 1 when a "
+            "result regresses beyond the threshold against the baseline."
+        )
+    )
+    parser.add_argument("--scale", action="append", choices=sorted(SCALES), help="Scale to run (repeatable, default: all)")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="Benchmark to run (repeatable, default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark after one warm-up")
+    parser.add_argument("--budget", type=float, default=20.0, help="Seconds of timed runs per benchmark; slow ones run fewer times")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run (peak is reported as 0)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown as a fraction of the baseline time")
+    parser.add_argument("--memory-threshold", type=float, default=None, help="Allowed peak memory growth (default: --threshold)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write these results to the baseline instead of comparing")
+    parser.add_argument("--json", default="", help="Also write the results to this file")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    baseline_path = Path(args.baseline)
+    baseline = load_baseline(baseline_path)
+
+    print(f"{'benchmark':<42} {'best ms':>10} {'median ms':>10} {'peak KiB':>10} {'vs base':>8}")
+
+    def report(result) -> None:
+        base_ms = float((baseline.get(result.key) or {}).get("best_ms") or 0.0)
+        delta = f"{(result.best_ms / base_ms - 1) * 100:+.0f}%" if base_ms else "new"
+        print(f"{result.key:<42} {result.best_ms:>10.1f} {result.median_ms:>10.1f} {result.peak_kib:>10.0f} {delta:>8}", flush=True)
+
+    results = run_benchmarks(scales=args.scale, names=args.only, repeat=args.repeat, budget_s=args.budget, memory=not args.no_memory, progress=report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results_as_dicts(results), indent=2) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        save_baseline(results, baseline_path)
+        print(f"baseline updated: {baseline_path}")
+        return 0
+
+    regressions = find_regressions(results, baseline, threshold=args.threshold, memory_threshold=args.memory_threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = REPO_ROOT / "backend"
+
+sys.path.insert(0, str(BACKEND_ROOT))
+
+import uvicorn
+
+from app.devtools.loadtest import BackendProcess, default_mix, render_markdown, run_load_test, write_report
+from app.devtools.ozon_stub import StubConfig, StubDataset, create_stub_app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Load-test the API against the local Ozon stand-in at rising concurrency and write a JSON + Markdown "
+            "report (latency percentiles, throughput, upstream calls per request, RSS)."
+        )
+    )
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrent users per step")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per step")
+    parser.add_argument("--label", default="", help="Name for this run, e.g. the version or commit")
+    parser.add_argument("--out", default=str(BACKEND_ROOT / "data" / "loadtest"), help="Report directory")
+    parser.add_argument("--compare", default="", help="Earlier report JSON to show deltas against")
+    parser.add_argument("--database-url", default="", help="Database for the backend (default: fresh SQLite file)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the backend")
+    parser.add_argument("--with-worker", action="store_true", help="Also start the job worker (storage refreshes, schedules)")
+    parser.add_argument("--backend-url", default="", help="Use an already running backend instead of starting one")
+    parser.add_argument("--backend-pid", type=int, action="append", default=[], help="PID to sample RSS from when --backend-url is used (repeatable)")
+    parser.add_argument("--stub-url", default="", help="Use an already running Ozon stub instead of starting one")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="Stub latency per Ozon call")
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--throttle-probability", type=float, default=0.0)
+    parser.add_argument("--campaigns", type=int, default=30)
+    parser.add_argument("--skus", type=int, default=600)
+    parser.add_argument("--supply-orders", type=int, default=200)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--end-date", default="", help="Last day with stub data, YYYY-MM-DD (default: today)")
+    return parser.parse_args()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_stub(config: StubConfig) -> tuple[str, uvicorn.Server]:
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(create_stub_app(config), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="ozon-stub", daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if not server.started:
+        raise RuntimeError("Ozon stub did not start")
+    return f"http://127.0.0.1:{port}", server
+
+
+def main() -> int:
+    args = parse_args()
+    levels = [int(item) for item in args.concurrency.split(",") if item.strip()]
+    end_date = date.fromisoformat(args.end_date) if args.end_date else date.today()
+    dataset = StubDataset(
+        campaigns=args.campaigns,
+        skus=args.skus,
+        supply_orders=args.supply_orders,
+        days=args.days,
+        end_date=end_date,
+    )
+    previous = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+
+    stub_server = None
+    stub_url = args.stub_url
+    if not stub_url:
+        stub_url, stub_server = _start_stub(
+            StubConfig(
+                latency_ms=args.latency_ms,
+                jitter_ms=args.jitter_ms,
+                throttle_probability=args.throttle_probability,
+                dataset=dataset,
+            )
+        )
+
+    mix = default_mix(end_date=end_date, campaign_id=str(dataset.campaign_id(0)), sku=str(dataset.sku(0)))
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        backend = None
+        base_url, pids = args.backend_url, args.backend_pid
+        if not base_url:
+            backend = BackendProcess(
+                port=_free_port(),
+                stub_url=stub_url,
+                database_url=args.database_url or f"sqlite:///{Path(workdir) / 'loadtest.db'}",
+                data_dir=str(Path(workdir) / "data"),
+                workers=args.workers,
+                with_worker=args.with_worker,
+            ).start()
+            base_url, pids = backend.url, backend.pids
+        try:
+            report = run_load_test(
+                base_url=base_url,
+                mix=mix,
+                concurrency_levels=levels,
+                duration_s=args.duration,
+                stub_url=stub_url,
+                pids=pids,
+                label=args.label,
+            )
+        finally:
+            if backend is not None:
+                backend.stop()
+            if stub_server is not None:
+                stub_server.should_exit = True
+
+    json_path, md_path = write_report(report, Path(args.out), previous)
+    print(render_markdown(report, previous))
+    print(f"report: {json_path}\nsummary: {md_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
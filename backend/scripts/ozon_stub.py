@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = REPO_ROOT / "backend"
+
+sys.path.insert(0, str(BACKEND_ROOT))
+
+import uvicorn
+
+from app.devtools.ozon_stub import StubConfig, StubDataset, create_stub_app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Local stand-in for the Ozon Performance and Seller APIs. Start the backend with "
+            "OZON_PERF_BASE and OZON_SELLER_BASE pointing at it."
+        )
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--mode", choices=["synthetic", "record", "replay"], default="synthetic")
+    parser.add_argument("--recordings", default=str(BACKEND_ROOT / "data" / "ozon_recordings"), help="Directory for record/replay mode")
+    parser.add_argument("--strict", action="store_true", help="Replay: answer 404 instead of synthetic data when no recording matches")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency, uniform in [0, jitter]")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Answer every N-th request with 429")
+    parser.add_argument("--throttle-probability", type=float, default=0.0, help="Answer requests with 429 at this probability")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429")
+    parser.add_argument("--campaigns", type=int, default=20)
+    parser.add_argument("--skus", type=int, default=500)
+    parser.add_argument("--supply-orders", type=int, default=200)
+    parser.add_argument("--days", type=int, default=60, help="Days of history ending today (or --end-date)")
+    parser.add_argument("--postings-per-day", type=int, default=50)
+    parser.add_argument("--end-date", default="", help="Last day with data, YYYY-MM-DD")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    dataset = StubDataset(
+        campaigns=args.campaigns,
+        skus=args.skus,
+        supply_orders=args.supply_orders,
+        days=args.days,
+        postings_per_day=args.postings_per_day,
+        seed=args.seed,
+        end_date=date.fromisoformat(args.end_date) if args.end_date else date.today(),
+    )
+    config = StubConfig(
+        mode=args.mode,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_every=args.throttle_every,
+        throttle_probability=args.throttle_probability,
+        retry_after_seconds=args.retry_after,
+        recordings_dir=args.recordings if args.mode != "synthetic" else "",
+        strict=args.strict,
+        seed=args.seed,
+        dataset=dataset,
+    )
+    uvicorn.run(create_stub_app(config), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = REPO_ROOT / "backend"
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.db.bootstrap import create_all
+from app.db.session import SessionLocal, engine
+from app.services.leases import acquire_lease, current_lease_holder, release_lease
+from app.services.raw_archive import archive_stats, recompress_payloads, train_dictionary, train_missing_dictionaries
+from app.services.raw_archive_replay import REPLAYERS, migrate_inline_payloads, replay_payloads
+
+MIGRATE_LEASE = "raw_archive.migrate"
+MIGRATE_LEASE_SECONDS = 300
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Inspect the raw payload archive and rebuild typed columns from it")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="payload counts and raw vs stored bytes per kind")
+    train = commands.add_parser("train", help="train a new dictionary for a kind and recompress its payloads with it")
+    train.add_argument("--kind", required=True)
+    replay = commands.add_parser("replay", help="recompute typed columns from archived payloads")
+    replay.add_argument("--kind", action="append", choices=sorted(REPLAYERS), help="repeatable; default: every kind")
+    commands.add_parser(
+        "migrate",
+        help="move the inline JSON columns of a database created before the archive into it (run before starting the new version)",
+    )
+    args = parser.parse_args()
+
+    create_all()
+    db = SessionLocal()
+    try:
+        if args.command == "stats":
+            print(json.dumps(archive_stats(db), ensure_ascii=False, indent=2))
+        elif args.command == "train":
+            dictionary_id = train_dictionary(db, args.kind)
+            db.commit()
+            if dictionary_id is None:
+                print(f"not_enough_samples kind={args.kind}")
+                return 1
+            print(f"dictionary_trained kind={args.kind} id={dictionary_id} recompressed={recompress_payloads(db, args.kind)}")
+        elif args.command == "migrate":
+            return migrate(db)
+        else:
+            for kind in args.kind or sorted(REPLAYERS):
+                print(f"replayed kind={kind} rows_changed={replay_payloads(db, kind)}")
+        return 0
+    finally:
+        db.close()
+
+
+def migrate(db: Session) -> int:
+    # The lease keeps a second run (another deploy hook or operator) from racing this one.
+    holder = f"{socket.gethostname()}:{os.getpid()}"
+    if not acquire_lease(db, MIGRATE_LEASE, holder=holder, ttl_seconds=MIGRATE_LEASE_SECONDS):
+        print(f"migration_running holder={current_lease_holder(db, MIGRATE_LEASE)}")
+        return 1
+
+    def keep_alive() -> None:
+        if not acquire_lease(db, MIGRATE_LEASE, holder=holder, ttl_seconds=MIGRATE_LEASE_SECONDS):
+            raise RuntimeError(f"Lost the {MIGRATE_LEASE} lease")
+
+    try:
+        print(f"migrated payloads_moved={migrate_inline_payloads(engine, keep_alive=keep_alive)}")
+        # Moved payloads are stored without a dictionary; later writes of a kind use the one trained here.
+        for kind, dictionary_id in train_missing_dictionaries(db).items():
+            print(f"dictionary_trained kind={kind} id={dictionary_id}")
+    finally:
+        release_lease(db, MIGRATE_LEASE, holder=holder)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
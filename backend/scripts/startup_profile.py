@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = REPO_ROOT / "backend"
+
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.devtools.startup import (
+    LAZY_MODULES,
+    STARTUP_BUDGET_MS,
+    STARTUP_MODULE,
+    eager_heavy_imports,
+    module_ms,
+    profile_imports,
+    slowest,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Profile the imports of the API start (python -X importtime). Exits with 1 when the start is over "
+            "budget or pulls in a library that must be imported lazily."
+        )
+    )
+    parser.add_argument("--module", default=STARTUP_MODULE, help="Module to import (default: app.main, which builds the app)")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to start; the fastest one is reported")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--prefix", default="", help="Only list modules starting with this (e.g. app.)")
+    parser.add_argument("--cumulative", action="store_true", help="Sort by time including nested imports")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    runs = [profile_imports(args.module) for _ in range(max(1, args.runs))]
+    entries = min(runs, key=lambda run: module_ms(run, args.module))
+
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for entry in slowest(entries, prefix=args.prefix, cumulative=args.cumulative, limit=args.top):
+        print(f"{entry.self_us / 1000:>9.1f} {entry.cumulative_us / 1000:>9.1f}  {entry.module}")
+
+    total_ms = module_ms(entries, args.module)
+    print(f"\nimport {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms), {len(entries)} modules")
+    eager = eager_heavy_imports(entries, LAZY_MODULES)
+    for name in eager:
+        print(f"EAGER {name} is imported at start; import it inside the functions that use it")
+    if total_ms > args.budget_ms:
+        print(f"OVER BUDGET by {total_ms - args.budget_ms:.0f} ms")
+    return 1 if eager or total_ms > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -348,6 +348,45 @@ export function getStocksSnapshot(company?: string): Promise<StocksSnapshot> {
   return requestJson<StocksSnapshot>(`/stocks/snapshot${query}`);
 }
 
+type RowsQuery = {
+  q?: string;
+  cities?: string[];
+  sort?: string;
+  offset?: number;
+  limit?: number;
+  cursor?: string;
+  candidatesOnly?: boolean;
+  paidStorage?: "ALL" | "PAID" | "SOON_30" | "SOON_60";
+};
+
+type StorageRowsQuery = Omit<RowsQuery, "candidatesOnly" | "paidStorage"> & {
+  feeWithinDays?: number;
+  riskOnly?: boolean;
+  riskSort?: string;
+  riskOffset?: number;
+  riskCursor?: string;
+};
+
+function appendRowsQuery(search: URLSearchParams, rows: RowsQuery | StorageRowsQuery): void {
+  if (rows.q) {
+    search.set("q", rows.q);
+  }
+  for (const city of rows.cities ?? []) {
+    search.append("city", city);
+  }
+  if (rows.sort) {
+    search.set("sort", rows.sort);
+  }
+  if (rows.cursor) {
+    search.set("cursor", rows.cursor);
+  } else if (rows.offset) {
+    search.set("offset", String(rows.offset));
+  }
+  if (rows.limit !== undefined) {
+    search.set("limit", String(rows.limit));
+  }
+}
+
 export function getStocksWorkspace(params: {
   company?: string;
   dateFrom?: string;
@@ -357,7 +396,7 @@ export function getStocksWorkspace(params: {
   positionFilter?: string;
   assortmentFilter?: string;
   forceRefresh?: boolean;
-}): Promise<StocksWorkspace> {
+} & RowsQuery): Promise<StocksWorkspace> {
   const search = new URLSearchParams();
   if (params.company) {
     search.set("company", params.company);
@@ -383,6 +422,13 @@ export function getStocksWorkspace(params: {
   if (params.forceRefresh) {
     search.set("force_refresh", "1");
   }
+  appendRowsQuery(search, params);
+  if (params.candidatesOnly) {
+    search.set("candidates_only", "1");
+  }
+  if (params.paidStorage) {
+    search.set("paid_storage", params.paidStorage);
+  }
   return requestJson<StocksWorkspace>(`/stocks/workspace?${search.toString()}`);
 }
 
@@ -393,7 +439,7 @@ export function updateStocksWarehousePreferences(payload: {
   return putJson<StocksWarehousePreferencesUpdateResponse>("/stocks/warehouse-preferences", payload);
 }
 
-export function getStorageSnapshot(company?: string, forceRefresh = false): Promise<StorageSnapshot> {
+export function getStorageSnapshot(company?: string, forceRefresh = false, rows: StorageRowsQuery = {}): Promise<StorageSnapshot> {
   const search = new URLSearchParams();
   if (company) {
     search.set("company", company);
@@ -401,6 +447,21 @@ export function getStorageSnapshot(company?: string, forceRefresh = false): Prom
   if (forceRefresh) {
     search.set("force_refresh", "1");
   }
+  appendRowsQuery(search, rows);
+  if (rows.feeWithinDays !== undefined) {
+    search.set("fee_within_days", String(rows.feeWithinDays));
+  }
+  if (rows.riskOnly) {
+    search.set("risk_only", "1");
+  }
+  if (rows.riskSort) {
+    search.set("risk_sort", rows.riskSort);
+  }
+  if (rows.riskCursor) {
+    search.set("risk_cursor", rows.riskCursor);
+  } else if (rows.riskOffset) {
+    search.set("risk_offset", String(rows.riskOffset));
+  }
   const query = search.toString();
   return requestJson<StorageSnapshot>(`/storage/snapshot${query ? `?${query}` : ""}`);
 }
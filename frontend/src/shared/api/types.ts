@@ -37,12 +37,26 @@ export type CampaignReportRow = {
   comment_all: string;
 };
 
+export type CampaignReportTimings = {
+  running_campaigns_ms: number;
+  token_ms: number;
+  seller_sales_ms: number;
+  ads_stats_ms: number;
+  products_ms: number;
+  sku_offer_map_ms: number;
+  bid_log_ms: number;
+  comments_ms: number;
+  rows_ms: number;
+  total_ms: number;
+};
+
 export type CampaignReport = {
   company: string;
   date_from: string;
   date_to: string;
   target_drr_pct: number;
   running_campaigns_count: number;
+  timings: CampaignReportTimings;
   rows: CampaignReportRow[];
 };
 
@@ -330,6 +344,8 @@ export type CampaignHourlyReport = {
   selected_campaign_id: string;
   selected_campaign_title: string;
   last_sample_at: string | null;
+  granularity?: "hourly" | "daily";
+  day_total?: CampaignHourlySample | null;
   rows: CampaignHourlyRow[];
 };
 
@@ -419,6 +435,14 @@ export type StocksWorkspaceRow = {
   cells: StocksWorkspaceCell[];
 };
 
+export type RowsPage = {
+  offset: number;
+  limit: number | null;
+  total: number;
+  returned: number;
+  next_cursor: string | null;
+};
+
 export type StocksWorkspace = {
   company: string;
   seller_client_id: string;
@@ -431,6 +455,7 @@ export type StocksWorkspace = {
   columns: string[];
   columns_meta: StocksWorkspaceColumn[];
   rows: StocksWorkspaceRow[];
+  page?: RowsPage | null;
 };
 
 export type StocksWarehousePreferencesUpdateResponse = {
@@ -451,6 +476,12 @@ export type StorageRiskRow = {
   estimated_daily_fee_rub: number;
 };
 
+export type StorageFeeProjectionDay = {
+  day: number;
+  date: string;
+  estimated_daily_fee_rub: number;
+};
+
 export type StorageLotRow = {
   city?: string;
   warehouse?: string;
@@ -472,6 +503,20 @@ export type StorageLotRow = {
   bundle_id?: string;
 };
 
+export type StorageRefreshProgress = {
+  status: string;
+  active: boolean;
+  stage: string;
+  done: number;
+  total: number;
+  attempts: number;
+  stages: Record<string, { ms: number; items: number }>;
+  last_error: string | null;
+  started_at: string | null;
+  updated_at: string | null;
+  finished_at: string | null;
+};
+
 export type StorageSnapshot = {
   company: string;
   seller_client_id: string;
@@ -479,13 +524,17 @@ export type StorageSnapshot = {
   cache_source: string;
   refresh_started: boolean;
   refresh_in_progress: boolean;
+  refresh_progress?: StorageRefreshProgress | null;
   sku_count: number;
   order_count: number;
   ship_lot_count: number;
   stock_articles_count: number;
   lot_rows: StorageLotRow[];
   risk_rows: StorageRiskRow[];
+  fee_projection?: StorageFeeProjectionDay[];
   unknown_stock_rows: Record<string, unknown>[];
+  lot_page?: RowsPage | null;
+  risk_page?: RowsPage | null;
 };
 
 export type FinanceRow = {
@@ -0,0 +1,68 @@
+import json
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.devtools.benchmarks import (
+    BENCHMARKS,
+    BenchFixtures,
+    BenchResult,
+    find_regressions,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+class BenchmarkSuiteTests(unittest.TestCase):
+    def test_every_builder_runs_on_small_fixtures(self):
+        fixtures = BenchFixtures(campaigns=6, skus=24, days=7)
+        results = run_benchmarks(scales=["realistic"], repeat=1, fixtures={"realistic": fixtures})
+
+        self.assertEqual([result.name for result in results], list(BENCHMARKS))
+        for result in results:
+            self.assertGreater(result.best_ms, 0)
+            self.assertGreaterEqual(result.peak_kib, 0)
+
+    def test_workspace_benchmark_builds_a_matrix_with_shipments(self):
+        from contextlib import ExitStack
+
+        fixtures = BenchFixtures(campaigns=2, skus=10, days=3)
+        with ExitStack() as stack:
+            workspace = BENCHMARKS["stocks_workspace"](fixtures, stack)()
+
+        self.assertEqual(workspace["summary"]["article_count"], 10)
+        cells = [cell for row in workspace["rows"] for cell in row["cells"]]
+        self.assertTrue(any(cell["shipment_events_count"] for cell in cells))
+
+    def test_regressions_beyond_threshold_are_reported(self):
+        baseline = {
+            "fast@realistic": {"best_ms": 100.0, "peak_kib": 1000.0},
+            "tiny@realistic": {"best_ms": 1.0, "peak_kib": 10.0},
+        }
+        results = [
+            BenchResult("fast", "realistic", best_ms=140.0, median_ms=150.0, peak_kib=1100.0, runs=3),
+            BenchResult("tiny", "realistic", best_ms=2.5, median_ms=2.5, peak_kib=100.0, runs=3),
+            BenchResult("new", "realistic", best_ms=9999.0, median_ms=9999.0, peak_kib=1.0, runs=1),
+        ]
+
+        problems = find_regressions(results, baseline, threshold=0.25)
+        self.assertEqual(len(problems), 1)
+        self.assertTrue(problems[0].startswith("fast@realistic: time 140.0 ms"))
+        self.assertEqual(find_regressions(results, baseline, threshold=0.5), [])
+
+    def test_baseline_round_trip_merges_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "baseline.json"
+            save_baseline([BenchResult("a", "10x", 5.0, 6.0, 7.0, 3)], path)
+            save_baseline([BenchResult("b", "10x", 1.0, 1.0, 1.0, 3)], path)
+
+            self.assertEqual(set(load_baseline(path)), {"a@10x", "b@10x"})
+            self.assertIn("python", json.loads(path.read_text(encoding="utf-8"))["meta"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.services.cache import TTLCache, cache_stats
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_lru_eviction_keeps_recently_used_entries(self):
+        cache = TTLCache("test.lru", ttl_seconds=60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["hits"], 3)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_entries_expire_after_ttl(self):
+        cache = TTLCache("test.ttl", ttl_seconds=10, max_entries=4)
+        with patch("app.services.cache.time.monotonic", return_value=100.0):
+            cache.set("a", "value")
+        with patch("app.services.cache.time.monotonic", return_value=109.0):
+            self.assertEqual(cache.get("a"), "value")
+        with patch("app.services.cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_byte_bound_evicts_oldest_and_tracks_size(self):
+        cache = TTLCache("test.bytes", ttl_seconds=60, max_entries=10, max_bytes=250, sizeof=lambda value: 100)
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+
+        self.assertIsNone(cache.peek("a"))
+        self.assertEqual(cache.stats()["approx_bytes"], 200)
+
+    def test_get_or_load_calls_loader_once_and_registers_stats(self):
+        cache = TTLCache("test.loader", ttl_seconds=60)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return (1, 2)
+
+        self.assertEqual(cache.get_or_load("k", loader), (1, 2))
+        self.assertEqual(cache.get_or_load("k", loader), (1, 2))
+        self.assertEqual(len(calls), 1)
+        self.assertIn("test.loader", [item["name"] for item in cache_stats()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.db.base import Base
+from app.models import CampaignHourlySnapshot, RawPayload
+from app.services import campaign_hourly, raw_archive
+from app.services.campaign_hourly import compact_campaign_hourly_snapshots, get_campaign_hourly_report
+
+TODAY = date(2026, 3, 31)
+
+
+class CampaignHourlyRetentionTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+        self.addCleanup(self.db.close)
+        patcher = patch.object(campaign_hourly, "create_all", lambda: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        raw_archive._current.clear()
+        raw_archive._dictionaries.clear()
+
+    def _seed_day(self, day: date, hours: range, campaign_id: str = "7") -> None:
+        for hour in hours:
+            self.db.add(
+                CampaignHourlySnapshot(
+                    company="aura",
+                    campaign_id=campaign_id,
+                    day=day,
+                    sample_hour=hour,
+                    sample_at=datetime(day.year, day.month, day.day) + timedelta(hours=hour),
+                    views=100 * hour,
+                    clicks=10 * hour,
+                    money_spent=5.0 * hour,
+                    orders=hour,
+                    raw_ads_id=raw_archive.store_payload(
+                        self.db, raw_archive.KIND_CAMPAIGN_HOURLY_ADS, {"views": str(100 * hour), "orders": str(hour)}
+                    ),
+                )
+            )
+        self.db.commit()
+
+    def _hours(self, day: date, campaign_id: str = "7") -> list[int]:
+        return [
+            hour
+            for (hour,) in self.db.query(CampaignHourlySnapshot.sample_hour)
+            .filter(CampaignHourlySnapshot.day == day, CampaignHourlySnapshot.campaign_id == campaign_id)
+            .order_by(CampaignHourlySnapshot.sample_hour)
+        ]
+
+    def test_old_days_keep_their_end_of_day_row_and_lose_their_raw_payload(self):
+        old_day, partial_day, mid_day, recent_day = TODAY - timedelta(days=40), TODAY - timedelta(days=35), TODAY - timedelta(days=10), TODAY - timedelta(days=2)
+        for day in (old_day, mid_day, recent_day):
+            self._seed_day(day, range(25))
+        self._seed_day(partial_day, range(0, 18), campaign_id="8")
+
+        with patch.object(campaign_hourly, "CAMPAIGN_HOURLY_VACUUM_FREE_RATIO", 0.0):
+            result = compact_campaign_hourly_snapshots(self.db, today=TODAY, full_days=30, raw_days=7)
+
+        self.assertEqual(result, {"deleted": 24 + 17, "raw_dropped": 2 + 25, "vacuumed": True})
+        self.assertEqual(self._hours(old_day), [24])
+        self.assertEqual(self._hours(partial_day, campaign_id="8"), [17])
+        self.assertEqual(self._hours(mid_day), list(range(25)))
+        end_of_day = self.db.query(CampaignHourlySnapshot).filter(CampaignHourlySnapshot.day == old_day).one()
+        self.assertEqual((end_of_day.views, end_of_day.money_spent, end_of_day.orders), (2400, 120.0, 24))
+        self.assertIsNone(end_of_day.raw_ads_id)
+        recent = self.db.query(CampaignHourlySnapshot).filter(CampaignHourlySnapshot.day == recent_day).first()
+        self.assertEqual(raw_archive.load_payloads(self.db, [recent.raw_ads_id]), {recent.raw_ads_id: {"views": "0", "orders": "0"}})
+        self.assertEqual(self.db.query(RawPayload).count(), 25)
+
+        self.assertEqual(
+            compact_campaign_hourly_snapshots(self.db, today=TODAY, full_days=30, raw_days=7),
+            {"deleted": 0, "raw_dropped": 0, "vacuumed": False},
+        )
+
+    def test_sqlite_vacuum_waits_for_enough_free_pages(self):
+        self._seed_day(TODAY - timedelta(days=40), range(25))
+        with patch.object(campaign_hourly, "CAMPAIGN_HOURLY_VACUUM_FREE_RATIO", 1.0):
+            result = compact_campaign_hourly_snapshots(self.db, today=TODAY, full_days=30, raw_days=7)
+
+        self.assertEqual(result, {"deleted": 24, "raw_dropped": 1, "vacuumed": False})
+
+    def test_report_marks_compacted_days(self):
+        old_day = TODAY - timedelta(days=40)
+        self._seed_day(old_day, range(25))
+        compact_campaign_hourly_snapshots(self.db, today=TODAY, full_days=30, raw_days=7, vacuum=False)
+
+        with (
+            patch.object(campaign_hourly, "resolve_company_config", lambda _company: ("aura", {})),
+            patch.object(campaign_hourly, "get_running_campaigns", lambda **_kwargs: [{"id": 7, "title": "Кампания"}]),
+            patch.object(campaign_hourly, "_campaign_skus", lambda **_kwargs: []),
+            patch.object(campaign_hourly, "load_fbo_orders_by_hour", lambda *_args, **_kwargs: None),
+        ):
+            report = get_campaign_hourly_report(db=self.db, company="aura", day=old_day.isoformat())
+
+        self.assertEqual(report["granularity"], "daily")
+        self.assertEqual(report["day_total"]["orders"], 24)
+        self.assertEqual(report["day_total"]["views"], 2400)
+        self.assertFalse(any(row["has_data"] for row in report["rows"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
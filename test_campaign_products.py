@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.db.base import Base
+from app.models import CampaignProduct, Organization
+from app.services import campaign_products
+
+
+class CampaignProductsCacheTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        with self.session_factory() as db:
+            db.add(Organization(slug="aura", name="aura", is_active=True))
+            db.commit()
+        self.patches = [
+            patch("app.services.campaign_products.SessionLocal", self.session_factory),
+            patch("app.services.campaign_products.create_all", lambda: None),
+        ]
+        for item in self.patches:
+            item.start()
+        campaign_products._cache.clear()
+
+    def tearDown(self):
+        for item in self.patches:
+            item.stop()
+        campaign_products._cache.clear()
+
+    def test_products_are_fetched_once_and_bid_writes_update_in_place(self):
+        upstream = [{"sku": "101", "title": "tea", "bid": "5000000"}]
+        with patch("app.services.campaign_products.get_campaign_products_all", return_value=upstream) as loader:
+            first = campaign_products.get_campaign_products_cached("t", "7", company="aura")
+            campaign_products.record_campaign_product_bid(company="aura", campaign_id="7", sku="101", bid_micro=6_000_000)
+            second = campaign_products.get_campaign_products_cached("t", "7", company="aura")
+
+        self.assertEqual(loader.call_count, 1)
+        self.assertEqual(first[0]["bid"], "5000000")
+        self.assertEqual(second[0]["bid"], "6000000")
+        with self.session_factory() as db:
+            row = db.query(CampaignProduct).filter(CampaignProduct.sku == "101").one()
+            self.assertEqual(row.current_bid_micro, 6_000_000)
+
+    def test_products_are_served_from_table_after_memory_is_cleared(self):
+        upstream = [{"sku": "101", "title": "tea", "bid": "5000000"}]
+        with patch("app.services.campaign_products.get_campaign_products_all", return_value=upstream) as loader:
+            campaign_products.get_campaign_products_cached("t", "7", company="aura")
+            campaign_products._cache.clear()
+            items = campaign_products.get_campaign_products_cached("t", "7", company="aura")
+
+        self.assertEqual(loader.call_count, 1)
+        self.assertEqual(items, upstream)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.services.campaign_reporting import fetch_ads_daily_totals
+from app.services.integrations.json_stream import iter_json_array
+
+ROWS = {
+    ("2026-07-01", "1"): {"views": "100", "clicks": "4", "moneySpent": "20,5", "orders": "1", "ordersMoney": "500"},
+    ("2026-07-01", "2"): {"views": "50", "clicks": "0", "moneySpent": "0", "orders": "0", "ordersMoney": "0"},
+    ("2026-07-02", "1"): {"views": "80", "clicks": "2", "moneySpent": "9", "orders": "0", "ordersMoney": "0"},
+}
+
+
+def _per_day_stats(_token, day_from, _day_to, campaign_ids):
+    return {"rows": [{"id": cid, **row} for (day, cid), row in ROWS.items() if day == day_from and cid in campaign_ids]}
+
+
+def _range_stats(_token, _date_from, _date_to, campaign_ids):
+    return iter([{"id": cid, "date": day, **row} for (day, cid), row in ROWS.items() if cid in campaign_ids])
+
+
+class FetchAdsDailyTotalsTests(unittest.TestCase):
+    def test_range_mode_matches_per_day_mode(self):
+        with (
+            patch("app.services.campaign_reporting.get_campaign_stats_json", side_effect=_per_day_stats),
+            patch("app.services.campaign_reporting.iter_campaign_daily_stats_rows", side_effect=_range_stats) as range_call,
+        ):
+            per_day = fetch_ads_daily_totals("t", "2026-07-01", "2026-07-03", ["1", "2"], 15, True, use_range_stats=False)
+            ranged = fetch_ads_daily_totals("t", "2026-07-01", "2026-07-03", ["1", "2"], 15, True)
+
+        self.assertEqual(range_call.call_count, 1)
+        self.assertEqual(ranged, per_day)
+        self.assertEqual(ranged[0][0]["money_spent"], 20.5)
+        self.assertEqual(ranged[0][2]["views"], 0)
+
+    def test_range_mode_falls_back_to_per_day_requests(self):
+        response = requests.Response()
+        response.status_code = 404
+        with (
+            patch("app.services.campaign_reporting.get_campaign_stats_json", side_effect=_per_day_stats) as per_day_call,
+            patch(
+                "app.services.campaign_reporting.iter_campaign_daily_stats_rows",
+                side_effect=requests.HTTPError(response=response),
+            ),
+        ):
+            totals = fetch_ads_daily_totals("t", "2026-07-01", "2026-07-02", ["1", "2"], 15)
+
+        self.assertEqual(per_day_call.call_count, 2)
+        self.assertEqual([row["clicks"] for row in totals], [4, 2])
+
+
+    def test_rows_are_read_from_a_body_split_at_any_byte(self):
+        body = json.dumps(
+            {"totals": {"rows": 2, "note": "строки"}, "rows": [{"id": "1", "moneySpent": "20,5"}, {"id": "2", "views": 12345}]},
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        for size in (1, 3, len(body)):
+            chunks = [body[index : index + size] for index in range(0, len(body), size)]
+            self.assertEqual([row["id"] for row in iter_json_array(chunks, "rows")], ["1", "2"])
+        self.assertEqual(list(iter_json_array([b'{"rows": null}'], "rows")), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"rows": [{"id": "1"}'], "rows"))
+
+
+if __name__ == "__main__":
+    unittest.main()
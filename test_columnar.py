@@ -0,0 +1,129 @@
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.services import legacy_compat
+from app.services.columnar import ColumnTable
+from app.services.row_index import RowIndex
+from app.services.stocks_snapshot import _article_labels, _position_filter_mask, _stock_matrices
+
+
+def _stock_row(article: str, cluster: str, stock: float, *, ads: float = 1.0, grade: str = "", offer_id: str | None = None) -> dict:
+    return {
+        "sku": f"sku-{article}",
+        "article": article,
+        "title": f"Title {article}",
+        "offer_id": offer_id if offer_id is not None else article,
+        "cluster": cluster,
+        "turnover_grade": grade,
+        "available_stock_count": stock,
+        "ads_cluster": ads,
+        "transit_stock_count": 0.0,
+    }
+
+
+class ColumnTableTests(unittest.TestCase):
+    def test_records_match_dataframe_records(self):
+        rows = [
+            {"city": "Москва", "article": "A-1", "qty": 5, "volume": 1.5, "at": pd.Timestamp("2026-03-01")},
+            {"city": "Москва", "article": "B-2", "qty": 7, "volume": None, "started": True},
+            {"city": "Казань", "article": "A-1", "qty": 0, "volume": 2.0},
+        ]
+        frame = pd.DataFrame(rows)
+        table = ColumnTable.from_records(rows)
+        expected = frame.to_dict("records")
+        actual = table.records()
+
+        self.assertEqual([row.keys() for row in actual], [row.keys() for row in expected])
+        for got, want in zip(actual, expected):
+            for key, value in want.items():
+                if pd.isna(value):
+                    self.assertTrue(pd.isna(got[key]))
+                else:
+                    self.assertEqual(got[key], value)
+                    self.assertIs(type(got[key]), type(value))
+        codes, vocab = table.codes("city")
+        self.assertEqual(vocab.tolist(), ["Москва", "Казань"])
+        self.assertEqual(codes.tolist(), [0, 0, 1])
+        self.assertEqual(table.records(np.array([2]))[0]["city"], "Казань")
+
+    def test_map_runs_once_per_distinct_value(self):
+        table = ColumnTable.from_records([{"city": city} for city in ["Москва", "Казань"] * 50])
+        calls = []
+        mapped = table.map("city", lambda value: calls.append(value) or value.upper())
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(mapped[:2].tolist(), ["МОСКВА", "КАЗАНЬ"])
+
+
+class StockTableTests(unittest.TestCase):
+    def test_matrices_aggregate_like_the_pivot_tables(self):
+        rows = [
+            _stock_row("B-2", "Москва", 4.0, ads=1.0, grade=""),
+            _stock_row("B-2", "Москва", 6.0, ads=2.0, grade="DEFICIT"),
+            _stock_row("A-1", "Казань", 3.0, ads=0.5, grade="POPULAR"),
+            _stock_row("", "Казань", 1.0, offer_id="AURA-9"),
+        ]
+        table = ColumnTable.from_records(rows)
+        articles = _article_labels(table)
+        self.assertEqual(articles.tolist(), ["B-2", "B-2", "A-1", "sku-"])
+
+        matrices = _stock_matrices(table, articles)
+        self.assertEqual(matrices["articles"], ["A-1", "B-2", "sku-"])
+        self.assertEqual(matrices["clusters"], ["Казань", "Москва"])
+        self.assertEqual(matrices["stock"].tolist(), [[3.0, 0.0], [0.0, 10.0], [1.0, 0.0]])
+        self.assertEqual(matrices["ads"][1, 1], 1.5)
+        # Cells without stock rows keep the "nan" grade the pandas pivot produced.
+        self.assertEqual(matrices["grade"].tolist(), [["POPULAR", "nan"], ["nan", "DEFICIT"], ["", "nan"]])
+
+        self.assertEqual(_position_filter_mask(table, "ADDITIONAL").tolist(), [False, False, False, True])
+        self.assertEqual(_position_filter_mask(table, "CORE").sum(), 3)
+
+    def test_stock_table_is_reused_while_the_pickle_is_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp)
+            legacy_compat._stock_tables.clear()
+            with (
+                patch.object(legacy_compat, "BACKEND_DATA_DIR", data_dir),
+                patch.object(legacy_compat, "REPO_ROOT", data_dir),
+                patch.object(legacy_compat, "load_stocks_cache_payload", wraps=legacy_compat.load_stocks_cache_payload) as loads,
+            ):
+                legacy_compat.save_stocks_cache_payload("1", rows=[_stock_row("A-1", "Москва", 2.0)], sku_count=1)
+                first, sku_count, _ts = legacy_compat.build_stock_table_cached(seller_client_id="1", seller_api_key="key")
+                again, _sku_count, _ts = legacy_compat.build_stock_table_cached(seller_client_id="1", seller_api_key="key")
+                self.assertIs(again, first)
+                self.assertEqual(sku_count, 1)
+                self.assertEqual(loads.call_count, 1)
+
+                legacy_compat.save_stocks_cache_payload("1", rows=[_stock_row("A-1", "Москва", 2.0)] * 2, sku_count=1)
+                rebuilt, _sku_count, _ts = legacy_compat.build_stock_table_cached(seller_client_id="1", seller_api_key="key")
+                self.assertEqual(len(rebuilt), 2)
+            legacy_compat._stock_tables.clear()
+
+
+class RowIndexTableTests(unittest.TestCase):
+    def test_table_index_matches_row_dict_index(self):
+        rows = [
+            {"city": "Москва", "city_key": "", "article": "B-2", "qty": 3},
+            {"city": "Казань", "city_key": "КАЗАНЬ", "article": "A-1", "qty": None},
+            {"city": "Москва", "city_key": "МОСКВА", "article": "A-3", "qty": 9},
+        ]
+        by_dict = RowIndex(rows, search_fields=("article",), city_field=("city_key", "city"))
+        by_table = RowIndex(ColumnTable.from_records(rows), search_fields=("article",), city_field=("city_key", "city"))
+
+        self.assertEqual(by_table.cities.tolist(), by_dict.cities.tolist())
+        for sort in ("qty", "-qty", "article", "-article"):
+            mask = by_table.match(search="a-")
+            self.assertEqual(by_table.order(mask, sort).tolist(), by_dict.order(by_dict.match(search="a-"), sort).tolist())
+        page = by_table.page(by_table.order(by_table.match(cities={"МОСКВА"}), "-qty"), offset=0, limit=1)
+        self.assertEqual(page, [{"city": "Москва", "city_key": "МОСКВА", "article": "A-3", "qty": 9.0}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.core.responses import etag_for, etag_matches, model_response
+from app.schemas.stocks import StocksWorkspaceResponse
+from app.schemas.storage import StorageSnapshotResponse
+from app.schemas.trends import TrendsSnapshotResponse
+from app.services.snapshot_views import StocksWorkspaceView
+
+
+def _pydantic_json(model, data):
+    return json.loads(model(**data).model_dump_json())
+
+
+def _workspace_payload():
+    event = {"quantity": np.int64(4), "event_at": "2026-03-01T10:00:00", "paid_qty": 1}
+    cell = {
+        "city": "Москва",
+        "stock": 3,
+        "need60": np.int64(12),
+        "in_transit": 0,
+        "total_with_transit": 3,
+        "turnover_grade": "DEFICIT",
+        "is_candidate": np.bool_(True),
+        "display_value": "12",
+        "shipment_events": [event],
+        "debug_only": "dropped",
+    }
+    return {
+        "company": "default",
+        "seller_client_id": "1",
+        "sku_count": 2,
+        "stocks_updated_at": None,
+        "shipments_updated_at": "2026-03-02",
+        "settings": {"regional_order_min": 2, "minimum_supply": 5, "position_filter": "ALL", "assortment_filter": "ALL"},
+        "summary": {"article_count": 1, "city_count": 1, "candidate_count": 1, "approved_count": 0},
+        "timings": {"matrix_ms": 1.5, "total_ms": 4, "not_in_schema_ms": 9.0},
+        "columns": ["Москва"],
+        "rows": [{"article": "A-1", "title": "Товар", "revenue": 1500, "ordered_units": 7.0, "cells": [cell]}],
+    }
+
+
+class FastResponseTests(unittest.TestCase):
+    def test_workspace_matches_pydantic_output(self):
+        data = _workspace_payload()
+        response = model_response(StocksWorkspaceResponse, data)
+
+        self.assertEqual(json.loads(response.body), _pydantic_json(StocksWorkspaceResponse, data))
+        self.assertEqual(response.media_type, "application/json")
+        self.assertNotIn(b"not_in_schema_ms", response.body)
+        self.assertIn("Москва".encode("utf-8"), response.body)
+
+    def test_storage_snapshot_keeps_free_form_rows(self):
+        data = {
+            "company": "default",
+            "seller_client_id": "1",
+            "sku_count": 1,
+            "order_count": 2,
+            "ship_lot_count": 1,
+            "stock_articles_count": 1,
+            "lot_rows": [{"article": "A-1", "qty": np.int64(5), "ratio": float("nan"), "at": pd.Timestamp("2026-03-01 10:00")}],
+            "risk_rows": [
+                {
+                    "city": "Казань",
+                    "article": "A-1",
+                    "fee_from_date": "2026-04-01",
+                    "days_until_fee_start": 10,
+                    "sales_per_day": 1,
+                    "qty_remaining_now": 5,
+                    "qty_expected_at_fee_start": 0,
+                    "volume_expected_liters": 0.5,
+                    "estimated_daily_fee_rub": 2,
+                }
+            ],
+            "unknown_stock_rows": [],
+        }
+        body = json.loads(model_response(StorageSnapshotResponse, data).body)
+
+        self.assertEqual(body["lot_rows"], [{"article": "A-1", "qty": 5, "ratio": None, "at": "2026-03-01T10:00:00"}])
+        self.assertEqual(body["risk_rows"][0]["sales_per_day"], 1.0)
+        self.assertEqual(body["cache_source"], "")
+        self.assertFalse(body["refresh_in_progress"])
+
+    def test_trends_snapshot_matches_pydantic_output(self):
+        data = {
+            "niches": [{"name": "Чай", "score": 0.75}],
+            "products": [{"sku": "1", "trend": [1, 2, 3]}],
+            "external_sources": [],
+            "errors": ["wordstat: timeout"],
+            "meta": {"horizon": "1-3 months", "rows": 1},
+        }
+        self.assertEqual(json.loads(model_response(TrendsSnapshotResponse, data).body), _pydantic_json(TrendsSnapshotResponse, data))
+
+    def test_missing_required_field_is_an_error(self):
+        data = _workspace_payload()
+        del data["summary"]
+        with self.assertRaises(ValueError):
+            model_response(StocksWorkspaceResponse, data)
+
+
+def _get(app, path: str, query: str, headers: dict[str, str] | None = None):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()],
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1234),
+        "root_path": "",
+        "http_version": "1.1",
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], {key.decode().lower(): value.decode() for key, value in start["headers"]}, body
+
+
+class ETagTests(unittest.TestCase):
+    def test_if_none_match_accepts_lists_weak_tags_and_star(self):
+        class _Request:
+            def __init__(self, value):
+                self.headers = {"if-none-match": value}
+
+        etag = etag_for("v1", [("company", "aura")])
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertTrue(etag_matches(_Request(f'"other", W/{etag}'), etag))
+        self.assertTrue(etag_matches(_Request("*"), etag))
+        self.assertFalse(etag_matches(_Request('"other"'), etag))
+        self.assertNotEqual(etag, etag_for("v2", [("company", "aura")]))
+
+    def test_workspace_answers_304_while_the_snapshot_is_unchanged(self):
+        from app.main import create_app
+
+        view = StocksWorkspaceView({**_workspace_payload(), "rows": []})
+        with (
+            patch("app.api.stocks.get_stocks_workspace_view", lambda **_kwargs: view),
+            patch("app.main.setup_tracing", lambda *_args: None),
+        ):
+            app = create_app()
+            status, headers, body = _get(app, "/api/stocks/workspace", "company=aura&limit=10")
+            self.assertEqual(status, 200)
+            self.assertEqual(headers["cache-control"], "private, no-cache")
+            self.assertIn("Accept-Encoding", headers["vary"])
+            etag = headers["etag"]
+
+            status, headers, body = _get(app, "/api/stocks/workspace", "company=aura&limit=10", {"If-None-Match": etag})
+            self.assertEqual(status, 304)
+            self.assertEqual(body, b"")
+            self.assertEqual(headers["etag"], etag)
+            self.assertIn("Accept-Encoding", headers["vary"])
+
+            # The gzip representation has its own tag, so an identity tag never validates a compressed body.
+            gzip = {"Accept-Encoding": "gzip"}
+            status, headers, _body = _get(app, "/api/stocks/workspace", "company=aura&limit=10", {**gzip, "If-None-Match": etag})
+            self.assertEqual(status, 200)
+            gzip_etag = headers["etag"]
+            self.assertNotEqual(gzip_etag, etag)
+            self.assertIn("Accept-Encoding", headers["vary"])
+            status, headers, _body = _get(app, "/api/stocks/workspace", "company=aura&limit=10", {**gzip, "If-None-Match": gzip_etag})
+            self.assertEqual(status, 304)
+            self.assertIn("Accept-Encoding", headers["vary"])
+
+            status, headers, _body = _get(app, "/api/stocks/workspace", "company=aura&limit=20", {"If-None-Match": etag})
+            self.assertEqual(status, 200)
+            self.assertNotEqual(headers["etag"], etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+from datetime import date, datetime
+import os
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.services.fbo_postings import (
+    ingest_fbo_postings_for_company,
+    load_fbo_orders_by_hour,
+    recheck_fbo_posting_statuses_for_company,
+)
+
+
+def _posting(number: str, created_at: str, sku: str, quantity: int, status: str = "delivered") -> dict:
+    return {
+        "posting_number": number,
+        "status": status,
+        "created_at": created_at,
+        "products": [{"sku": sku, "quantity": quantity}],
+    }
+
+
+class FboPostingsIngestTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+        self.patches = [
+            patch("app.services.fbo_postings.create_all", lambda: None),
+            patch.dict(os.environ, {"TZ": "Europe/Moscow"}),
+        ]
+        for item in self.patches:
+            item.start()
+
+    def tearDown(self):
+        for item in self.patches:
+            item.stop()
+        self.db.close()
+
+    def _ingest(self, postings: list[dict], now: datetime) -> None:
+        with patch("app.services.fbo_postings.seller_posting_fbo_list", return_value={"result": postings}):
+            ingest_fbo_postings_for_company(
+                self.db,
+                company="aura",
+                seller_client_id="1",
+                seller_api_key="k",
+                now=now,
+            )
+
+    def test_rollup_groups_moscow_hours_and_skips_cancelled(self):
+        self._ingest(
+            [
+                _posting("A-1", "2026-07-06T07:15:00Z", "101", 2),
+                _posting("A-2", "2026-07-06T07:45:00Z", "101", 1),
+                _posting("A-3", "2026-07-06T08:05:00Z", "202", 5),
+                _posting("A-4", "2026-07-06T08:10:00Z", "101", 4, status="cancelled"),
+            ],
+            now=datetime(2026, 7, 6, 13, 0),
+        )
+
+        orders = load_fbo_orders_by_hour(self.db, company="aura", target_day=date(2026, 7, 6), skus=["101"])
+
+        self.assertEqual(orders, {10: 3})
+
+    def test_reingest_replaces_postings_whose_status_changed(self):
+        now = datetime(2026, 7, 6, 13, 0)
+        self._ingest([_posting("A-1", "2026-07-06T07:15:00Z", "101", 2)], now=now)
+        self._ingest([_posting("A-1", "2026-07-06T07:15:00Z", "101", 2, status="cancelled")], now=now)
+
+        orders = load_fbo_orders_by_hour(self.db, company="aura", target_day=date(2026, 7, 6), skus=["101"])
+
+        self.assertEqual(orders, {})
+
+    def test_recheck_drops_postings_cancelled_after_the_ingest_overlap(self):
+        self._ingest([_posting("A-1", "2026-07-06T07:15:00Z", "101", 2)], now=datetime(2026, 7, 6, 13, 0))
+        # Two days later the incremental ingest no longer asks for A-1, so its cancellation is not seen.
+        later = datetime(2026, 7, 8, 13, 0)
+        self._ingest([], now=later)
+        self.assertEqual(load_fbo_orders_by_hour(self.db, company="aura", target_day=date(2026, 7, 6), skus=["101"]), {10: 2})
+
+        cancelled = {"result": [_posting("A-1", "2026-07-06T07:15:00Z", "101", 2, status="cancelled")]}
+        with patch("app.services.fbo_postings.seller_posting_fbo_list", return_value=cancelled) as fetch:
+            fetched = recheck_fbo_posting_statuses_for_company(
+                self.db, company="aura", seller_client_id="1", seller_api_key="k", now=later, days=7
+            )
+
+        self.assertEqual(fetched, 1)
+        self.assertEqual(fetch.call_args.kwargs["since"], "2026-07-01T10:00:00Z")
+        self.assertEqual(load_fbo_orders_by_hour(self.db, company="aura", target_day=date(2026, 7, 6), skus=["101"]), {})
+
+    def test_days_outside_ingested_window_are_not_served(self):
+        self._ingest([], now=datetime(2026, 7, 6, 13, 0))
+
+        self.assertIsNone(load_fbo_orders_by_hour(self.db, company="aura", target_day=date(2026, 6, 1), skus=["101"]))
+        self.assertIsNone(load_fbo_orders_by_hour(self.db, company="osome", target_day=date(2026, 7, 6), skus=["101"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
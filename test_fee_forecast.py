@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.services.columnar import ColumnTable
+from app.services.legacy_compat import build_fee_projection_table, build_fee_risk_forecast_table
+from app.services.snapshot_views import StorageSnapshotView
+
+
+def _lot(city: str, article: str, arrival: str, qty: float, days: int, volume: float, sales_per_day: float = 1.0) -> dict:
+    return {
+        "city": city,
+        "city_key": city.upper(),
+        "article": article,
+        "arrival_date": arrival,
+        "fee_from_date": (pd.Timestamp("2026-03-01") + pd.Timedelta(days=days)).date().isoformat(),
+        "days_until_fee_start": days,
+        "qty_remaining_from_lot": qty,
+        "item_volume_liters": volume,
+        "sales_per_day": sales_per_day,
+    }
+
+
+def _lots() -> pd.DataFrame:
+    # Listed newest first: the forecast must still drain the oldest lot first.
+    return pd.DataFrame(
+        [
+            _lot("Казань", "A-1", "2026-01-10", 5, 4, 2.0),
+            _lot("Казань", "A-1", "2026-01-01", 3, 2, 1.0),
+            _lot("Москва", "B-2", "2026-01-05", 2, 120, 1.0),
+            _lot("Москва", "C-3", "2026-01-05", 1, 0, 0.5, sales_per_day=0.0),
+        ]
+    )
+
+
+class FeeForecastTests(unittest.TestCase):
+    def test_risk_rows_follow_fifo_sales(self):
+        risk = build_fee_risk_forecast_table(_lots())
+
+        self.assertEqual(risk["article"].tolist(), ["C-3", "A-1", "A-1"])
+        self.assertEqual(risk["qty_expected_at_fee_start"].tolist(), [1, 1, 4])
+        self.assertEqual(risk["estimated_daily_fee_rub"].tolist(), [1.25, 2.5, 20.0])
+        self.assertEqual(str(risk["days_until_fee_start"].dtype), "int64")
+
+    def test_projection_charges_what_is_left_each_day(self):
+        projection = build_fee_projection_table(_lots())
+        a1 = projection[projection["article"] == "A-1"]
+
+        self.assertEqual(dict(zip(a1["day"], a1["estimated_daily_fee_rub"])), {2: 2.5, 4: 20.0, 5: 15.0, 6: 10.0, 7: 5.0})
+        c3 = projection[projection["article"] == "C-3"]
+        self.assertEqual(c3["day"].tolist(), list(range(90)))
+        self.assertNotIn("B-2", projection["article"].tolist())
+
+    def test_view_sums_the_projection_for_the_filtered_cities(self):
+        lots = _lots()
+        view = StorageSnapshotView(
+            {
+                "company": "default",
+                "seller_client_id": "1",
+                "lot_rows": ColumnTable.from_frame(lots),
+                "risk_rows": ColumnTable.from_frame(build_fee_risk_forecast_table(lots)),
+                "fee_projection_rows": ColumnTable.from_frame(build_fee_projection_table(lots)),
+                "fee_projection_start": "2026-03-01",
+            },
+            stamp=None,
+        )
+
+        everything = view.page()["fee_projection"]
+        self.assertEqual(len(everything), 90)
+        self.assertEqual(everything[2], {"day": 2, "date": "2026-03-03", "estimated_daily_fee_rub": 3.75})
+        kazan = view.page(cities=["Казань"])["fee_projection"]
+        self.assertEqual([point["estimated_daily_fee_rub"] for point in kazan[:5]], [0.0, 0.0, 2.5, 0.0, 20.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
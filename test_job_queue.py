@@ -0,0 +1,87 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.db.base import Base
+from app.models import BackgroundJob
+from app.services import job_queue
+from app.tasks.schedules import daily_at, every, hourly_at
+
+
+class JobQueueTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+        self.patch = patch("app.services.job_queue.create_all", lambda: None)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.db.close()
+
+    def test_active_dedup_key_collapses_enqueues_until_job_finishes(self):
+        first, created = job_queue.enqueue_job(self.db, "storage.refresh", {"company_name": "aura"}, dedup_key="k")
+        second, created_again = job_queue.enqueue_job(self.db, "storage.refresh", {}, dedup_key="k")
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(first.id, second.id)
+
+        claimed = job_queue.claim_next_job(self.db, worker_id="w1")
+        self.assertEqual(claimed.id, first.id)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(job_queue.claim_next_job(self.db, worker_id="w2"))
+        job_queue.complete_job(self.db, first.id, {"lot_rows": 3})
+
+        third, created_third = job_queue.enqueue_job(self.db, "storage.refresh", {}, dedup_key="k")
+        self.assertTrue(created_third)
+        self.assertNotEqual(third.id, first.id)
+        self.assertEqual(job_queue.job_to_dict(self.db.get(BackgroundJob, first.id))["result"], {"lot_rows": 3})
+
+    def test_failed_attempts_retry_with_backoff_then_fail(self):
+        job, _created = job_queue.enqueue_job(self.db, "fbo_postings.ingest", dedup_key="x", max_attempts=2)
+        job_queue.claim_next_job(self.db, worker_id="w1")
+        self.assertEqual(job_queue.fail_job(self.db, job.id, "boom"), job_queue.JOB_QUEUED)
+        self.db.refresh(job)
+        self.assertGreater(job.run_after, datetime.utcnow())
+        self.assertIsNone(job_queue.claim_next_job(self.db, worker_id="w1"))
+
+        job.run_after = datetime.utcnow() - timedelta(seconds=1)
+        self.db.commit()
+        job_queue.claim_next_job(self.db, worker_id="w1")
+        self.assertEqual(job_queue.fail_job(self.db, job.id, "boom again"), job_queue.JOB_FAILED)
+        self.db.refresh(job)
+        self.assertIsNone(job.dedup_key)
+        self.assertEqual(job.last_error, "boom again")
+
+    def test_stale_running_job_is_requeued(self):
+        job, _created = job_queue.enqueue_job(self.db, "auto_bids.run", timeout_seconds=10, max_attempts=2)
+        job_queue.claim_next_job(self.db, worker_id="dead")
+        job.started_at = datetime.utcnow() - timedelta(minutes=5)
+        self.db.commit()
+
+        self.assertEqual(job_queue.requeue_stale_jobs(self.db), 1)
+        self.db.refresh(job)
+        self.assertEqual(job.status, job_queue.JOB_QUEUED)
+        self.assertIn("worker lost", job.last_error)
+
+
+class ScheduleTests(unittest.TestCase):
+    def test_next_run_helpers(self):
+        now = datetime(2026, 3, 10, 8, 30)
+        self.assertEqual(daily_at(5)(now), datetime(2026, 3, 11, 5, 0))
+        self.assertEqual(daily_at(9)(now), datetime(2026, 3, 10, 9, 0))
+        self.assertEqual(hourly_at(10)(now), datetime(2026, 3, 10, 9, 10))
+        self.assertEqual(every(10)(now), datetime(2026, 3, 10, 8, 40))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.db.base import Base
+from app.models import LeaderLease
+from app.services import leases
+
+
+class LeaderLeaseTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+        self.patch = patch("app.services.leases.create_all", lambda: None)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.db.close()
+
+    def test_only_one_holder_until_lease_expires(self):
+        self.assertTrue(leases.acquire_lease(self.db, "scheduler", holder="a", ttl_seconds=60))
+        self.assertFalse(leases.acquire_lease(self.db, "scheduler", holder="b", ttl_seconds=60))
+        self.assertTrue(leases.acquire_lease(self.db, "scheduler", holder="a", ttl_seconds=60))
+        self.assertEqual(leases.current_lease_holder(self.db, "scheduler"), "a")
+
+        lease = self.db.query(LeaderLease).filter(LeaderLease.name == "scheduler").one()
+        lease.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        self.db.commit()
+
+        self.assertTrue(leases.acquire_lease(self.db, "scheduler", holder="b", ttl_seconds=60))
+        self.assertFalse(leases.acquire_lease(self.db, "scheduler", holder="a", ttl_seconds=60))
+        self.assertEqual(leases.current_lease_holder(self.db, "scheduler"), "b")
+
+    def test_release_lets_another_holder_in(self):
+        self.assertTrue(leases.acquire_lease(self.db, "scheduler", holder="a", ttl_seconds=60))
+        leases.release_lease(self.db, "scheduler", holder="a")
+        self.assertIsNone(leases.current_lease_holder(self.db, "scheduler"))
+        self.assertTrue(leases.acquire_lease(self.db, "scheduler", holder="b", ttl_seconds=60))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+import unittest
+
+import uvicorn
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.devtools.loadtest import LoadRequest, percentile, render_markdown, run_load_test
+from app.devtools.ozon_stub import StubConfig, StubDataset, create_stub_app
+
+
+def _serve_stub(test: unittest.TestCase) -> str:
+    dataset = StubDataset(campaigns=2, skus=10, supply_orders=2, days=3, end_date=date(2026, 3, 10))
+    server = uvicorn.Server(uvicorn.Config(create_stub_app(StubConfig(dataset=dataset)), host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.01)
+    test.assertTrue(server.started)
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    test.addCleanup(stop)
+    return f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}"
+
+
+class LoadTestHarnessTests(unittest.TestCase):
+    def test_percentile_interpolates(self):
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.5)
+        self.assertAlmostEqual(percentile(values, 99), 99.01)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_steps_record_latency_throughput_and_upstream_calls(self):
+        stub = _serve_stub(self)
+        mix = [
+            LoadRequest("campaigns", "GET", "/api/client/campaign", 2),
+            LoadRequest("missing", "GET", "/nope", 1),
+        ]
+
+        report = run_load_test(base_url=stub, mix=mix, concurrency_levels=[1, 2], duration_s=0.3, stub_url=stub, warmup=False, label="v1")
+
+        self.assertEqual([step["concurrency"] for step in report["steps"]], [1, 2])
+        step = report["steps"][1]
+        self.assertGreater(step["ok"], 0)
+        self.assertEqual(step["endpoints"]["missing"]["count"], 0)
+        self.assertEqual(step["statuses"].get("404", 0) + step["ok"], step["requests"])
+        # The stub counts the load requests themselves, so every request is one "upstream" call.
+        self.assertEqual(step["upstream_per_request"], 1.0)
+
+        markdown = render_markdown(report, previous=report)
+        self.assertIn("| 2 |", markdown)
+        self.assertIn("(+0%)", markdown)
+
+
+if __name__ == "__main__":
+    unittest.main()
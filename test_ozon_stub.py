@@ -0,0 +1,115 @@
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+import requests
+import uvicorn
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.devtools.ozon_stub import StubConfig, StubDataset, create_stub_app
+from app.services.integrations import ozon_ads, ozon_seller
+
+
+def _serve(test: unittest.TestCase, config: StubConfig) -> str:
+    server = uvicorn.Server(uvicorn.Config(create_stub_app(config), host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.01)
+    test.assertTrue(server.started)
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    test.addCleanup(stop)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def _dataset() -> StubDataset:
+    return StubDataset(campaigns=4, skus=40, supply_orders=12, days=10, end_date=date(2026, 3, 10))
+
+
+class OzonStubTests(unittest.TestCase):
+    def _point_clients_at(self, base: str) -> None:
+        for patcher in (patch.object(ozon_ads, "PERF_BASE", base), patch.object(ozon_seller, "SELLER_BASE", base)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_clients_page_through_synthetic_data(self):
+        dataset = _dataset()
+        self._point_clients_at(_serve(self, StubConfig(dataset=dataset)))
+
+        token, expires_in = ozon_ads.request_perf_token("id", "secret")
+        campaigns = ozon_ads.get_campaigns(token)
+        self.assertEqual(len(campaigns), 4)
+        products = ozon_ads.get_campaign_products_all(token, campaigns[0]["id"], page_size=3)
+        self.assertEqual(len(products), 10)
+        self.assertEqual(expires_in, 1800)
+
+        campaign_ids = [str(campaign["id"]) for campaign in campaigns]
+        streamed = list(ozon_ads.iter_campaign_daily_stats_rows(token, "2026-03-01", "2026-03-10", campaign_ids))
+        whole = requests.get(
+            f"{ozon_ads.PERF_BASE}/api/client/statistics/daily/json",
+            params=[("dateFrom", "2026-03-01"), ("dateTo", "2026-03-10")] + [("campaignIds", cid) for cid in campaign_ids],
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=10,
+        ).json()["rows"]
+        self.assertTrue(streamed)
+        self.assertEqual(streamed, whole)
+
+        by_sku, by_day, _by_day_sku = ozon_seller.seller_analytics_sku_day(
+            "2026-03-01", "2026-03-10", limit=7, client_id="1", api_key="key"
+        )
+        self.assertEqual(len(by_day), 10)
+        expected_units = sum(dataset.ordered_units(index, day) for index in range(40) for day in dataset.days_between("2026-03-01", "2026-03-10"))
+        self.assertEqual(sum(units for _revenue, units in by_sku.values()), expected_units)
+
+        first_page = ozon_seller.seller_supply_order_list(filter={}, limit=5, client_id="1", api_key="key")
+        self.assertEqual(len(first_page["order_ids"]), 5)
+        self.assertEqual(first_page["last_id"], "5")
+
+    def test_injects_429_with_retry_after(self):
+        base = _serve(self, StubConfig(dataset=_dataset(), throttle_every=2, retry_after_seconds=0.01))
+        self._point_clients_at(base)
+
+        with patch("app.services.integrations.ozon_seller.time.sleep") as sleep:
+            ozon_seller.seller_product_list(limit=10, client_id="1", api_key="key")
+            ozon_seller.seller_product_list(limit=10, client_id="1", api_key="key")
+        sleep.assert_called_once_with(0.01)
+        stats = requests.get(f"{base}/__stub/stats", timeout=5).json()
+        self.assertEqual(stats["total"], 3)
+        self.assertEqual(stats["throttled"], {"POST /v3/product/list": 1})
+
+    def test_record_then_strict_replay_returns_anonymised_responses(self):
+        upstream = _serve(self, StubConfig(dataset=_dataset()))
+        with tempfile.TemporaryDirectory() as recordings:
+            recorder = _serve(
+                self,
+                StubConfig(mode="record", recordings_dir=recordings, upstream_perf_base=upstream, upstream_seller_base=upstream),
+            )
+            self._point_clients_at(recorder)
+            recorded = ozon_seller.seller_product_info_list(product_ids=["500001", "500002"], client_id="1", api_key="key")
+            self.assertTrue(all(item["name"].startswith("anon-") for item in recorded["items"]))
+            self.assertEqual(recorded["items"][0]["sku"], 100000001)
+
+            replay = _serve(self, StubConfig(mode="replay", recordings_dir=recordings, strict=True))
+            self._point_clients_at(replay)
+            self.assertEqual(
+                ozon_seller.seller_product_info_list(product_ids=["500001", "500002"], client_id="1", api_key="key"),
+                recorded,
+            )
+            with self.assertRaises(requests.HTTPError):
+                ozon_seller.seller_product_info_list(product_ids=["500003"], client_id="1", api_key="key")
+
+
+if __name__ == "__main__":
+    unittest.main()
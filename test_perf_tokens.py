@@ -0,0 +1,115 @@
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.core.security import decrypt_secret, encrypt_secret
+from app.db.base import Base
+from app.models import PerfApiToken
+from app.services import perf_tokens
+
+
+class PerfTokenStoreTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        self.patches = [
+            patch("app.services.perf_tokens.SessionLocal", self.session_factory),
+            patch("app.services.perf_tokens.create_all", lambda: None),
+            patch("app.services.leases.create_all", lambda: None),
+        ]
+        for item in self.patches:
+            item.start()
+        perf_tokens._local.clear()
+
+    def tearDown(self):
+        for item in self.patches:
+            item.stop()
+        perf_tokens._local.clear()
+
+    def test_concurrent_cold_callers_fetch_once_and_share_the_token(self):
+        calls = []
+
+        def fake_request(client_id, client_secret):
+            calls.append(client_id)
+            time.sleep(0.05)
+            return "tok-1", 1800
+
+        results = []
+        with patch("app.services.perf_tokens.request_perf_token", side_effect=fake_request):
+            threads = [
+                threading.Thread(target=lambda: results.append(perf_tokens.get_perf_token("id", "secret")))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            perf_tokens._local.clear()
+            from_store = perf_tokens.get_perf_token("id", "secret")
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(set(results), {"tok-1"})
+        self.assertEqual(from_store, "tok-1")
+        with self.session_factory() as db:
+            row = db.query(PerfApiToken).one()
+            self.assertNotIn("secret", row.credential_hash)
+            self.assertNotIn("tok-1", row.access_token)
+            self.assertEqual(decrypt_secret(row.access_token), "tok-1")
+            self.assertGreater(row.expires_at, datetime.utcnow() + timedelta(minutes=29))
+
+    def test_proactive_refresh_replaces_tokens_close_to_expiry(self):
+        key = perf_tokens._credential_hash("id", "secret")
+        with self.session_factory() as db:
+            db.add(
+                PerfApiToken(
+                    credential_hash=key,
+                    client_id="id",
+                    access_token=encrypt_secret("old"),
+                    expires_at=datetime.utcnow() + timedelta(minutes=3),
+                )
+            )
+            db.commit()
+        credentials = [("aura", "id", "secret")]
+        with (
+            patch("app.services.perf_tokens._iter_perf_credentials", return_value=credentials),
+            patch("app.services.perf_tokens.request_perf_token", return_value=("new", 1800)) as request,
+        ):
+            self.assertEqual(perf_tokens.refresh_expiring_perf_tokens(), 1)
+            self.assertEqual(perf_tokens.refresh_expiring_perf_tokens(), 0)
+            self.assertEqual(perf_tokens.get_perf_token("id", "secret"), "new")
+
+        self.assertEqual(request.call_count, 1)
+
+    def test_plaintext_rows_from_before_encryption_are_fetched_again(self):
+        key = perf_tokens._credential_hash("id", "secret")
+        with self.session_factory() as db:
+            db.add(
+                PerfApiToken(
+                    credential_hash=key,
+                    client_id="id",
+                    access_token="plain",
+                    expires_at=datetime.utcnow() + timedelta(minutes=20),
+                )
+            )
+            db.commit()
+        with patch("app.services.perf_tokens.request_perf_token", return_value=("fresh", 1800)) as request:
+            self.assertEqual(perf_tokens.get_perf_token("id", "secret"), "fresh")
+
+        self.assertEqual(request.call_count, 1)
+        with self.session_factory() as db:
+            self.assertEqual(decrypt_secret(db.query(PerfApiToken).one().access_token), "fresh")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.core import middleware
+from app.core.middleware import ProfilingMiddleware
+from app.core.profiler import SamplingProfiler, profiled_call
+from app.db.base import Base
+from app.models import ProfilingArm
+from app.services import profiling
+
+
+def _busy_work(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def _noise_work(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(200))
+
+
+async def _slow_app(scope, receive, send):
+    await run_in_threadpool(profiled_call(_busy_work), 0.1)
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _call(app, path="/api/storage/snapshot", headers=None):
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers or []}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return dict((key.decode(), value.decode()) for key, value in messages[0]["headers"])
+
+
+class ProfilingTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        self.db = session_factory()
+        self.addCleanup(self.db.close)
+        for patcher in (
+            patch.object(profiling, "backend_data_path", lambda name: Path(self._tmp.name) / name),
+            patch.object(profiling, "create_all", lambda: None),
+            patch.object(profiling, "_armed_route", (float("-inf"), None, None)),
+            patch("app.db.session.SessionLocal", session_factory),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_sampler_captures_busy_frames_in_both_formats(self):
+        profiler = SamplingProfiler("unit", interval_ms=2).start()
+        _busy_work(0.1)
+        profile = profiler.stop()
+
+        self.assertGreater(profile.sample_count, 5)
+        self.assertIn("_busy_work", profile.to_collapsed())
+        speedscope = profile.to_speedscope()
+        frame_names = {frame["name"] for frame in speedscope["shared"]["frames"]}
+        self.assertIn("_busy_work", frame_names)
+        self.assertEqual(speedscope["profiles"][0]["type"], "sampled")
+        self.assertEqual(len(speedscope["profiles"][0]["samples"]), len(speedscope["profiles"][0]["weights"]))
+
+    def test_sampler_only_records_registered_threads(self):
+        stop = threading.Event()
+        noise = threading.Thread(target=_noise_work, args=(stop,), daemon=True)
+        noise.start()
+        self.addCleanup(noise.join)
+        self.addCleanup(stop.set)
+
+        profiler = SamplingProfiler("unit", interval_ms=2, threads={threading.get_ident()}).start()
+        _busy_work(0.1)
+        collapsed = profiler.stop().to_collapsed()
+
+        self.assertIn("_busy_work", collapsed)
+        self.assertNotIn("_noise_work", collapsed)
+
+    def test_armed_route_is_profiled_for_next_n_requests_only(self):
+        profiling.arm_profiling(self.db, "/api/storage/snapshot", count=1, method="get", interval_ms=2)
+        app = ProfilingMiddleware(_slow_app)
+        stop = threading.Event()
+        noise = threading.Thread(target=_noise_work, args=(stop,), daemon=True)
+        noise.start()
+        self.addCleanup(noise.join)
+        self.addCleanup(stop.set)
+
+        self.assertNotIn("x-profile-name", _call(app, path="/api/stocks/workspace"))
+        headers = _call(app)
+        self.assertIn("x-profile-name", headers)
+        self.assertIsNone(profiling.profiling_state(self.db))
+        self.assertNotIn("x-profile-name", _call(app))
+
+        items = profiling.list_profiles()
+        self.assertEqual([item["name"] for item in items], [headers["x-profile-name"]])
+        speedscope_path = profiling.profile_file(items[0]["speedscope_file"])
+        self.assertIn("_busy_work", speedscope_path.read_text(encoding="utf-8"))
+        self.assertNotIn("_noise_work", speedscope_path.read_text(encoding="utf-8"))
+        json.loads(speedscope_path.read_text(encoding="utf-8"))
+        self.assertIsNotNone(profiling.profile_file(items[0]["collapsed_file"]))
+        self.assertIsNone(profiling.profile_file("../secrets.speedscope.json"))
+
+    def test_busy_profile_slot_does_not_spend_armed_requests(self):
+        profiling.arm_profiling(self.db, "/api/storage/snapshot", count=1, interval_ms=2)
+        app = ProfilingMiddleware(_slow_app)
+
+        with middleware._profile_slot:
+            self.assertNotIn("x-profile-name", _call(app))
+        self.assertEqual(profiling.profiling_state(self.db)["remaining"], 1)
+        self.assertIn("x-profile-name", _call(app))
+
+    def test_arm_from_another_process_is_seen_after_the_cache_expires(self):
+        app = ProfilingMiddleware(_slow_app)
+        self.assertNotIn("x-profile-name", _call(app))
+        self.assertFalse(profiling.may_be_armed("GET", "/api/storage/snapshot"))
+
+        # Armed through another API process: only the shared row changes, not this process's cached copy.
+        self.db.add(ProfilingArm(path="/api/storage/snapshot", remaining=2, interval_ms=2))
+        self.db.commit()
+        self.assertNotIn("x-profile-name", _call(app))
+
+        with patch.object(profiling, "ARM_CACHE_SECONDS", 0):
+            self.assertIn("x-profile-name", _call(app))
+        self.assertEqual(profiling.profiling_state(self.db)["remaining"], 1)
+
+    def test_debug_header_requires_admin(self):
+        app = ProfilingMiddleware(_slow_app)
+        with patch("app.core.middleware._is_admin_authorization", return_value=False):
+            self.assertNotIn("x-profile-name", _call(app, headers=[(b"x-profile", b"1")]))
+        with patch("app.core.middleware._is_admin_authorization", return_value=True):
+            self.assertIn("x-profile-name", _call(app, headers=[(b"x-profile", b"1")]))
+
+
+if __name__ == "__main__":
+    unittest.main()
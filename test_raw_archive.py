@@ -0,0 +1,183 @@
+import sys
+from datetime import date, datetime
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.db.base import Base
+from app.models import CampaignHourlySnapshot, RawPayload, RawPayloadDictionary
+from app.services import raw_archive
+from app.services.raw_archive import (
+    KIND_CAMPAIGN_HOURLY_ADS,
+    delete_payloads,
+    load_payloads,
+    store_payloads,
+    train_missing_dictionaries,
+)
+from app.services import raw_archive_replay
+from app.services.raw_archive_replay import (
+    ensure_inline_payloads_migrated,
+    migrate_inline_payloads,
+    pending_inline_columns,
+    replay_payloads,
+)
+
+
+def _stats_row(index: int) -> dict:
+    return {
+        "id": str(9000 + index),
+        "title": f"Кампания по чаю {index % 7}",
+        "views": str(1000 + index),
+        "clicks": str(30 + index % 11),
+        "moneySpent": f"{150 + index},{index % 100:02d}",
+        "orders": str(index % 5),
+        "ordersMoney": f"{index * 3},00",
+        "clickPrice": "5,10",
+    }
+
+
+class RawArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        raw_archive._current.clear()
+        raw_archive._dictionaries.clear()
+        self.addCleanup(raw_archive._current.clear)
+        self.addCleanup(raw_archive._dictionaries.clear)
+
+    def _session(self):
+        db = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)()
+        self.addCleanup(db.close)
+        return db
+
+    def test_payloads_round_trip_and_overwrite_in_place(self):
+        Base.metadata.create_all(bind=self.engine)
+        db = self._session()
+        first, second = store_payloads(db, KIND_CAMPAIGN_HOURLY_ADS, [_stats_row(1), {"note": "пусто"}])
+        self.assertEqual(load_payloads(db, [first, second, None]), {first: _stats_row(1), second: {"note": "пусто"}})
+
+        self.assertEqual(store_payloads(db, KIND_CAMPAIGN_HOURLY_ADS, [_stats_row(2)], [first]), [first])
+        self.assertEqual(load_payloads(db, [first])[first], _stats_row(2))
+        self.assertEqual(delete_payloads(db, [second, second]), 1)
+        self.assertEqual(db.query(RawPayload).count(), 1)
+
+    def test_dictionary_is_trained_once_a_kind_has_enough_samples(self):
+        Base.metadata.create_all(bind=self.engine)
+        db = self._session()
+        with patch.object(raw_archive, "DICTIONARY_MIN_SAMPLES", 50):
+            store_payloads(db, KIND_CAMPAIGN_HOURLY_ADS, [_stats_row(index) for index in range(40)])
+            self.assertEqual(train_missing_dictionaries(db), {})
+            plain_ids = store_payloads(db, KIND_CAMPAIGN_HOURLY_ADS, [_stats_row(index) for index in range(40, 60)])
+            # Storing never trains; the worker job (or the migrate command) does.
+            self.assertEqual(db.query(RawPayloadDictionary).count(), 0)
+            trained = train_missing_dictionaries(db)
+            self.assertEqual(list(trained), [KIND_CAMPAIGN_HOURLY_ADS])
+            self.assertEqual(train_missing_dictionaries(db), {})
+            trained_id = store_payloads(db, KIND_CAMPAIGN_HOURLY_ADS, [_stats_row(60)])[0]
+
+        dictionary = db.query(RawPayloadDictionary).one()
+        self.assertEqual((dictionary.kind, dictionary.codec, dictionary.sample_count), (KIND_CAMPAIGN_HOURLY_ADS, raw_archive.CODEC, 60))
+        plain, trained = db.get(RawPayload, plain_ids[-1]), db.get(RawPayload, trained_id)
+        self.assertIsNone(plain.dictionary_id)
+        self.assertEqual(trained.dictionary_id, dictionary.id)
+        self.assertLess(len(trained.data), len(plain.data) * 0.7)
+
+        raw_archive._dictionaries.clear()
+        self.assertEqual(load_payloads(db, [plain_ids[0], trained_id]), {plain_ids[0]: _stats_row(40), trained_id: _stats_row(60)})
+
+    def test_inline_json_columns_move_to_the_archive_and_replay_rebuilds_columns(self):
+        with self.engine.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE campaign_hourly_snapshots (id INTEGER PRIMARY KEY, company VARCHAR(128), "
+                    "campaign_id VARCHAR(128), campaign_title VARCHAR(255) NOT NULL, day DATE, sample_hour INTEGER, "
+                    "sample_at DATETIME, views INTEGER NOT NULL, clicks INTEGER NOT NULL, money_spent FLOAT NOT NULL, "
+                    "raw_ads_json TEXT NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+                )
+            )
+            connection.execute(
+                text(
+                    "INSERT INTO campaign_hourly_snapshots VALUES "
+                    "(1, 'aura', '9001', '', '2026-03-01', 10, '2026-03-01 10:05:00', 1001, 31, 151.01, :raw, '2026-03-01', '2026-03-01'), "
+                    "(2, 'aura', '9001', '', '2026-03-01', 11, '2026-03-01 11:05:00', 0, 0, 0, '{}', '2026-03-01', '2026-03-01')"
+                ),
+                {"raw": '{"views": "1001", "clicks": "31", "moneySpent": "151,01", "orders": "4"}'},
+            )
+        Base.metadata.create_all(bind=self.engine)
+
+        self.assertEqual(migrate_inline_payloads(self.engine), 1)
+
+        columns = {column["name"] for column in inspect(self.engine).get_columns("campaign_hourly_snapshots")}
+        self.assertNotIn("raw_ads_json", columns)
+        self.assertTrue({"orders", "raw_ads_id"} <= columns)
+        db = self._session()
+        moved, empty = db.query(CampaignHourlySnapshot).order_by(CampaignHourlySnapshot.id).all()
+        self.assertEqual((moved.orders, empty.raw_ads_id), (4, None))
+        self.assertEqual(load_payloads(db, [moved.raw_ads_id])[moved.raw_ads_id]["moneySpent"], "151,01")
+        self.assertEqual(migrate_inline_payloads(self.engine), 0)
+
+        moved.views, moved.money_spent = 0, 0.0
+        db.add(CampaignHourlySnapshot(company="aura", campaign_id="9001", day=date(2026, 3, 1), sample_hour=12, sample_at=datetime(2026, 3, 1, 12)))
+        db.commit()
+        self.assertEqual(replay_payloads(db, KIND_CAMPAIGN_HOURLY_ADS), 1)
+        db.refresh(moved)
+        self.assertEqual((moved.views, moved.clicks, moved.money_spent, moved.orders), (1001, 31, 151.01, 4))
+        with self.assertRaises(ValueError):
+            replay_payloads(db, "campaign_daily.seller")
+
+
+    def test_interrupted_migration_resumes_without_archiving_rows_twice(self):
+        with self.engine.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE campaign_hourly_snapshots (id INTEGER PRIMARY KEY, company VARCHAR(128), "
+                    "campaign_id VARCHAR(128), campaign_title VARCHAR(255) NOT NULL, day DATE, sample_hour INTEGER, "
+                    "sample_at DATETIME, views INTEGER NOT NULL, clicks INTEGER NOT NULL, money_spent FLOAT NOT NULL, "
+                    "raw_ads_json TEXT NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+                )
+            )
+            for hour in range(3):
+                connection.execute(
+                    text(
+                        "INSERT INTO campaign_hourly_snapshots VALUES "
+                        "(:id, 'aura', '9001', '', '2026-03-01', :hour, '2026-03-01 10:05:00', 0, 0, 0, :raw, '2026-03-01', '2026-03-01')"
+                    ),
+                    {"id": hour + 1, "hour": hour, "raw": f'{{"views": "{hour}", "orders": "{hour + 1}"}}'},
+                )
+        Base.metadata.create_all(bind=self.engine)
+        self.assertEqual([spec.column for spec in pending_inline_columns(self.engine)], ["raw_ads_json"])
+        with self.assertRaisesRegex(RuntimeError, "campaign_hourly_snapshots.raw_ads_json"):
+            ensure_inline_payloads_migrated(self.engine)
+
+        calls = []
+
+        def store_then_fail(db, kind, payloads):
+            calls.append(len(payloads))
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            return store_payloads(db, kind, payloads)
+
+        with patch.object(raw_archive_replay, "store_payloads", store_then_fail):
+            with self.assertRaises(RuntimeError):
+                migrate_inline_payloads(self.engine, batch_size=1)
+        self.assertEqual(len(pending_inline_columns(self.engine)), 1)
+
+        keep_alive_calls = []
+        self.assertEqual(migrate_inline_payloads(self.engine, batch_size=1, keep_alive=lambda: keep_alive_calls.append(1)), 2)
+        self.assertEqual(len(keep_alive_calls), 2)
+        self.assertEqual(pending_inline_columns(self.engine), [])
+        ensure_inline_payloads_migrated(self.engine)
+        db = self._session()
+        self.assertEqual(db.query(RawPayload).count(), 3)
+        rows = db.query(CampaignHourlySnapshot).order_by(CampaignHourlySnapshot.id).all()
+        self.assertEqual(len({row.raw_ads_id for row in rows}), 3)
+        # The row archived before the interruption is replayed too.
+        self.assertEqual([(row.views, row.orders) for row in rows], [(0, 1), (1, 2), (2, 3)])
+
+if __name__ == "__main__":
+    unittest.main()
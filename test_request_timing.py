@@ -0,0 +1,101 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.core.middleware import RequestTimingMiddleware
+from app.core.timing import StageTimings, collect_timings, instrument_engine, record_upstream_time, timed
+
+
+async def _json_app(scope, receive, send):
+    with timed("build"):
+        record_upstream_time(0.25)
+    body = json.dumps({"rows": [1, 2]}).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def _call(app, headers=None, query=b""):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/stocks/workspace",
+        "query_string": query,
+        "headers": headers or [],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return dict((key.decode(), value.decode()) for key, value in start["headers"]), body
+
+
+class RequestTimingTests(unittest.TestCase):
+    def test_stages_db_queries_and_upstream_time_are_collected(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        instrument_engine(engine)
+        instrument_engine(engine)
+        with collect_timings() as timings:
+            with timed("load"):
+                with engine.connect() as conn:
+                    conn.execute(text("select 1"))
+                    conn.execute(text("select 2"))
+            stage_timings = StageTimings()
+            stage_timings["matrix_ms"] = 12.5
+            stage_timings["total_ms"] = 99
+            record_upstream_time(0.1)
+        summary = timings.summary()
+        self.assertEqual(summary["db_queries"], 2)
+        self.assertEqual(summary["upstream_calls"], 1)
+        self.assertEqual(summary["upstream_ms"], 100.0)
+        self.assertIn("load", summary["stages"])
+        self.assertEqual(summary["stages"]["matrix"], 12.5)
+        self.assertNotIn("total", summary["stages"])
+
+        with engine.connect() as conn:
+            conn.execute(text("select 3"))
+        self.assertEqual(timings.summary()["db_queries"], 2)
+
+    def test_middleware_sets_server_timing_header(self):
+        headers, body = _call(RequestTimingMiddleware(_json_app))
+        self.assertIn("total;dur=", headers["server-timing"])
+        self.assertIn('upstream;dur=250.0;desc="1 calls"', headers["server-timing"])
+        self.assertIn("build;dur=", headers["server-timing"])
+        self.assertEqual(json.loads(body), {"rows": [1, 2]})
+
+    def test_debug_breakdown_is_only_added_for_admins(self):
+        app = RequestTimingMiddleware(_json_app)
+        with patch("app.core.middleware._is_admin_authorization", return_value=False):
+            _headers, body = _call(app, headers=[(b"x-debug-timings", b"1")])
+        self.assertNotIn("debug_timings", json.loads(body))
+
+        with patch("app.core.middleware._is_admin_authorization", return_value=True):
+            headers, body = _call(app, query=b"debug_timings=1")
+        payload = json.loads(body)
+        self.assertEqual(payload["rows"], [1, 2])
+        self.assertEqual(payload["debug_timings"]["upstream_calls"], 1)
+        self.assertEqual(headers["content-length"], str(len(body)))
+
+
+if __name__ == "__main__":
+    unittest.main()
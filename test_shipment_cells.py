@@ -0,0 +1,87 @@
+from datetime import datetime
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.models.shipment_cell import ShipmentCell
+from app.models.shipment_event import ShipmentEvent
+from app.models.shipment_history import ShipmentHistory
+from app.models.shipment_transit import ShipmentTransit
+from app.services import shipment_history
+from app.services.shipment_history import (
+    load_shipment_cells,
+    refresh_shipment_cells,
+    shipment_cell_events,
+    sync_shipment_history,
+)
+
+
+class ShipmentCellTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+        self.addCleanup(self.db.close)
+        patcher = patch.object(shipment_history, "create_all", lambda: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _seed(self):
+        scope = {"company_name": "aura", "seller_client_id": "1"}
+        for day, qty in ((1, 10), (20, 5), (10, 7)):
+            self.db.add(ShipmentEvent(**scope, article="A-1", city_key="МОСКВА", city="Москва", event_at=datetime(2026, 1, day), quantity=qty))
+        self.db.add(ShipmentEvent(**scope, article="A-1", city_key="КАЗАНЬ", city="Казань", event_at=datetime(2026, 2, 1), quantity=4))
+        self.db.add(ShipmentHistory(**scope, article="A-1", city_key="МОСКВА", shipments_count=3, updated_at=datetime(2026, 3, 1)))
+        self.db.add(ShipmentTransit(**scope, article="B-2", city_key="UNKNOWN", city="", quantity=6))
+        self.db.add(ShipmentTransit(**scope, article="B-2", city_key="UNKNOWN", city="", quantity=2))
+        self.db.commit()
+
+    def test_refresh_builds_the_aggregate_from_the_raw_tables(self):
+        self._seed()
+        # Reading never builds the aggregate; the sync and rebuild paths do.
+        self.assertEqual(load_shipment_cells(self.db, company_name="aura", seller_client_id="1"), {})
+        self.assertEqual(self.db.query(ShipmentCell).count(), 0)
+
+        self.assertEqual(refresh_shipment_cells(self.db, company_name="aura", seller_client_id="1"), 3)
+        self.db.commit()
+        cells = load_shipment_cells(self.db, company_name="aura", seller_client_id="1")
+
+        self.assertEqual(set(cells), {("A-1", "МОСКВА"), ("A-1", "КАЗАНЬ"), ("B-2", "UNKNOWN")})
+        moscow = cells[("A-1", "МОСКВА")]
+        self.assertEqual((moscow["shipments_count"], moscow["total_quantity"], moscow["events_count"]), (3, 22, 3))
+        self.assertEqual(moscow["last_event_at"], datetime(2026, 1, 20))
+        self.assertEqual(moscow["history_updated_at"], datetime(2026, 3, 1))
+        self.assertEqual(cells[("B-2", "UNKNOWN")]["transit_quantity"], 8)
+        self.assertEqual(self.db.query(ShipmentCell).count(), 3)
+
+        events = shipment_cell_events(moscow, per_cell_limit=2)
+        self.assertEqual([item["quantity"] for item in events["events_for_calc"]], [5, 7, 10])
+        self.assertEqual(events["events"], [
+            {"quantity": 5, "event_at": datetime(2026, 1, 20), "city": "Москва"},
+            {"quantity": 7, "event_at": datetime(2026, 1, 10), "city": "Москва"},
+        ])
+
+    def test_storage_sync_keeps_the_aggregate_in_step(self):
+        self._seed()
+        lot_rows = [{"article": "C-3", "city_key": "КАЗАНЬ"}, {"article": "C-3", "city": "Казань"}]
+        sync_shipment_history(self.db, company_name="aura", seller_client_id="1", lot_rows=lot_rows)
+
+        cells = load_shipment_cells(self.db, company_name="aura", seller_client_id="1")
+        self.assertEqual(cells[("C-3", "КАЗАНЬ")]["shipments_count"], 2)
+        # History now comes from the lots only; events and transit are untouched.
+        self.assertEqual(cells[("A-1", "МОСКВА")]["shipments_count"], 0)
+        self.assertEqual(cells[("A-1", "МОСКВА")]["total_quantity"], 22)
+        self.assertEqual(cells[("B-2", "UNKNOWN")]["transit_quantity"], 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
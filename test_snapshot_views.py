@@ -0,0 +1,197 @@
+from datetime import datetime
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.db.base import Base
+import app.models  # noqa: F401
+from app.models.storage import StorageSnapshotCache
+from app.services import snapshot_views
+from app.services.row_index import RowIndex, decode_cursor, encode_cursor
+from app.services.snapshot_views import StocksWorkspaceView, StorageSnapshotView, get_storage_snapshot_view
+
+
+def _cell(city: str, stock: int, *, candidate: bool = False, paid: int = 0, soon_30: int = 0) -> dict:
+    return {
+        "city": city,
+        "stock": stock,
+        "need60": stock * 2,
+        "in_transit": 0,
+        "total_with_transit": stock,
+        "turnover_grade": "",
+        "is_candidate": candidate,
+        "display_value": f"{stock} | {stock * 2} | 0",
+        "paid_storage_qty": paid,
+        "paid_storage_soon_30_qty": soon_30,
+        "paid_storage_soon_60_qty": soon_30,
+    }
+
+
+def _workspace() -> dict:
+    return {
+        "company": "aura",
+        "seller_client_id": "1",
+        "sku_count": 3,
+        "stocks_updated_at": "2026-03-10T08:00:00+03:00",
+        "shipments_updated_at": None,
+        "settings": {"regional_order_min": 2, "minimum_supply": 5, "position_filter": "ALL", "assortment_filter": "ALL"},
+        "summary": {"article_count": 3, "city_count": 2, "candidate_count": 2, "approved_count": 0},
+        "columns": ["Москва", "Казань"],
+        "columns_meta": [
+            {"city": "Москва", "city_key": "МОСКВА", "shipment_total_qty": 10, "is_used_for_shipments": True},
+            {"city": "Казань", "city_key": "КАЗАНЬ", "shipment_total_qty": 5, "is_used_for_shipments": True},
+        ],
+        "rows": [
+            {"article": "A-1", "title": "Чай зелёный", "revenue": 100.0, "cells": [_cell("Москва", 5), _cell("Казань", 1, candidate=True)]},
+            {"article": "B-2", "title": "Кофе", "revenue": None, "cells": [_cell("Москва", 40, paid=3), _cell("Казань", 0)]},
+            {"article": "C-3", "title": "Чай чёрный", "revenue": 300.0, "cells": [_cell("Москва", 2, candidate=True), _cell("Казань", 9, soon_30=4)]},
+        ],
+    }
+
+
+class RowIndexTests(unittest.TestCase):
+    def test_sort_puts_missing_values_last_in_both_directions(self):
+        rows = [{"name": "b", "value": 2}, {"name": "a", "value": None}, {"name": "C", "value": 1}]
+        index = RowIndex(rows, search_fields=("name",))
+        mask = index.match()
+
+        self.assertEqual(index.order(mask, "value").tolist(), [2, 0, 1])
+        self.assertEqual(index.order(mask, "-value").tolist(), [0, 2, 1])
+        self.assertEqual(index.order(mask, "name").tolist(), [1, 0, 2])
+        with self.assertRaises(ValueError):
+            index.order(mask, "missing_field")
+
+    def test_cursor_is_bound_to_snapshot_version(self):
+        cursor = encode_cursor("v1", 50)
+        self.assertEqual(decode_cursor(cursor, "v1"), 50)
+        with self.assertRaises(ValueError):
+            decode_cursor(cursor, "v2")
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor", "v1")
+
+
+class StocksWorkspaceViewTests(unittest.TestCase):
+    def test_filters_narrow_rows_and_city_cells(self):
+        view = StocksWorkspaceView(_workspace())
+
+        tea = view.page(search="чай")
+        self.assertEqual([row["article"] for row in tea["rows"]], ["A-1", "C-3"])
+        self.assertEqual(tea["page"]["total"], 2)
+
+        kazan = view.page(cities=["казань"], candidates_only=True)
+        self.assertEqual(kazan["columns"], ["Казань"])
+        self.assertEqual([row["article"] for row in kazan["rows"]], ["A-1"])
+        self.assertEqual([cell["city"] for cell in kazan["rows"][0]["cells"]], ["Казань"])
+
+        self.assertEqual([row["article"] for row in view.page(paid_storage="PAID")["rows"]], ["B-2"])
+        self.assertEqual([row["article"] for row in view.page(paid_storage="SOON_30")["rows"]], ["B-2", "C-3"])
+        self.assertEqual([row["article"] for row in view.page(sort="-stock")["rows"]], ["B-2", "C-3", "A-1"])
+        self.assertEqual([row["article"] for row in view.page(sort="-revenue")["rows"]], ["C-3", "A-1", "B-2"])
+
+    def test_cursor_pages_cover_every_row_once(self):
+        view = StocksWorkspaceView(_workspace())
+        first = view.page(limit=2, sort="article")
+        second = view.page(limit=2, sort="article", cursor=first["page"]["next_cursor"])
+
+        self.assertEqual([row["article"] for row in first["rows"] + second["rows"]], ["A-1", "B-2", "C-3"])
+        self.assertIsNone(second["page"]["next_cursor"])
+        self.assertEqual(len(view.payload["rows"]), 3)
+
+
+class StorageSnapshotViewTests(unittest.TestCase):
+    def _payload(self) -> dict:
+        return {
+            "company": "aura",
+            "seller_client_id": "1",
+            "cache_updated_at": "2026-03-10T08:00:00",
+            "lot_rows": [
+                {"city": "Москва", "city_key": "МОСКВА", "article": "A-1", "days_until_fee_start": 5, "qty_remaining_from_lot": 10},
+                {"city": "Казань", "city_key": "КАЗАНЬ", "article": "A-1", "days_until_fee_start": 80, "qty_remaining_from_lot": 3},
+                {"city": "Москва", "city_key": "МОСКВА", "article": "B-2", "days_until_fee_start": 200, "qty_remaining_from_lot": 7},
+            ],
+            "risk_rows": [{"city": "Москва", "article": "A-1", "days_until_fee_start": 5, "estimated_daily_fee_rub": 2.5}],
+            "unknown_stock_rows": [],
+        }
+
+    def test_lot_filters_and_risk_pages(self):
+        view = StorageSnapshotView(self._payload(), stamp="s1")
+
+        page = view.page(fee_within_days=90, sort="-qty_remaining_from_lot", limit=1)
+        self.assertEqual([row["qty_remaining_from_lot"] for row in page["lot_rows"]], [10])
+        self.assertEqual(page["lot_page"]["total"], 2)
+        self.assertIsNotNone(page["lot_page"]["next_cursor"])
+        self.assertEqual(page["risk_page"]["total"], 1)
+
+        self.assertEqual(len(view.page(risk_only=True)["lot_rows"]), 1)
+        self.assertEqual([row["article"] for row in view.page(cities=["МОСКВА"], search="b-")["lot_rows"]], ["B-2"])
+
+    def test_lots_and_risk_rows_page_independently(self):
+        payload = self._payload()
+        payload["risk_rows"].append({"city": "Казань", "article": "A-1", "days_until_fee_start": 80, "estimated_daily_fee_rub": 1.0})
+        view = StorageSnapshotView(payload, stamp="s1")
+
+        first = view.page(sort="article", risk_sort="days_until_fee_start", limit=1)
+        self.assertEqual([row["city"] for row in first["risk_rows"]], ["Москва"])
+        lots = view.page(sort="article", risk_sort="days_until_fee_start", limit=1, cursor=first["lot_page"]["next_cursor"])
+        self.assertEqual(lots["lot_page"]["offset"], 1)
+        self.assertEqual(lots["risk_page"]["offset"], 0)
+        self.assertEqual([row["city"] for row in lots["risk_rows"]], ["Москва"])
+
+        risks = view.page(sort="article", risk_sort="days_until_fee_start", limit=1, risk_cursor=first["risk_page"]["next_cursor"])
+        self.assertEqual([row["city"] for row in risks["risk_rows"]], ["Казань"])
+        self.assertEqual(risks["lot_page"]["offset"], 0)
+        self.assertIsNone(risks["risk_page"]["next_cursor"])
+        self.assertEqual(view.page(limit=1, risk_offset=1)["risk_page"]["offset"], 1)
+
+        with self.assertRaisesRegex(ValueError, "another row list"):
+            view.page(limit=1, risk_cursor=first["lot_page"]["next_cursor"])
+        with self.assertRaisesRegex(ValueError, "another row list"):
+            view.page(limit=1, cursor=first["risk_page"]["next_cursor"])
+
+    def test_view_is_reused_until_the_stored_snapshot_changes(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+        self.addCleanup(db.close)
+        row = StorageSnapshotCache(company_name="aura", seller_client_id="1", version="v12", updated_at=datetime(2026, 3, 10, 8))
+        db.add(row)
+        db.commit()
+        snapshot_views._storage_views.clear()
+
+        calls = []
+
+        def fake_snapshot(**kwargs):
+            calls.append(kwargs)
+            return {**self._payload(), "refresh_started": kwargs["force_refresh"]}
+
+        with (
+            patch.object(snapshot_views, "resolve_company_config", lambda _company: ("aura", {"seller_client_id": "1"})),
+            patch.object(snapshot_views, "get_storage_snapshot", fake_snapshot),
+            patch("app.services.storage_snapshot.create_all", lambda: None),
+            patch("app.services.storage_pipeline.create_all", lambda: None),
+        ):
+            first, _flags = get_storage_snapshot_view(company="aura", db=db)
+            again, flags = get_storage_snapshot_view(company="aura", db=db)
+            self.assertIs(again, first)
+            self.assertEqual(flags, {"refresh_started": False, "refresh_in_progress": False, "refresh_progress": None})
+
+            _view, forced_flags = get_storage_snapshot_view(company="aura", force_refresh=True, db=db)
+            self.assertTrue(forced_flags["refresh_started"])
+
+            row.updated_at = datetime(2026, 3, 10, 9)
+            db.commit()
+            rebuilt, _flags = get_storage_snapshot_view(company="aura", db=db)
+
+        self.assertIsNot(rebuilt, first)
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
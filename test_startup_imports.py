@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.devtools.startup import (
+    LAZY_MODULES,
+    STARTUP_BUDGET_MS,
+    STARTUP_MODULE,
+    eager_heavy_imports,
+    module_ms,
+    parse_importtime,
+    profile_imports,
+    slowest,
+)
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      4100 |      90500 |     numpy.core
+import time:      2000 |     436000 |   pandas
+import time:      1400 |     950000 | app.main
+DeprecationWarning: something unrelated
+"""
+
+
+class StartupImportTests(unittest.TestCase):
+    def test_importtime_output_is_parsed(self):
+        entries = parse_importtime(SAMPLE)
+
+        self.assertEqual([entry.module for entry in entries], ["_io", "numpy.core", "pandas", "app.main"])
+        self.assertEqual((entries[1].self_us, entries[1].cumulative_us, entries[1].depth), (4100, 90500, 2))
+        self.assertEqual(module_ms(entries, "app.main"), 950.0)
+        self.assertEqual(module_ms(entries, "fastapi"), 0.0)
+        self.assertEqual(eager_heavy_imports(entries), ["pandas", "numpy"])
+        self.assertEqual([entry.module for entry in slowest(entries, limit=2)], ["numpy.core", "pandas"])
+
+    def test_api_start_stays_lazy_and_within_budget(self):
+        # Best of three fresh interpreters, so one slow start on a busy machine does not fail the check.
+        runs = [profile_imports() for _ in range(3)]
+        for entries in runs:
+            self.assertGreater(module_ms(entries, STARTUP_MODULE), 0)
+            self.assertEqual(eager_heavy_imports(entries, LAZY_MODULES), [])
+        self.assertLess(min(module_ms(entries, STARTUP_MODULE) for entries in runs), STARTUP_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
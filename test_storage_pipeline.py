@@ -0,0 +1,104 @@
+import sys
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+import requests
+import uvicorn
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.db.base import Base
+from app.devtools.ozon_stub import StubConfig, StubDataset, create_stub_app
+from app.models import StorageOrderLots, StorageRefreshRun
+from app.services import storage_pipeline
+from app.services.integrations import ozon_seller
+
+NOW = datetime(2026, 3, 12, 10)
+
+
+def _serve_stub(test: unittest.TestCase) -> str:
+    dataset = StubDataset(campaigns=1, skus=30, supply_orders=20, days=10, end_date=date(2026, 3, 10))
+    server = uvicorn.Server(uvicorn.Config(create_stub_app(StubConfig(dataset=dataset)), host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.01)
+    test.assertTrue(server.started)
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    test.addCleanup(stop)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+class StoragePipelineTests(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+        self.base = _serve_stub(self)
+        for patcher in (
+            patch.object(ozon_seller, "SELLER_BASE", self.base),
+            patch.object(storage_pipeline, "create_all", lambda: None),
+            patch.object(storage_pipeline, "STORAGE_REFRESH_RPS", 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _run(self):
+        return storage_pipeline.run_storage_pipeline(
+            self.db, company_name="aura", seller_client_id="3319846", seller_api_key="key", version="v1", now=NOW
+        )[0]
+
+    def _requests(self) -> dict:
+        stats = requests.get(f"{self.base}/__stub/stats", timeout=5).json()["requests"]
+        requests.post(f"{self.base}/__stub/reset", timeout=5)
+        return stats
+
+    def test_second_run_reuses_stored_lots(self):
+        payload = self._run()
+        self.assertTrue(payload["lot_rows"])
+        self.assertEqual(payload["order_count"], 20)
+        self.assertIn("POST /v1/supply-order/bundle", self._requests())
+
+        self.assertEqual(self._run(), payload)
+        self.assertNotIn("POST /v1/supply-order/bundle", self._requests())
+        progress = storage_pipeline.storage_refresh_progress(self.db, company_name="aura", seller_client_id="3319846", version="v1")
+        self.assertEqual(progress["status"], "succeeded")
+        self.assertFalse(progress["active"])
+        self.assertEqual(set(progress["stages"]), {"stocks", "order_ids", "lots", "assemble"})
+
+    def test_failed_run_resumes_after_its_last_checkpoint(self):
+        with patch.object(storage_pipeline, "_orders_by_ids", side_effect=RuntimeError("upstream down")):
+            with self.assertRaises(RuntimeError):
+                self._run()
+        progress = storage_pipeline.storage_refresh_progress(self.db, company_name="aura", seller_client_id="3319846", version="v1")
+        self.assertEqual((progress["status"], progress["stage"]), ("failed", "lots"))
+        self.assertIn("upstream down", progress["last_error"])
+        self._requests()
+
+        payload = self._run()
+        made = self._requests()
+        self.assertNotIn("POST /v1/analytics/stocks", made)
+        self.assertNotIn("POST /v3/supply-order/list", made)
+        self.assertIn("POST /v3/supply-order/get", made)
+        self.assertTrue(payload["lot_rows"])
+        run = self.db.query(StorageRefreshRun).one()
+        self.assertEqual((run.status, run.attempts, run.checkpoint_json), ("succeeded", 2, "{}"))
+        self.assertEqual(self.db.query(StorageOrderLots).count(), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.api import campaigns
+from app.services.task_graph import GraphTask, run_task_graph
+
+
+class TaskGraphTests(unittest.TestCase):
+    def test_independent_tasks_run_concurrently_and_receive_dependency_results(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def left():
+            barrier.wait()
+            return 2
+
+        def right():
+            barrier.wait()
+            return 3
+
+        results, timings = run_task_graph(
+            [
+                GraphTask("left", left),
+                GraphTask("right", right),
+                GraphTask("total", lambda left, right: left * right, deps=("left", "right")),
+            ],
+            max_workers=2,
+        )
+
+        self.assertEqual(results["total"], 6)
+        self.assertEqual(set(timings), {"left_ms", "right_ms", "total_ms"})
+
+    def test_failure_is_reraised(self):
+        def fail():
+            raise RuntimeError("upstream down")
+
+        with self.assertRaises(RuntimeError):
+            run_task_graph([GraphTask("fail", fail), GraphTask("after", lambda fail: fail, deps=("fail",))])
+
+    def test_cycle_is_rejected(self):
+        with self.assertRaises(ValueError):
+            run_task_graph([GraphTask("a", lambda b: b, deps=("b",)), GraphTask("b", lambda a: a, deps=("a",))])
+
+
+
+class CampaignReportGraphTests(unittest.TestCase):
+    def test_report_without_running_campaigns_skips_every_other_source(self):
+        def unreachable(*_args, **_kwargs):
+            raise AssertionError("called without running campaigns")
+
+        with (
+            patch.object(campaigns, "resolve_company_config", lambda _company: ("aura", {})),
+            patch.object(campaigns, "get_campaign_report_cache", lambda _key: None),
+            patch.object(campaigns, "set_campaign_report_cache", lambda _key, _payload: None),
+            patch.object(campaigns, "get_running_campaigns", lambda **_kwargs: []),
+            patch.object(campaigns, "perf_token", unreachable),
+            patch.object(campaigns, "seller_analytics_sku_day", unreachable),
+            patch.object(campaigns, "seller_analytics_stocks", unreachable),
+            patch.object(campaigns, "load_bid_changes_df", unreachable),
+            patch.object(campaigns, "load_campaign_comments_df", unreachable),
+        ):
+            report = campaigns.get_campaign_report(company="aura", date_from="2026-03-01", date_to="2026-03-07", target_drr_pct=20.0)
+
+        self.assertEqual((report.running_campaigns_count, report.rows), (0, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import importlib.util
+import os
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.core import tracing
+from app.core.request_context import request_labels
+from app.services.integrations.metrics import record_upstream_call
+
+HAS_OTEL_SDK = importlib.util.find_spec("opentelemetry.sdk") is not None
+
+
+class TracingDisabledTests(unittest.TestCase):
+    def test_helpers_are_no_ops_without_an_exporter(self):
+        with patch.dict(os.environ, {"TRACING_EXPORTER": ""}):
+            self.assertFalse(tracing.setup_tracing("test"))
+        self.assertFalse(tracing.tracing_enabled())
+
+        @tracing.traced("double")
+        def double(value):
+            return value * 2
+
+        with tracing.span("noop", campaign_id="1") as current:
+            self.assertIsNone(current)
+            self.assertEqual(double(4), 8)
+
+
+@unittest.skipUnless(HAS_OTEL_SDK, "opentelemetry-sdk is not installed")
+class TracingEnabledTests(unittest.TestCase):
+    def setUp(self):
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        self.exporter = InMemorySpanExporter()
+        self.assertTrue(tracing.setup_tracing("test", span_exporter=self.exporter))
+        self.addCleanup(tracing.shutdown_tracing)
+
+    def test_stage_query_and_upstream_spans_share_a_trace(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        tracing.instrument_engine_tracing(engine)
+        with request_labels(company="trace-co"), tracing.span("load_products_parallel", campaign_ids=["7", "8"]):
+            with engine.connect() as conn:
+                conn.execute(text("select 1"))
+            record_upstream_call(
+                "performance",
+                "GET",
+                "https://api-performance.ozon.ru/api/client/campaign/7/v2/products",
+                status=200,
+                seconds=0.05,
+            )
+
+        spans = {item.name: item for item in self.exporter.get_finished_spans()}
+        stage = spans["load_products_parallel"]
+        query = spans["db.query"]
+        upstream = spans["ozon.performance GET /api/client/campaign/{id}/v2/products"]
+        self.assertEqual(stage.attributes["company"], "trace-co")
+        self.assertEqual(list(stage.attributes["campaign_ids"]), ["7", "8"])
+        self.assertEqual(query.parent.span_id, stage.context.span_id)
+        self.assertEqual(upstream.parent.span_id, stage.context.span_id)
+        self.assertEqual(upstream.attributes["http.url.path"], "/api/client/campaign/7/v2/products")
+
+
+if __name__ == "__main__":
+    unittest.main()
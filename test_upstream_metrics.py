@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend"))
+
+from app.core.metrics import render_prometheus
+from app.core.request_context import current_route, request_labels
+from app.services.integrations import ozon_ads, ozon_seller
+from app.services.integrations.metrics import (
+    UPSTREAM_BACKOFF,
+    UPSTREAM_LATENCY,
+    UPSTREAM_REQUESTS,
+    UPSTREAM_RETRIES,
+    endpoint_label,
+)
+
+
+def _response(status: int, body: bytes = b"{}", headers: dict | None = None):
+    response = MagicMock()
+    response.status_code = status
+    response.content = body
+    response.headers = headers or {}
+    return response
+
+
+class UpstreamMetricsTests(unittest.TestCase):
+    def test_seller_retries_and_backoff_are_labelled_by_company_and_route(self):
+        labels = {
+            "service": "seller",
+            "endpoint": "/v1/analytics/data",
+            "company": "metrics-co",
+            "route": "GET /api/stocks/snapshot",
+        }
+        responses = [_response(429, headers={"Retry-After": "3"}), _response(200, b'{"result": []}')]
+        with (
+            patch.object(ozon_seller._session(), "post", side_effect=responses),
+            patch("app.services.integrations.ozon_seller.time.sleep") as sleep,
+            request_labels(company="metrics-co", route="GET /api/stocks/snapshot"),
+        ):
+            ozon_seller._post_with_backoff(
+                "https://api-seller.ozon.ru/v1/analytics/data",
+                headers={"Client-Id": "1"},
+                body={},
+            )
+
+        sleep.assert_called_once_with(3.0)
+        self.assertEqual(UPSTREAM_REQUESTS.value(method="POST", status="429", **labels), 1)
+        self.assertEqual(UPSTREAM_REQUESTS.value(method="POST", status="200", **labels), 1)
+        self.assertEqual(UPSTREAM_RETRIES.value(reason="429", **labels), 1)
+        self.assertEqual(UPSTREAM_BACKOFF.value(**labels), 3.0)
+        self.assertEqual(UPSTREAM_LATENCY.count(**labels), 2)
+        self.assertIn('company="metrics-co"', render_prometheus())
+
+    def test_streamed_response_is_closed_before_a_retry(self):
+        retried = _response(503, headers={"Retry-After": "1"})
+        final = _response(200)
+        final.iter_content.return_value = [b'{"rows": [{"id": "1"}]}']
+        with (
+            patch.object(ozon_ads._session(), "request", side_effect=[retried, final]),
+            patch("app.services.integrations.ozon_ads.time.sleep"),
+        ):
+            rows = list(ozon_ads.iter_campaign_daily_stats_rows("token", "2026-03-01", "2026-03-02", ["1"]))
+
+        self.assertEqual(rows, [{"id": "1"}])
+        retried.close.assert_called_once_with()
+
+    def test_endpoint_label_collapses_ids(self):
+        self.assertEqual(
+            endpoint_label("https://api-performance.ozon.ru/api/client/campaign/123456/v2/products?page=1"),
+            "/api/client/campaign/{id}/v2/products",
+        )
+
+    def test_route_label_comes_from_the_matched_route(self):
+        scope = {"type": "http", "method": "GET", "path": "/api/jobs/42"}
+        with request_labels(http_scope=scope):
+            self.assertEqual(current_route(), "GET unmatched")
+            scope["route"] = MagicMock(path="/jobs/{job_id}")
+            self.assertEqual(current_route(), "GET /jobs/{job_id}")
+        self.assertEqual(current_route(), "")
+
+if __name__ == "__main__":
+    unittest.main()